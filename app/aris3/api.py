@@ -17,6 +17,7 @@ from app.aris3.routers.metrics import router as metrics_router
 from app.aris3.routers.assets_images import router as assets_images_router
 from app.aris3.routers.pos_drawer import router as pos_drawer_router
 from app.aris3.routers.pos_advances import router as pos_advances_router
+from app.aris3.routers.live_events import router as live_events_router
 
 api_router = APIRouter()
 api_router.include_router(health_router)
@@ -34,5 +35,6 @@ api_router.include_router(pos_advances_router, tags=["pos-advances"])
 api_router.include_router(reports_router, tags=["reports"])
 api_router.include_router(exports_router, tags=["exports"])
 api_router.include_router(assets_images_router, tags=["assets"])
+api_router.include_router(live_events_router, tags=["live-events"])
 if settings.METRICS_ENABLED:
     api_router.include_router(metrics_router, tags=["ops"])
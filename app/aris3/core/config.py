@@ -38,9 +38,48 @@ class Settings(BaseSettings):
     OPENAI_INVENTORY_MODEL: str = "gpt-4.1-mini"
     OPENAI_INVENTORY_TIMEOUT_SECONDS: float = 20.0
     OPENAI_INVENTORY_LARGE_TIMEOUT_SECONDS: float = 60.0
+    OPENAI_API_BASE_URL: str = "https://api.openai.com/v1"
+    OPENAI_INVENTORY_MAX_CONNECTIONS: int = 20
+    OPENAI_INVENTORY_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    OPENAI_INVENTORY_KEEPALIVE_SECONDS: float = 30.0
+    OPENAI_INVENTORY_MAX_CONCURRENCY: int = 8
+    OPENAI_INVENTORY_MAX_RETRIES: int = 2
+    OPENAI_INVENTORY_RETRY_BACKOFF_SECONDS: float = 0.5
+    AI_INVENTORY_CLIENT: str = "openai"
+    AI_EXTRACTION_CACHE_ENABLED: bool = True
+    AI_EXTRACTION_CACHE_TTL_DAYS: int = 30
     AI_PRELOAD_SYNC_TEXT_CHAR_LIMIT: int = 4000
     AI_PRELOAD_MAX_FILES: int = 10
     AI_PRELOAD_MAX_FILE_BYTES: int = 10 * 1024 * 1024
     AI_PRELOAD_MAX_TOTAL_BYTES: int = 30 * 1024 * 1024
+    AI_PRELOAD_CHUNK_TEXT_CHARS: int = 4000
+    AI_PRELOAD_CHUNK_ROWS: int = 200
+    AI_PRELOAD_CHUNK_CONCURRENCY: int = 4
+    AI_PRELOAD_SHEET_PROGRESS_ROWS: int = 1000
+    AI_JOBS_LEASE_SECONDS: int = 300
+    AI_JOBS_MAX_ATTEMPTS: int = 3
+    AI_JOBS_RETRY_BASE_SECONDS: int = 30
+    AI_JOBS_RETRY_MAX_SECONDS: int = 900
+    AI_JOBS_TENANT_CONCURRENCY: int = 2
+    AI_JOBS_POLL_SECONDS: float = 2.0
+    AI_WORKER_MAX_BACKOFF_SECONDS: float = 60.0
+    STOCK_IMPORT_STREAM_CHUNK_SIZE: int = 500
+    STOCK_IMPORT_MAX_ERROR_DETAILS: int = 1000
+    STOCK_IMPORT_MAX_LINE_BYTES: int = 65536
+    STOCK_BULK_ACTION_CHUNK_SIZE: int = 500
+    STOCK_MARKDOWN_CHUNK_SIZE: int = 1000
+    STOCK_ARCHIVE_SOLD_AFTER_DAYS: int = 90
+    STOCK_ARCHIVE_BATCH_SIZE: int = 1000
+    SKU_IMAGE_CACHE_TTL_SECONDS: int = 60
+    SKU_IMAGE_CACHE_MAX_ENTRIES: int = 20000
+    SKU_IMAGE_CACHE_VERSION_CHECK_SECONDS: int = 5
+    STOCK_CHANGES_SETTLE_SECONDS: int = 2
+    STOCK_TOMBSTONE_RETENTION_DAYS: int = 30
+    LIVE_EVENTS_BACKEND: str = "memory"
+    LIVE_EVENTS_QUEUE_SIZE: int = 100
+    LIVE_EVENTS_HEARTBEAT_SECONDS: int = 15
+    FORENSICS_HEADER_ENABLED: bool = False
+    FORENSICS_TENANT_IDS: str = ""
+    FORENSICS_SAMPLE_RATE: float = 0.0
 
 settings = Settings()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+
+from fastapi import Request
+
+from app.aris3.core.config import settings
+from app.aris3.core.scope import is_superadmin, is_tenant_admin
+
+
+FORENSICS_HEADER = "X-ARIS3-Forensics"
+_TRUTHY = {"1", "true", "yes", "on"}
+
+
+@dataclass(frozen=True)
+class ForensicTrace:
+    active: bool
+    reason: str | None = None
+    trace_id: str = ""
+
+    def emit(self, logger, event: str, **fields) -> None:
+        # Callers guard expensive field values (compiled SQL, extra counts) behind `trace.active`.
+        if not self.active:
+            return
+        fields["forensic_reason"] = self.reason
+        fields["trace_id"] = self.trace_id
+        message = " ".join([event, *(f"{name}=%s" for name in fields)])
+        logger.info(message, *fields.values())
+
+
+def compile_sql_with_literals(db, statement) -> str:
+    bind = db.get_bind()
+    compiled = statement.compile(
+        dialect=bind.dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    return str(compiled)
+
+
+def _forensic_tenant_ids() -> set[str]:
+    return {value.strip() for value in settings.FORENSICS_TENANT_IDS.split(",") if value.strip()}
+
+
+def _header_requested(request: Request, role: str | None) -> bool:
+    # The header is an operator tool: only admins may turn on SQL forensics for their own request.
+    if not settings.FORENSICS_HEADER_ENABLED or not (is_superadmin(role) or is_tenant_admin(role)):
+        return False
+    return (request.headers.get(FORENSICS_HEADER) or "").strip().lower() in _TRUTHY
+
+
+def _resolve_reason(request: Request, tenant_id: str | None, role: str | None) -> str | None:
+    if _header_requested(request, role):
+        return "header"
+    if tenant_id and str(tenant_id) in _forensic_tenant_ids():
+        return "tenant"
+    if settings.FORENSICS_SAMPLE_RATE > 0 and random.random() < settings.FORENSICS_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def get_forensic_trace(request: Request, *, tenant_id: str | None = None, role: str | None = None) -> ForensicTrace:
+    # Decided once per request so every router touched by the request traces (or skips) consistently.
+    trace = getattr(request.state, "forensic_trace", None)
+    if isinstance(trace, ForensicTrace):
+        return trace
+    reason = _resolve_reason(request, tenant_id, role)
+    trace = ForensicTrace(active=reason is not None, reason=reason, trace_id=getattr(request.state, "trace_id", ""))
+    request.state.forensic_trace = trace
+    return trace
@@ -4,7 +4,7 @@ from decimal import Decimal
 import uuid
 
 from sqlalchemy import Boolean, Date, DateTime, ForeignKey, ForeignKeyConstraint, Index, JSON, Numeric, String, Text, UniqueConstraint
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, mapped_column, query_expression, relationship
 
 from app.aris3.db.base import Base, GUID
 
@@ -128,15 +128,281 @@ class StockItem(Base):
     cost_price: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
     suggested_price: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
     sale_price: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
+    list_price: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
+    markdown_percent: Mapped[Decimal | None] = mapped_column(Numeric(5, 2), nullable=True)
+    quantity: Mapped[int] = mapped_column(nullable=False, default=1)
+    search_text: Mapped[str | None] = mapped_column(Text, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # EPC/SKU/NONE, filled only by queries that select stock_rules.operational_mode_expression.
+    operational_mode: Mapped[str | None] = query_expression()
 
     __table_args__ = (
         UniqueConstraint("tenant_id", "epc", name="uq_stock_items_tenant_epc"),
         UniqueConstraint("tenant_id", "item_uid", name="uq_stock_items_tenant_item_uid"),
+        # SKU picking at checkout, transfer validation, returns and report cost lookups.
+        Index(
+            "ix_stock_items_tenant_store_sku_status",
+            "tenant_id",
+            "store_id",
+            "sku",
+            "status",
+            "location_code",
+            "pool",
+            "location_is_vendible",
+            "created_at",
+            postgresql_include=["epc", "quantity"],
+        ),
+        # list_stock pages ordered by created_at, per store and tenant-wide.
+        Index("ix_stock_items_tenant_store_created", "tenant_id", "store_id", "created_at"),
+        Index("ix_stock_items_tenant_created", "tenant_id", "created_at"),
+        # Delta sync pages changes in (updated_at, id) order, per store and tenant-wide.
+        Index("ix_stock_items_tenant_store_updated", "tenant_id", "store_id", "updated_at", "id"),
+        Index("ix_stock_items_tenant_updated", "tenant_id", "updated_at", "id"),
+    )
+
+
+class StockItemArchive(Base):
+    # Cold tier for SOLD units; mirrors stock_items column for column so rows move with INSERT ... SELECT.
+    __tablename__ = "stock_items_archive"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True)
+    item_uid: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("tenants.id"), index=True, nullable=False)
+    store_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), ForeignKey("stores.id"), nullable=True)
+    catalog_product_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    sku: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    var1_value: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    var2_value: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    epc: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    location_code: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    pool: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    status: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    item_status: Mapped[str] = mapped_column(String(50), nullable=False)
+    epc_status: Mapped[str] = mapped_column(String(50), nullable=False)
+    observation: Mapped[str | None] = mapped_column(Text, nullable=True)
+    print_status: Mapped[str] = mapped_column(String(50), nullable=False)
+    issue_state: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    location_is_vendible: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    image_asset_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    image_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    image_thumb_url: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    image_source: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    image_updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    cost_price: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
+    suggested_price: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
+    sale_price: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
+    list_price: Mapped[Decimal | None] = mapped_column(Numeric(12, 2), nullable=True)
+    markdown_percent: Mapped[Decimal | None] = mapped_column(Numeric(5, 2), nullable=True)
+    quantity: Mapped[int] = mapped_column(nullable=False, default=1)
+    search_text: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_stock_items_archive_tenant_store_created", "tenant_id", "store_id", "created_at"),
+        Index("ix_stock_items_archive_tenant_sku", "tenant_id", "sku"),
+        Index("ix_stock_items_archive_tenant_epc", "tenant_id", "epc"),
+    )
+
+
+class StockItemTombstone(Base):
+    # A unit that left a delta-sync scope: deleted, archived, or moved out of store_id.
+    __tablename__ = "stock_item_tombstones"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("tenants.id"), nullable=False)
+    store_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    stock_item_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    reason: Mapped[str] = mapped_column(String(20), nullable=False)
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_stock_item_tombstones_tenant_store_deleted", "tenant_id", "store_id", "deleted_at", "stock_item_id"),
+        Index("ix_stock_item_tombstones_tenant_deleted", "tenant_id", "deleted_at", "stock_item_id"),
+    )
+
+
+class StockMovement(Base):
+    # Append-only ledger of on-hand (non-SOLD) unit changes per store and SKU.
+    __tablename__ = "stock_movements"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("tenants.id"), nullable=False)
+    store_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    sku: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    qty_delta: Mapped[int] = mapped_column(nullable=False)
+    reason: Mapped[str] = mapped_column(String(40), nullable=False)
+    reference_type: Mapped[str | None] = mapped_column(String(40), nullable=True)
+    reference_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_stock_movements_tenant_occurred", "tenant_id", "occurred_at"),
+        Index("ix_stock_movements_tenant_store_sku_occurred", "tenant_id", "store_id", "sku", "occurred_at"),
+    )
+
+
+class StockSnapshot(Base):
+    __tablename__ = "stock_snapshots"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("tenants.id"), nullable=False)
+    taken_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+    __table_args__ = (Index("ix_stock_snapshots_tenant_taken", "tenant_id", "taken_at"),)
+
+
+class StockSnapshotLine(Base):
+    __tablename__ = "stock_snapshot_lines"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    snapshot_id: Mapped[uuid.UUID] = mapped_column(
+        GUID(), ForeignKey("stock_snapshots.id", ondelete="CASCADE"), nullable=False
+    )
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    store_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    sku: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    on_hand: Mapped[int] = mapped_column(nullable=False)
+
+    __table_args__ = (Index("ix_stock_snapshot_lines_snapshot_store_sku", "snapshot_id", "store_id", "sku"),)
+
+
+class StockSearchToken(Base):
+    __tablename__ = "stock_item_search_tokens"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("tenants.id"), nullable=False)
+    stock_item_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False, index=True)
+    token: Mapped[str] = mapped_column(String(100), nullable=False)
+
+    __table_args__ = (Index("ix_stock_item_search_tokens_tenant_token", "tenant_id", "token"),)
+
+
+class StockCounter(Base):
+    __tablename__ = "stock_counters"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("tenants.id"), nullable=False)
+    store_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), ForeignKey("stores.id"), nullable=True)
+    counter_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    sku: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    var1_value: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    var2_value: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    location_code: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    pool: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    status: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    location_is_vendible: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    has_epc: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    qty: Mapped[int] = mapped_column(nullable=False, default=0)
+    row_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "counter_key", name="uq_stock_counters_tenant_key"),
+        Index("ix_stock_counters_tenant_store_sku", "tenant_id", "store_id", "sku"),
+    )
+
+
+class ChangeVersion(Base):
+    __tablename__ = "change_versions"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    resource: Mapped[str] = mapped_column(String(50), nullable=False)
+    # Store id or "shared" for changes not tied to one store. Rows scoped "*" are a retired tenant-wide
+    # counter; they are no longer bumped but still count towards the tenant-wide sum.
+    scope_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    version: Mapped[int] = mapped_column(nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "resource", "scope_key", name="uq_change_versions_tenant_resource_scope"),
     )
 
 
+class StockImportJob(Base):
+    __tablename__ = "stock_import_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), index=True, nullable=False)
+    created_by_user_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    transaction_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    source_format: Mapped[str] = mapped_column(String(10), nullable=False)
+    status: Mapped[str] = mapped_column(String(30), nullable=False, default="RUNNING")
+    processed_lines: Mapped[int] = mapped_column(nullable=False, default=0)
+    inserted_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    error_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    errors: Mapped[list[dict] | None] = mapped_column(JSON, nullable=True)
+    failure_reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    trace_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (Index("ix_stock_import_jobs_tenant_status", "tenant_id", "status"),)
+
+
+class StockBulkActionRun(Base):
+    __tablename__ = "stock_bulk_action_runs"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), nullable=False)
+    created_by_user_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    transaction_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    action: Mapped[str] = mapped_column(String(30), nullable=False)
+    request_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    status: Mapped[str] = mapped_column(String(30), nullable=False, default="RUNNING")
+    last_item_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    matched: Mapped[int] = mapped_column(nullable=False, default=0)
+    matched_rows: Mapped[int] = mapped_column(nullable=False, default=0)
+    processed: Mapped[int] = mapped_column(nullable=False, default=0)
+    chunks: Mapped[int] = mapped_column(nullable=False, default=0)
+    failure_reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    trace_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (Index("ix_stock_bulk_action_runs_tenant_txn", "tenant_id", "transaction_id"),)
+
+
+class StockMarkdownPolicy(Base):
+    __tablename__ = "stock_markdown_policies"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("tenants.id"), index=True, nullable=False)
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    store_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), ForeignKey("stores.id"), nullable=True)
+    pool: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    buckets: Mapped[list[dict]] = mapped_column(JSON, nullable=False)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (UniqueConstraint("tenant_id", "name", name="uq_stock_markdown_policies_tenant_name"),)
+
+
+class StockMarkdownRun(Base):
+    __tablename__ = "stock_markdown_runs"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), index=True, nullable=False)
+    policy_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("stock_markdown_policies.id"), index=True, nullable=False)
+    created_by_user_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), nullable=True)
+    status: Mapped[str] = mapped_column(String(30), nullable=False, default="QUEUED")
+    updated_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    updated_units: Mapped[int] = mapped_column(nullable=False, default=0)
+    bucket_counts: Mapped[list[dict] | None] = mapped_column(JSON, nullable=True)
+    failure_reason: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    trace_id: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
 class EpcAssignment(Base):
     __tablename__ = "epc_assignments"
 
@@ -245,12 +511,40 @@ class StockAiExtraction(Base):
     warnings: Mapped[list[dict] | None] = mapped_column(JSON, nullable=True)
     model_used: Mapped[str | None] = mapped_column(String(100), nullable=True)
     trace_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    chunks_total: Mapped[int | None] = mapped_column(nullable=True)
+    chunks_completed: Mapped[int | None] = mapped_column(nullable=True)
     preload_session_id: Mapped[uuid.UUID | None] = mapped_column(GUID(), ForeignKey("preload_sessions.id"), nullable=True, index=True)
     confirmed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
 
 
+class StockAiJob(Base):
+    # Durable queue for AI work that is too slow for the request; run by `python -m app.ops.stock_ai_worker`.
+    __tablename__ = "stock_ai_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("tenants.id"), nullable=False)
+    extraction_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("stock_ai_extractions.id"), nullable=False, index=True)
+    kind: Mapped[str] = mapped_column(String(40), nullable=False)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="QUEUED")
+    attempts: Mapped[int] = mapped_column(nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(nullable=False, default=3)
+    available_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    lease_owner: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_stock_ai_jobs_status_available", "status", "available_at"),
+        Index("ix_stock_ai_jobs_tenant_status", "tenant_id", "status"),
+    )
+
+
 class StockAiExtractionFile(Base):
     __tablename__ = "stock_ai_extraction_files"
 
@@ -260,7 +554,30 @@ class StockAiExtractionFile(Base):
     content_type: Mapped[str] = mapped_column(String(120), nullable=False)
     size_bytes: Mapped[int] = mapped_column(nullable=False)
     storage_key: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    file_hash: Mapped[str | None] = mapped_column(String(128), nullable=True, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class StockAiExtractionCache(Base):
+    # Raw AI output per tenant, keyed by a hash of the prompt and file contents; rows from an older
+    # prompt version or model are never read again.
+    __tablename__ = "stock_ai_extraction_cache"
+
+    id: Mapped[uuid.UUID] = mapped_column(GUID(), primary_key=True, default=uuid.uuid4)
+    tenant_id: Mapped[uuid.UUID] = mapped_column(GUID(), ForeignKey("tenants.id"), nullable=False)
+    content_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    prompt_version: Mapped[str] = mapped_column(String(64), nullable=False)
+    model: Mapped[str] = mapped_column(String(100), nullable=False)
+    result: Mapped[dict] = mapped_column(JSON, nullable=False)
+    hit_count: Mapped[int] = mapped_column(nullable=False, default=0)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    last_hit_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "tenant_id", "content_hash", "prompt_version", "model", name="uq_stock_ai_extraction_cache_key"
+        ),
+    )
 
 
 class CatalogProduct(Base):
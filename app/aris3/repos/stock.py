@@ -1,12 +1,22 @@
 from __future__ import annotations
 
+import base64
+import json
 from dataclasses import dataclass
 from datetime import datetime
+from decimal import Decimal
+from typing import Any, Iterable
 from uuid import UUID
 
-from sqlalchemy import case, func, or_, select
+from sqlalchemy import DateTime, Numeric, and_, case, func, or_, select
+from sqlalchemy.orm import load_only, with_expression
 
-from app.aris3.db.models import StockItem
+from app.aris3.db.base import GUID
+from app.aris3.db.models import StockCounter, StockItem
+from app.aris3.services.stock_archive import stock_items_with_archive
+from app.aris3.services.stock_counters import StockCounterService
+from app.aris3.services.stock_rules import operational_mode_expression
+from app.aris3.services.stock_search import search_clause
 
 
 @dataclass(frozen=True)
@@ -28,6 +38,65 @@ class StockQueryFilters:
     view: str = "operational"
 
 
+@dataclass(frozen=True)
+class StockAggregates:
+    total_rows: int
+    total_rfid: int
+    total_pending: int
+    rows_by_store: dict[UUID | None, int]
+
+    def totals(self) -> dict[str, int]:
+        return {
+            "total_rows": self.total_rows,
+            "total_rfid": self.total_rfid,
+            "total_pending": self.total_pending,
+            "total_units": self.total_rfid + self.total_pending,
+        }
+
+
+@dataclass(frozen=True)
+class StockCursor:
+    sort_by: str
+    sort_dir: str
+    value: Any
+    id: UUID
+
+
+def encode_stock_cursor(cursor: StockCursor) -> str:
+    value = cursor.value
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif value is not None:
+        value = str(value)
+    raw = json.dumps(
+        {"s": cursor.sort_by, "d": cursor.sort_dir, "v": value, "k": str(cursor.id)},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_stock_cursor(token: str) -> StockCursor:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        sort_by = str(data["s"])
+        sort_dir = str(data["d"])
+        cursor_id = UUID(str(data["k"]))
+        raw_value = data["v"]
+    except (ValueError, TypeError, KeyError, UnicodeError) as exc:
+        raise ValueError("malformed cursor") from exc
+    if sort_dir not in {"asc", "desc"}:
+        raise ValueError("malformed cursor")
+    column = StockRepository._resolve_sort_column(sort_by)
+    if (column.key or sort_by) != sort_by:
+        raise ValueError("malformed cursor")
+    try:
+        value = StockRepository._coerce_cursor_value(column, raw_value)
+    except (ValueError, TypeError, ArithmeticError) as exc:
+        raise ValueError("malformed cursor") from exc
+    return StockCursor(sort_by=sort_by, sort_dir=sort_dir, value=value, id=cursor_id)
+
+
 class StockRepository:
     def __init__(self, db):
         self.db = db
@@ -40,99 +109,187 @@ class StockRepository:
         page_size: int,
         sort_by: str,
         sort_dir: str,
-    ) -> tuple[list[StockItem], dict[str, int], str]:
+        cursor: StockCursor | None = None,
+        columns: Iterable[str] | None = None,
+    ) -> tuple[list[StockItem], StockAggregates, str, str | None]:
         base_query = self._apply_filters(filters)
-        total_rows = self.db.execute(
-            select(func.count()).select_from(base_query.subquery())
-        ).scalar_one()
-
-        sort_column = self._resolve_sort_column(sort_by)
-        resolved_sort_by = sort_column.key or sort_by
-        if sort_dir.lower() == "desc":
-            sort_column = sort_column.desc()
-        else:
-            sort_column = sort_column.asc()
+        aggregates = self.aggregate_for_filters(filters)
 
-        query = base_query.order_by(sort_column).offset((page - 1) * page_size).limit(page_size)
+        resolved_sort_by = self.resolve_sort_by(sort_by)
+        entity = self.entity_for(filters)
+        query = self._paged_query(
+            base_query,
+            page=page,
+            page_size=page_size,
+            limit=page_size + 1,
+            sort_by=sort_by,
+            sort_dir=sort_dir,
+            cursor=cursor,
+            entity=entity,
+        ).options(with_expression(entity.operational_mode, operational_mode_expression(entity)))
+        if columns is not None:
+            # Sparse fieldsets: only the requested columns (plus what paging needs) leave the database.
+            loaded = dict.fromkeys(["id", resolved_sort_by, *columns])
+            query = query.options(load_only(*[getattr(entity, name) for name in loaded]))
         rows = self.db.execute(query).scalars().all()
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = self._cursor_for_row(rows[-1], sort_by=resolved_sort_by, sort_dir=sort_dir.lower())
+        return rows, aggregates, resolved_sort_by, next_cursor
 
-        total_rfid, total_pending = self._totals_for_filters(filters)
-        totals = {
-            "total_rows": total_rows,
-            "total_rfid": total_rfid,
-            "total_pending": total_pending,
-            "total_units": total_rfid + total_pending,
-        }
-        return rows, totals, resolved_sort_by
+    def _paged_query(
+        self,
+        base_query,
+        *,
+        page: int,
+        page_size: int,
+        sort_by: str,
+        sort_dir: str,
+        cursor: StockCursor | None = None,
+        entity=StockItem,
+        limit: int | None = None,
+    ):
+        # ``limit`` may exceed ``page_size`` (one extra row to detect a next page); offsets use ``page_size``.
+        limit = page_size if limit is None else limit
+        sort_column = getattr(entity, self.resolve_sort_by(sort_by))
+        descending = sort_dir.lower() == "desc"
+        if descending:
+            order_by = (sort_column.desc().nullslast(), entity.id.desc())
+        else:
+            order_by = (sort_column.asc().nullslast(), entity.id.asc())
+        query = base_query.order_by(*order_by)
+        if cursor is not None:
+            return query.where(
+                self._keyset_predicate(sort_column, cursor, descending=descending, id_column=entity.id)
+            ).limit(limit)
+        return query.offset((page - 1) * page_size).limit(limit)
+
+    @staticmethod
+    def _keyset_predicate(sort_column, cursor: StockCursor, *, descending: bool, id_column=StockItem.id):
+        # Rows strictly after the cursor in (sort_column NULLS LAST, id) order.
+        id_after = id_column < cursor.id if descending else id_column > cursor.id
+        if cursor.value is None:
+            return and_(sort_column.is_(None), id_after)
+        value_after = sort_column < cursor.value if descending else sort_column > cursor.value
+        return or_(value_after, and_(sort_column == cursor.value, id_after), sort_column.is_(None))
 
-    def _apply_filters(self, filters: StockQueryFilters):
-        query = select(StockItem).where(StockItem.tenant_id == filters.tenant_id)
+    @classmethod
+    def _cursor_for_row(cls, row: StockItem, *, sort_by: str, sort_dir: str) -> str:
+        return encode_stock_cursor(
+            StockCursor(sort_by=sort_by, sort_dir=sort_dir, value=getattr(row, sort_by), id=row.id)
+        )
+
+    @staticmethod
+    def _coerce_cursor_value(sort_column, raw_value):
+        if raw_value is None:
+            return None
+        column_type = sort_column.type
+        if isinstance(column_type, DateTime):
+            return datetime.fromisoformat(raw_value)
+        if isinstance(column_type, Numeric):
+            return Decimal(raw_value)
+        if isinstance(column_type, GUID):
+            return UUID(raw_value)
+        return str(raw_value)
+
+    @staticmethod
+    def entity_for(filters: StockQueryFilters):
+        # The operational view reads the hot table only; history and all also see archived SOLD units.
+        if filters.view == "operational":
+            return StockItem
+        return stock_items_with_archive()
+
+    def _apply_filters(self, filters: StockQueryFilters, *, entity=None):
+        entity = entity or self.entity_for(filters)
+        query = select(entity).where(entity.tenant_id == filters.tenant_id)
         scope_store_id = self._normalize_optional_store_id(filters.scope_store_id)
         if scope_store_id is not None:
-            query = query.where(StockItem.store_id == scope_store_id)
-        if filters.q:
-            like = f"%{filters.q}%"
-            query = query.where(
-                or_(
-                    StockItem.sku.ilike(like),
-                    StockItem.description.ilike(like),
-                    StockItem.var1_value.ilike(like),
-                    StockItem.var2_value.ilike(like),
-                    StockItem.epc.ilike(like),
-                    StockItem.location_code.ilike(like),
-                    StockItem.pool.ilike(like),
-                )
-            )
+            query = query.where(entity.store_id == scope_store_id)
+        if filters.q and filters.q.strip():
+            query = query.where(search_clause(self.db, filters.tenant_id, filters.q, entity=entity))
         if filters.description:
-            query = query.where(StockItem.description.ilike(f"%{filters.description}%"))
+            query = query.where(entity.description.ilike(f"%{filters.description}%"))
         if filters.var1_value:
-            query = query.where(StockItem.var1_value == filters.var1_value)
+            query = query.where(entity.var1_value == filters.var1_value)
         if filters.var2_value:
-            query = query.where(StockItem.var2_value == filters.var2_value)
+            query = query.where(entity.var2_value == filters.var2_value)
         if filters.sku:
-            query = query.where(StockItem.sku == filters.sku)
+            query = query.where(entity.sku == filters.sku)
         if filters.epc:
-            query = query.where(StockItem.epc == filters.epc)
+            query = query.where(entity.epc == filters.epc)
         if filters.location_code:
-            query = query.where(StockItem.location_code == filters.location_code)
+            query = query.where(entity.location_code == filters.location_code)
         if filters.pool:
-            query = query.where(StockItem.pool == filters.pool)
+            query = query.where(entity.pool == filters.pool)
         requested_store_id = self._normalize_optional_store_id(filters.store_id)
         if requested_store_id is not None:
-            query = query.where(StockItem.store_id == requested_store_id)
+            query = query.where(entity.store_id == requested_store_id)
         if filters.view == "operational":
-            query = query.where(StockItem.status != "SOLD")
+            query = query.where(entity.status != "SOLD")
         elif filters.view == "history":
-            query = query.where(StockItem.status == "SOLD")
+            query = query.where(entity.status == "SOLD")
         if filters.from_date:
-            query = query.where(StockItem.created_at >= filters.from_date)
+            query = query.where(entity.created_at >= filters.from_date)
         if filters.to_date:
-            query = query.where(StockItem.created_at <= filters.to_date)
+            query = query.where(entity.created_at <= filters.to_date)
         return query
 
-    def _totals_for_filters(self, filters: StockQueryFilters) -> tuple[int, int]:
-        base_query = self._apply_filters(filters).subquery()
-        total_rfid_expr = func.coalesce(
-            func.sum(
-                case(
-                    (base_query.c.location_is_vendible.is_(True) & (base_query.c.status == "RFID"), 1),
-                    else_=0,
-                )
-            ),
-            0,
-        )
-        total_pending_expr = func.coalesce(
-            func.sum(
-                case(
-                    (base_query.c.location_is_vendible.is_(True) & (base_query.c.status == "PENDING"), 1),
-                    else_=0,
+    def aggregate_for_filters(self, filters: StockQueryFilters) -> StockAggregates:
+        # One GROUP BY store_id pass; the grand totals are the rollup of the per-store rows. Row totals count
+        # stock rows (what pages are made of); RFID/pending totals count units, so a LOT row counts its quantity.
+        if self._counters_can_serve(filters):
+            grouped_query = StockCounterService(self.db).grouped_totals_query(self._counter_clauses(filters))
+        else:
+            entity = self.entity_for(filters)
+            vendible = entity.location_is_vendible.is_(True)
+            grouped_query = (
+                self._apply_filters(filters, entity=entity)
+                .with_only_columns(
+                    entity.store_id,
+                    func.count(),
+                    func.coalesce(func.sum(case((vendible & (entity.status == "RFID"), entity.quantity), else_=0)), 0),
+                    func.coalesce(func.sum(case((vendible & (entity.status == "PENDING"), entity.quantity), else_=0)), 0),
                 )
-            ),
-            0,
+                .group_by(entity.store_id)
+                .order_by(None)
+            )
+        rows_by_store: dict[UUID | None, int] = {}
+        total_rfid = 0
+        total_pending = 0
+        for store_id, row_count, rfid_count, pending_count in self.db.execute(grouped_query).all():
+            rows_by_store[store_id] = int(row_count or 0)
+            total_rfid += int(rfid_count or 0)
+            total_pending += int(pending_count or 0)
+        return StockAggregates(
+            total_rows=sum(rows_by_store.values()),
+            total_rfid=total_rfid,
+            total_pending=total_pending,
+            rows_by_store=rows_by_store,
         )
-        totals_query = select(total_rfid_expr, total_pending_expr)
-        total_rfid, total_pending = self.db.execute(totals_query).one()
-        return int(total_rfid or 0), int(total_pending or 0)
+
+    @staticmethod
+    def _counters_can_serve(filters: StockQueryFilters) -> bool:
+        # stock_counters only carry the key dimensions; text search, EPC and date filters need the unit rows.
+        return not any((filters.q, filters.description, filters.epc, filters.from_date, filters.to_date))
+
+    def _counter_clauses(self, filters: StockQueryFilters) -> list:
+        clauses = [StockCounter.tenant_id == UUID(str(filters.tenant_id))]
+        scope_store_id = self._normalize_optional_store_id(filters.scope_store_id)
+        if scope_store_id is not None:
+            clauses.append(StockCounter.store_id == scope_store_id)
+        requested_store_id = self._normalize_optional_store_id(filters.store_id)
+        if requested_store_id is not None:
+            clauses.append(StockCounter.store_id == requested_store_id)
+        for field in ("var1_value", "var2_value", "sku", "location_code", "pool"):
+            value = getattr(filters, field)
+            if value:
+                clauses.append(getattr(StockCounter, field) == value)
+        if filters.view == "operational":
+            clauses.append(StockCounter.status != "SOLD")
+        elif filters.view == "history":
+            clauses.append(StockCounter.status == "SOLD")
+        return clauses
 
     @staticmethod
     def _resolve_sort_column(sort_by: str):
@@ -155,6 +312,10 @@ class StockRepository:
         }
         return mapping.get(sort_by, StockItem.created_at)
 
+    @classmethod
+    def resolve_sort_by(cls, sort_by: str) -> str:
+        return cls._resolve_sort_column(sort_by).key or sort_by
+
     @staticmethod
     def _normalize_store_id(store_id: str) -> UUID:
         return UUID(str(store_id))
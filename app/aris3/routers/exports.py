@@ -54,6 +54,7 @@ def _normalize_filters_snapshot(filters: ExportFilters, *, store_id: str) -> Exp
         cashier=filters.cashier,
         channel=filters.channel,
         payment_method=filters.payment_method,
+        sku=filters.sku,
     )
 
 
@@ -0,0 +1,96 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+
+from app.aris3.core.config import settings
+from app.aris3.core.deps import get_current_token_data, require_active_user
+from app.aris3.core.error_catalog import AppError, ErrorCatalog
+from app.aris3.core.scope import can_read_tenant_scope, is_superadmin
+from app.aris3.db.models import Store
+from app.aris3.db.session import get_db
+from app.aris3.services.live_events import format_sse, live_events
+
+
+router = APIRouter()
+
+
+def _resolve_tenant_id(token_data, tenant_id: str | None) -> str:
+    if is_superadmin(token_data.role):
+        if not tenant_id:
+            raise AppError(ErrorCatalog.TENANT_SCOPE_REQUIRED)
+        return tenant_id
+    if not token_data.tenant_id:
+        raise AppError(ErrorCatalog.TENANT_SCOPE_REQUIRED)
+    if tenant_id and tenant_id != token_data.tenant_id:
+        raise AppError(ErrorCatalog.CROSS_TENANT_ACCESS_DENIED)
+    return token_data.tenant_id
+
+
+def _resolve_store_scope(db, token_data, *, tenant_id: str, scope: str, store_id: str | None) -> str | None:
+    token_store_id = getattr(token_data, "store_id", None)
+    if scope == "self":
+        if token_store_id is None:
+            raise AppError(ErrorCatalog.STORE_SCOPE_REQUIRED)
+        if store_id and store_id != token_store_id:
+            raise AppError(ErrorCatalog.STORE_SCOPE_MISMATCH)
+        return token_store_id
+    if not can_read_tenant_scope(token_data.role):
+        raise AppError(ErrorCatalog.PERMISSION_DENIED)
+    if store_id is None:
+        return None
+    store_exists = db.execute(
+        select(Store.id).where(Store.id == store_id, Store.tenant_id == tenant_id)
+    ).scalar_one_or_none()
+    if not store_exists:
+        raise AppError(
+            ErrorCatalog.CROSS_TENANT_ACCESS_DENIED,
+            details={"message": "store_id is outside tenant scope", "store_id": store_id},
+        )
+    return store_id
+
+
+async def _event_stream(request: Request, *, tenant_id: str, store_id: str | None):
+    subscription = live_events.subscribe(tenant_id=tenant_id, store_id=store_id)
+    event_id = 0
+    try:
+        yield "retry: 3000\n: connected\n\n"
+        while not await request.is_disconnected():
+            live_event = await subscription.next(timeout=settings.LIVE_EVENTS_HEARTBEAT_SECONDS)
+            if live_event is None:
+                yield ": keep-alive\n\n"
+                continue
+            event_id += 1
+            yield format_sse(live_event, event_id=event_id)
+    finally:
+        live_events.unsubscribe(subscription)
+
+
+@router.get(
+    "/aris3/live/events",
+    response_class=StreamingResponse,
+    summary="Stream stock and sale change notifications",
+    description=(
+        "Server-sent events for one store (or the whole tenant with `scope=tenant`): `stock.status` unit transitions, "
+        "`sale.checkout`, `sale.cancel` and `transfer.receive`. Notifications are hints to refresh; there is no replay, "
+        "so clients reconnecting after a gap re-read the list endpoints (or `/aris3/stock/changes`)."
+    ),
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+def stream_live_events(
+    request: Request,
+    token_data=Depends(get_current_token_data),
+    _user=Depends(require_active_user),
+    db=Depends(get_db),
+    store_id: str | None = None,
+    tenant_id: str | None = None,
+    scope: Literal["self", "tenant"] = Query("self"),
+):
+    scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
+    scoped_store_id = _resolve_store_scope(db, token_data, tenant_id=scoped_tenant_id, scope=scope, store_id=store_id)
+    return StreamingResponse(
+        _event_stream(request, tenant_id=scoped_tenant_id, store_id=scoped_store_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
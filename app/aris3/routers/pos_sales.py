@@ -6,9 +6,9 @@ import logging
 import uuid
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
 from fastapi.responses import JSONResponse
-from sqlalchemy import delete, func, or_, select
+from sqlalchemy import delete, or_, select
 
 from app.aris3.core.context import build_request_context
 from app.aris3.core.deps import get_current_token_data, require_active_user, require_permission
@@ -57,9 +57,15 @@ from app.aris3.schemas.pos_sales import (
 )
 from app.aris3.services.access_control import AccessControlService
 from app.aris3.services.audit import AuditEventPayload, AuditService
+from app.aris3.services.change_versions import SALES_RESOURCE, ChangeVersionService, not_modified_or_tag
 from app.aris3.services.idempotency import IdempotencyService, extract_idempotency_key
+from app.aris3.services.live_events import SALE_CANCEL_EVENT, SALE_CHECKOUT_EVENT, queue_live_event
+from app.aris3.services.stock_movements import MOVEMENT_RETURN, MOVEMENT_SALE, set_movement_context
 from app.aris3.services.pos_advances import expire_advance_if_needed
 from app.aris3.services.sale_statuses import FINALIZED_SALE_STATUSES, is_finalized_sale_status
+from app.aris3.services.stock_archive import StockArchiveService
+from app.aris3.services.stock_counters import StockCounterService
+from app.aris3.services.stock_lots import stock_units, take_stock_units
 from app.aris3.services.stock_rules import sale_epc_filters, sale_sku_filters
 
 
@@ -234,8 +240,14 @@ def _build_sale_line_from_stock(db, *, tenant_id: str, line: PosSaleLineCreate,
     if snapshot.pool:
         filters.append(StockItem.pool == snapshot.pool)
 
-    count = db.execute(select(func.count()).select_from(StockItem).where(*filters)).scalar_one()
-    if int(count or 0) < line.qty:
+    count = StockCounterService(db).sku_available_qty(
+        tenant_id=tenant_id,
+        store_id=store_id,
+        sku=sku,
+        location_code=snapshot.location_code,
+        pool=snapshot.pool,
+    )
+    if count < line.qty:
         if _legacy_unit_price(line) is not None:
             return PosSaleLineCreate(
                 line_type=line.line_type,
@@ -883,6 +895,8 @@ def _sale_summary_row(repo: PosSaleRepository, sale: PosSale) -> SaleSummaryRow:
     },
 )
 def list_sales(
+    request: Request,
+    response: Response,
     store_id: str | None = Query(default=None),
     receipt_number: str | None = Query(default=None),
     status: str | None = Query(default=None),
@@ -901,6 +915,14 @@ def list_sales(
     scoped_tenant_id = _resolve_tenant_id(token_data, token_data.tenant_id)
     resolved_store_id = _resolve_store_id(token_data, store_id)
     enforce_store_scope(token_data, resolved_store_id, db, allow_superadmin=True)
+    version = ChangeVersionService(db).current(
+        tenant_id=scoped_tenant_id,
+        resource=SALES_RESOURCE,
+        store_id=resolved_store_id,
+    )
+    not_modified = not_modified_or_tag(request, response, token_data, resource=SALES_RESOURCE, version=version)
+    if not_modified is not None:
+        return not_modified
     repo = PosSaleRepository(db)
     rows, total = repo.list_sales(
         PosSaleQueryFilters(
@@ -1366,6 +1388,12 @@ def sale_action(
 
     action = str(payload.action).upper()
     effective_store_id = str(sale.store_id)
+    set_movement_context(
+        db,
+        MOVEMENT_SALE if action == "CHECKOUT" else MOVEMENT_RETURN,
+        reference_type="pos_sale",
+        reference_id=sale.id,
+    )
 
     if action == "CANCEL":
         if sale.status != "DRAFT":
@@ -1375,6 +1403,13 @@ def sale_action(
         sale.canceled_at = datetime.utcnow()
         sale.updated_by_user_id = current_user.id
         sale.updated_at = datetime.utcnow()
+        queue_live_event(
+            db,
+            SALE_CANCEL_EVENT,
+            tenant_id=sale.tenant_id,
+            store_id=sale.store_id,
+            data={"sale_id": str(sale.id), "status": sale.status},
+        )
         db.commit()
         response = _sale_response(repo, sale)
         context.record_success(status_code=200, response_body=response.model_dump(mode="json"))
@@ -1526,6 +1561,13 @@ def sale_action(
             for item in return_items:
                 line = line_lookup[item.line_id]
                 if line.line_type == "EPC":
+                    StockArchiveService(db).restore_sold(
+                        tenant_id=sale.tenant_id,
+                        store_id=sale.store_id,
+                        location_code=line.location_code,
+                        pool=line.pool,
+                        epc=line.epc,
+                    )
                     stock_row = (
                         db.execute(
                             select(StockItem)
@@ -1584,6 +1626,14 @@ def sale_action(
                         stock_row.location_is_vendible = True
                         stock_row.updated_at = now
                 elif line.line_type == "SKU":
+                    StockArchiveService(db).restore_sold(
+                        tenant_id=sale.tenant_id,
+                        store_id=sale.store_id,
+                        location_code=line.location_code,
+                        pool=line.pool,
+                        sku=line.sku,
+                        units=item.qty,
+                    )
                     stock_rows = (
                         db.execute(
                             select(StockItem)
@@ -1602,7 +1652,8 @@ def sale_action(
                         .scalars()
                         .all()
                     )
-                    if len(stock_rows) < item.qty:
+                    stock_rows = take_stock_units(db, stock_rows, item.qty)
+                    if stock_units(stock_rows) < item.qty:
                         raise AppError(
                             ErrorCatalog.VALIDATION_ERROR,
                             details={"message": "sold stock not found for SKU refund", "sku": line.sku},
@@ -1974,7 +2025,8 @@ def sale_action(
                     .scalars()
                     .all()
                 )
-                if len(stock_rows) < line.qty:
+                stock_rows = take_stock_units(db, stock_rows, line.qty)
+                if stock_units(stock_rows) < line.qty:
                     raise AppError(
                         ErrorCatalog.VALIDATION_ERROR,
                         details={"message": "insufficient stock for exchange SKU line", "sku": snapshot.sku},
@@ -1988,6 +2040,13 @@ def sale_action(
         for item in return_items:
             line = line_lookup[item.line_id]
             if line.line_type == "EPC":
+                StockArchiveService(db).restore_sold(
+                    tenant_id=sale.tenant_id,
+                    store_id=sale.store_id,
+                    location_code=line.location_code,
+                    pool=line.pool,
+                    epc=line.epc,
+                )
                 stock_row = (
                     db.execute(
                         select(StockItem)
@@ -2046,6 +2105,14 @@ def sale_action(
                     stock_row.location_is_vendible = True
                     stock_row.updated_at = now
             elif line.line_type == "SKU":
+                StockArchiveService(db).restore_sold(
+                    tenant_id=sale.tenant_id,
+                    store_id=sale.store_id,
+                    location_code=line.location_code,
+                    pool=line.pool,
+                    sku=line.sku,
+                    units=item.qty,
+                )
                 stock_rows = (
                     db.execute(
                         select(StockItem)
@@ -2064,7 +2131,8 @@ def sale_action(
                     .scalars()
                     .all()
                 )
-                if len(stock_rows) < item.qty:
+                stock_rows = take_stock_units(db, stock_rows, item.qty)
+                if stock_units(stock_rows) < item.qty:
                     raise AppError(
                         ErrorCatalog.VALIDATION_ERROR,
                         details={"message": "sold stock not found for SKU return", "sku": line.sku},
@@ -2297,15 +2365,17 @@ def sale_action(
                 .scalars()
                 .all()
             )
-            if len(stock_rows) < line.qty:
+            stock_rows = take_stock_units(db, stock_rows, line.qty)
+            if stock_units(stock_rows) < line.qty:
                 raise AppError(
                     ErrorCatalog.VALIDATION_ERROR,
                     details={"message": "insufficient stock for SKU line", "sku": line.sku},
                 )
             for stock_row in stock_rows:
                 if stock_row.cost_price is not None:
-                    stock_cost_total += Decimal(str(stock_row.cost_price))
-                    stock_cost_count += 1
+                    units = stock_row.quantity or 1
+                    stock_cost_total += Decimal(str(stock_row.cost_price)) * units
+                    stock_cost_count += units
                 stock_row.status = "SOLD"
                 stock_row.item_status = "SOLD"
                 stock_row.location_is_vendible = False
@@ -2372,6 +2442,18 @@ def sale_action(
                 trace_id=getattr(request.state, "trace_id", None),
                 occurred_at=now,
             )
+    queue_live_event(
+        db,
+        SALE_CHECKOUT_EVENT,
+        tenant_id=sale.tenant_id,
+        store_id=sale.store_id,
+        data={
+            "sale_id": str(sale.id),
+            "status": sale.status,
+            "receipt_number": sale.receipt_number,
+            "total_due": str(totals["total_due"]),
+        },
+    )
     db.commit()
 
     response = _sale_response(repo, sale)
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 import time
-from datetime import date
+from datetime import date, datetime
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, Query, Request
@@ -18,6 +18,10 @@ from app.aris3.schemas.reports import (
     ReportDailyResponse,
     ReportDailyRow,
     ReportFilters,
+    ReportInventoryValuationMeta,
+    ReportInventoryValuationResponse,
+    ReportInventoryValuationRow,
+    ReportInventoryValuationTotals,
     ReportMeta,
     ReportOverviewResponse,
     ReportTotals,
@@ -25,9 +29,11 @@ from app.aris3.schemas.reports import (
 from app.aris3.services.reports import (
     apply_liability_and_tender_rows,
     build_daily_report_rows,
+    build_inventory_valuation_totals,
     build_report_totals,
     daily_sales_refunds,
     eligible_sales_count_by_store,
+    inventory_valuation_rows,
     resolve_date_range,
     resolve_timezone,
     validate_date_range,
@@ -459,3 +465,75 @@ def report_calendar(
         },
     )
     return ReportCalendarResponse(meta=meta, totals=totals, rows=calendar_rows)
+
+
+@router.get(
+    "/aris3/reports/inventory-valuation",
+    response_model=ReportInventoryValuationResponse,
+    responses={
+        422: {
+            "description": "Validation error",
+            "content": {
+                "application/json": {
+                    "schema": {"$ref": "#/components/schemas/ValidationErrorResponse"}
+                }
+            },
+        }
+    },
+)
+def report_inventory_valuation(
+    request: Request,
+    store_id: str | None = Query(None),
+    sku: str | None = Query(None),
+    token_data=Depends(get_current_token_data),
+    _permission=Depends(require_permission("REPORTS_VIEW")),
+    db=Depends(get_db),
+):
+    resolved_store_id = _resolve_store_id(token_data, store_id)
+    store = enforce_store_scope(
+        token_data,
+        resolved_store_id,
+        db,
+        allow_superadmin=True,
+        broader_store_roles=DEFAULT_BROAD_STORE_ROLES,
+    )
+    as_of = datetime.utcnow()
+    start_time = time.perf_counter()
+    rows_data = inventory_valuation_rows(
+        db,
+        tenant_id=str(store.tenant_id),
+        store_id=resolved_store_id,
+        as_of=as_of,
+        sku=sku,
+    )
+    totals = ReportInventoryValuationTotals(**build_inventory_valuation_totals(rows_data))
+    query_ms = (time.perf_counter() - start_time) * 1000
+    meta = ReportInventoryValuationMeta(
+        store_id=resolved_store_id,
+        requested_store_id=store_id,
+        resolved_store_id=resolved_store_id,
+        token_store_id=token_data.store_id,
+        as_of=as_of,
+        sku=sku,
+        trace_id=getattr(request.state, "trace_id", None),
+        query_ms=query_ms,
+    )
+    logger.info(
+        "reports_inventory_valuation",
+        extra={
+            "trace_id": meta.trace_id,
+            "tenant_id": str(store.tenant_id),
+            "store_id": resolved_store_id,
+            "endpoint": "/aris3/reports/inventory-valuation",
+            "latency_ms": query_ms,
+            "row_count": len(rows_data),
+            "units": totals.units,
+            "cost_value": str(totals.cost_value),
+            "retail_value": str(totals.retail_value),
+        },
+    )
+    return ReportInventoryValuationResponse(
+        meta=meta,
+        totals=totals,
+        rows=[ReportInventoryValuationRow(**row) for row in rows_data],
+    )
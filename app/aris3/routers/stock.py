@@ -1,30 +1,51 @@
 import asyncio
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import logging
 import re
 import time
 from decimal import Decimal
-from typing import Any, Literal
+from typing import Any, Literal, Sequence
 from urllib.parse import urlencode
 from uuid import UUID
 from uuid import uuid4
 
-from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, Query, Request, UploadFile
+from fastapi import APIRouter, Depends, File, Form, Query, Request, Response, UploadFile
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError
-from sqlalchemy import String, cast, func, select
+from sqlalchemy import String, cast, select
 from sqlalchemy.exc import IntegrityError, ProgrammingError, SQLAlchemyError
 
 from app.aris3.core.deps import get_current_token_data, require_active_user, require_permission
 from app.aris3.core.error_catalog import AppError, ErrorCatalog
+from app.aris3.core.forensics import compile_sql_with_literals, get_forensic_trace
 from app.aris3.core.scope import can_read_tenant_scope, can_write_stock_or_assets, is_superadmin
-from app.aris3.db.session import SessionLocal, get_db
+from app.aris3.db.session import get_db
 from app.aris3.core.config import settings
-from app.aris3.db.models import EpcAssignment, PreloadLine, PreloadSession, SkuImage, StockAiExtraction, StockAiExtractionFile, StockItem, Store
-from app.aris3.repos.stock import StockQueryFilters, StockRepository
+from app.aris3.db.models import (
+    EpcAssignment,
+    PreloadLine,
+    PreloadSession,
+    SkuImage,
+    StockAiExtraction,
+    StockAiExtractionFile,
+    StockItem,
+    StockMarkdownPolicy,
+    StockMarkdownRun,
+    Store,
+)
+from app.aris3.repos.stock import StockQueryFilters, StockRepository, decode_stock_cursor
 from app.aris3.schemas.stock import (
+    StockImportEpcLine,
     StockImportEpcRequest,
+    StockImportJobError,
+    StockImportJobErrorsResponse,
+    StockImportJobResponse,
     StockImportResponse,
+    StockMarkdownPolicyRequest,
+    StockMarkdownPolicyResponse,
+    StockMarkdownPreviewBucket,
+    StockMarkdownPreviewResponse,
+    StockMarkdownRunResponse,
     StockImportSkuRequest,
     StockActionEpcLifecyclePayload,
     StockActionMarkdownPayload,
@@ -34,6 +55,12 @@ from app.aris3.schemas.stock import (
     StockActionRequest,
     StockActionResponse,
     StockActionWriteOffPayload,
+    StockBulkActionRequest,
+    StockBulkActionResponse,
+    StockBulkMarkdownPayload,
+    StockBulkRepricePayload,
+    StockBulkSelector,
+    StockBulkWriteOffPayload,
     StockMigrateRequest,
     StockMigrateResponse,
     EpcAssignmentHistoryResponse,
@@ -63,13 +90,51 @@ from app.aris3.schemas.stock import (
     StockQueryMeta,
     StockQueryResponse,
     StockQueryTotals,
+    StockChangesResponse,
+    StockOnHandResponse,
+    StockOnHandRow,
     StockRow,
+    StockTombstoneRow,
 )
 from app.aris3.schemas.errors import ApiErrorResponse
 from app.aris3.services.audit import AuditEventPayload, AuditService
+from app.aris3.services.change_versions import (
+    CATALOG_RESOURCE,
+    STOCK_RESOURCE,
+    ChangeVersionService,
+    not_modified_or_tag,
+)
 from app.aris3.services.idempotency import IdempotencyService, extract_idempotency_key
-from app.aris3.services.stock_rules import compute_operational_state
-from app.aris3.services.stock_ai_preload import StockAiPreloadService, UploadedSource
+from app.aris3.services.sku_image_cache import primary_sku_images
+from app.aris3.services.stock_bulk import StockBulkInsertService
+from app.aris3.services.stock_bulk_actions import StockBulkActionService
+from app.aris3.services.stock_changes import (
+    StockChangeCursor,
+    StockChangeService,
+    decode_change_cursor,
+    encode_change_cursor,
+)
+from app.aris3.services.stock_counters import StockCounterService
+from app.aris3.services.stock_import_jobs import (
+    ImportChunkResult,
+    ImportRecord,
+    ImportRecordDecoder,
+    StockImportJobService,
+    error_entry,
+    iter_body_lines,
+)
+from app.aris3.services.stock_lots import stock_units, take_stock_units
+from app.aris3.services.stock_markdowns import StockMarkdownService
+from app.aris3.services.stock_movements import (
+    MOVEMENT_IMPORT,
+    MOVEMENT_STOCK_ACTION,
+    StockMovementService,
+    set_movement_context,
+)
+from app.aris3.services.stock_rules import row_operational_state
+from app.aris3.services.stock_ai_cache import StockAiExtractionCacheService, extraction_cache_key, file_content_hash
+from app.aris3.services.stock_ai_jobs import JOB_LARGE_EXTRACTION, StockAiJobService, encode_attachments
+from app.aris3.services.stock_ai_preload import StockAiPreloadService, UploadedSource, partial_extraction_message, serialize_ai_line
 from app.aris3.services.catalog_products import CatalogProductService
 
 
@@ -154,15 +219,6 @@ def _resolve_query_scope(
     return None
 
 
-def _compile_sql_with_literals(db, statement) -> str:
-    bind = db.get_bind()
-    compiled = statement.compile(
-        dialect=bind.dialect,
-        compile_kwargs={"literal_binds": True},
-    )
-    return str(compiled)
-
-
 def _store_row_counts(rows: list[StockItem]) -> dict[str, int]:
     counts: dict[str, int] = {}
     for row in rows:
@@ -303,6 +359,36 @@ def _import_sku_payload_summary(payload: StockImportSkuRequest) -> dict:
     }
 
 
+def _sku_import_rows(lines, *, tenant_id: str, storage_mode: str = "UNIT"):
+    for line in lines:
+        values = {
+            "tenant_id": tenant_id,
+            "sku": line.sku,
+            "description": line.description,
+            "var1_value": line.var1_value,
+            "var2_value": line.var2_value,
+            "epc": None,
+            "location_code": line.location_code,
+            "pool": line.pool,
+            "store_id": line.store_id,
+            "status": "PENDING",
+            "location_is_vendible": line.location_is_vendible,
+            "image_asset_id": _image_asset_uuid(line.image_asset_id),
+            "image_url": line.image_url,
+            "image_thumb_url": line.image_thumb_url,
+            "image_source": line.image_source,
+            "image_updated_at": _normalize_utc_datetime(line.image_updated_at),
+            "cost_price": line.cost_price,
+            "suggested_price": line.suggested_price,
+            "sale_price": line.sale_price,
+        }
+        if storage_mode == "LOT":
+            yield {**values, "id": uuid4(), "item_uid": uuid4(), "quantity": line.qty}
+            continue
+        for _ in range(line.qty):
+            yield {**values, "id": uuid4(), "item_uid": uuid4(), "quantity": 1}
+
+
 def _is_in_transit(location_code: str | None, pool: str | None) -> bool:
     return location_code == _IN_TRANSIT_CODE or pool == _IN_TRANSIT_CODE
 
@@ -385,9 +471,193 @@ def _build_pending_migration_filters(scoped_tenant_id: str, data):
     return tuple(filters)
 
 
+STOCK_ROW_FIELDS = tuple(StockRow.model_fields)
+_STOCK_COLUMN_FIELDS = (
+    "sku",
+    "description",
+    "var1_value",
+    "var2_value",
+    "cost_price",
+    "suggested_price",
+    "sale_price",
+    "epc",
+    "location_code",
+    "pool",
+    "store_id",
+    "status",
+    "location_is_vendible",
+    "quantity",
+    "id",
+    "tenant_id",
+    "created_at",
+    "updated_at",
+)
+_STOCK_STATE_FIELDS = frozenset({"available_for_sale", "available_for_transfer", "sale_mode", "transfer_mode", "is_historical"})
+_STOCK_IMAGE_FIELDS = frozenset({"image_asset_id", "image_url", "image_thumb_url", "image_source", "image_updated_at"})
+# StockItem columns each StockRow field reads; a sparse fieldset loads only these.
+_STOCK_ROW_COLUMNS: dict[str, tuple[str, ...]] = {
+    **{name: (name,) for name in _STOCK_COLUMN_FIELDS},
+    "store_name": ("store_id",),
+    "is_current_store": ("store_id",),
+    # The state fields come from the operational_mode expression the listing selects.
+    **{name: () for name in _STOCK_STATE_FIELDS},
+    "available_qty": ("store_id", "sku", "quantity"),
+    **{
+        name: ("sku", "image_asset_id", "image_url", "image_thumb_url", "image_source", "image_updated_at")
+        for name in _STOCK_IMAGE_FIELDS
+    },
+    "display_pool": ("pool",),
+    "display_location_code": ("location_code",),
+}
+
+
+def _parse_stock_fields(fields: str | None) -> list[str] | None:
+    if fields is None:
+        return None
+    selected = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in selected if name not in _STOCK_ROW_COLUMNS]
+    if not selected or unknown:
+        raise AppError(
+            ErrorCatalog.VALIDATION_ERROR,
+            details={"message": f"unknown stock fields: {', '.join(unknown) or '(empty)'}", "field": "fields"},
+        )
+    return selected
+
+
+def _stock_select_columns(fields: list[str] | None) -> list[str] | None:
+    if fields is None:
+        return None
+    # Store names and totals_by_store resolve through store_id whatever the fieldset.
+    columns = ["store_id"]
+    for name in fields:
+        columns.extend(_STOCK_ROW_COLUMNS[name])
+    return list(dict.fromkeys(columns))
+
+
+def _stock_json_value(value):
+    if isinstance(value, Decimal):
+        return format(value.quantize(Decimal("0.01")), "f")
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _stock_row_values(
+    db,
+    request: Request,
+    rows: list[StockItem],
+    *,
+    tenant_id: str,
+    token_store_id: str | None,
+    stores_by_id: dict[str, Store],
+    fields: Sequence[str] = STOCK_ROW_FIELDS,
+) -> list[dict[str, Any]]:
+    # Only the requested fields are computed, so a narrow fieldset also skips the counter and catalog lookups.
+    wanted = set(fields)
+    needs_state = bool(wanted & (_STOCK_STATE_FIELDS | {"available_qty"}))
+    states = [row_operational_state(row) if needs_state else None for row in rows]
+    sku_available_qty: dict[tuple[str | None, str | None], int] = {}
+    if "available_qty" in wanted:
+        sku_mode_rows = [
+            row for row, state in zip(rows, states) if state.sale_mode == "SKU" or state.transfer_mode == "SKU"
+        ]
+        sku_available_qty = StockCounterService(db).sku_available_qty_by_store(
+            tenant_id=tenant_id,
+            skus={row.sku for row in sku_mode_rows if row.sku},
+        )
+        for row in sku_mode_rows:
+            if row.sku:
+                continue
+            key = (str(row.store_id) if row.store_id else None, row.sku)
+            sku_available_qty[key] = sku_available_qty.get(key, 0) + (row.quantity or 1)
+
+    catalog_primary_by_sku = {}
+    if wanted & _STOCK_IMAGE_FIELDS:
+        skus_needing_catalog_image = {
+            row.sku
+            for row in rows
+            if row.sku and row.image_asset_id and (not row.image_url or not row.image_thumb_url or not row.image_source)
+        }
+        catalog_primary_by_sku = primary_sku_images.get_many(db, tenant_id=tenant_id, skus=skus_needing_catalog_image)
+
+    values = []
+    for row, state in zip(rows, states):
+        item: dict[str, Any] = {name: getattr(row, name) for name in _STOCK_COLUMN_FIELDS if name in wanted}
+        for name in ("id", "tenant_id", "store_id"):
+            if name in item:
+                item[name] = str(item[name]) if item[name] else None
+        if "quantity" in item:
+            item["quantity"] = row.quantity or 1
+        if "store_name" in wanted:
+            item["store_name"] = (
+                stores_by_id.get(str(row.store_id)).name if row.store_id and str(row.store_id) in stores_by_id else None
+            )
+        if "is_current_store" in wanted:
+            item["is_current_store"] = (str(row.store_id) == token_store_id) if row.store_id else None
+        if "display_pool" in wanted:
+            item["display_pool"] = row.pool
+        if "display_location_code" in wanted:
+            item["display_location_code"] = row.location_code
+        if needs_state:
+            item.update(
+                available_for_sale=state.available_for_sale,
+                available_for_transfer=state.available_for_transfer,
+                sale_mode=state.sale_mode,
+                transfer_mode=state.transfer_mode,
+                is_historical=state.is_historical,
+            )
+            if "available_qty" in wanted:
+                key = (str(row.store_id) if row.store_id else None, row.sku)
+                sku_mode = state.sale_mode == "SKU" or state.transfer_mode == "SKU"
+                item["available_qty"] = sku_available_qty.get(key, 0) if sku_mode else (1 if state.available_for_sale else 0)
+        if wanted & _STOCK_IMAGE_FIELDS:
+            catalog_image = catalog_primary_by_sku.get(row.sku) if row.sku else None
+            effective_asset_id = (
+                str(row.image_asset_id) if row.image_asset_id else (str(catalog_image.asset_id) if catalog_image else None)
+            )
+            catalog_image_url = (
+                _build_asset_content_url(request, asset_id=effective_asset_id, tenant_id=tenant_id)
+                if effective_asset_id and catalog_image
+                else None
+            )
+            image_url = row.image_url or catalog_image_url
+            item.update(
+                image_asset_id=effective_asset_id,
+                image_url=image_url,
+                image_thumb_url=row.image_thumb_url or catalog_image_url or image_url,
+                image_source=row.image_source or ("catalog" if catalog_image else None),
+                image_updated_at=row.image_updated_at or (catalog_image.image_updated_at if catalog_image else None),
+            )
+        values.append({name: item[name] for name in fields})
+    return values
+
+
+def _stock_response_rows(
+    db,
+    request: Request,
+    rows: list[StockItem],
+    *,
+    tenant_id: str,
+    token_store_id: str | None,
+    stores_by_id: dict[str, Store],
+) -> list[StockRow]:
+    return [
+        StockRow(**values)
+        for values in _stock_row_values(
+            db,
+            request,
+            rows,
+            tenant_id=tenant_id,
+            token_store_id=token_store_id,
+            stores_by_id=stores_by_id,
+        )
+    ]
+
+
 @router.get("/aris3/stock", response_model=StockQueryResponse)
 def list_stock(
     request: Request,
+    response: Response,
     token_data=Depends(get_current_token_data),
     _user=Depends(require_active_user),
     db=Depends(get_db),
@@ -407,11 +677,38 @@ def list_stock(
     page_size: int = Query(50, ge=1, le=500),
     sort_by: str = Query("created_at"),
     sort_dir: Literal["asc", "desc"] = "desc",
+    cursor: str | None = Query(
+        None,
+        description="Opaque keyset cursor from meta.next_cursor; when provided, page is ignored.",
+    ),
     scope: Literal["self", "tenant"] = Query("self"),
     view: Literal["operational", "history", "all"] = Query("operational"),
     include_sold: bool | None = Query(default=None),
+    fields: str | None = Query(
+        None,
+        description="Comma-separated StockRow fields to return; only the columns they need are selected.",
+    ),
+    encoding: Literal["objects", "columnar"] = Query(
+        "objects",
+        description="columnar lists the column names once and returns each row as an array of values.",
+    ),
 ):
     scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
+    selected_fields = _parse_stock_fields(fields)
+    stock_cursor = None
+    if cursor:
+        try:
+            stock_cursor = decode_stock_cursor(cursor)
+        except ValueError:
+            raise AppError(
+                ErrorCatalog.VALIDATION_ERROR,
+                details={"message": "cursor is invalid", "field": "cursor"},
+            )
+        if stock_cursor.sort_by != StockRepository.resolve_sort_by(sort_by) or stock_cursor.sort_dir != sort_dir:
+            raise AppError(
+                ErrorCatalog.VALIDATION_ERROR,
+                details={"message": "cursor does not match sort_by/sort_dir", "field": "cursor"},
+            )
     if store_id:
         _validate_scoped_store(db, tenant_id=scoped_tenant_id, store_id=store_id)
     scope_store_id = _resolve_query_scope(
@@ -421,6 +718,14 @@ def list_stock(
     )
     if include_sold is True and view == "operational":
         view = "all"
+    version = ChangeVersionService(db).current(
+        tenant_id=scoped_tenant_id,
+        resource=STOCK_RESOURCE,
+        store_id=scope_store_id or store_id,
+    )
+    not_modified = not_modified_or_tag(request, response, token_data, resource=STOCK_RESOURCE, version=version)
+    if not_modified is not None:
+        return not_modified
     repo = StockRepository(db)
     filters = StockQueryFilters(
         tenant_id=scoped_tenant_id,
@@ -439,65 +744,56 @@ def list_stock(
         to_date=to_date,
         view=view,
     )
-    base_query = repo._apply_filters(filters)
-    sort_column = repo._resolve_sort_column(sort_by)
-    resolved_sort_column = sort_column.desc() if sort_dir.lower() == "desc" else sort_column.asc()
-    paged_query = base_query.order_by(resolved_sort_column).offset((page - 1) * page_size).limit(page_size)
-    base_subquery = base_query.subquery()
-    grouped_store_counts_query = (
-        select(base_subquery.c.store_id, func.count())
-        .select_from(base_subquery)
-        .group_by(base_subquery.c.store_id)
-    )
-
-    rows, totals, resolved_sort_by = repo.list_stock(
+    rows, aggregates, resolved_sort_by, next_cursor = repo.list_stock(
         filters,
         page=page,
         page_size=page_size,
         sort_by=sort_by,
         sort_dir=sort_dir,
+        cursor=stock_cursor,
+        columns=_stock_select_columns(selected_fields),
     )
+    totals = aggregates.totals()
 
     token_store_id = getattr(token_data, "store_id", None)
-    resolved_store_id = str(UUID(store_id)) if store_id else None
-    grouped_store_counts = {
-        str(store_id_value) if store_id_value else "NULL": count
-        for store_id_value, count in db.execute(grouped_store_counts_query).all()
-    }
-    logger.info(
-        "stock_query_forensics requested_store_id=%s resolved_store_id=%s token_store_id=%s view=%s include_sold=%s base_sql=%s paged_sql=%s grouped_store_counts=%s paged_row_counts=%s",
-        store_id,
-        resolved_store_id,
-        token_store_id,
-        view,
-        include_sold,
-        _compile_sql_with_literals(db, base_query),
-        _compile_sql_with_literals(db, paged_query),
-        grouped_store_counts,
-        _store_row_counts(rows),
-    )
-    if scope_store_id:
-        scoped_store_id = UUID(scope_store_id)
-        rows = [row for row in rows if row.store_id == scoped_store_id]
-        total_rfid = sum(1 for row in rows if row.location_is_vendible and row.status == "RFID")
-        total_pending = sum(1 for row in rows if row.location_is_vendible and row.status == "PENDING")
-        totals = {
-            "total_rows": len(rows),
-            "total_rfid": total_rfid,
-            "total_pending": total_pending,
-            "total_units": total_rfid + total_pending,
-        }
+    forensic_trace = get_forensic_trace(request, tenant_id=scoped_tenant_id, role=getattr(token_data, "role", None))
+    if forensic_trace.active:
+        base_query = repo._apply_filters(filters)
+        paged_query = repo._paged_query(
+            base_query,
+            page=page,
+            page_size=page_size,
+            sort_by=sort_by,
+            sort_dir=sort_dir,
+            cursor=stock_cursor,
+            entity=repo.entity_for(filters),
+        )
+        forensic_trace.emit(
+            logger,
+            "stock_query_forensics",
+            requested_store_id=store_id,
+            resolved_store_id=str(UUID(store_id)) if store_id else None,
+            token_store_id=token_store_id,
+            view=view,
+            include_sold=include_sold,
+            base_sql=compile_sql_with_literals(db, base_query),
+            paged_sql=compile_sql_with_literals(db, paged_query),
+            grouped_store_counts={
+                str(store_id_value) if store_id_value else "NULL": count
+                for store_id_value, count in aggregates.rows_by_store.items()
+            },
+            paged_row_counts=_store_row_counts(rows),
+        )
 
     store_ids = {row.store_id for row in rows if row.store_id is not None}
-    grouped_store_ids = {store_id for store_id, _ in db.execute(grouped_store_counts_query).all() if store_id is not None}
-    store_ids.update(grouped_store_ids)
+    store_ids.update(store_id_value for store_id_value in aggregates.rows_by_store if store_id_value is not None)
     stores_by_id = {}
     if store_ids:
         stores = db.execute(select(Store).where(Store.id.in_(store_ids))).scalars().all()
         stores_by_id = {str(store.id): store for store in stores}
 
     grouped_store_totals = []
-    for grouped_store_id, count in db.execute(grouped_store_counts_query).all():
+    for grouped_store_id, count in aggregates.rows_by_store.items():
         grouped_store_id_str = str(grouped_store_id) if grouped_store_id else None
         store_name = stores_by_id.get(grouped_store_id_str).name if grouped_store_id_str in stores_by_id else None
         grouped_store_totals.append(
@@ -509,84 +805,6 @@ def list_stock(
             }
         )
 
-    sku_available_qty: dict[tuple[str | None, str | None], int] = {}
-    for row in rows:
-        state = compute_operational_state(row)
-        if state.sale_mode != "SKU" and state.transfer_mode != "SKU":
-            continue
-        key = (str(row.store_id) if row.store_id else None, row.sku)
-        sku_available_qty[key] = sku_available_qty.get(key, 0) + 1
-
-    catalog_primary_by_sku: dict[str, SkuImage] = {}
-    skus_needing_catalog_image = {
-        row.sku
-        for row in rows
-        if row.sku and row.image_asset_id and (not row.image_url or not row.image_thumb_url or not row.image_source)
-    }
-    if skus_needing_catalog_image:
-        primary_rows = db.execute(
-            select(SkuImage)
-            .where(
-                SkuImage.tenant_id == scoped_tenant_id,
-                SkuImage.sku.in_(skus_needing_catalog_image),
-                SkuImage.is_primary.is_(True),
-            )
-            .order_by(SkuImage.sort_order.asc(), SkuImage.updated_at.desc().nullslast())
-        ).scalars().all()
-        for image_row in primary_rows:
-            catalog_primary_by_sku.setdefault(image_row.sku, image_row)
-
-    response_rows = []
-    for row in rows:
-        state = compute_operational_state(row)
-        key = (str(row.store_id) if row.store_id else None, row.sku)
-        sku_mode = state.sale_mode == "SKU" or state.transfer_mode == "SKU"
-        available_qty = sku_available_qty.get(key, 0) if sku_mode else (1 if state.available_for_sale else 0)
-        catalog_image = catalog_primary_by_sku.get(row.sku) if row.sku else None
-        effective_asset_id = str(row.image_asset_id) if row.image_asset_id else (str(catalog_image.asset_id) if catalog_image else None)
-        catalog_image_url = (
-            _build_asset_content_url(request, asset_id=effective_asset_id, tenant_id=scoped_tenant_id)
-            if effective_asset_id and catalog_image
-            else None
-        )
-        image_url = row.image_url or catalog_image_url
-        image_thumb_url = row.image_thumb_url or catalog_image_url or image_url
-        image_source = row.image_source or ("catalog" if catalog_image else None)
-        image_updated_at = row.image_updated_at or (catalog_image.updated_at or catalog_image.created_at if catalog_image else None)
-        response_rows.append(StockRow(
-            sku=row.sku,
-            description=row.description,
-            var1_value=row.var1_value,
-            var2_value=row.var2_value,
-            cost_price=row.cost_price,
-            suggested_price=row.suggested_price,
-            sale_price=row.sale_price,
-            epc=row.epc,
-            location_code=row.location_code,
-            pool=row.pool,
-            store_id=str(row.store_id) if row.store_id else None,
-            store_name=stores_by_id.get(str(row.store_id)).name if row.store_id and str(row.store_id) in stores_by_id else None,
-            is_current_store=(str(row.store_id) == token_store_id) if row.store_id else None,
-            status=row.status,
-            location_is_vendible=row.location_is_vendible,
-            image_asset_id=effective_asset_id,
-            image_url=image_url,
-            image_thumb_url=image_thumb_url,
-            image_source=image_source,
-            image_updated_at=image_updated_at,
-            available_for_sale=state.available_for_sale,
-            available_for_transfer=state.available_for_transfer,
-            sale_mode=state.sale_mode,
-            transfer_mode=state.transfer_mode,
-            is_historical=state.is_historical,
-            available_qty=available_qty,
-            display_pool=row.pool,
-            display_location_code=row.location_code,
-            id=str(row.id),
-            tenant_id=str(row.tenant_id),
-            created_at=row.created_at,
-            updated_at=row.updated_at,
-        ))
     meta = StockQueryMeta(
         page=page,
         page_size=page_size,
@@ -594,14 +812,156 @@ def list_stock(
         sort_dir=sort_dir,
         scope=scope,
         view=view,
+        next_cursor=next_cursor,
+    )
+    query_totals = StockQueryTotals(
+        **totals,
+        totals_by_store=grouped_store_totals if scope == "tenant" else [],
+    )
+    if selected_fields is None and encoding == "objects":
+        return StockQueryResponse(
+            meta=meta,
+            rows=_stock_response_rows(
+                db,
+                request,
+                rows,
+                tenant_id=scoped_tenant_id,
+                token_store_id=token_store_id,
+                stores_by_id=stores_by_id,
+            ),
+            totals=query_totals,
+        )
+
+    # Projected and columnar pages skip StockRow validation and are encoded straight from the row values.
+    output_fields = selected_fields or list(STOCK_ROW_FIELDS)
+    row_values = _stock_row_values(
+        db,
+        request,
+        rows,
+        tenant_id=scoped_tenant_id,
+        token_store_id=token_store_id,
+        stores_by_id=stores_by_id,
+        fields=output_fields,
+    )
+    content: dict[str, Any] = {
+        "meta": meta.model_dump(mode="json"),
+        "totals": query_totals.model_dump(mode="json"),
+    }
+    if encoding == "columnar":
+        content["columns"] = output_fields
+        content["rows"] = [[_stock_json_value(values[name]) for name in output_fields] for values in row_values]
+    else:
+        content["rows"] = [{name: _stock_json_value(value) for name, value in values.items()} for values in row_values]
+    return JSONResponse(
+        content=content,
+        headers={name: response.headers[name] for name in ("etag", "cache-control") if name in response.headers},
+    )
+
+
+@router.get("/aris3/stock/changes", response_model=StockChangesResponse)
+def list_stock_changes(
+    request: Request,
+    token_data=Depends(get_current_token_data),
+    _user=Depends(require_active_user),
+    db=Depends(get_db),
+    cursor: str | None = Query(None, description="next_cursor from the previous poll."),
+    changed_since: datetime | None = Query(
+        None,
+        description="Watermark for the first poll; omit both cursor and changed_since for a full initial sync.",
+    ),
+    store_id: str | None = None,
+    tenant_id: str | None = None,
+    scope: Literal["self", "tenant"] = Query("self"),
+    limit: int = Query(500, ge=1, le=1000),
+):
+    scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
+    if store_id:
+        _validate_scoped_store(db, tenant_id=scoped_tenant_id, store_id=store_id)
+    scope_store_id = _resolve_query_scope(token_data, scope=scope, requested_store_id=store_id)
+    service = StockChangeService(db)
+    change_cursor = None
+    if cursor:
+        try:
+            change_cursor = decode_change_cursor(cursor)
+        except ValueError:
+            raise AppError(
+                ErrorCatalog.VALIDATION_ERROR,
+                details={"message": "cursor is invalid", "field": "cursor"},
+            )
+    elif changed_since is not None:
+        change_cursor = StockChangeCursor(changed_at=_normalize_utc_datetime(changed_since), id=UUID(int=0))
+    if change_cursor is not None and service.cursor_expired(change_cursor):
+        raise AppError(
+            ErrorCatalog.BUSINESS_CONFLICT,
+            details={
+                "message": "cursor is older than the tombstone retention window; reload the full stock list",
+                "field": "cursor",
+            },
+        )
+    page = service.changes(
+        tenant_id=scoped_tenant_id,
+        store_id=scope_store_id or store_id,
+        cursor=change_cursor,
+        limit=limit,
     )
-    return StockQueryResponse(
-        meta=meta,
-        rows=response_rows,
-        totals=StockQueryTotals(
-            **totals,
-            totals_by_store=grouped_store_totals if scope == "tenant" else [],
+    store_ids = {row.store_id for row in page.rows if row.store_id is not None}
+    stores_by_id = {}
+    if store_ids:
+        stores = db.execute(select(Store).where(Store.id.in_(store_ids))).scalars().all()
+        stores_by_id = {str(store.id): store for store in stores}
+    return StockChangesResponse(
+        rows=_stock_response_rows(
+            db,
+            request,
+            page.rows,
+            tenant_id=scoped_tenant_id,
+            token_store_id=getattr(token_data, "store_id", None),
+            stores_by_id=stores_by_id,
         ),
+        tombstones=[
+            StockTombstoneRow(
+                id=str(tombstone.stock_item_id),
+                store_id=str(tombstone.store_id) if tombstone.store_id else None,
+                reason=tombstone.reason,
+                deleted_at=tombstone.deleted_at,
+            )
+            for tombstone in page.tombstones
+        ],
+        next_cursor=encode_change_cursor(page.next_cursor),
+        has_more=page.has_more,
+    )
+
+
+@router.get("/aris3/stock/on-hand", response_model=StockOnHandResponse)
+def get_stock_on_hand(
+    token_data=Depends(get_current_token_data),
+    _user=Depends(require_active_user),
+    db=Depends(get_db),
+    at: datetime | None = Query(None, description="Point in time (UTC); defaults to now."),
+    store_id: str | None = None,
+    sku: str | None = None,
+    tenant_id: str | None = None,
+    scope: Literal["self", "tenant"] = Query("self"),
+):
+    scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
+    if store_id:
+        _validate_scoped_store(db, tenant_id=scoped_tenant_id, store_id=store_id)
+    scope_store_id = _resolve_query_scope(token_data, scope=scope, requested_store_id=store_id)
+    on_hand = StockMovementService(db).on_hand_at(
+        tenant_id=scoped_tenant_id,
+        at=_normalize_utc_datetime(at) or datetime.utcnow(),
+        store_id=scope_store_id or store_id,
+        sku=sku,
+    )
+    rows = [
+        StockOnHandRow(store_id=row_store_id, sku=row_sku, on_hand=units)
+        for (row_store_id, row_sku), units in sorted(on_hand.units.items(), key=lambda item: (item[0][0] or "", item[0][1] or ""))
+    ]
+    return StockOnHandResponse(
+        at=on_hand.at,
+        snapshot_taken_at=on_hand.snapshot_taken_at,
+        rows=rows,
+        total_units=sum(row.on_hand for row in rows),
     )
 
 
@@ -634,6 +994,7 @@ def import_stock_epc(
             headers={"X-Idempotency-Result": ErrorCatalog.IDEMPOTENCY_REPLAY.code},
         )
     request.state.idempotency = context
+    set_movement_context(db, MOVEMENT_IMPORT, reference_type="transaction", reference_id=payload.transaction_id)
 
     if not payload.lines:
         raise AppError(
@@ -737,6 +1098,339 @@ def import_stock_epc(
     return response
 
 
+def _epc_import_row(line, *, tenant_id: str) -> dict:
+    return {
+        "tenant_id": tenant_id,
+        "sku": line.sku,
+        "description": line.description,
+        "var1_value": line.var1_value,
+        "var2_value": line.var2_value,
+        "epc": line.epc,
+        "location_code": line.location_code,
+        "pool": line.pool,
+        "store_id": line.store_id,
+        "status": "RFID",
+        "location_is_vendible": line.location_is_vendible,
+        "image_asset_id": _image_asset_uuid(line.image_asset_id),
+        "image_url": line.image_url,
+        "image_thumb_url": line.image_thumb_url,
+        "image_source": line.image_source,
+        "image_updated_at": _normalize_utc_datetime(line.image_updated_at),
+        "cost_price": line.cost_price,
+        "suggested_price": line.suggested_price,
+        "sale_price": line.sale_price,
+        "item_uid": uuid4(),
+    }
+
+
+def _validate_streamed_epc_line(db, record: ImportRecord, *, tenant_id: str, store_scope: dict[str, bool]):
+    # Streamed lines may omit nullable columns (CSV exports rarely carry every field).
+    values = dict.fromkeys(StockImportEpcLine.model_fields)
+    values.update(record.values)
+    if values["qty"] is None:
+        values["qty"] = 1
+    line = StockImportEpcLine.model_validate(values)
+    _apply_import_defaults(line)
+    _validate_location_pool_for_import(line)
+    if line.store_id:
+        if line.store_id not in store_scope:
+            store_scope[line.store_id] = False
+            _validate_scoped_store(db, tenant_id=tenant_id, store_id=line.store_id)
+            store_scope[line.store_id] = True
+        elif not store_scope[line.store_id]:
+            raise AppError(
+                ErrorCatalog.CROSS_TENANT_ACCESS_DENIED,
+                details={"message": "store_id is outside tenant scope", "store_id": line.store_id},
+            )
+    _validate_non_negative_prices(line)
+    _validate_expected_status(line.status, "RFID")
+    if line.qty != 1:
+        raise AppError(
+            ErrorCatalog.VALIDATION_ERROR,
+            details={"message": "qty must be exactly 1 for EPC imports", "qty": line.qty},
+        )
+    if line.epc is None:
+        raise AppError(
+            ErrorCatalog.VALIDATION_ERROR,
+            details={"message": "epc is required for EPC imports"},
+        )
+    _validate_epc(line.epc)
+    return line
+
+
+def _import_epc_stream_chunk(
+    db,
+    records: list[ImportRecord],
+    *,
+    tenant_id: str,
+    store_scope: dict[str, bool],
+) -> ImportChunkResult:
+    result = ImportChunkResult(last_line=records[-1].line)
+    accepted = []
+    seen_epcs: set[str] = set()
+    for record in records:
+        if record.error:
+            result.errors.append(error_entry(record, record.error))
+            continue
+        try:
+            line = _validate_streamed_epc_line(db, record, tenant_id=tenant_id, store_scope=store_scope)
+        except ValidationError as exc:
+            first_error = exc.errors()[0]
+            field = ".".join(str(part) for part in first_error.get("loc", ()))
+            result.errors.append(error_entry(record, first_error.get("msg", "invalid line"), field=field))
+            continue
+        except AppError as exc:
+            details = exc.details if isinstance(exc.details, dict) else {}
+            result.errors.append(
+                error_entry(
+                    record,
+                    details.get("message") or exc.error.message,
+                    epc=record.values.get("epc"),
+                    field=details.get("field"),
+                )
+            )
+            continue
+        if line.epc in seen_epcs:
+            result.errors.append(error_entry(record, "duplicate epc in request", epc=line.epc))
+            continue
+        seen_epcs.add(line.epc)
+        accepted.append((record, line))
+
+    existing_epcs = set()
+    if accepted:
+        existing_epcs = set(
+            db.execute(
+                select(StockItem.epc).where(
+                    StockItem.tenant_id == tenant_id,
+                    StockItem.epc.in_([line.epc for _, line in accepted]),
+                )
+            ).scalars()
+        )
+    rows = []
+    for record, line in accepted:
+        if line.epc in existing_epcs:
+            result.errors.append(error_entry(record, "epc already exists", epc=line.epc))
+            continue
+        rows.append(_epc_import_row(line, tenant_id=tenant_id))
+    result.errors.sort(key=lambda entry: entry["line"])
+    result.inserted = StockBulkInsertService(db).insert_rows(rows)
+    return result
+
+
+def _commit_epc_stream_chunk(db, jobs: StockImportJobService, job, records, *, tenant_id: str, store_scope) -> bool:
+    try:
+        jobs.record_chunk(job, _import_epc_stream_chunk(db, records, tenant_id=tenant_id, store_scope=store_scope))
+        db.commit()
+    except IntegrityError:
+        # A concurrent writer claimed one of the EPCs; the chunk is rolled back and the job can be resumed.
+        db.rollback()
+        jobs.fail(job, "epc already exists")
+        db.commit()
+        return False
+    except Exception as exc:
+        jobs.fail_after_error(job, exc)
+        raise
+    return True
+
+
+def _import_job_response(job) -> StockImportJobResponse:
+    return StockImportJobResponse(
+        job_id=str(job.id),
+        tenant_id=str(job.tenant_id),
+        transaction_id=job.transaction_id,
+        format=job.source_format,
+        status=job.status,
+        processed_lines=job.processed_lines,
+        inserted=job.inserted_count,
+        error_count=job.error_count,
+        failure_reason=job.failure_reason,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+        completed_at=job.completed_at,
+        trace_id=job.trace_id,
+    )
+
+
+@router.post("/aris3/stock/import-epc/stream", response_model=StockImportJobResponse)
+async def import_stock_epc_stream(
+    request: Request,
+    token_data=Depends(get_current_token_data),
+    current_user=Depends(require_active_user),
+    _permission=Depends(require_permission("STORE_MANAGE")),
+    db=Depends(get_db),
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Body format: one JSON line per unit, or CSV with a header row."),
+    transaction_id: str | None = Query(None),
+    tenant_id: str | None = Query(None),
+    job_id: str | None = Query(None, description="Resume a RUNNING/FAILED import job; lines up to processed_lines are skipped."),
+):
+    _require_tenant_admin(token_data)
+    scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
+    trace_id = getattr(request.state, "trace_id", "") or None
+    jobs = StockImportJobService(db)
+    # The body is read on the event loop; every database step runs in a worker thread so a long import
+    # never blocks other requests served by this worker. The session is only touched by one step at a time.
+    job = await asyncio.to_thread(
+        _open_epc_stream_job,
+        db,
+        jobs,
+        tenant_id=scoped_tenant_id,
+        user_id=str(current_user.id),
+        transaction_id=transaction_id,
+        source_format=format,
+        trace_id=trace_id,
+        job_id=job_id,
+    )
+    resume_after = job.processed_lines
+    chunk_size = max(1, settings.STOCK_IMPORT_STREAM_CHUNK_SIZE)
+    decoder = ImportRecordDecoder(format)
+    store_scope: dict[str, bool] = {}
+    chunk: list[ImportRecord] = []
+    completed = True
+    try:
+        async for text in iter_body_lines(request.stream(), max_line_bytes=settings.STOCK_IMPORT_MAX_LINE_BYTES):
+            record = decoder.decode(text)
+            if record is None or record.line <= resume_after:
+                continue
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                completed = await asyncio.to_thread(
+                    _commit_epc_stream_chunk, db, jobs, job, chunk, tenant_id=scoped_tenant_id, store_scope=store_scope
+                )
+                chunk = []
+                if not completed:
+                    break
+        if completed and chunk:
+            completed = await asyncio.to_thread(
+                _commit_epc_stream_chunk, db, jobs, job, chunk, tenant_id=scoped_tenant_id, store_scope=store_scope
+            )
+    except Exception as exc:
+        # An oversized line or a dropped body fails the job as well; committed chunks stay resumable.
+        await asyncio.to_thread(jobs.fail_after_error, job, exc)
+        raise
+    return await asyncio.to_thread(
+        _close_epc_stream_job,
+        db,
+        jobs,
+        job,
+        completed=completed,
+        current_user=current_user,
+        tenant_id=scoped_tenant_id,
+        trace_id=trace_id,
+        source_format=format,
+        resumed=bool(job_id),
+    )
+
+
+def _open_epc_stream_job(
+    db,
+    jobs: StockImportJobService,
+    *,
+    tenant_id: str,
+    user_id: str,
+    transaction_id: str | None,
+    source_format: str,
+    trace_id: str | None,
+    job_id: str | None,
+):
+    if job_id:
+        job = jobs.resume(tenant_id=tenant_id, job_id=job_id, source_format=source_format)
+        db.commit()
+    else:
+        _require_transaction_id(transaction_id)
+        job = jobs.create(
+            tenant_id=tenant_id,
+            user_id=user_id,
+            transaction_id=transaction_id,
+            source_format=source_format,
+            trace_id=trace_id,
+        )
+    set_movement_context(db, MOVEMENT_IMPORT, reference_type="stock_import_job", reference_id=job.id)
+    return job
+
+
+def _close_epc_stream_job(
+    db,
+    jobs: StockImportJobService,
+    job,
+    *,
+    completed: bool,
+    current_user,
+    tenant_id: str,
+    trace_id: str | None,
+    source_format: str,
+    resumed: bool,
+) -> StockImportJobResponse:
+    if completed:
+        jobs.finish(job)
+        db.commit()
+    logger.info(
+        "Stock import-epc stream processed",
+        extra={
+            "trace_id": trace_id or "",
+            "tenant_id": tenant_id,
+            "job_id": str(job.id),
+            "status": job.status,
+            "processed_lines": job.processed_lines,
+        },
+    )
+    response = _import_job_response(job)
+    AuditService(db).record_event(
+        AuditEventPayload(
+            tenant_id=tenant_id,
+            user_id=str(current_user.id),
+            store_id=str(current_user.store_id) if current_user.store_id else None,
+            trace_id=trace_id,
+            actor=current_user.username,
+            action="stock.import_epc_stream",
+            entity_type="stock_import_job",
+            entity_id=str(job.id),
+            before=None,
+            after={
+                "status": response.status,
+                "processed_lines": response.processed_lines,
+                "inserted": response.inserted,
+                "error_count": response.error_count,
+            },
+            metadata={"transaction_id": job.transaction_id, "format": source_format, "resumed": resumed},
+            result="success" if completed else "failure",
+        )
+    )
+    return response
+
+
+@router.get("/aris3/stock/import-jobs/{job_id}", response_model=StockImportJobResponse)
+def get_stock_import_job(
+    job_id: str,
+    token_data=Depends(get_current_token_data),
+    _user=Depends(require_active_user),
+    _permission=Depends(require_permission("STORE_MANAGE")),
+    db=Depends(get_db),
+    tenant_id: str | None = Query(None),
+):
+    scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
+    return _import_job_response(StockImportJobService(db).get(tenant_id=scoped_tenant_id, job_id=job_id))
+
+
+@router.get("/aris3/stock/import-jobs/{job_id}/errors", response_model=StockImportJobErrorsResponse)
+def get_stock_import_job_errors(
+    job_id: str,
+    token_data=Depends(get_current_token_data),
+    _user=Depends(require_active_user),
+    _permission=Depends(require_permission("STORE_MANAGE")),
+    db=Depends(get_db),
+    tenant_id: str | None = Query(None),
+):
+    scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
+    job = StockImportJobService(db).get(tenant_id=scoped_tenant_id, job_id=job_id)
+    errors = [StockImportJobError(**entry) for entry in (job.errors or [])]
+    return StockImportJobErrorsResponse(
+        job_id=str(job.id),
+        error_count=job.error_count,
+        truncated=job.error_count > len(errors),
+        errors=errors,
+    )
+
+
 @router.post("/aris3/stock/import-sku", response_model=StockImportResponse, status_code=201)
 def import_stock_sku(
     request: Request,
@@ -766,6 +1460,7 @@ def import_stock_sku(
             headers={"X-Idempotency-Result": ErrorCatalog.IDEMPOTENCY_REPLAY.code},
         )
     request.state.idempotency = context
+    set_movement_context(db, MOVEMENT_IMPORT, reference_type="transaction", reference_id=payload.transaction_id)
     logger.info(
         "Processing stock import-sku request",
         extra={
@@ -781,7 +1476,7 @@ def import_stock_sku(
             details={"message": "lines must not be empty"},
         )
 
-    items: list[StockItem] = []
+    validated_store_ids: set[str] = set()
     for line in payload.lines:
         _apply_import_defaults(line)
         _validate_location_pool_for_import(line)
@@ -795,7 +1490,9 @@ def import_stock_sku(
                 ErrorCatalog.VALIDATION_ERROR,
                 details={"message": "sku is required", "field": "lines[].sku"},
             )
-        _validate_scoped_store(db, tenant_id=scoped_tenant_id, store_id=line.store_id)
+        if line.store_id not in validated_store_ids:
+            _validate_scoped_store(db, tenant_id=scoped_tenant_id, store_id=line.store_id)
+            validated_store_ids.add(line.store_id)
         _validate_non_negative_prices(line)
         _validate_expected_status(line.status, "PENDING")
         if line.qty < 1:
@@ -809,37 +1506,16 @@ def import_stock_sku(
                 ErrorCatalog.VALIDATION_ERROR,
                 details={"message": "epc must be empty for SKU imports", "epc": line.epc},
             )
-        for _ in range(line.qty):
-            items.append(
-                StockItem(
-                    tenant_id=scoped_tenant_id,
-                    sku=line.sku,
-                    description=line.description,
-                    var1_value=line.var1_value,
-                    var2_value=line.var2_value,
-                    epc=None,
-                    location_code=line.location_code,
-                    pool=line.pool,
-                    store_id=line.store_id,
-                    status="PENDING",
-                    location_is_vendible=line.location_is_vendible,
-                    image_asset_id=_image_asset_uuid(line.image_asset_id),
-                    image_url=line.image_url,
-                    image_thumb_url=line.image_thumb_url,
-                    image_source=line.image_source,
-                    image_updated_at=_normalize_utc_datetime(line.image_updated_at),
-                    cost_price=line.cost_price,
-                    suggested_price=line.suggested_price,
-                    sale_price=line.sale_price,
-                )
-            )
 
-    db.add_all(items)
+    StockBulkInsertService(db).insert_rows(
+        _sku_import_rows(payload.lines, tenant_id=scoped_tenant_id, storage_mode=payload.storage_mode)
+    )
+    processed = sum(line.qty for line in payload.lines)
     _commit_stock_items(db, operation="import-sku", trace_id=getattr(request.state, "trace_id", ""))
 
     response = StockImportResponse(
         tenant_id=scoped_tenant_id,
-        processed=len(items),
+        processed=processed,
         trace_id=getattr(request.state, "trace_id", ""),
     )
     context.record_success(status_code=201, response_body=response.model_dump())
@@ -854,7 +1530,7 @@ def import_stock_sku(
             entity_type="stock_item",
             entity_id="import-sku",
             before=None,
-            after={"created": len(items)},
+            after={"created": processed},
             metadata={"transaction_id": payload.transaction_id},
             result="success",
         )
@@ -891,6 +1567,7 @@ def migrate_stock_sku_to_epc(
             headers={"X-Idempotency-Result": ErrorCatalog.IDEMPOTENCY_REPLAY.code},
         )
     request.state.idempotency = context
+    set_movement_context(db, MOVEMENT_STOCK_ACTION, reference_type="transaction", reference_id=payload.transaction_id)
 
     _validate_location_pool(payload.data)
     if payload.data.store_id:
@@ -928,6 +1605,8 @@ def migrate_stock_sku_to_epc(
             ErrorCatalog.VALIDATION_ERROR,
             details={"message": "no pending stock available for migration"},
         )
+    # EPC assignment materializes a single unit out of a SKU lot.
+    pending_row = take_stock_units(db, [pending_row], 1)[0]
     pending_row.epc = payload.epc
     pending_row.status = "RFID"
     pending_row.cost_price = payload.data.cost_price if payload.data.cost_price is not None else pending_row.cost_price
@@ -992,6 +1671,7 @@ def stock_actions(
             headers={"X-Idempotency-Result": ErrorCatalog.IDEMPOTENCY_REPLAY.code},
         )
     request.state.idempotency = context
+    set_movement_context(db, MOVEMENT_STOCK_ACTION, reference_type="transaction", reference_id=payload.transaction_id)
 
     action = payload.action
     processed = 0
@@ -1079,7 +1759,8 @@ def stock_actions(
                     .scalars()
                     .all()
                 )
-                if len(rows) < action_payload.qty:
+                rows = take_stock_units(db, rows, action_payload.qty)
+                if stock_units(rows) < action_payload.qty:
                     raise AppError(
                         ErrorCatalog.VALIDATION_ERROR,
                         details={"message": "insufficient pending stock for write-off"},
@@ -1087,7 +1768,7 @@ def stock_actions(
                 before_payload = {"removed": [_stock_snapshot(row) for row in rows]}
                 for row in rows:
                     db.delete(row)
-                processed = len(rows)
+                processed = stock_units(rows)
             after_payload = {"removed": processed}
         elif action == "REPRICE":
             action_payload = StockActionRepricePayload(**payload.payload)
@@ -1288,6 +1969,389 @@ def stock_actions(
     return response
 
 
+
+_BULK_SELECTOR_CRITERIA = (
+    "q",
+    "description",
+    "var1_value",
+    "var2_value",
+    "sku",
+    "location_code",
+    "pool",
+    "store_id",
+    "from_date",
+    "to_date",
+    "epcs",
+    "item_uids",
+)
+
+
+def _bulk_selection(db, token_data, *, tenant_id: str, selector: StockBulkSelector, to_date: datetime | None):
+    if not any(getattr(selector, name) for name in _BULK_SELECTOR_CRITERIA):
+        raise AppError(
+            ErrorCatalog.VALIDATION_ERROR,
+            details={"message": "selector requires at least one filter, epcs or item_uids", "field": "selector"},
+        )
+    if selector.store_id:
+        _validate_scoped_store(db, tenant_id=tenant_id, store_id=selector.store_id)
+    for epc in selector.epcs or []:
+        _validate_epc(epc)
+    filters = StockQueryFilters(
+        tenant_id=tenant_id,
+        scope=selector.scope,
+        scope_store_id=_resolve_query_scope(token_data, scope=selector.scope, requested_store_id=selector.store_id),
+        q=selector.q,
+        description=selector.description,
+        var1_value=selector.var1_value,
+        var2_value=selector.var2_value,
+        sku=selector.sku,
+        location_code=selector.location_code,
+        pool=selector.pool,
+        store_id=selector.store_id,
+        from_date=selector.from_date,
+        to_date=to_date,
+        view="operational",
+    )
+    selection = StockRepository(db)._apply_filters(filters)
+    if selector.epcs:
+        selection = selection.where(StockItem.epc.in_(selector.epcs))
+    if selector.item_uids:
+        selection = selection.where(StockItem.item_uid.in_(selector.item_uids))
+    return selection
+
+
+@router.post("/aris3/stock/actions/bulk", response_model=StockBulkActionResponse)
+def stock_bulk_actions(
+    request: Request,
+    payload: StockBulkActionRequest,
+    token_data=Depends(get_current_token_data),
+    current_user=Depends(require_active_user),
+    _permission=Depends(require_permission("STORE_MANAGE")),
+    db=Depends(get_db),
+):
+    _require_transaction_id(payload.transaction_id)
+    scoped_tenant_id = _resolve_tenant_id(token_data, payload.tenant_id)
+    idempotency_key = extract_idempotency_key(request.headers, required=True)
+    request_hash = IdempotencyService.fingerprint(payload.model_dump(mode="json"))
+    idempotency_service = IdempotencyService(db)
+    context, replay = idempotency_service.start(
+        tenant_id=scoped_tenant_id,
+        endpoint=str(request.url.path),
+        method=request.method,
+        idempotency_key=idempotency_key,
+        request_hash=request_hash,
+    )
+    if replay:
+        return JSONResponse(
+            status_code=replay.status_code,
+            content=replay.response_body,
+            headers={"X-Idempotency-Result": ErrorCatalog.IDEMPOTENCY_REPLAY.code},
+        )
+    request.state.idempotency = context
+    set_movement_context(db, MOVEMENT_STOCK_ACTION, reference_type="transaction", reference_id=payload.transaction_id)
+
+    action = payload.action
+    selector = payload.selector
+    metadata: dict = {"transaction_id": payload.transaction_id, "selector": selector.model_dump(mode="json", exclude_none=True)}
+    now = datetime.utcnow()
+    to_date = selector.to_date
+    price = None
+    markdown_percent = None
+    try:
+        if action == "WRITE_OFF":
+            action_payload = StockBulkWriteOffPayload(**payload.payload)
+            if action_payload.reason:
+                metadata["reason"] = action_payload.reason
+        elif action == "REPRICE":
+            action_payload = StockBulkRepricePayload(**payload.payload)
+            price = action_payload.price
+            metadata["price"] = str(price)
+            if action_payload.currency:
+                metadata["currency"] = action_payload.currency
+        elif action == "MARKDOWN_BY_AGE":
+            action_payload = StockBulkMarkdownPayload(**payload.payload)
+            markdown_percent = action_payload.percent
+            metadata["percent"] = str(action_payload.percent)
+            if action_payload.policy:
+                metadata["policy"] = action_payload.policy
+            if action_payload.min_age_days is not None:
+                metadata["min_age_days"] = action_payload.min_age_days
+                cutoff = now - timedelta(days=action_payload.min_age_days)
+                to_date = min(to_date, cutoff) if to_date else cutoff
+    except ValidationError as exc:
+        raise AppError(
+            ErrorCatalog.VALIDATION_ERROR,
+            details={"message": "invalid action payload", "errors": exc.errors()},
+        ) from exc
+
+    selection = _bulk_selection(db, token_data, tenant_id=scoped_tenant_id, selector=selector, to_date=to_date)
+    if action == "WRITE_OFF":
+        selection = selection.where(
+            StockItem.status.in_(("RFID", "PENDING")),
+            StockItem.location_code != _IN_TRANSIT_CODE,
+            StockItem.pool != _IN_TRANSIT_CODE,
+        )
+    service = StockBulkActionService(db)
+    run = service.start(
+        tenant_id=scoped_tenant_id,
+        user_id=str(current_user.id),
+        transaction_id=payload.transaction_id,
+        action=action,
+        request_hash=request_hash,
+        trace_id=getattr(request.state, "trace_id", "") or None,
+    )
+    metadata["run_id"] = str(run.id)
+    try:
+        result = service.execute(run, selection, price=price, markdown_percent=markdown_percent, now=now)
+    except Exception:
+        # Chunks already committed stay applied; the audit row and the FAILED run record how far it got.
+        metadata.update(
+            {
+                "matched": run.matched,
+                "matched_rows": run.matched_rows,
+                "processed": run.processed,
+                "chunks": run.chunks,
+                "failure_reason": run.failure_reason,
+            }
+        )
+        _record_bulk_action_audit(
+            db, request, current_user, tenant_id=scoped_tenant_id, action=action, metadata=metadata, result="failure"
+        )
+        raise
+
+    response = StockBulkActionResponse(
+        tenant_id=scoped_tenant_id,
+        action=action,
+        run_id=str(run.id),
+        matched=result.matched,
+        matched_rows=result.matched_rows,
+        processed=result.processed,
+        chunks=result.chunks,
+        trace_id=getattr(request.state, "trace_id", ""),
+    )
+    context.record_success(status_code=200, response_body=response.model_dump())
+    metadata.update(
+        {"matched": result.matched, "matched_rows": result.matched_rows, "processed": result.processed, "chunks": result.chunks}
+    )
+    _record_bulk_action_audit(
+        db,
+        request,
+        current_user,
+        tenant_id=scoped_tenant_id,
+        action=action,
+        metadata=metadata,
+        result="success",
+        before={"sample": result.before_sample},
+        after={"sample": result.after_sample},
+    )
+    return response
+
+
+def _record_bulk_action_audit(
+    db,
+    request: Request,
+    current_user,
+    *,
+    tenant_id: str,
+    action: str,
+    metadata: dict,
+    result: str,
+    before: dict | None = None,
+    after: dict | None = None,
+) -> None:
+    AuditService(db).record_event(
+        AuditEventPayload(
+            tenant_id=tenant_id,
+            user_id=str(current_user.id),
+            store_id=str(current_user.store_id) if current_user.store_id else None,
+            trace_id=getattr(request.state, "trace_id", "") or None,
+            actor=current_user.username,
+            action=f"stock.bulk_{action.lower()}",
+            entity_type="stock_item",
+            entity_id=action,
+            before=before,
+            after=after,
+            metadata=metadata,
+            result=result,
+        )
+    )
+
+
+def _markdown_policy_response(policy: StockMarkdownPolicy) -> StockMarkdownPolicyResponse:
+    return StockMarkdownPolicyResponse(
+        policy_id=str(policy.id),
+        tenant_id=str(policy.tenant_id),
+        name=policy.name,
+        store_id=str(policy.store_id) if policy.store_id else None,
+        pool=policy.pool,
+        buckets=policy.buckets,
+        is_active=policy.is_active,
+        created_at=policy.created_at,
+        updated_at=policy.updated_at,
+    )
+
+
+def _markdown_run_response(run: StockMarkdownRun) -> StockMarkdownRunResponse:
+    return StockMarkdownRunResponse(
+        run_id=str(run.id),
+        policy_id=str(run.policy_id),
+        tenant_id=str(run.tenant_id),
+        status=run.status,
+        updated_count=run.updated_count,
+        updated_units=run.updated_units,
+        bucket_counts=run.bucket_counts,
+        failure_reason=run.failure_reason,
+        created_at=run.created_at,
+        started_at=run.started_at,
+        completed_at=run.completed_at,
+        trace_id=run.trace_id,
+    )
+
+
+@router.post("/aris3/stock/markdown-policies", response_model=StockMarkdownPolicyResponse)
+def upsert_stock_markdown_policy(
+    request: Request,
+    payload: StockMarkdownPolicyRequest,
+    token_data=Depends(get_current_token_data),
+    current_user=Depends(require_active_user),
+    _permission=Depends(require_permission("STORE_MANAGE")),
+    db=Depends(get_db),
+):
+    scoped_tenant_id = _resolve_tenant_id(token_data, payload.tenant_id)
+    if payload.store_id:
+        _validate_scoped_store(db, tenant_id=scoped_tenant_id, store_id=payload.store_id)
+    ages = [bucket.min_age_days for bucket in payload.buckets]
+    if len(set(ages)) != len(ages):
+        raise AppError(
+            ErrorCatalog.VALIDATION_ERROR,
+            details={"message": "bucket min_age_days must be unique", "field": "buckets"},
+        )
+    buckets = [bucket.model_dump(mode="json") for bucket in sorted(payload.buckets, key=lambda bucket: bucket.min_age_days)]
+    policy = (
+        db.execute(
+            select(StockMarkdownPolicy).where(
+                StockMarkdownPolicy.tenant_id == UUID(scoped_tenant_id),
+                StockMarkdownPolicy.name == payload.name,
+            )
+        )
+        .scalars()
+        .first()
+    )
+    before = _markdown_policy_response(policy).model_dump(mode="json") if policy else None
+    if policy is None:
+        policy = StockMarkdownPolicy(tenant_id=UUID(scoped_tenant_id), name=payload.name)
+        db.add(policy)
+    else:
+        policy.updated_at = datetime.utcnow()
+    policy.store_id = UUID(payload.store_id) if payload.store_id else None
+    policy.pool = payload.pool
+    policy.buckets = buckets
+    policy.is_active = payload.is_active
+    db.commit()
+    response = _markdown_policy_response(policy)
+    AuditService(db).record_event(
+        AuditEventPayload(
+            tenant_id=scoped_tenant_id,
+            user_id=str(current_user.id),
+            store_id=str(current_user.store_id) if current_user.store_id else None,
+            trace_id=getattr(request.state, "trace_id", "") or None,
+            actor=current_user.username,
+            action="stock.markdown_policy.upsert",
+            entity_type="stock_markdown_policy",
+            entity_id=response.policy_id,
+            before=before,
+            after=response.model_dump(mode="json"),
+            metadata=None,
+            result="success",
+        )
+    )
+    return response
+
+
+@router.get("/aris3/stock/markdown-policies", response_model=list[StockMarkdownPolicyResponse])
+def list_stock_markdown_policies(
+    token_data=Depends(get_current_token_data),
+    _user=Depends(require_active_user),
+    _permission=Depends(require_permission("STORE_MANAGE")),
+    db=Depends(get_db),
+    tenant_id: str | None = Query(None),
+):
+    scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
+    policies = (
+        db.execute(
+            select(StockMarkdownPolicy)
+            .where(StockMarkdownPolicy.tenant_id == UUID(scoped_tenant_id))
+            .order_by(StockMarkdownPolicy.name)
+        )
+        .scalars()
+        .all()
+    )
+    return [_markdown_policy_response(policy) for policy in policies]
+
+
+@router.post("/aris3/stock/markdown-policies/{policy_id}/preview", response_model=StockMarkdownPreviewResponse)
+def preview_stock_markdown_policy(
+    policy_id: str,
+    token_data=Depends(get_current_token_data),
+    _user=Depends(require_active_user),
+    _permission=Depends(require_permission("STORE_MANAGE")),
+    db=Depends(get_db),
+    tenant_id: str | None = Query(None),
+):
+    scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
+    service = StockMarkdownService(db)
+    policy = service.get_policy(tenant_id=scoped_tenant_id, policy_id=policy_id)
+    evaluated_at = datetime.utcnow()
+    buckets = [StockMarkdownPreviewBucket(**vars(bucket)) for bucket in service.preview(policy, now=evaluated_at)]
+    return StockMarkdownPreviewResponse(
+        policy_id=str(policy.id),
+        evaluated_at=evaluated_at,
+        buckets=buckets,
+        total_rows=sum(bucket.rows for bucket in buckets),
+        total_units=sum(bucket.units for bucket in buckets),
+    )
+
+
+@router.post("/aris3/stock/markdown-policies/{policy_id}/runs", response_model=StockMarkdownRunResponse, status_code=202)
+def run_stock_markdown_policy(
+    request: Request,
+    policy_id: str,
+    token_data=Depends(get_current_token_data),
+    current_user=Depends(require_active_user),
+    _permission=Depends(require_permission("STORE_MANAGE")),
+    db=Depends(get_db),
+    tenant_id: str | None = Query(None),
+):
+    scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
+    service = StockMarkdownService(db)
+    policy = service.get_policy(tenant_id=scoped_tenant_id, policy_id=policy_id)
+    if not policy.is_active:
+        raise AppError(
+            ErrorCatalog.BUSINESS_CONFLICT,
+            details={"message": "markdown policy is inactive", "policy_id": policy_id},
+        )
+    run = service.queue_run(
+        policy,
+        user_id=str(current_user.id),
+        trace_id=getattr(request.state, "trace_id", "") or None,
+    )
+    # The run is only recorded here; `python -m app.ops.stock_markdowns run-queued` executes it, so a restart
+    # of this worker never loses or half-applies a requested run.
+    return _markdown_run_response(run)
+
+
+@router.get("/aris3/stock/markdown-runs/{run_id}", response_model=StockMarkdownRunResponse)
+def get_stock_markdown_run(
+    run_id: str,
+    token_data=Depends(get_current_token_data),
+    _user=Depends(require_active_user),
+    _permission=Depends(require_permission("STORE_MANAGE")),
+    db=Depends(get_db),
+    tenant_id: str | None = Query(None),
+):
+    scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
+    return _markdown_run_response(StockMarkdownService(db).get_run(tenant_id=scoped_tenant_id, run_id=run_id))
+
 def _preload_line_response(line: PreloadLine) -> PreloadLineResponse:
     return PreloadLineResponse(
         id=str(line.id), preload_session_id=str(line.preload_session_id), item_uid=str(line.item_uid), tenant_id=str(line.tenant_id),
@@ -1301,56 +2365,6 @@ def _preload_line_response(line: PreloadLine) -> PreloadLineResponse:
     )
 
 
-def _serialize_ai_line(row_key: int, line: dict) -> AiPreloadLine:
-    return AiPreloadLine(
-        row_key=str(row_key),
-        sku=line.get("sku"),
-        suggested_sku=line.get("suggested_sku"),
-        description=line.get("description") or "",
-        variant_1=line.get("variant_1"),
-        variant_2=line.get("variant_2"),
-        color=line.get("color") or line.get("variant_1"),
-        size=line.get("size") or line.get("variant_2"),
-        brand=line.get("brand"),
-        category=line.get("category"),
-        style=line.get("style"),
-        pool=line.get("pool"),
-        location_code=line.get("location_code"),
-        logistics_status=line.get("logistics_status"),
-        sellable=bool(line.get("sellable", True)),
-        quantity=max(1, int(line.get("quantity") or 1)),
-        source_order_number=line.get("source_order_number"),
-        source_order_date=line.get("source_order_date"),
-        source_supplier=line.get("source_supplier"),
-        original_cost=line.get("original_cost"),
-        source_currency=line.get("source_currency"),
-        exchange_rate_to_gtq=line.get("exchange_rate_to_gtq"),
-        cost_gtq=line.get("cost_gtq"),
-        suggested_price_gtq=line.get("suggested_price_gtq"),
-        reference_price_original=line.get("reference_price_original"),
-        reference_price_gtq=line.get("reference_price_gtq"),
-        needs_review=bool(line.get("needs_review", True)),
-        confidence=line.get("confidence"),
-        notes=line.get("notes"),
-        source_file_name=line.get("source_file_name"),
-        source_row_number=line.get("source_row_number"),
-    )
-
-
-def _build_ai_prompt(*, free_text: str | None, deterministic_rows: list[dict], operator_notes: str | None, document_type: str | None) -> str:
-    parts = [
-        "Extrae líneas de inventario. No incluyas EPC ni precio de venta final.",
-        f"document_type={document_type or 'unknown'}",
-    ]
-    if free_text:
-        parts.append(f"texto_libre:\\n{free_text}")
-    if deterministic_rows:
-        parts.append(f"filas_deterministicas={deterministic_rows}")
-    if operator_notes:
-        parts.append(f"notas_operador={operator_notes}")
-    return "\\n\\n".join(parts)
-
-
 def _populate_document_summary_from_lines(document_summary: dict[str, Any], lines: list[AiPreloadLine]) -> dict[str, Any]:
     summary = dict(document_summary or {})
     first_number = next((line.source_order_number for line in lines if line.source_order_number), None)
@@ -1365,7 +2379,6 @@ def _populate_document_summary_from_lines(document_summary: dict[str, Any], line
 @router.post("/aris3/stock/ai/preload/analyze", response_model=AiPreloadAnalyzeResponse)
 async def analyze_ai_preload(
     request: Request,
-    background_tasks: BackgroundTasks,
     store_id: str = Form(...),
     free_text: str | None = Form(default=None),
     document_type: str | None = Form(default=None),
@@ -1389,7 +2402,7 @@ async def analyze_ai_preload(
     started_at = time.perf_counter()
     uploads: list[UploadedSource] = []
     upload_files = files if files else []
-    deterministic_rows: list[dict] = []
+    row_batches: list[str] = []
     deterministic_lines: list[dict] = []
     warnings: list[AiPreloadWarning] = []
     text_only = len(upload_files) == 0
@@ -1411,24 +2424,47 @@ async def analyze_ai_preload(
         service.validate_files(uploads)
         for file in uploads:
             if file.content_type in {"text/csv", "text/tab-separated-values", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "application/vnd.ms-excel"}:
-                rows, sheet_warnings = service.extract_spreadsheet_rows(file)
-                deterministic_rows.extend(rows)
-                warnings.extend(AiPreloadWarning(**w) for w in sheet_warnings)
-                for row in rows:
-                    mapped_line, row_warnings = service.map_deterministic_row(row, source_file_name=file.filename)
-                    deterministic_lines.append(mapped_line)
-                    for warning in row_warnings:
-                        warnings.append(AiPreloadWarning(severity="warning", message=warning))
+                # Large workbooks take a while to parse; keep the event loop free meanwhile.
+                scan = await asyncio.to_thread(service.scan_spreadsheet, file)
+                row_batches.extend(scan.row_batches)
+                deterministic_lines.extend(scan.lines)
+                warnings.extend(AiPreloadWarning(**w) for w in scan.warnings)
+                warnings.extend(AiPreloadWarning(severity="warning", message=w) for w in scan.row_warnings)
             if file.content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
                 free_text = (free_text or "") + "\n" + service.extract_docx_text(file.content)
 
-    prompt = _build_ai_prompt(free_text=free_text, deterministic_rows=deterministic_rows, operator_notes=operator_notes, document_type=document_type)
     model_name = service.openai_client._model
+    ai_attachments = [f for f in uploads if f.content_type in {"application/pdf", "image/jpeg", "image/png", "image/webp"}]
+    chunks = service.plan_extraction_chunks(
+        free_text=free_text,
+        row_batches=row_batches,
+        operator_notes=operator_notes,
+        document_type=document_type,
+        attachments=ai_attachments,
+    )
+    # Several chunks cannot share one request's time budget, so they go to the job queue, where each finished
+    # chunk is cached and shown as progress; only a single-chunk analysis is answered inline.
+    large_input = large_input or len(chunks) > 1
+    chunks_completed = 0
+    extraction_cache = StockAiExtractionCacheService(db)
+    cache_keys = [extraction_cache_key(prompt=chunk.prompt, attachments=chunk.attachments) for chunk in chunks]
     shein_result = service.parse_shein_order_text(free_text=free_text, source_currency=source_currency) if text_only else None
+    cached_chunks: dict[int, dict[str, Any]] = {}
+    if shein_result is None:
+        for index, cache_key in enumerate(cache_keys):
+            cached = extraction_cache.get(tenant_id=scoped_tenant_id, content_hash=cache_key, model=model_name)
+            if cached is not None:
+                cached_chunks[index] = cached
     ai_result: dict[str, Any] = {"document_summary": {}, "lines": [], "warnings": []}
     if shein_result is not None:
         ai_result = shein_result
         large_input = False
+    elif len(cached_chunks) == len(chunks):
+        # A resent document: answer synchronously even when it would otherwise be queued as large.
+        ai_result = service.merge_chunk_results([cached_chunks[index] for index in range(len(chunks))])
+        chunks_completed = len(chunks)
+        large_input = False
+        warnings.append(AiPreloadWarning(severity="info", message="Resultado reutilizado de un análisis previo del mismo documento."))
     elif large_input:
         now = datetime.utcnow()
         extraction = StockAiExtraction(
@@ -1449,31 +2485,50 @@ async def analyze_ai_preload(
             warnings=[],
             model_used=service.openai_client._model,
             trace_id=getattr(request.state, "trace_id", None),
+            chunks_total=len(chunks),
+            chunks_completed=0,
             created_at=now,
             updated_at=now,
         )
         db.add(extraction)
         db.flush()
         extraction_id = str(extraction.id)
+        for file in uploads:
+            db.add(
+                StockAiExtractionFile(
+                    extraction_id=extraction.id,
+                    original_filename=file.filename,
+                    content_type=file.content_type,
+                    size_bytes=len(file.content),
+                    file_hash=file_content_hash(file.content),
+                    created_at=now,
+                )
+            )
+        StockAiJobService(db, preload_service=service).enqueue(
+            tenant_id=extraction.tenant_id,
+            extraction_id=extraction.id,
+            kind=JOB_LARGE_EXTRACTION,
+            payload={
+                "chunks": [
+                    {"prompt": chunk.prompt, "cache_key": cache_key, "attachments": encode_attachments(chunk.attachments)}
+                    for chunk, cache_key in zip(chunks, cache_keys)
+                ],
+                "deterministic_lines": deterministic_lines,
+                "warnings": [warning.model_dump() for warning in warnings],
+                "trace_id": getattr(request.state, "trace_id", None),
+                "store_id": store_id,
+                "document_type": document_type,
+                "source_currency": source_currency,
+                "exchange_rate_to_gtq": exchange_rate_to_gtq,
+                "pricing_mode": pricing_mode,
+                "markup_percent": markup_percent,
+                "margin_percent": margin_percent,
+                "multiplier": multiplier,
+                "rounding_step": rounding_step,
+            },
+        )
         db.commit()
 
-        background_tasks.add_task(
-            _run_large_ai_preload_extraction,
-            extraction_id=extraction_id,
-            prompt=prompt,
-            trace_id=getattr(request.state, "trace_id", None),
-            tenant_id=scoped_tenant_id,
-            store_id=store_id,
-            document_type=document_type,
-            source_currency=source_currency,
-            exchange_rate_to_gtq=exchange_rate_to_gtq,
-            pricing_mode=pricing_mode,
-            markup_percent=markup_percent,
-            margin_percent=margin_percent,
-            multiplier=multiplier,
-            rounding_step=rounding_step,
-            attachments=[f for f in uploads if f.content_type in {"application/pdf", "image/jpeg", "image/png", "image/webp"}],
-        )
         return AiPreloadAnalyzeResponse(
             extraction_id=extraction_id,
             store_id=store_id,
@@ -1494,23 +2549,33 @@ async def analyze_ai_preload(
             total_lines=0,
             lines=[],
             warnings=[],
+            chunks_total=len(chunks),
+            chunks_completed=0,
         )
     else:
         timeout_seconds = float(settings.OPENAI_INVENTORY_TIMEOUT_SECONDS)
+
+        def _cache_chunk(index: int, result: dict[str, Any]) -> None:
+            extraction_cache.put(tenant_id=scoped_tenant_id, content_hash=cache_keys[index], model=model_name, result=result)
+            # Committed now so a later timeout or persistence failure does not discard a paid-for result.
+            db.commit()
+
         try:
-            ai_result = await asyncio.wait_for(
-                asyncio.to_thread(
-                    service.openai_client.extract,
-                    prompt=prompt,
-                    attachments=[f for f in uploads if f.content_type in {"application/pdf", "image/jpeg", "image/png", "image/webp"}],
+            chunk_results, chunk_errors = await asyncio.wait_for(
+                service.extract_chunks(
+                    chunks,
                     trace_id=getattr(request.state, "trace_id", None),
                     tenant_id=scoped_tenant_id,
                     store_id=store_id,
                     document_type=document_type,
                     timeout_seconds=timeout_seconds,
+                    done=cached_chunks,
+                    on_chunk=_cache_chunk,
                 ),
                 timeout=timeout_seconds + 2,
             )
+            if chunk_errors and not any(chunk_results):
+                raise chunk_errors[0]
         except TimeoutError as exc:
             raise AppError(
                 ErrorCatalog.AI_SERVICE_TIMEOUT,
@@ -1532,6 +2597,15 @@ async def analyze_ai_preload(
                 merged_details.setdefault("large_input", large_input)
                 raise AppError(ErrorCatalog.AI_SERVICE_TIMEOUT, details=merged_details) from exc
             raise
+        ai_result = service.merge_chunk_results(chunk_results)
+        chunks_completed = sum(1 for result in chunk_results if result)
+        if chunk_errors:
+            warnings.append(
+                AiPreloadWarning(
+                    severity="warning",
+                    message=partial_extraction_message(len(chunk_errors), len(chunks)),
+                )
+            )
     if (time.perf_counter() - started_at) > AI_PRELOAD_ENDPOINT_TIMEOUT_SECONDS:
         raise AppError(
             ErrorCatalog.AI_SERVICE_TIMEOUT,
@@ -1571,7 +2645,7 @@ async def analyze_ai_preload(
             rounding_step=rounding_decimal,
         )
         priced = service.apply_operational_defaults(priced)
-        normalized_lines.append(_serialize_ai_line(idx, priced))
+        normalized_lines.append(serialize_ai_line(idx, priced))
     warnings.extend(AiPreloadWarning(**w) for w in ai_result.get("warnings", []))
     warnings.append(AiPreloadWarning(severity="info", message="EPC y precio de venta final fueron excluidos del resultado asistido."))
 
@@ -1594,6 +2668,8 @@ async def analyze_ai_preload(
         warnings=[w.model_dump() for w in warnings],
         model_used=service.openai_client._model,
         trace_id=getattr(request.state, "trace_id", None),
+        chunks_total=len(chunks),
+        chunks_completed=chunks_completed,
         created_at=now,
         updated_at=now,
     )
@@ -1607,6 +2683,7 @@ async def analyze_ai_preload(
                     original_filename=file.filename,
                     content_type=file.content_type,
                     size_bytes=len(file.content),
+                    file_hash=file_content_hash(file.content),
                     created_at=now,
                 )
             )
@@ -1655,6 +2732,8 @@ async def analyze_ai_preload(
         total_lines=len(normalized_lines),
         lines=normalized_lines,
         warnings=warnings,
+        chunks_total=extraction.chunks_total,
+        chunks_completed=extraction.chunks_completed,
     )
 
 
@@ -1684,93 +2763,11 @@ def get_ai_preload_extraction(extraction_id: str, token_data=Depends(get_current
         total_lines=len(lines),
         lines=lines,
         warnings=[AiPreloadWarning(**item) for item in (extraction.warnings or [])],
+        chunks_total=extraction.chunks_total,
+        chunks_completed=extraction.chunks_completed,
     )
 
 
-def _run_large_ai_preload_extraction(
-    *,
-    extraction_id: str,
-    prompt: str,
-    trace_id: str | None,
-    tenant_id: str,
-    store_id: str,
-    document_type: str | None,
-    source_currency: str,
-    exchange_rate_to_gtq: str | None,
-    pricing_mode: str,
-    markup_percent: str | None,
-    margin_percent: str | None,
-    multiplier: str | None,
-    rounding_step: str,
-    attachments: list[UploadedSource],
-) -> None:
-    db = SessionLocal()
-    service = StockAiPreloadService()
-    try:
-        extraction = db.get(StockAiExtraction, extraction_id)
-        if extraction is None:
-            return
-        ai_result = service.openai_client.extract(
-            prompt=prompt,
-            attachments=attachments,
-            trace_id=trace_id,
-            tenant_id=tenant_id,
-            store_id=store_id,
-            document_type=document_type,
-            timeout_seconds=float(settings.OPENAI_INVENTORY_LARGE_TIMEOUT_SECONDS),
-        )
-        markup_decimal = service.parse_decimal(markup_percent)
-        margin_decimal = service.parse_decimal(margin_percent)
-        multiplier_decimal = service.parse_decimal(multiplier)
-        rounding_decimal = service.parse_decimal(rounding_step) or Decimal("1.00")
-        exchange_rate_decimal = service.parse_decimal(exchange_rate_to_gtq)
-        warnings: list[dict[str, Any]] = list(ai_result.get("warnings", []))
-        lines: list[dict[str, Any]] = []
-        for idx, raw_line in enumerate(ai_result.get("lines", []), start=1):
-            priced = service.apply_pricing(
-                line=raw_line,
-                source_currency=source_currency,
-                exchange_rate_to_gtq=exchange_rate_decimal,
-                pricing_mode=pricing_mode,
-                markup_percent=markup_decimal,
-                margin_percent=margin_decimal,
-                multiplier=multiplier_decimal,
-                rounding_step=rounding_decimal,
-            )
-            priced = service.apply_operational_defaults(priced)
-            lines.append(_serialize_ai_line(idx, priced).model_dump())
-        warnings.append({"severity": "info", "message": "EPC y precio de venta final fueron excluidos del resultado asistido."})
-        extraction.status = "COMPLETED"
-        extraction.raw_ai_result = ai_result
-        extraction.normalized_result = {"lines": lines}
-        extraction.warnings = warnings
-        extraction.updated_at = datetime.utcnow()
-        db.commit()
-    except AppError as exc:
-        extraction = db.get(StockAiExtraction, extraction_id)
-        if extraction is not None:
-            extraction.status = "FAILED"
-            extraction.warnings = [
-                {
-                    "severity": "error",
-                    "message": (exc.details or {}).get("message") or "AI analysis failed",
-                }
-            ]
-            extraction.raw_ai_result = {
-                "code": exc.error.code,
-                "details": {
-                    **(exc.details or {}),
-                    "retryable": (exc.details or {}).get("retryable", True),
-                    "text_only": True,
-                    "large_input": True,
-                },
-            }
-            extraction.updated_at = datetime.utcnow()
-            db.commit()
-    finally:
-        db.close()
-
-
 @router.post("/aris3/stock/ai/preload/confirm", response_model=AiPreloadConfirmResponse)
 def confirm_ai_preload(
     payload: AiPreloadConfirmRequest,
@@ -2362,10 +3359,8 @@ def release_epc(payload: EpcReleaseRequest, tenant_id: str | None = None, token_
     return {"released": True, "epc": payload.epc, "item_uid": payload.item_uid, "reason": payload.reason}
 
 
-@router.get("/aris3/catalog/sku/{sku}/images", response_model=list[SkuImageResponse])
-def list_sku_images(request: Request, sku: str, tenant_id: str | None = None, token_data=Depends(get_current_token_data), _user=Depends(require_active_user), db=Depends(get_db)):
-    scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
-    rows = db.execute(select(SkuImage).where(SkuImage.tenant_id == scoped_tenant_id, SkuImage.sku == sku).order_by(SkuImage.is_primary.desc(), SkuImage.sort_order.asc())).scalars().all()
+def _sku_image_responses(request: Request, db, *, tenant_id: str, sku: str) -> list[SkuImageResponse]:
+    rows = db.execute(select(SkuImage).where(SkuImage.tenant_id == tenant_id, SkuImage.sku == sku).order_by(SkuImage.is_primary.desc(), SkuImage.sort_order.asc())).scalars().all()
     return [
         SkuImageResponse(
             id=str(r.id),
@@ -2375,8 +3370,8 @@ def list_sku_images(request: Request, sku: str, tenant_id: str | None = None, to
             file_hash=r.file_hash,
             is_primary=r.is_primary,
             sort_order=r.sort_order,
-            image_url=_build_asset_content_url(request, asset_id=str(r.asset_id), tenant_id=scoped_tenant_id),
-            image_thumb_url=_build_asset_content_url(request, asset_id=str(r.asset_id), tenant_id=scoped_tenant_id),
+            image_url=_build_asset_content_url(request, asset_id=str(r.asset_id), tenant_id=tenant_id),
+            image_thumb_url=_build_asset_content_url(request, asset_id=str(r.asset_id), tenant_id=tenant_id),
             image_source="catalog",
             image_updated_at=r.updated_at or r.created_at,
             created_at=r.created_at,
@@ -2386,6 +3381,16 @@ def list_sku_images(request: Request, sku: str, tenant_id: str | None = None, to
     ]
 
 
+@router.get("/aris3/catalog/sku/{sku}/images", response_model=list[SkuImageResponse])
+def list_sku_images(request: Request, response: Response, sku: str, tenant_id: str | None = None, token_data=Depends(get_current_token_data), _user=Depends(require_active_user), db=Depends(get_db)):
+    scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
+    version = ChangeVersionService(db).current(tenant_id=scoped_tenant_id, resource=CATALOG_RESOURCE)
+    not_modified = not_modified_or_tag(request, response, token_data, resource=CATALOG_RESOURCE, version=version)
+    if not_modified is not None:
+        return not_modified
+    return _sku_image_responses(request, db, tenant_id=scoped_tenant_id, sku=sku)
+
+
 @router.post(
     "/aris3/catalog/sku/{sku}/images",
     response_model=list[SkuImageResponse],
@@ -2396,11 +3401,11 @@ def upsert_sku_images(request: Request, sku: str, payload: SkuImageUpsertRequest
     scoped_tenant_id = _resolve_tenant_id(token_data, tenant_id)
     now = datetime.utcnow()
     if payload.mode == "blank":
-        return list_sku_images(request, sku, scoped_tenant_id, token_data, _user, db)  # type: ignore[arg-type]
+        return _sku_image_responses(request, db, tenant_id=scoped_tenant_id, sku=sku)
     if payload.file_hash:
         existing_hash = db.execute(select(SkuImage).where(SkuImage.tenant_id == scoped_tenant_id, SkuImage.sku == sku, SkuImage.file_hash == payload.file_hash)).scalars().first()
         if existing_hash:
-            return list_sku_images(request, sku, scoped_tenant_id, token_data, _user, db)  # type: ignore[arg-type]
+            return _sku_image_responses(request, db, tenant_id=scoped_tenant_id, sku=sku)
     if payload.mode == "replace":
         for row in db.execute(select(SkuImage).where(SkuImage.tenant_id == scoped_tenant_id, SkuImage.sku == sku)).scalars().all():
             row.is_primary = False
@@ -2408,7 +3413,8 @@ def upsert_sku_images(request: Request, sku: str, payload: SkuImageUpsertRequest
     max_order = db.execute(select(SkuImage.sort_order).where(SkuImage.tenant_id == scoped_tenant_id, SkuImage.sku == sku).order_by(SkuImage.sort_order.desc())).scalars().first() or 0
     db.add(SkuImage(tenant_id=scoped_tenant_id, sku=sku, asset_id=payload.asset_id, file_hash=payload.file_hash, is_primary=payload.mode in {"replace", "use_existing"}, sort_order=max_order + 1, created_at=now, updated_at=now))
     db.commit()
-    return list_sku_images(request, sku, scoped_tenant_id, token_data, _user, db)  # type: ignore[arg-type]
+    primary_sku_images.invalidate(scoped_tenant_id, sku)
+    return _sku_image_responses(request, db, tenant_id=scoped_tenant_id, sku=sku)
 
 
 @router.put(
@@ -2423,7 +3429,8 @@ def set_primary_sku_image(request: Request, sku: str, asset_id: str, tenant_id:
         row.is_primary = str(row.asset_id) == asset_id
         row.updated_at = datetime.utcnow()
     db.commit()
-    return list_sku_images(request, sku, scoped_tenant_id, token_data, _user, db)  # type: ignore[arg-type]
+    primary_sku_images.invalidate(scoped_tenant_id, sku)
+    return _sku_image_responses(request, db, tenant_id=scoped_tenant_id, sku=sku)
 
 
 @router.post(
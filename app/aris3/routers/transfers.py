@@ -31,6 +31,9 @@ from app.aris3.schemas.transfers import (
 from app.aris3.services.access_control import AccessControlService
 from app.aris3.services.audit import AuditEventPayload, AuditService
 from app.aris3.services.idempotency import IdempotencyService, extract_idempotency_key
+from app.aris3.services.live_events import TRANSFER_RECEIVE_EVENT, queue_live_event
+from app.aris3.services.stock_lots import stock_units, take_stock_units
+from app.aris3.services.stock_movements import MOVEMENT_TRANSFER, set_movement_context
 from app.aris3.services.stock_rules import TRANSFER_SKU_ALLOWED_STATUSES, transfer_sku_filters
 
 
@@ -451,7 +454,7 @@ def _validate_transferable_sku_stock(
         .scalars()
         .all()
     )
-    if len(rows) < line.qty:
+    if stock_units(rows) < line.qty:
         raise AppError(
             ErrorCatalog.BUSINESS_CONFLICT,
             details={
@@ -459,7 +462,7 @@ def _validate_transferable_sku_stock(
                 "sku": snapshot.sku,
                 "origin_store_id": origin_store_id,
                 "requested_qty": line.qty,
-                "available_qty": len(rows),
+                "available_qty": stock_units(rows),
             },
         )
     return rows
@@ -1439,6 +1442,7 @@ def transfer_actions(
         raise AppError(ErrorCatalog.VALIDATION_ERROR, details={"message": "transfer not found"})
 
     action = payload.action
+    set_movement_context(db, MOVEMENT_TRANSFER, reference_type="transfer", reference_id=transfer.id)
     if action == "dispatch":
         _require_action_permission(request, db, "transfers.dispatch", token_data)
         _enforce_origin_store_scope(token_data, str(transfer.origin_store_id))
@@ -1494,6 +1498,7 @@ def transfer_actions(
                     expected_location_code=line.location_code,
                     expected_pool=line.pool,
                 )
+                pending_rows = take_stock_units(db, pending_rows, line.qty)
                 for row in pending_rows:
                     row.location_code = _IN_TRANSIT_CODE
                     row.pool = _IN_TRANSIT_CODE
@@ -1640,7 +1645,8 @@ def transfer_actions(
                     .scalars()
                     .all()
                 )
-                if len(rows) < receive_line.qty:
+                rows = take_stock_units(db, rows, receive_line.qty)
+                if stock_units(rows) < receive_line.qty:
                     raise AppError(
                         ErrorCatalog.VALIDATION_ERROR,
                         details={
@@ -1654,7 +1660,7 @@ def transfer_actions(
                             "expected_pool": _IN_TRANSIT_CODE,
                             "accepted_statuses": list(_TRANSFER_SKU_ACCEPTED_STATUSES),
                             "requested_qty": receive_line.qty,
-                            "matched_count": len(rows),
+                            "matched_count": stock_units(rows),
                         },
                     )
                 for row in rows:
@@ -1760,6 +1766,18 @@ def transfer_actions(
             transfer.status = "PARTIAL_RECEIVED"
         transfer.updated_at = datetime.utcnow()
         transfer.updated_by_user_id = current_user.id
+        queue_live_event(
+            db,
+            TRANSFER_RECEIVE_EVENT,
+            tenant_id=transfer.tenant_id,
+            store_id=transfer.destination_store_id,
+            data={
+                "transfer_id": _normalize_uuid(transfer.id),
+                "status": transfer.status,
+                "origin_store_id": _normalize_uuid(transfer.origin_store_id),
+                "received_qty": sum(receive_line.qty for receive_line in payload.receive_lines),
+            },
+        )
         db.commit()
         lines = repo.get_lines(transfer_id)
         response = _transfer_response(repo, transfer, lines)
@@ -2001,7 +2019,8 @@ def transfer_actions(
                         .scalars()
                         .all()
                     )
-                    if len(pending_rows) < resolution_line.qty:
+                    pending_rows = take_stock_units(db, pending_rows, resolution_line.qty)
+                    if stock_units(pending_rows) < resolution_line.qty:
                         raise AppError(
                             ErrorCatalog.VALIDATION_ERROR,
                             details={
@@ -2115,7 +2134,8 @@ def transfer_actions(
                         .scalars()
                         .all()
                     )
-                    if len(rows) < line.qty:
+                    rows = take_stock_units(db, rows, line.qty)
+                    if stock_units(rows) < line.qty:
                         raise AppError(
                             ErrorCatalog.BUSINESS_CONFLICT,
                             details={"message": "sku stock not in transit for cancel", "sku": line.sku},
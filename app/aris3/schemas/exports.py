@@ -10,6 +10,7 @@ class ExportSourceType(str, Enum):
     REPORTS_OVERVIEW = "reports_overview"
     REPORTS_DAILY = "reports_daily"
     REPORTS_CALENDAR = "reports_calendar"
+    REPORTS_INVENTORY_VALUATION = "reports_inventory_valuation"
 
 
 class ExportFormat(str, Enum):
@@ -33,6 +34,7 @@ class ExportFilters(BaseModel):
     cashier: str | None = None
     channel: str | None = None
     payment_method: str | None = None
+    sku: str | None = Field(None, description="reports_inventory_valuation only: restrict to one SKU.")
 
     def snapshot(self) -> dict:
         snapshot = {
@@ -43,6 +45,7 @@ class ExportFilters(BaseModel):
             "cashier": self.cashier,
             "channel": self.channel,
             "payment_method": self.payment_method,
+            "sku": self.sku,
         }
         return {key: value for key, value in snapshot.items() if value not in (None, "", {}, [])}
 
@@ -273,6 +273,68 @@ class ReportCalendarResponse(ReportModel):
     )
 
 
+class ReportInventoryValuationMeta(ReportModel):
+    store_id: str
+    requested_store_id: str | None = None
+    resolved_store_id: str
+    token_store_id: str | None = None
+    as_of: datetime = Field(..., description="UTC time age buckets are measured from")
+    sku: str | None = None
+    trace_id: str | None
+    query_ms: float
+
+
+class ReportInventoryAgeBucket(ReportModel):
+    age_bucket: str
+    units: int
+    cost_value: Decimal
+    retail_value: Decimal
+
+
+class ReportInventoryValuationTotals(ReportModel):
+    units: int
+    cost_value: Decimal
+    retail_value: Decimal
+    missing_cost_units: int = Field(..., description="On-hand units without cost_price, valued at zero cost")
+    age_buckets: list[ReportInventoryAgeBucket]
+
+
+class ReportInventoryValuationRow(ReportModel):
+    store_id: str
+    sku: str | None
+    location_code: str | None
+    pool: str | None
+    age_bucket: str = Field(..., description="Days since the unit was received: 0_30, 31_60, 61_90, 91_180 or 181_plus")
+    units: int
+    cost_value: Decimal
+    retail_value: Decimal
+    missing_cost_units: int
+    oldest_received_at: datetime
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "store_id": "f35a8cb4-3f99-4fca-aaf0-3b2ca1801111",
+                "sku": "SKU-001",
+                "location_code": "LOC-1",
+                "pool": "P1",
+                "age_bucket": "31_60",
+                "units": 12,
+                "cost_value": "240.00",
+                "retail_value": "600.00",
+                "missing_cost_units": 0,
+                "oldest_received_at": "2026-01-15T10:00:00",
+            }
+        }
+    )
+
+
+class ReportInventoryValuationResponse(ReportModel):
+    meta: ReportInventoryValuationMeta
+    totals: ReportInventoryValuationTotals
+    rows: list[ReportInventoryValuationRow]
+
+
 DailyRow = ReportDailyRow
 CalendarRow = ReportCalendarRow
 ReportCalendarDay = ReportCalendarRow
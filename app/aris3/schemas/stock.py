@@ -104,6 +104,7 @@ class StockRow(BaseModel):
     transfer_mode: Literal["EPC", "SKU", "NONE"]
     is_historical: bool
     available_qty: int
+    quantity: int = 1
     display_pool: str | None
     display_location_code: str | None
     id: str
@@ -126,6 +127,7 @@ class StockQueryMeta(BaseModel):
     sort_dir: Literal["asc", "desc"]
     scope: Literal["self", "tenant"]
     view: Literal["operational", "history", "all"]
+    next_cursor: str | None = None
 
 
 class StockTotalsByStore(BaseModel):
@@ -149,6 +151,35 @@ class StockQueryResponse(BaseModel):
     totals: StockQueryTotals
 
 
+class StockTombstoneRow(BaseModel):
+    id: str
+    store_id: str | None
+    reason: Literal["DELETED", "ARCHIVED", "MOVED"]
+    deleted_at: datetime
+
+
+class StockChangesResponse(BaseModel):
+    rows: list[StockRow]
+    tombstones: list[StockTombstoneRow]
+    next_cursor: str = Field(description="Pass back as cursor on the next poll, including when has_more is false.")
+    has_more: bool
+
+
+class StockOnHandRow(BaseModel):
+    store_id: str | None
+    sku: str | None
+    on_hand: int
+
+
+class StockOnHandResponse(BaseModel):
+    at: datetime
+    snapshot_taken_at: datetime | None = Field(
+        description="Snapshot the quantities were rolled forward from; null when replayed from the ledger start."
+    )
+    rows: list[StockOnHandRow]
+    total_units: int
+
+
 class StockDataBlock(BaseModel):
     sku: str | None
     description: str | None
@@ -232,6 +263,10 @@ class StockImportEpcRequest(BaseModel):
 class StockImportSkuRequest(BaseModel):
     transaction_id: str | None
     tenant_id: str | None = None
+    storage_mode: Literal["UNIT", "LOT"] = Field(
+        default="UNIT",
+        description="UNIT stores one stock row per unit; LOT stores each line as a single row carrying quantity.",
+    )
     lines: list[StockImportSkuLine]
 
     model_config = {
@@ -277,6 +312,94 @@ class StockImportResponse(BaseModel):
     trace_id: str
 
 
+class StockImportJobError(BaseModel):
+    line: int
+    message: str
+    epc: str | None = None
+    field: str | None = None
+
+
+class StockImportJobResponse(BaseModel):
+    job_id: str
+    tenant_id: str
+    transaction_id: str | None = None
+    format: Literal["ndjson", "csv"]
+    status: Literal["RUNNING", "COMPLETED", "COMPLETED_WITH_ERRORS", "FAILED"]
+    processed_lines: int
+    inserted: int
+    error_count: int
+    failure_reason: str | None = None
+    created_at: datetime
+    updated_at: datetime | None = None
+    completed_at: datetime | None = None
+    trace_id: str | None = None
+
+
+class StockMarkdownBucket(BaseModel):
+    min_age_days: int = Field(ge=0)
+    percent: Decimal = Field(gt=0, lt=100, max_digits=5, decimal_places=2)
+
+
+class StockMarkdownPolicyRequest(BaseModel):
+    tenant_id: str | None = None
+    name: str = Field(min_length=1, max_length=100)
+    store_id: str | None = None
+    pool: str | None = None
+    buckets: list[StockMarkdownBucket] = Field(min_length=1, max_length=20)
+    is_active: bool = True
+
+
+class StockMarkdownPolicyResponse(BaseModel):
+    policy_id: str
+    tenant_id: str
+    name: str
+    store_id: str | None = None
+    pool: str | None = None
+    buckets: list[StockMarkdownBucket]
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime | None = None
+
+
+class StockMarkdownPreviewBucket(BaseModel):
+    min_age_days: int
+    percent: Decimal
+    rows: int
+    units: int
+    current_value: Decimal
+    new_value: Decimal
+
+
+class StockMarkdownPreviewResponse(BaseModel):
+    policy_id: str
+    evaluated_at: datetime
+    buckets: list[StockMarkdownPreviewBucket]
+    total_rows: int
+    total_units: int
+
+
+class StockMarkdownRunResponse(BaseModel):
+    run_id: str
+    policy_id: str
+    tenant_id: str
+    status: Literal["QUEUED", "RUNNING", "COMPLETED", "FAILED"]
+    updated_count: int
+    updated_units: int
+    bucket_counts: list[dict] | None = None
+    failure_reason: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
+    trace_id: str | None = None
+
+
+class StockImportJobErrorsResponse(BaseModel):
+    job_id: str
+    error_count: int
+    truncated: bool
+    errors: list[StockImportJobError]
+
+
 class StockMigrateRequest(BaseModel):
     transaction_id: str | None
     tenant_id: str | None = None
@@ -365,6 +488,56 @@ class StockActionResponse(BaseModel):
     trace_id: str
 
 
+class StockBulkSelector(BaseModel):
+    scope: Literal["self", "tenant"] = "self"
+    q: str | None = None
+    description: str | None = None
+    var1_value: str | None = None
+    var2_value: str | None = None
+    sku: str | None = None
+    location_code: str | None = None
+    pool: str | None = None
+    store_id: str | None = None
+    from_date: datetime | None = None
+    to_date: datetime | None = None
+    epcs: list[str] | None = Field(default=None, max_length=5000)
+    item_uids: list[UUID] | None = Field(default=None, max_length=5000)
+
+
+class StockBulkWriteOffPayload(BaseModel):
+    reason: str | None = None
+
+
+class StockBulkRepricePayload(BaseModel):
+    price: MoneyValue
+    currency: str | None = None
+
+
+class StockBulkMarkdownPayload(BaseModel):
+    percent: Decimal = Field(gt=0, lt=100)
+    min_age_days: int | None = Field(default=None, ge=0)
+    policy: str | None = None
+
+
+class StockBulkActionRequest(BaseModel):
+    transaction_id: str | None
+    tenant_id: str | None = None
+    action: Literal["WRITE_OFF", "REPRICE", "MARKDOWN_BY_AGE"]
+    selector: StockBulkSelector
+    payload: dict = Field(default_factory=dict)
+
+
+class StockBulkActionResponse(BaseModel):
+    tenant_id: str
+    action: str
+    run_id: str
+    matched: int
+    matched_rows: int
+    processed: int
+    chunks: int
+    trace_id: str
+
+
 class PreloadLineInput(BaseModel):
     sku: str | None = None
     epc: str | None = None
@@ -603,6 +776,8 @@ class AiPreloadAnalyzeResponse(BaseModel):
     total_lines: int
     lines: list[AiPreloadLine]
     warnings: list[AiPreloadWarning]
+    chunks_total: int | None = None
+    chunks_completed: int | None = None
 
 
 class AiPreloadConfirmRequest(BaseModel):
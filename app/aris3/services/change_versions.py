@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import hashlib
+import uuid
+from datetime import datetime
+from typing import Iterable
+from uuid import UUID
+
+from fastapi import Request, Response
+from sqlalchemy import delete, event, func, inspect, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.base import NO_VALUE
+
+from app.aris3.db.models import (
+    CatalogProduct,
+    ChangeVersion,
+    PosPayment,
+    PosReturnEvent,
+    PosSale,
+    PosSaleLine,
+    SkuImage,
+    StockItem,
+    Store,
+)
+
+
+STOCK_RESOURCE = "stock"
+SALES_RESOURCE = "sales"
+CATALOG_RESOURCE = "catalog"
+ALL_RESOURCES = (STOCK_RESOURCE, SALES_RESOURCE, CATALOG_RESOURCE)
+# Changes not tied to one store (catalog images, sale lines whose sale is not loaded) land here,
+# so store-scoped readers combine their store row with it.
+SHARED_SCOPE = "shared"
+_SESSION_PENDING_KEY = "change_versions_pending"
+
+
+def _as_uuid(value) -> UUID | None:
+    if value is None:
+        return None
+    if isinstance(value, UUID):
+        return value
+    return UUID(str(value))
+
+
+def _scope_key(store_id) -> str:
+    return SHARED_SCOPE if store_id is None else str(_as_uuid(store_id))
+
+
+def mark_changed(session, *, tenant_id, resource: str, store_id=None) -> None:
+    # Queues a bump for the current transaction; applied once, right before it commits.
+    if tenant_id is None:
+        return
+    pending = session.info.setdefault(_SESSION_PENDING_KEY, set())
+    pending.add((_as_uuid(tenant_id), resource, _scope_key(store_id)))
+
+
+def bump_versions(connection, pending: Iterable[tuple[UUID, str, str]]) -> None:
+    now = datetime.utcnow()
+    # Only the touched scopes are bumped; tenant-wide readers sum them instead of sharing one hot row.
+    keys = set(pending)
+    if not keys:
+        return
+    # Stable order so concurrent commits lock the version rows in the same sequence.
+    rows = [
+        {"id": uuid.uuid4(), "tenant_id": tenant_id, "resource": resource, "scope_key": scope_key, "version": 1, "updated_at": now}
+        for tenant_id, resource, scope_key in sorted(keys, key=lambda key: (str(key[0]), key[1], key[2]))
+    ]
+    table = ChangeVersion.__table__
+    dialect_name = connection.dialect.name
+    if dialect_name in {"postgresql", "sqlite"}:
+        if dialect_name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        stmt = dialect_insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.tenant_id, table.c.resource, table.c.scope_key],
+            set_={"version": table.c.version + 1, "updated_at": stmt.excluded.updated_at},
+        )
+        connection.execute(stmt)
+        return
+    for row in rows:
+        updated = connection.execute(
+            update(ChangeVersion)
+            .where(
+                ChangeVersion.tenant_id == row["tenant_id"],
+                ChangeVersion.resource == row["resource"],
+                ChangeVersion.scope_key == row["scope_key"],
+            )
+            .values(version=ChangeVersion.version + 1, updated_at=now)
+        )
+        if not updated.rowcount:
+            connection.execute(insert(ChangeVersion).values(**row))
+
+
+def _committed_value(obj, field: str):
+    original = inspect(obj).committed_state.get(field, NO_VALUE)
+    return getattr(obj, field) if original is NO_VALUE else original
+
+
+def _sale_store_id(session, sale_id):
+    # Lines and payments carry no store_id; the parent sale is normally already in the identity map.
+    if sale_id is None:
+        return None
+    with session.no_autoflush:
+        sale = session.get(PosSale, sale_id)
+    return sale.store_id if sale is not None else None
+
+
+def _track_changes(session, flush_context, instances) -> None:
+    touched = [obj for obj in session.dirty if session.is_modified(obj)]
+    for obj in [*session.new, *touched, *session.deleted]:
+        if isinstance(obj, StockItem):
+            mark_changed(session, tenant_id=obj.tenant_id, resource=STOCK_RESOURCE, store_id=obj.store_id)
+            previous_store_id = _committed_value(obj, "store_id")
+            if previous_store_id != obj.store_id:
+                mark_changed(session, tenant_id=obj.tenant_id, resource=STOCK_RESOURCE, store_id=previous_store_id)
+        elif isinstance(obj, (PosSale, PosReturnEvent)):
+            mark_changed(session, tenant_id=obj.tenant_id, resource=SALES_RESOURCE, store_id=obj.store_id)
+        elif isinstance(obj, (PosSaleLine, PosPayment)):
+            mark_changed(
+                session,
+                tenant_id=obj.tenant_id,
+                resource=SALES_RESOURCE,
+                store_id=_sale_store_id(session, obj.sale_id),
+            )
+        elif isinstance(obj, SkuImage):
+            # Stock rows fall back to the primary catalog image.
+            mark_changed(session, tenant_id=obj.tenant_id, resource=CATALOG_RESOURCE)
+            mark_changed(session, tenant_id=obj.tenant_id, resource=STOCK_RESOURCE)
+        elif isinstance(obj, CatalogProduct):
+            mark_changed(session, tenant_id=obj.tenant_id, resource=CATALOG_RESOURCE)
+        elif isinstance(obj, Store):
+            # Store names are rendered into stock rows and totals.
+            mark_changed(session, tenant_id=obj.tenant_id, resource=STOCK_RESOURCE, store_id=obj.id)
+
+
+def _apply_pending(session) -> None:
+    # Bumped inside the committing transaction, after the final flush, so the row locks on the
+    # version rows are held only for the commit itself and a reader never pairs new rows with an old version.
+    session.flush()
+    pending = session.info.pop(_SESSION_PENDING_KEY, None)
+    if pending:
+        bump_versions(session.connection(), pending)
+
+
+def _discard_pending(session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_SESSION_PENDING_KEY, None)
+
+
+event.listen(Session, "before_flush", _track_changes)
+event.listen(Session, "before_commit", _apply_pending)
+event.listen(Session, "after_soft_rollback", _discard_pending)
+
+
+class ChangeVersionService:
+    def __init__(self, db):
+        self.db = db
+
+    def current(self, *, tenant_id, resource: str, store_id=None) -> str:
+        if store_id is None:
+            return str(self.tenant_total(tenant_id=tenant_id, resource=resource))
+        scopes = [_scope_key(store_id), SHARED_SCOPE]
+        versions = dict(
+            self.db.execute(
+                select(ChangeVersion.scope_key, ChangeVersion.version).where(
+                    ChangeVersion.tenant_id == _as_uuid(tenant_id),
+                    ChangeVersion.resource == resource,
+                    ChangeVersion.scope_key.in_(scopes),
+                )
+            ).all()
+        )
+        return ".".join(str(versions.get(scope, 0)) for scope in scopes)
+
+    def tenant_total(self, *, tenant_id, resource: str) -> int:
+        # Every bump adds one to some scope row, so the sum moves on any change in the tenant.
+        total = self.db.execute(
+            select(func.coalesce(func.sum(ChangeVersion.version), 0)).where(
+                ChangeVersion.tenant_id == _as_uuid(tenant_id),
+                ChangeVersion.resource == resource,
+            )
+        ).scalar_one()
+        return int(total)
+
+    def mark_store_content(self, store_id) -> None:
+        # For set-based deletes that wipe a whole store's stock, sales and catalog state.
+        tenant_id = self.db.execute(select(Store.tenant_id).where(Store.id == _as_uuid(store_id))).scalar_one_or_none()
+        for resource in ALL_RESOURCES:
+            mark_changed(self.db, tenant_id=tenant_id, resource=resource, store_id=store_id)
+
+    def mark_tenant_content(self, tenant_id) -> None:
+        for resource in ALL_RESOURCES:
+            mark_changed(self.db, tenant_id=tenant_id, resource=resource)
+
+    def delete_for_tenant(self, tenant_id) -> None:
+        self.db.execute(delete(ChangeVersion).where(ChangeVersion.tenant_id == _as_uuid(tenant_id)))
+
+
+def list_etag(request: Request, token_data, *, resource: str, version: str) -> str:
+    # The version says whether anything changed; the digest pins the caller and the exact query,
+    # since role, store and filters all shape the rendered page.
+    raw = "|".join(
+        [
+            str(getattr(token_data, "sub", "")),
+            str(getattr(token_data, "tenant_id", "")),
+            str(getattr(token_data, "store_id", "")),
+            str(request.base_url),
+            request.url.path,
+            "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items())),
+        ]
+    )
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+    return f'W/"{resource}-{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses weak comparison: the W/ prefix is ignored on both sides.
+    wanted = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == wanted:
+            return True
+    return False
+
+
+def not_modified_or_tag(
+    request: Request,
+    response: Response,
+    token_data,
+    *,
+    resource: str,
+    version: str,
+) -> Response | None:
+    # Returns the 304 to send as-is, or None after tagging the full response about to be rendered.
+    etag = list_etag(request, token_data, resource=resource, version=version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
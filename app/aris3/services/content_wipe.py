@@ -30,6 +30,13 @@ from app.aris3.db.models import (
     TransferMovement,
 )
 from app.aris3.services.audit import AuditEventPayload, AuditService
+from app.aris3.services.sku_image_cache import primary_sku_images
+from app.aris3.services.change_versions import ChangeVersionService
+from app.aris3.services.stock_changes import TOMBSTONE_DELETED, record_tombstones_for
+from app.aris3.services.stock_archive import StockArchiveService
+from app.aris3.services.stock_counters import StockCounterService
+from app.aris3.services.stock_movements import StockMovementService
+from app.aris3.services.stock_search import StockSearchIndexService
 from app.aris3.services.spaces_images import SpacesImageService, SpacesImageUploadError
 from app.aris3.services.tenant_purge import _is_missing_purge_lock_table
 
@@ -242,11 +249,18 @@ class ContentWipeService:
         deleted_counts["preload_lines"] = int(self.db.execute(delete(PreloadLine).where(PreloadLine.store_id == store_id)).rowcount or 0)
         deleted_counts["preload_sessions"] = int(self.db.execute(delete(PreloadSession).where(PreloadSession.store_id == store_id)).rowcount or 0)
         deleted_counts["epc_assignments"] = int(self.db.execute(delete(EpcAssignment).where(EpcAssignment.store_id == store_id)).rowcount or 0)
+        StockSearchIndexService(self.db).delete_for_store(store_id)
+        record_tombstones_for(self.db, StockItem.store_id == store_id, reason=TOMBSTONE_DELETED)
         deleted_counts["stock_items"] = int(self.db.execute(delete(StockItem).where(StockItem.store_id == store_id)).rowcount or 0)
+        StockArchiveService(self.db).delete_for_store(store_id)
+        StockCounterService(self.db).delete_for_store(store_id)
+        StockMovementService(self.db).delete_for_store(store_id)
+        ChangeVersionService(self.db).mark_store_content(store_id)
         return deleted_counts
 
     def _delete_tenant_content(self, *, tenant_id: str) -> dict[str, int]:
         deleted_counts = {k: 0 for k in self._tenant_counts(tenant_id=tenant_id).keys()}
+        record_tombstones_for(self.db, StockItem.tenant_id == tenant_id, reason=TOMBSTONE_DELETED)
         for name, model in (
             ("transfer_movements", TransferMovement),
             ("transfer_lines", TransferLine),
@@ -266,6 +280,12 @@ class ContentWipeService:
             ("stock_items", StockItem),
         ):
             deleted_counts[name] = int(self.db.execute(delete(model).where(model.tenant_id == tenant_id)).rowcount or 0)
+        StockCounterService(self.db).delete_for_tenant(tenant_id)
+        StockMovementService(self.db).delete_for_tenant(tenant_id)
+        StockSearchIndexService(self.db).delete_for_tenant(tenant_id)
+        StockArchiveService(self.db).delete_for_tenant(tenant_id)
+        primary_sku_images.invalidate(tenant_id)
+        ChangeVersionService(self.db).mark_tenant_content(tenant_id)
         return deleted_counts
 
     def _store_counts(self, *, store_id: str) -> dict[str, int]:
@@ -26,8 +26,10 @@ from app.aris3.core.error_catalog import AppError, ErrorCatalog
 from app.aris3.schemas.exports import ExportFilters, ExportFormat, ExportSourceType
 from app.aris3.services.reports import (
     build_daily_report_rows,
+    build_inventory_valuation_totals,
     build_report_totals,
     daily_sales_refunds,
+    inventory_valuation_rows,
     resolve_date_range,
     resolve_timezone,
     validate_date_range,
@@ -77,6 +79,30 @@ def build_report_dataset(
     filters: ExportFilters,
     max_days: int,
 ) -> ExportDataset:
+    if source_type == "reports_inventory_valuation":
+        # Point-in-time stock, so the sales date range does not apply.
+        rows_data = inventory_valuation_rows(
+            db,
+            tenant_id=tenant_id,
+            store_id=store_id,
+            as_of=datetime.utcnow(),
+            sku=filters.sku,
+        )
+        columns = [
+            "sku",
+            "location_code",
+            "pool",
+            "age_bucket",
+            "units",
+            "cost_value",
+            "retail_value",
+            "missing_cost_units",
+            "oldest_received_at",
+        ]
+        totals = build_inventory_valuation_totals(rows_data)
+        totals.pop("age_buckets")
+        return ExportDataset(columns=columns, rows=[[row[col] for col in columns] for row in rows_data], totals=totals)
+
     tz = resolve_timezone(filters.timezone)
     date_range = resolve_date_range(filters.from_value, filters.to_value, tz)
     validate_date_range(date_range, max_days=max_days)
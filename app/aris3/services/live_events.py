@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Iterable
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.base import NO_VALUE
+
+from app.aris3.core.config import settings
+from app.aris3.db.models import StockItem
+
+
+logger = logging.getLogger(__name__)
+
+STOCK_STATUS_EVENT = "stock.status"
+SALE_CHECKOUT_EVENT = "sale.checkout"
+SALE_CANCEL_EVENT = "sale.cancel"
+TRANSFER_RECEIVE_EVENT = "transfer.receive"
+_SESSION_EVENTS_KEY = "live_events_pending"
+_SESSION_TRANSITIONS_KEY = "live_stock_transitions_pending"
+
+
+@dataclass(frozen=True)
+class LiveEvent:
+    type: str
+    tenant_id: str
+    store_id: str | None
+    data: dict
+    occurred_at: datetime = field(default_factory=datetime.utcnow)
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "type": self.type,
+                "tenant_id": self.tenant_id,
+                "store_id": self.store_id,
+                "occurred_at": self.occurred_at.isoformat(),
+                "data": self.data,
+            },
+            separators=(",", ":"),
+            default=str,
+        )
+
+
+class LiveEventBackend:
+    # Fan-out transport between workers. publish() hands an event to the transport and the backend
+    # calls deliver() for every event, from any worker, that should reach this worker's subscribers.
+
+    def start(self, deliver: Callable[[LiveEvent], None]) -> None:
+        self._deliver = deliver
+
+    def publish(self, live_event: LiveEvent) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        return None
+
+
+class InProcessBackend(LiveEventBackend):
+    # Single worker, no external services: published events go straight to local subscribers.
+
+    def publish(self, live_event: LiveEvent) -> None:
+        self._deliver(live_event)
+
+
+_BACKENDS: dict[str, Callable[[], LiveEventBackend]] = {"memory": InProcessBackend}
+
+
+def register_backend(name: str, factory: Callable[[], LiveEventBackend]) -> None:
+    _BACKENDS[name] = factory
+
+
+class LiveEventSubscription:
+    def __init__(self, *, tenant_id: str, store_id: str | None, loop: asyncio.AbstractEventLoop, queue_size: int):
+        self.tenant_id = tenant_id
+        self.store_id = store_id
+        self.dropped = 0
+        self._loop = loop
+        self._queue: asyncio.Queue[LiveEvent] = asyncio.Queue(maxsize=queue_size)
+
+    def wants(self, live_event: LiveEvent) -> bool:
+        return self.store_id is None or self.store_id == live_event.store_id
+
+    def offer(self, live_event: LiveEvent) -> None:
+        # Publishers run in request worker threads; the queue belongs to the subscriber's event loop.
+        try:
+            self._loop.call_soon_threadsafe(self._put, live_event)
+        except RuntimeError:
+            pass
+
+    def _put(self, live_event: LiveEvent) -> None:
+        # A slow screen loses its oldest notifications rather than holding memory for every event.
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(live_event)
+
+    async def next(self, timeout: float) -> LiveEvent | None:
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LiveEventBroker:
+    def __init__(self, backend: LiveEventBackend | None = None):
+        self._lock = threading.Lock()
+        self._subscriptions: dict[str, set[LiveEventSubscription]] = defaultdict(set)
+        self._backend = None
+        if backend is not None:
+            self.use_backend(backend)
+
+    @property
+    def backend(self) -> LiveEventBackend:
+        if self._backend is None:
+            factory = _BACKENDS.get(settings.LIVE_EVENTS_BACKEND)
+            if factory is None:
+                raise RuntimeError(f"unknown LIVE_EVENTS_BACKEND: {settings.LIVE_EVENTS_BACKEND}")
+            self.use_backend(factory())
+        return self._backend
+
+    def use_backend(self, backend: LiveEventBackend) -> None:
+        if self._backend is not None:
+            self._backend.close()
+        backend.start(self.deliver)
+        self._backend = backend
+
+    def subscribe(
+        self,
+        *,
+        tenant_id: str,
+        store_id: str | None = None,
+        loop: asyncio.AbstractEventLoop | None = None,
+    ) -> LiveEventSubscription:
+        subscription = LiveEventSubscription(
+            tenant_id=str(UUID(str(tenant_id))),
+            store_id=str(UUID(str(store_id))) if store_id else None,
+            loop=loop or asyncio.get_running_loop(),
+            queue_size=settings.LIVE_EVENTS_QUEUE_SIZE,
+        )
+        with self._lock:
+            self._subscriptions[subscription.tenant_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LiveEventSubscription) -> None:
+        with self._lock:
+            tenant_subscriptions = self._subscriptions.get(subscription.tenant_id)
+            if tenant_subscriptions is None:
+                return
+            tenant_subscriptions.discard(subscription)
+            if not tenant_subscriptions:
+                self._subscriptions.pop(subscription.tenant_id, None)
+
+    def publish(self, live_events: Iterable[LiveEvent]) -> None:
+        backend = self.backend
+        for live_event in live_events:
+            backend.publish(live_event)
+
+    def deliver(self, live_event: LiveEvent) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(live_event.tenant_id, ()))
+        for subscription in subscriptions:
+            if subscription.wants(live_event):
+                subscription.offer(live_event)
+
+
+live_events = LiveEventBroker()
+
+
+def _as_str(value) -> str | None:
+    return str(value) if value is not None else None
+
+
+def queue_live_event(session, event_type: str, *, tenant_id, store_id, data: dict) -> None:
+    # Held until the transaction commits, so screens never hear about work that was rolled back.
+    if tenant_id is None:
+        return
+    pending = session.info.setdefault(_SESSION_EVENTS_KEY, [])
+    pending.append(LiveEvent(type=event_type, tenant_id=str(tenant_id), store_id=_as_str(store_id), data=data))
+
+
+def note_stock_transition(session, tenant_id, store_id, from_status, to_status, quantity) -> None:
+    # Flushes are tracked by the hook below; set-based inserts and deletes call this per row or per group.
+    if tenant_id is None or from_status == to_status:
+        return
+    pending = session.info.setdefault(_SESSION_TRANSITIONS_KEY, {})
+    key = (str(tenant_id), _as_str(store_id))
+    transitions = pending.setdefault(key, defaultdict(int))
+    transitions[(from_status, to_status)] += quantity or 1
+
+
+def _committed_value(obj, name: str):
+    original = inspect(obj).committed_state.get(name, NO_VALUE)
+    return getattr(obj, name) if original is NO_VALUE else original
+
+
+def _track_stock_transitions(session, flush_context, instances) -> None:
+    for obj in session.new:
+        if isinstance(obj, StockItem):
+            note_stock_transition(session, obj.tenant_id, obj.store_id, None, obj.status, obj.quantity)
+    for obj in session.deleted:
+        if isinstance(obj, StockItem):
+            note_stock_transition(
+                session, obj.tenant_id, _committed_value(obj, "store_id"), _committed_value(obj, "status"), None, obj.quantity
+            )
+    for obj in session.dirty:
+        if not isinstance(obj, StockItem) or not session.is_modified(obj):
+            continue
+        previous_status = _committed_value(obj, "status")
+        previous_store_id = _committed_value(obj, "store_id")
+        if str(previous_store_id) != str(obj.store_id):
+            # A store move leaves one store and arrives in the other.
+            note_stock_transition(session, obj.tenant_id, previous_store_id, previous_status, None, obj.quantity)
+            note_stock_transition(session, obj.tenant_id, obj.store_id, None, obj.status, obj.quantity)
+        else:
+            note_stock_transition(session, obj.tenant_id, obj.store_id, previous_status, obj.status, obj.quantity)
+
+
+def _publish_pending(session) -> None:
+    pending = session.info.pop(_SESSION_EVENTS_KEY, [])
+    transitions = session.info.pop(_SESSION_TRANSITIONS_KEY, {})
+    for (tenant_id, store_id), counts in transitions.items():
+        pending.append(
+            LiveEvent(
+                type=STOCK_STATUS_EVENT,
+                tenant_id=tenant_id,
+                store_id=store_id,
+                data={
+                    "transitions": [
+                        {"from": from_status, "to": to_status, "units": units}
+                        for (from_status, to_status), units in counts.items()
+                    ]
+                },
+            )
+        )
+    if not pending:
+        return
+    try:
+        live_events.publish(pending)
+    except Exception:
+        # The transaction is already committed; a lost notification must not fail the request.
+        logger.exception("live_events_publish_failed", extra={"events": len(pending)})
+
+
+def _discard_pending(session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_SESSION_EVENTS_KEY, None)
+        session.info.pop(_SESSION_TRANSITIONS_KEY, None)
+
+
+event.listen(Session, "before_flush", _track_stock_transitions)
+event.listen(Session, "after_commit", _publish_pending)
+event.listen(Session, "after_soft_rollback", _discard_pending)
+
+
+def format_sse(live_event: LiveEvent, *, event_id: int) -> str:
+    return f"id: {event_id}\nevent: {live_event.type}\ndata: {live_event.to_json()}\n\n"
@@ -176,7 +176,7 @@ def _quote_from_sale(repo: PosSaleRepository, sale: PosSale, request: ReturnQuot
         else:
             available_count = int(
                 repo.db.execute(
-                    select(func.count()).select_from(StockItem).where(
+                    select(func.coalesce(func.sum(StockItem.quantity), 0)).where(
                         *sale_sku_filters(
                             tenant_id=_normalize_uuid(sale.tenant_id),
                             store_id=request.store_id,
@@ -7,11 +7,12 @@ from decimal import Decimal
 import logging
 from typing import Iterable
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
-from sqlalchemy import Select, func, select
+from sqlalchemy import Select, case, func, select
 
 from app.aris3.core.error_catalog import AppError, ErrorCatalog
 from app.aris3.db.models import PosAdvance, PosAdvanceEvent, PosPayment, PosReturnEvent, PosSale, PosSaleLine, StockItem
 from app.aris3.services.sale_statuses import FINALIZED_SALE_STATUSES
+from app.aris3.services.stock_archive import stock_items_with_archive
 
 
 logger = logging.getLogger(__name__)
@@ -491,13 +492,15 @@ def sale_line_costs_and_diagnostics(
         if (row.sku_snapshot or row.sku)
     }
 
+    # Sold units may already sit in the archive tier, so cost lookups read both.
+    stock_items = stock_items_with_archive()
     stock_by_item_uid: dict[object, Decimal | None] = {}
     if item_uids:
         for item_uid, cost_price in db.execute(
-            select(StockItem.item_uid, StockItem.cost_price).where(
-                StockItem.tenant_id == tenant_id,
-                StockItem.store_id == store_id,
-                StockItem.item_uid.in_(item_uids),
+            select(stock_items.item_uid, stock_items.cost_price).where(
+                stock_items.tenant_id == tenant_id,
+                stock_items.store_id == store_id,
+                stock_items.item_uid.in_(item_uids),
             )
         ).all():
             stock_by_item_uid[item_uid] = Decimal(str(cost_price)) if cost_price is not None else None
@@ -505,10 +508,10 @@ def sale_line_costs_and_diagnostics(
     stock_by_epc: dict[str, Decimal | None] = {}
     if epcs:
         epc_rows = db.execute(
-            select(StockItem.epc, StockItem.cost_price).where(
-                StockItem.tenant_id == tenant_id,
-                StockItem.store_id == store_id,
-                StockItem.epc.in_(list(epcs)),
+            select(stock_items.epc, stock_items.cost_price).where(
+                stock_items.tenant_id == tenant_id,
+                stock_items.store_id == store_id,
+                stock_items.epc.in_(list(epcs)),
             )
         ).all()
         epc_map: dict[str, list[Decimal | None]] = defaultdict(list)
@@ -523,20 +526,34 @@ def sale_line_costs_and_diagnostics(
     if sku_keys:
         sku_values = {key[0] for key in sku_keys if key[0]}
         sku_rows = db.execute(
-            select(StockItem.sku, StockItem.var1_value, StockItem.var2_value, StockItem.cost_price).where(
-                StockItem.tenant_id == tenant_id,
-                StockItem.store_id == store_id,
-                StockItem.sku.in_(list(sku_values)),
+            select(
+                stock_items.sku,
+                stock_items.var1_value,
+                stock_items.var2_value,
+                stock_items.cost_price,
+                stock_items.quantity,
+            ).where(
+                stock_items.tenant_id == tenant_id,
+                stock_items.store_id == store_id,
+                stock_items.sku.in_(list(sku_values)),
             )
         ).all()
-        sku_map: dict[tuple[str, str | None, str | None], list[Decimal | None]] = defaultdict(list)
-        for sku, var1, var2, cost_price in sku_rows:
+        sku_map: dict[tuple[str, str | None, str | None], list[tuple[Decimal | None, int]]] = defaultdict(list)
+        for sku, var1, var2, cost_price, quantity in sku_rows:
             if not sku:
                 continue
-            sku_map[(sku, var1, var2)].append(Decimal(str(cost_price)) if cost_price is not None else None)
+            sku_map[(sku, var1, var2)].append(
+                (Decimal(str(cost_price)) if cost_price is not None else None, int(quantity or 1))
+            )
         for key, matches in sku_map.items():
             if len(matches) == 1:
-                stock_by_sku_variant[key] = matches[0]
+                stock_by_sku_variant[key] = matches[0][0]
+            elif all(cost is not None and quantity > 1 for cost, quantity in matches):
+                # Several matching rows stay ambiguous (missing cost), except when every one is a LOT of the
+                # variant: those hold interchangeable units, so their unit-weighted average cost is used.
+                units = sum(quantity for _cost, quantity in matches)
+                cost_total = sum(cost * quantity for cost, quantity in matches)
+                stock_by_sku_variant[key] = (cost_total / Decimal(units)).quantize(Decimal("0.01"))
 
     cost_by_line_id: dict[str, Decimal] = {}
     qty_by_line_id: dict[str, int] = {}
@@ -737,3 +754,90 @@ def apply_liability_and_tender_rows(
         row["tender_transfer_received"] = extras.get("tender_transfer_received", Decimal("0.00"))
         row["tender_total_received"] = extras.get("tender_total_received", Decimal("0.00"))
     return rows_data
+
+
+# (label, max age in days); the last bucket is open ended.
+INVENTORY_AGE_BUCKETS: tuple[tuple[str, int | None], ...] = (
+    ("0_30", 30),
+    ("31_60", 60),
+    ("61_90", 90),
+    ("91_180", 180),
+    ("181_plus", None),
+)
+
+
+def _inventory_age_bucket(as_of: datetime):
+    # Cutoffs are computed here rather than with date arithmetic in SQL, which differs between SQLite and Postgres.
+    whens = [
+        (StockItem.created_at >= as_of - timedelta(days=max_days), label)
+        for label, max_days in INVENTORY_AGE_BUCKETS
+        if max_days is not None
+    ]
+    return case(*whens, else_=INVENTORY_AGE_BUCKETS[-1][0])
+
+
+def inventory_valuation_rows(
+    db,
+    *,
+    tenant_id: str,
+    store_id: str,
+    as_of: datetime,
+    sku: str | None = None,
+) -> list[dict[str, Decimal | datetime | int | str | None]]:
+    age_bucket = _inventory_age_bucket(as_of).label("age_bucket")
+    query = (
+        select(
+            StockItem.sku,
+            StockItem.location_code,
+            StockItem.pool,
+            age_bucket,
+            func.sum(StockItem.quantity).label("units"),
+            func.sum(StockItem.quantity * func.coalesce(StockItem.cost_price, 0)).label("cost_value"),
+            func.sum(StockItem.quantity * func.coalesce(StockItem.sale_price, 0)).label("retail_value"),
+            func.sum(case((StockItem.cost_price.is_(None), StockItem.quantity), else_=0)).label("missing_cost_units"),
+            func.min(StockItem.created_at).label("oldest_received_at"),
+        )
+        .where(
+            StockItem.tenant_id == tenant_id,
+            StockItem.store_id == store_id,
+            StockItem.status != "SOLD",
+        )
+        .group_by(StockItem.sku, StockItem.location_code, StockItem.pool, age_bucket)
+        .order_by(StockItem.sku, StockItem.location_code, StockItem.pool, age_bucket)
+    )
+    if sku:
+        query = query.where(StockItem.sku == sku)
+    return [
+        {
+            "store_id": store_id,
+            "sku": row.sku,
+            "location_code": row.location_code,
+            "pool": row.pool,
+            "age_bucket": row.age_bucket,
+            "units": int(row.units or 0),
+            "cost_value": Decimal(str(row.cost_value or 0)).quantize(Decimal("0.01")),
+            "retail_value": Decimal(str(row.retail_value or 0)).quantize(Decimal("0.01")),
+            "missing_cost_units": int(row.missing_cost_units or 0),
+            "oldest_received_at": row.oldest_received_at,
+        }
+        for row in db.execute(query)
+    ]
+
+
+def build_inventory_valuation_totals(rows: list[dict]) -> dict[str, object]:
+    buckets = {
+        label: {"age_bucket": label, "units": 0, "cost_value": _MONETARY_DEFAULT, "retail_value": _MONETARY_DEFAULT}
+        for label, _max_days in INVENTORY_AGE_BUCKETS
+    }
+    for row in rows:
+        bucket = buckets[row["age_bucket"]]
+        bucket["units"] += row["units"]
+        bucket["cost_value"] += row["cost_value"]
+        bucket["retail_value"] += row["retail_value"]
+    return {
+        "units": sum(row["units"] for row in rows),
+        "cost_value": sum((row["cost_value"] for row in rows), _MONETARY_DEFAULT),
+        "retail_value": sum((row["retail_value"] for row in rows), _MONETARY_DEFAULT),
+        "missing_cost_units": sum(row["missing_cost_units"] for row in rows),
+        "age_buckets": list(buckets.values()),
+    }
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.aris3.core.config import settings
+from app.aris3.db.models import SkuImage
+from app.aris3.services.change_versions import CATALOG_RESOURCE, ChangeVersionService
+
+
+@dataclass(frozen=True)
+class PrimarySkuImage:
+    asset_id: UUID
+    image_updated_at: datetime | None
+
+
+class PrimarySkuImageCache:
+    # Per-tenant, per-process cache of each SKU's primary catalog image. Misses are cached too, so
+    # pages of SKUs without catalog images stop issuing a query. A tenant's entries are tied to the
+    # catalog change version they were filled under: an image write on any worker bumps that version,
+    # and every worker drops the tenant's entries once it next reads the version. That read is a SUM over
+    # the tenant's version rows, so it happens at most once per SKU_IMAGE_CACHE_VERSION_CHECK_SECONDS.
+
+    def __init__(self):
+        self._entries: dict[str, dict[str, tuple[float, PrimarySkuImage | None]]] = {}
+        self._versions: dict[str, int] = {}
+        self._checked_until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, db, *, tenant_id: str | UUID, skus: Iterable[str]) -> dict[str, PrimarySkuImage]:
+        skus = {sku for sku in skus if sku}
+        if not skus:
+            return {}
+        ttl = settings.SKU_IMAGE_CACHE_TTL_SECONDS
+        tenant_key = str(tenant_id)
+        now = time.monotonic()
+        found: dict[str, PrimarySkuImage] = {}
+        missing = set(skus)
+        usable = ttl > 0
+        if usable:
+            with self._lock:
+                version = self._versions.get(tenant_key)
+                if now >= self._checked_until.get(tenant_key, 0.0):
+                    version = None
+            checked = version is None
+            if checked:
+                # Read before the images so anything loaded below is at least as new as this version.
+                version = ChangeVersionService(db).tenant_total(tenant_id=tenant_id, resource=CATALOG_RESOURCE)
+            with self._lock:
+                cached_version = self._versions.get(tenant_key)
+                if cached_version is None or version > cached_version:
+                    self._entries.pop(tenant_key, None)
+                    self._versions[tenant_key] = version
+                if checked and self._versions[tenant_key] == version:
+                    self._checked_until[tenant_key] = now + settings.SKU_IMAGE_CACHE_VERSION_CHECK_SECONDS
+                # A request holding an older version than the cache bypasses it entirely.
+                usable = self._versions[tenant_key] == version
+                tenant_entries = self._entries.get(tenant_key, {}) if usable else {}
+                for sku in skus:
+                    entry = tenant_entries.get(sku)
+                    if entry is None or entry[0] <= now:
+                        continue
+                    missing.discard(sku)
+                    if entry[1] is not None:
+                        found[sku] = entry[1]
+        if not missing:
+            return found
+        loaded = self._load(db, tenant_id=tenant_key, skus=missing)
+        found.update(loaded)
+        if usable:
+            with self._lock:
+                if self._versions.get(tenant_key) != version:
+                    return found
+                tenant_entries = self._entries.setdefault(tenant_key, {})
+                if len(tenant_entries) + len(missing) > settings.SKU_IMAGE_CACHE_MAX_ENTRIES:
+                    tenant_entries.clear()
+                for sku in missing:
+                    tenant_entries[sku] = (now + ttl, loaded.get(sku))
+        return found
+
+    def invalidate(self, tenant_id: str | UUID, sku: str | None = None) -> None:
+        with self._lock:
+            if sku is None:
+                self._entries.pop(str(tenant_id), None)
+                self._versions.pop(str(tenant_id), None)
+                self._checked_until.pop(str(tenant_id), None)
+                return
+            self._entries.get(str(tenant_id), {}).pop(sku, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._checked_until.clear()
+
+    @staticmethod
+    def _load(db, *, tenant_id: str, skus: set[str]) -> dict[str, PrimarySkuImage]:
+        rows = db.execute(
+            select(SkuImage)
+            .where(
+                SkuImage.tenant_id == tenant_id,
+                SkuImage.sku.in_(skus),
+                SkuImage.is_primary.is_(True),
+            )
+            .order_by(SkuImage.sort_order.asc(), SkuImage.updated_at.desc().nullslast())
+        ).scalars().all()
+        images: dict[str, PrimarySkuImage] = {}
+        for row in rows:
+            images.setdefault(
+                row.sku,
+                PrimarySkuImage(asset_id=row.asset_id, image_updated_at=row.updated_at or row.created_at),
+            )
+        return images
+
+
+primary_sku_images = PrimarySkuImageCache()
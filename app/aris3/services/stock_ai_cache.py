@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, or_, select, update
+
+from app.aris3.core.config import settings
+from app.aris3.db.models import StockAiExtractionCache
+from app.aris3.services.stock_ai_preload import UploadedSource, inventory_prompt_version
+
+
+logger = logging.getLogger(__name__)
+
+
+def file_content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def extraction_cache_key(*, prompt: str, attachments: list[UploadedSource]) -> str:
+    # Filenames are left out on purpose: a resent invoice usually arrives under a new name.
+    digest = hashlib.sha256()
+    digest.update(prompt.encode("utf-8"))
+    for attachment in attachments:
+        digest.update(b"\0")
+        digest.update(attachment.content_type.encode("utf-8"))
+        digest.update(file_content_hash(attachment.content).encode("ascii"))
+    return digest.hexdigest()
+
+
+class StockAiExtractionCacheService:
+    def __init__(self, db):
+        self.db = db
+
+    def get(self, *, tenant_id, content_hash: str, model: str, now: datetime | None = None) -> dict[str, Any] | None:
+        if not settings.AI_EXTRACTION_CACHE_ENABLED:
+            return None
+        now = now or datetime.utcnow()
+        entry = self.db.execute(
+            select(StockAiExtractionCache).where(
+                StockAiExtractionCache.tenant_id == tenant_id,
+                StockAiExtractionCache.content_hash == content_hash,
+                StockAiExtractionCache.prompt_version == inventory_prompt_version(),
+                StockAiExtractionCache.model == model,
+                StockAiExtractionCache.created_at >= now - timedelta(days=settings.AI_EXTRACTION_CACHE_TTL_DAYS),
+            )
+        ).scalar_one_or_none()
+        if entry is None:
+            return None
+        self.db.execute(
+            update(StockAiExtractionCache)
+            .where(StockAiExtractionCache.id == entry.id)
+            .values(hit_count=StockAiExtractionCache.hit_count + 1, last_hit_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        logger.info("stock.ai_preload.cache_hit tenant_id=%s content_hash=%s model=%s", tenant_id, content_hash, model)
+        return copy.deepcopy(entry.result)
+
+    def put(self, *, tenant_id, content_hash: str, model: str, result: dict[str, Any], now: datetime | None = None) -> None:
+        if not settings.AI_EXTRACTION_CACHE_ENABLED:
+            return
+        now = now or datetime.utcnow()
+        row = {
+            "id": uuid.uuid4(),
+            "tenant_id": tenant_id,
+            "content_hash": content_hash,
+            "prompt_version": inventory_prompt_version(),
+            "model": model,
+            "result": result,
+            "hit_count": 0,
+            "created_at": now,
+        }
+        table = StockAiExtractionCache.__table__
+        dialect_name = self.db.get_bind().dialect.name
+        if dialect_name in {"postgresql", "sqlite"}:
+            if dialect_name == "postgresql":
+                from sqlalchemy.dialects.postgresql import insert as dialect_insert
+            else:
+                from sqlalchemy.dialects.sqlite import insert as dialect_insert
+            # Two uploads of the same document can race; the later result simply wins.
+            stmt = dialect_insert(table).values(row)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.tenant_id, table.c.content_hash, table.c.prompt_version, table.c.model],
+                set_={"result": stmt.excluded.result, "hit_count": 0, "created_at": stmt.excluded.created_at, "last_hit_at": None},
+            )
+            self.db.execute(stmt)
+            return
+        updated = self.db.execute(
+            update(StockAiExtractionCache)
+            .where(
+                StockAiExtractionCache.tenant_id == tenant_id,
+                StockAiExtractionCache.content_hash == content_hash,
+                StockAiExtractionCache.prompt_version == row["prompt_version"],
+                StockAiExtractionCache.model == model,
+            )
+            .values(result=result, hit_count=0, created_at=now, last_hit_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        if not updated.rowcount:
+            self.db.add(StockAiExtractionCache(**row))
+
+    def prune(self, *, older_than_days: int | None = None, now: datetime | None = None) -> int:
+        # Reads only filter by TTL and prompt version, so expired and superseded rows are deleted here.
+        now = now or datetime.utcnow()
+        days = settings.AI_EXTRACTION_CACHE_TTL_DAYS if older_than_days is None else older_than_days
+        result = self.db.execute(
+            delete(StockAiExtractionCache).where(
+                or_(
+                    StockAiExtractionCache.created_at < now - timedelta(days=days),
+                    StockAiExtractionCache.prompt_version != inventory_prompt_version(),
+                )
+            )
+        )
+        self.db.commit()
+        return int(result.rowcount or 0)
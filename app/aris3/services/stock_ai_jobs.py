@@ -0,0 +1,401 @@
+from __future__ import annotations
+
+import base64
+import logging
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any, Callable
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import aliased
+
+from app.aris3.core.config import settings
+from app.aris3.core.error_catalog import AppError
+from app.aris3.db.models import StockAiExtraction, StockAiJob
+from app.aris3.services.stock_ai_cache import StockAiExtractionCacheService, extraction_cache_key
+from app.aris3.services.stock_ai_preload import (
+    ExtractionChunk,
+    StockAiPreloadService,
+    UploadedSource,
+    partial_extraction_message,
+    run_in_thread_loop,
+    serialize_ai_line,
+)
+
+
+logger = logging.getLogger(__name__)
+
+JOB_LARGE_EXTRACTION = "LARGE_EXTRACTION"
+JOB_QUEUED = "QUEUED"
+JOB_RUNNING = "RUNNING"
+JOB_COMPLETED = "COMPLETED"
+JOB_FAILED = "FAILED"
+
+
+def encode_attachments(attachments: list[UploadedSource]) -> list[dict[str, str]]:
+    return [
+        {
+            "filename": attachment.filename,
+            "content_type": attachment.content_type,
+            "content": base64.b64encode(attachment.content).decode("ascii"),
+        }
+        for attachment in attachments
+    ]
+
+
+def decode_attachments(entries: list[dict[str, str]] | None) -> list[UploadedSource]:
+    return [
+        UploadedSource(
+            filename=entry["filename"],
+            content_type=entry["content_type"],
+            content=base64.b64decode(entry["content"]),
+        )
+        for entry in entries or []
+    ]
+
+
+class StockAiJobService:
+    def __init__(self, db, preload_service: StockAiPreloadService | None = None):
+        self.db = db
+        self.preload_service = preload_service or StockAiPreloadService()
+
+    def enqueue(self, *, tenant_id, extraction_id, kind: str, payload: dict[str, Any]) -> StockAiJob:
+        now = datetime.utcnow()
+        job = StockAiJob(
+            tenant_id=tenant_id,
+            extraction_id=extraction_id,
+            kind=kind,
+            payload=payload,
+            status=JOB_QUEUED,
+            attempts=0,
+            max_attempts=max(1, settings.AI_JOBS_MAX_ATTEMPTS),
+            available_at=now,
+            created_at=now,
+            updated_at=now,
+        )
+        self.db.add(job)
+        self.db.flush()
+        return job
+
+    def claim(self, *, worker_id: str, now: datetime | None = None) -> StockAiJob | None:
+        # A RUNNING job whose lease expired belongs to a worker that died; it is claimable again.
+        now = now or datetime.utcnow()
+        query = (
+            select(StockAiJob)
+            .where(
+                or_(
+                    and_(StockAiJob.status == JOB_QUEUED, StockAiJob.available_at <= now),
+                    and_(StockAiJob.status == JOB_RUNNING, StockAiJob.lease_expires_at <= now),
+                )
+            )
+            .order_by(StockAiJob.available_at)
+            .limit(1)
+        )
+        tenant_limit = settings.AI_JOBS_TENANT_CONCURRENCY
+        if tenant_limit > 0:
+            saturated = (
+                select(StockAiJob.tenant_id)
+                .where(StockAiJob.status == JOB_RUNNING, StockAiJob.lease_expires_at > now)
+                .group_by(StockAiJob.tenant_id)
+                .having(func.count() >= tenant_limit)
+            )
+            query = query.where(StockAiJob.tenant_id.not_in(saturated))
+        if self.db.get_bind().dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True)
+        job = self.db.execute(query).scalar_one_or_none()
+        if job is None:
+            self.db.rollback()
+            return None
+        # Compare-and-set on (status, attempts): the SQLite equivalent of SKIP LOCKED, and a guard on
+        # Postgres too. Losing the race just means another worker has the job.
+        guards = [StockAiJob.id == job.id, StockAiJob.status == job.status, StockAiJob.attempts == job.attempts]
+        if tenant_limit > 0:
+            # The saturation filter above read a snapshot; re-check inside the write so two workers cannot
+            # both take a tenant's last slot. On Postgres a per-tenant transaction lock orders those writes.
+            if self.db.get_bind().dialect.name == "postgresql":
+                self.db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"stock_ai_jobs:{job.tenant_id}"))))
+            running = aliased(StockAiJob)
+            running_count = (
+                select(func.count())
+                .select_from(running)
+                .where(running.tenant_id == job.tenant_id, running.status == JOB_RUNNING, running.lease_expires_at > now)
+                .scalar_subquery()
+            )
+            guards.append(running_count < tenant_limit)
+        claimed = self.db.execute(
+            update(StockAiJob)
+            .where(*guards)
+            .values(
+                status=JOB_RUNNING,
+                attempts=job.attempts + 1,
+                lease_owner=worker_id,
+                lease_expires_at=now + timedelta(seconds=settings.AI_JOBS_LEASE_SECONDS),
+                updated_at=now,
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        self.db.commit()
+        if not claimed:
+            return None
+        self.db.refresh(job)
+        return job
+
+    def run_next(self, *, worker_id: str) -> StockAiJob | None:
+        job = self.claim(worker_id=worker_id)
+        if job is not None:
+            self.run(job, worker_id=worker_id)
+        return job
+
+    def run(self, job: StockAiJob, *, worker_id: str) -> None:
+        extraction = self.db.get(StockAiExtraction, job.extraction_id)
+        if extraction is None:
+            self._finish(job, worker_id=worker_id, status=JOB_COMPLETED)
+            return
+        if job.attempts > job.max_attempts:
+            # Reclaimed after the worker running its last attempt died.
+            self._record_failure(
+                job,
+                extraction,
+                worker_id=worker_id,
+                code="AI_JOB_ABANDONED",
+                details={"message": "AI analysis did not finish", "retryable": True},
+                retryable=False,
+            )
+            return
+        handler = _HANDLERS[job.kind]
+        try:
+            handler(self, job, extraction)
+        except AppError as exc:
+            details = dict(exc.details or {})
+            self._record_failure(
+                job,
+                extraction,
+                worker_id=worker_id,
+                code=exc.error.code,
+                details=details,
+                retryable=bool(details.get("retryable", True)),
+            )
+            return
+        except Exception:
+            logger.exception("stock.ai_job.failed job_id=%s kind=%s attempt=%s", job.id, job.kind, job.attempts)
+            self._record_failure(
+                job,
+                extraction,
+                worker_id=worker_id,
+                code="INTERNAL_ERROR",
+                details={"message": "AI analysis failed", "retryable": True},
+                retryable=True,
+            )
+            return
+        self._finish(job, worker_id=worker_id, status=JOB_COMPLETED)
+
+    def renew_lease(self, job: StockAiJob, lease: tuple[str | None, int], *, commit: bool = True) -> bool:
+        # Heartbeat for long handlers: a job that is still making progress must not look abandoned.
+        lease_owner, attempts = lease
+        now = datetime.utcnow()
+        renewed = self.db.execute(
+            update(StockAiJob)
+            .where(
+                StockAiJob.id == job.id,
+                StockAiJob.status == JOB_RUNNING,
+                StockAiJob.lease_owner == lease_owner,
+                StockAiJob.attempts == attempts,
+            )
+            .values(lease_expires_at=now + timedelta(seconds=settings.AI_JOBS_LEASE_SECONDS), updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if commit:
+            self.db.commit()
+        if not renewed:
+            logger.warning("stock.ai_job.lease_lost job_id=%s worker_id=%s", job.id, lease_owner)
+        return bool(renewed)
+
+    def record_progress(self, job: StockAiJob, lease: tuple[str | None, int], *, lines: list[dict[str, Any]], chunks_completed: int) -> None:
+        # Committed right away so pollers see lines as chunks finish. The lease is the one captured when
+        # the handler started; a worker that has since lost the job writes nothing.
+        if not self.renew_lease(job, lease, commit=False):
+            self.db.commit()
+            return
+        self.db.execute(
+            update(StockAiExtraction)
+            .where(StockAiExtraction.id == job.extraction_id, StockAiExtraction.status == "PROCESSING")
+            .values(normalized_result={"lines": lines}, chunks_completed=chunks_completed, updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+
+    def retry_delay(self, attempts: int) -> timedelta:
+        seconds = settings.AI_JOBS_RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1))
+        return timedelta(seconds=min(seconds, settings.AI_JOBS_RETRY_MAX_SECONDS))
+
+    def _finish(self, job: StockAiJob, *, worker_id: str, status: str, **values) -> bool:
+        # Only the lease holder may finish a job; if the lease expired and another worker took over,
+        # everything this worker wrote in the transaction is discarded.
+        now = datetime.utcnow()
+        values.setdefault("lease_owner", None)
+        values.setdefault("lease_expires_at", None)
+        if status in {JOB_COMPLETED, JOB_FAILED}:
+            values.setdefault("completed_at", now)
+            # Attachments travel base64-encoded in the payload; nothing reads it once the job is done.
+            values.setdefault("payload", {})
+        finished = self.db.execute(
+            update(StockAiJob)
+            .where(
+                StockAiJob.id == job.id,
+                StockAiJob.status == JOB_RUNNING,
+                StockAiJob.lease_owner == worker_id,
+                StockAiJob.attempts == job.attempts,
+            )
+            .values(status=status, updated_at=now, **values)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not finished:
+            self.db.rollback()
+            logger.warning("stock.ai_job.lease_lost job_id=%s worker_id=%s", job.id, worker_id)
+            return False
+        self.db.commit()
+        self.db.refresh(job)
+        return True
+
+    def _record_failure(
+        self,
+        job: StockAiJob,
+        extraction: StockAiExtraction,
+        *,
+        worker_id: str,
+        code: str,
+        details: dict[str, Any],
+        retryable: bool,
+    ) -> None:
+        self.db.rollback()
+        last_error = f"{code}: {details.get('message') or 'AI analysis failed'}"
+        if retryable and job.attempts < job.max_attempts:
+            # The extraction stays PROCESSING while the job waits for its next attempt.
+            self._finish(
+                job,
+                worker_id=worker_id,
+                status=JOB_QUEUED,
+                available_at=datetime.utcnow() + self.retry_delay(job.attempts),
+                last_error=last_error,
+            )
+            return
+        extraction.status = "FAILED"
+        extraction.warnings = [{"severity": "error", "message": details.get("message") or "AI analysis failed"}]
+        extraction.raw_ai_result = {
+            "code": code,
+            "details": {
+                **details,
+                "retryable": details.get("retryable", True),
+                "text_only": True,
+                "large_input": True,
+                "attempts": job.attempts,
+            },
+        }
+        extraction.updated_at = datetime.utcnow()
+        self.db.flush()
+        self._finish(job, worker_id=worker_id, status=JOB_FAILED, last_error=last_error)
+
+
+def _payload_chunks(payload: dict[str, Any]) -> tuple[list[ExtractionChunk], list[str]]:
+    # Jobs queued before chunking carry a single prompt.
+    entries = payload.get("chunks") or [
+        {"prompt": payload["prompt"], "cache_key": payload.get("cache_key"), "attachments": payload.get("attachments")}
+    ]
+    chunks = [ExtractionChunk(prompt=entry["prompt"], attachments=decode_attachments(entry.get("attachments"))) for entry in entries]
+    cache_keys = [
+        entry.get("cache_key") or extraction_cache_key(prompt=chunk.prompt, attachments=chunk.attachments)
+        for entry, chunk in zip(entries, chunks)
+    ]
+    return chunks, cache_keys
+
+
+def _price_lines(service: StockAiPreloadService, payload: dict[str, Any], raw_lines: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    markup_decimal = service.parse_decimal(payload.get("markup_percent"))
+    margin_decimal = service.parse_decimal(payload.get("margin_percent"))
+    multiplier_decimal = service.parse_decimal(payload.get("multiplier"))
+    rounding_decimal = service.parse_decimal(payload.get("rounding_step")) or Decimal("1.00")
+    exchange_rate_decimal = service.parse_decimal(payload.get("exchange_rate_to_gtq"))
+    lines: list[dict[str, Any]] = []
+    for idx, raw_line in enumerate(raw_lines, start=1):
+        priced = service.apply_pricing(
+            line=raw_line,
+            source_currency=payload["source_currency"],
+            exchange_rate_to_gtq=exchange_rate_decimal,
+            pricing_mode=payload["pricing_mode"],
+            markup_percent=markup_decimal,
+            margin_percent=margin_decimal,
+            multiplier=multiplier_decimal,
+            rounding_step=rounding_decimal,
+        )
+        priced = service.apply_operational_defaults(priced)
+        lines.append(serialize_ai_line(idx, priced).model_dump())
+    return lines
+
+
+def _raw_lines(payload: dict[str, Any], ai_result: dict[str, Any]) -> list[dict[str, Any]]:
+    # Spreadsheet rows mapped without the model come first, as in the inline analysis.
+    return [*payload.get("deterministic_lines", []), *ai_result.get("lines", [])]
+
+
+def _run_large_extraction(jobs: StockAiJobService, job: StockAiJob, extraction: StockAiExtraction) -> None:
+    payload = job.payload
+    service = jobs.preload_service
+    model = service.openai_client._model
+    lease = (job.lease_owner, job.attempts)
+    cache = StockAiExtractionCacheService(jobs.db)
+    chunks, cache_keys = _payload_chunks(payload)
+    done: dict[int, dict[str, Any]] = {}
+    for index, cache_key in enumerate(cache_keys):
+        cached = cache.get(tenant_id=job.tenant_id, content_hash=cache_key, model=model)
+        if cached is not None:
+            done[index] = cached
+
+    def _on_error(_index: int, _error: AppError) -> None:
+        jobs.renew_lease(job, lease)
+
+    def _on_chunk(index: int, result: dict[str, Any]) -> None:
+        cache.put(tenant_id=job.tenant_id, content_hash=cache_keys[index], model=model, result=result)
+        done[index] = result
+        partial = service.merge_chunk_results([done.get(position) for position in range(len(chunks))])
+        lines = _price_lines(service, payload, _raw_lines(payload, partial))
+        jobs.record_progress(job, lease, lines=lines, chunks_completed=len(done))
+
+    results, errors = run_in_thread_loop(
+        service.extract_chunks(
+            chunks,
+            trace_id=payload.get("trace_id"),
+            tenant_id=str(job.tenant_id),
+            store_id=payload["store_id"],
+            document_type=payload.get("document_type"),
+            timeout_seconds=float(settings.OPENAI_INVENTORY_LARGE_TIMEOUT_SECONDS),
+            done=dict(done),
+            on_chunk=_on_chunk,
+            on_error=_on_error,
+        )
+    )
+    if errors:
+        retryable = [error for error in errors if (error.details or {}).get("retryable", True)]
+        # Finished chunks are cached, so a retry only pays for the ones that failed. On the last
+        # attempt whatever was extracted is kept.
+        if not any(results):
+            raise errors[0]
+        if retryable and lease[1] < job.max_attempts:
+            raise retryable[0]
+    ai_result = service.merge_chunk_results(results)
+    warnings: list[dict[str, Any]] = [*payload.get("warnings", []), *ai_result.get("warnings", [])]
+    if errors:
+        warnings.append({"severity": "warning", "message": partial_extraction_message(len(errors), len(chunks))})
+    warnings.append({"severity": "info", "message": "EPC y precio de venta final fueron excluidos del resultado asistido."})
+    extraction.status = "COMPLETED"
+    extraction.raw_ai_result = ai_result
+    extraction.normalized_result = {"lines": _price_lines(service, payload, _raw_lines(payload, ai_result))}
+    extraction.warnings = warnings
+    extraction.chunks_total = len(chunks)
+    extraction.chunks_completed = sum(1 for result in results if result)
+    extraction.updated_at = datetime.utcnow()
+    jobs.db.flush()
+
+
+_HANDLERS: dict[str, Callable[[StockAiJobService, StockAiJob, StockAiExtraction], None]] = {
+    JOB_LARGE_EXTRACTION: _run_large_extraction,
+}
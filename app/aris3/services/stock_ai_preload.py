@@ -1,16 +1,21 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import copy
 import csv
+import hashlib
 import io
 import json
 import logging
 import re
+import threading
 import time
+import weakref
 import zipfile
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal, InvalidOperation, ROUND_CEILING
-from typing import Any
+from typing import Any, Callable, Iterator
 from xml.etree import ElementTree
 
 import httpx
@@ -18,6 +23,7 @@ from openpyxl import load_workbook
 
 from app.aris3.core.config import settings
 from app.aris3.core.error_catalog import AppError, ErrorCatalog
+from app.aris3.schemas.stock import AiPreloadLine
 
 
 SUPPORTED_CONTENT_TYPES = {
@@ -59,9 +65,13 @@ NON_SELLABLE_PHRASES = {
     "internal use",
 }
 DEFAULT_OPENAI_MODEL = "gpt-4.1-mini"
+FAKE_INVENTORY_MODEL = "fake-inventory"
+# Bump when the extraction instructions change; cached extractions from other versions are ignored.
+INVENTORY_PROMPT_VERSION = "1"
 _MODEL_NAME_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._:-]{1,127}$")
 OPENAI_TOTAL_TIMEOUT_SECONDS = 18.0
 OPENAI_CONNECT_TIMEOUT_SECONDS = 3.0
+OPENAI_RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
 logger = logging.getLogger(__name__)
 
 INVENTORY_PRELOAD_SCHEMA: dict[str, Any] = {
@@ -173,6 +183,12 @@ INVENTORY_PRELOAD_SCHEMA: dict[str, Any] = {
 }
 
 
+def inventory_prompt_version() -> str:
+    # The response schema is part of the prompt, so editing it invalidates the cache without a manual bump.
+    schema_digest = hashlib.sha256(json.dumps(INVENTORY_PRELOAD_SCHEMA, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+    return f"{INVENTORY_PROMPT_VERSION}:{schema_digest}"
+
+
 @dataclass
 class UploadedSource:
     filename: str
@@ -180,8 +196,80 @@ class UploadedSource:
     content: bytes
 
 
+@dataclass
+class ExtractionChunk:
+    prompt: str
+    attachments: list[UploadedSource]
+
+
+@dataclass
+class SpreadsheetScan:
+    # Raw rows are only needed for the AI prompt, so they are kept serialized, one string per chunk batch.
+    row_batches: list[str] = field(default_factory=list)
+    lines: list[dict[str, Any]] = field(default_factory=list)
+    warnings: list[dict[str, str]] = field(default_factory=list)
+    row_warnings: list[str] = field(default_factory=list)
+    row_count: int = 0
+
+
+# Pooled connections belong to the event loop that opened them, so the process keeps one client and
+# one concurrency gate per loop rather than a single global client.
+_loop_http_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = weakref.WeakKeyDictionary()
+_loop_semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+_configured_http_client: httpx.AsyncClient | None = None
+_sync_runners = threading.local()
+
+
+def configure_inventory_http_client(client: httpx.AsyncClient | None) -> None:
+    """Send all OpenAIInventoryClient traffic through ``client`` (e.g. a stub server); ``None`` restores the pool."""
+    global _configured_http_client
+    _configured_http_client = client
+
+
+def _pooled_http_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _loop_http_clients.get(loop)
+    if client is None or client.is_closed:
+        transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_INVENTORY_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_INVENTORY_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_INVENTORY_KEEPALIVE_SECONDS,
+            ),
+            retries=settings.OPENAI_INVENTORY_MAX_RETRIES,
+        )
+        client = httpx.AsyncClient(transport=transport)
+        _loop_http_clients[loop] = client
+    return client
+
+
+def _concurrency_gate() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _loop_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(max(1, settings.OPENAI_INVENTORY_MAX_CONCURRENCY))
+        _loop_semaphores[loop] = semaphore
+    return semaphore
+
+
+def run_in_thread_loop(coro):
+    # Sync callers (the AI job worker) keep one loop per thread so pooled connections survive between jobs.
+    runner = getattr(_sync_runners, "runner", None)
+    if runner is None:
+        runner = asyncio.Runner()
+        _sync_runners.runner = runner
+    return runner.run(coro)
+
+
+async def close_inventory_http_clients() -> None:
+    client = _loop_http_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
 class OpenAIInventoryClient:
-    def __init__(self) -> None:
+    def __init__(self, http_client: httpx.AsyncClient | None = None) -> None:
+        self._http_client = http_client
         self._api_key = settings.OPENAI_API_KEY
         configured_model = (settings.OPENAI_INVENTORY_MODEL or "").strip()
         if configured_model and _MODEL_NAME_PATTERN.match(configured_model):
@@ -210,6 +298,30 @@ class OpenAIInventoryClient:
         store_id: str,
         document_type: str | None,
         timeout_seconds: float | None = None,
+    ) -> dict[str, Any]:
+        # Sync entry point for scripts and the AI job worker.
+        return run_in_thread_loop(
+            self.extract_async(
+                prompt=prompt,
+                attachments=attachments,
+                trace_id=trace_id,
+                tenant_id=tenant_id,
+                store_id=store_id,
+                document_type=document_type,
+                timeout_seconds=timeout_seconds,
+            )
+        )
+
+    async def extract_async(
+        self,
+        *,
+        prompt: str,
+        attachments: list[UploadedSource],
+        trace_id: str | None,
+        tenant_id: str,
+        store_id: str,
+        document_type: str | None,
+        timeout_seconds: float | None = None,
     ) -> dict[str, Any]:
         if not self._api_key:
             raise AppError(
@@ -256,12 +368,13 @@ class OpenAIInventoryClient:
             self._model,
         )
         try:
-            response = httpx.post(
-                "https://api.openai.com/v1/responses",
-                headers={"Authorization": f"Bearer {self._api_key}"},
-                json=payload,
-                timeout=timeout,
-            )
+            async with _concurrency_gate():
+                response = await self._post_with_retries(
+                    payload,
+                    timeout=timeout,
+                    deadline=start + total_timeout,
+                    trace_id=trace_id,
+                )
             response.raise_for_status()
             data = response.json()
         except httpx.TimeoutException as exc:
@@ -400,6 +513,105 @@ class OpenAIInventoryClient:
             details={"message": "AI analysis returned empty output", "retryable": False, "model": self._model},
         )
 
+    async def _post_with_retries(
+        self,
+        payload: dict[str, Any],
+        *,
+        timeout: httpx.Timeout,
+        deadline: float,
+        trace_id: str | None,
+    ) -> httpx.Response:
+        # Connect failures are retried by the transport; this covers throttling, 5xx and a pooled
+        # connection the server already dropped, as long as the retry fits in the caller's budget.
+        client = self._http_client or _configured_http_client or _pooled_http_client()
+        url = f"{settings.OPENAI_API_BASE_URL.rstrip('/')}/responses"
+        max_retries = settings.OPENAI_INVENTORY_MAX_RETRIES
+        attempt = 0
+        while True:
+            attempt += 1
+            delay = self._retry_delay(attempt, None)
+            try:
+                response = await client.post(
+                    url,
+                    headers={"Authorization": f"Bearer {self._api_key}"},
+                    json=payload,
+                    timeout=timeout,
+                )
+            except httpx.RemoteProtocolError:
+                if attempt > max_retries or time.perf_counter() + delay >= deadline:
+                    raise
+            else:
+                delay = self._retry_delay(attempt, response)
+                if (
+                    response.status_code not in OPENAI_RETRYABLE_STATUS_CODES
+                    or attempt > max_retries
+                    or time.perf_counter() + delay >= deadline
+                ):
+                    return response
+                await response.aclose()
+            logger.info(
+                "stock.ai_preload.openai_call_retry trace_id=%s attempt=%s delay_seconds=%.2f model_used=%s",
+                trace_id,
+                attempt,
+                delay,
+                self._model,
+            )
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, attempt: int, response: httpx.Response | None) -> float:
+        delay = settings.OPENAI_INVENTORY_RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1))
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        return delay
+
+
+class FakeInventoryClient:
+    """Offline stand-in for OpenAIInventoryClient (``AI_INVENTORY_CLIENT=fake``).
+
+    Returns ``result`` when given, otherwise one line per ``SKU: <code>`` found in the prompt.
+    """
+
+    _SKU_PATTERN = re.compile(r"SKU\s*[:=]\s*([A-Za-z0-9._-]+)", re.IGNORECASE)
+
+    def __init__(self, result: dict[str, Any] | None = None) -> None:
+        self._model = FAKE_INVENTORY_MODEL
+        self._result = result
+        self.calls: list[dict[str, Any]] = []
+
+    def extract(
+        self,
+        *,
+        prompt: str,
+        attachments: list[UploadedSource],
+        trace_id: str | None,
+        tenant_id: str,
+        store_id: str,
+        document_type: str | None,
+        timeout_seconds: float | None = None,
+    ) -> dict[str, Any]:
+        self.calls.append({"prompt": prompt, "attachments": len(attachments), "tenant_id": tenant_id, "store_id": store_id})
+        if self._result is not None:
+            return copy.deepcopy(self._result)
+        skus = list(dict.fromkeys(self._SKU_PATTERN.findall(prompt)))
+        return {
+            "document_summary": {"document_type": document_type or "other"},
+            "lines": [{"sku": sku, "description": sku, "quantity": 1, "needs_review": True} for sku in skus],
+            "warnings": [],
+        }
+
+    async def extract_async(self, **kwargs: Any) -> dict[str, Any]:
+        return self.extract(**kwargs)
+
+
+def build_inventory_client() -> OpenAIInventoryClient | FakeInventoryClient:
+    if (settings.AI_INVENTORY_CLIENT or "").strip().lower() == "fake":
+        return FakeInventoryClient()
+    return OpenAIInventoryClient()
+
 
 def _extract_openai_error(response: httpx.Response | None) -> dict[str, Any]:
     if response is None:
@@ -420,9 +632,189 @@ def _extract_openai_error(response: httpx.Response | None) -> dict[str, Any]:
     }
 
 
+def serialize_ai_line(row_key: int, line: dict) -> AiPreloadLine:
+    return AiPreloadLine(
+        row_key=str(row_key),
+        sku=line.get("sku"),
+        suggested_sku=line.get("suggested_sku"),
+        description=line.get("description") or "",
+        variant_1=line.get("variant_1"),
+        variant_2=line.get("variant_2"),
+        color=line.get("color") or line.get("variant_1"),
+        size=line.get("size") or line.get("variant_2"),
+        brand=line.get("brand"),
+        category=line.get("category"),
+        style=line.get("style"),
+        pool=line.get("pool"),
+        location_code=line.get("location_code"),
+        logistics_status=line.get("logistics_status"),
+        sellable=bool(line.get("sellable", True)),
+        quantity=max(1, int(line.get("quantity") or 1)),
+        source_order_number=line.get("source_order_number"),
+        source_order_date=line.get("source_order_date"),
+        source_supplier=line.get("source_supplier"),
+        original_cost=line.get("original_cost"),
+        source_currency=line.get("source_currency"),
+        exchange_rate_to_gtq=line.get("exchange_rate_to_gtq"),
+        cost_gtq=line.get("cost_gtq"),
+        suggested_price_gtq=line.get("suggested_price_gtq"),
+        reference_price_original=line.get("reference_price_original"),
+        reference_price_gtq=line.get("reference_price_gtq"),
+        needs_review=bool(line.get("needs_review", True)),
+        confidence=line.get("confidence"),
+        notes=line.get("notes"),
+        source_file_name=line.get("source_file_name"),
+        source_row_number=line.get("source_row_number"),
+    )
+
+
+def partial_extraction_message(failed: int, total: int) -> str:
+    return f"No se pudieron analizar {failed} de {total} partes del documento; revisa las líneas faltantes."
+
+
+def _split_text(text: str, limit: int) -> list[str]:
+    # Prefer paragraph breaks, then line breaks, then whitespace, so an item is rarely cut in half.
+    if len(text) <= limit:
+        return [text]
+    for separator in ("\n\n", "\n", " "):
+        parts = text.split(separator)
+        if len(parts) == 1:
+            continue
+        pieces: list[str] = []
+        current = ""
+        for part in parts:
+            candidate = f"{current}{separator}{part}" if current else part
+            if len(candidate) <= limit:
+                current = candidate
+                continue
+            if current:
+                pieces.append(current)
+            current = part
+        if current:
+            pieces.append(current)
+        return [chunk for piece in pieces for chunk in _split_text(piece, limit)]
+    return [text[idx : idx + limit] for idx in range(0, len(text), limit)]
+
+
 class StockAiPreloadService:
-    def __init__(self, openai_client: OpenAIInventoryClient | None = None) -> None:
-        self.openai_client = openai_client or OpenAIInventoryClient()
+    def __init__(self, openai_client: OpenAIInventoryClient | FakeInventoryClient | None = None) -> None:
+        self.openai_client = openai_client or build_inventory_client()
+
+    def build_prompt(
+        self,
+        *,
+        free_text: str | None,
+        row_batch: str | None,
+        operator_notes: str | None,
+        document_type: str | None,
+    ) -> str:
+        parts = [
+            "Extrae líneas de inventario. No incluyas EPC ni precio de venta final.",
+            f"document_type={document_type or 'unknown'}",
+        ]
+        if free_text:
+            parts.append(f"texto_libre:\\n{free_text}")
+        if row_batch:
+            parts.append(f"filas_deterministicas={row_batch}")
+        if operator_notes:
+            parts.append(f"notas_operador={operator_notes}")
+        return "\\n\\n".join(parts)
+
+    def plan_extraction_chunks(
+        self,
+        *,
+        free_text: str | None,
+        row_batches: list[str],
+        operator_notes: str | None,
+        document_type: str | None,
+        attachments: list[UploadedSource],
+    ) -> list[ExtractionChunk]:
+        # Chunk i carries the i-th text piece, row batch and file, so a small document stays a single
+        # request and only large inputs fan out.
+        text_pieces = _split_text(free_text, max(1, settings.AI_PRELOAD_CHUNK_TEXT_CHARS)) if free_text else []
+        count = max(len(text_pieces), len(row_batches), len(attachments), 1)
+        return [
+            ExtractionChunk(
+                prompt=self.build_prompt(
+                    free_text=text_pieces[idx] if idx < len(text_pieces) else None,
+                    row_batch=row_batches[idx] if idx < len(row_batches) else None,
+                    operator_notes=operator_notes,
+                    document_type=document_type,
+                ),
+                attachments=[attachments[idx]] if idx < len(attachments) else [],
+            )
+            for idx in range(count)
+        ]
+
+    async def extract_chunks(
+        self,
+        chunks: list[ExtractionChunk],
+        *,
+        trace_id: str | None,
+        tenant_id: str,
+        store_id: str,
+        document_type: str | None,
+        timeout_seconds: float | None,
+        done: dict[int, dict[str, Any]] | None = None,
+        on_chunk: Callable[[int, dict[str, Any]], None] | None = None,
+        on_error: Callable[[int, AppError], None] | None = None,
+    ) -> tuple[list[dict[str, Any] | None], list[AppError]]:
+        """Extract the chunks not already in ``done``, at most AI_PRELOAD_CHUNK_CONCURRENCY at a time.
+
+        Returns one result per chunk (``None`` where it failed) and the errors; callers decide whether
+        a partial result is acceptable.
+        """
+        results: list[dict[str, Any] | None] = [None] * len(chunks)
+        for index, result in (done or {}).items():
+            results[index] = result
+        errors: list[AppError] = []
+        gate = asyncio.Semaphore(max(1, settings.AI_PRELOAD_CHUNK_CONCURRENCY))
+
+        async def _extract(index: int, chunk: ExtractionChunk) -> None:
+            async with gate:
+                try:
+                    result = await self.openai_client.extract_async(
+                        prompt=chunk.prompt,
+                        attachments=chunk.attachments,
+                        trace_id=trace_id,
+                        tenant_id=tenant_id,
+                        store_id=store_id,
+                        document_type=document_type,
+                        timeout_seconds=timeout_seconds,
+                    )
+                except AppError as exc:
+                    errors.append(exc)
+                    if on_error is not None:
+                        on_error(index, exc)
+                    return
+            results[index] = result
+            if on_chunk is not None:
+                on_chunk(index, result)
+
+        await asyncio.gather(*(_extract(index, chunk) for index, chunk in enumerate(chunks) if results[index] is None))
+        return results, errors
+
+    def merge_chunk_results(self, results: list[dict[str, Any] | None]) -> dict[str, Any]:
+        completed = [result for result in results if result]
+        if len(results) == 1 and completed:
+            return completed[0]
+        merged: dict[str, Any] = {"document_summary": {}, "lines": [], "warnings": []}
+        seen_warnings: set[tuple[Any, Any]] = set()
+        for result in results:
+            if not result:
+                continue
+            for key, value in (result.get("document_summary") or {}).items():
+                if value is not None and merged["document_summary"].get(key) is None:
+                    merged["document_summary"][key] = value
+            # Chunks never overlap (disjoint text pieces, row batches and files), so an identical line
+            # in two chunks is a genuine repeat and is kept.
+            merged["lines"].extend(result.get("lines", []))
+            for warning in result.get("warnings", []):
+                marker = (warning.get("severity"), warning.get("message"))
+                if marker not in seen_warnings:
+                    seen_warnings.add(marker)
+                    merged["warnings"].append(warning)
+        return merged
 
     def validate_files(self, files: list[UploadedSource]) -> None:
         if len(files) > settings.AI_PRELOAD_MAX_FILES:
@@ -437,36 +829,71 @@ class StockAiPreloadService:
         if total_bytes > settings.AI_PRELOAD_MAX_TOTAL_BYTES:
             raise AppError(ErrorCatalog.VALIDATION_ERROR, details={"message": "total upload size exceeded"})
 
-    def extract_spreadsheet_rows(self, file: UploadedSource) -> tuple[list[dict[str, str]], list[dict[str, str]]]:
-        warnings: list[dict[str, str]] = []
-        rows: list[dict[str, str]] = []
+    def iter_spreadsheet_rows(self, file: UploadedSource) -> Iterator[dict[str, str]]:
+        # Rows are yielded as they are read: CSV goes through csv.reader and workbooks are opened
+        # read-only, so a sheet is never materialized as a whole.
         if file.content_type in {"text/csv", "text/tab-separated-values"}:
             delimiter = "\t" if file.content_type == "text/tab-separated-values" else ","
-            reader = csv.DictReader(io.StringIO(file.content.decode("utf-8", errors="ignore")), delimiter=delimiter)
-            for idx, row in enumerate(reader, start=2):
-                normalized = {str(k or "").strip().lower(): str(v or "").strip() for k, v in row.items()}
-                normalized["_row_number"] = str(idx)
-                rows.append(normalized)
-        else:
-            wb = load_workbook(io.BytesIO(file.content), data_only=True)
-            for sheet in wb.worksheets:
-                values = list(sheet.iter_rows(values_only=True))
+            stream = io.TextIOWrapper(io.BytesIO(file.content), encoding="utf-8", errors="ignore", newline="")
+            reader = csv.reader(stream, delimiter=delimiter)
+            headers = [str(v or "").strip().lower() for v in next(reader, [])]
+            row_number = 1
+            for values in reader:
                 if not values:
                     continue
-                headers = [str(v or "").strip().lower() for v in values[0]]
-                for idx, value_row in enumerate(values[1:], start=2):
-                    normalized = {headers[i]: str(value_row[i] or "").strip() for i in range(len(headers)) if headers[i]}
+                row_number += 1
+                normalized = {header: (values[i] if i < len(values) else "").strip() for i, header in enumerate(headers)}
+                normalized["_row_number"] = str(row_number)
+                yield normalized
+            return
+        wb = load_workbook(io.BytesIO(file.content), read_only=True, data_only=True)
+        try:
+            for sheet in wb.worksheets:
+                values = sheet.iter_rows(values_only=True)
+                header_row = next(values, None)
+                if header_row is None:
+                    continue
+                headers = [str(v or "").strip().lower() for v in header_row]
+                for idx, value_row in enumerate(values, start=2):
+                    normalized = {
+                        headers[i]: str((value_row[i] if i < len(value_row) else None) or "").strip()
+                        for i in range(len(headers))
+                        if headers[i]
+                    }
                     normalized["_row_number"] = str(idx)
                     normalized["_sheet_name"] = sheet.title
-                    rows.append(normalized)
-        if not rows:
-            return rows, warnings
-        keys = {k for row in rows for k in row.keys()}
+                    yield normalized
+        finally:
+            wb.close()
+
+    def scan_spreadsheet(self, file: UploadedSource) -> SpreadsheetScan:
+        scan = SpreadsheetScan()
+        keys: set[str] = set()
+        progress_every = max(1, settings.AI_PRELOAD_SHEET_PROGRESS_ROWS)
+        batch_size = max(1, settings.AI_PRELOAD_CHUNK_ROWS)
+        batch: list[dict[str, str]] = []
+        for row in self.iter_spreadsheet_rows(file):
+            keys.update(row)
+            line, row_warnings = self.map_deterministic_row(row, source_file_name=file.filename)
+            batch.append(row)
+            if len(batch) >= batch_size:
+                scan.row_batches.append(str(batch))
+                batch = []
+            scan.lines.append(line)
+            scan.row_warnings.extend(row_warnings)
+            scan.row_count += 1
+            if scan.row_count % progress_every == 0:
+                logger.info("stock.ai_preload.sheet_progress file=%s rows=%s", file.filename, scan.row_count)
+        if batch:
+            scan.row_batches.append(str(batch))
+        logger.info("stock.ai_preload.sheet_parsed file=%s rows=%s", file.filename, scan.row_count)
+        if not scan.row_count:
+            return scan
         if any(any(token in key for token in EPC_KEYS) for key in keys):
-            warnings.append({"severity": "info", "message": "EPC values were detected but ignored. EPC must be assigned later."})
+            scan.warnings.append({"severity": "info", "message": "EPC values were detected but ignored. EPC must be assigned later."})
         if any(any(token in key for token in SALE_KEYS) for key in keys):
-            warnings.append({"severity": "info", "message": "Sale price values were detected but not imported. Final sale price must be set later."})
-        return rows, warnings
+            scan.warnings.append({"severity": "info", "message": "Sale price values were detected but not imported. Final sale price must be set later."})
+        return scan
 
     def map_deterministic_row(self, row: dict[str, str], *, source_file_name: str | None = None) -> tuple[dict[str, Any], list[str]]:
         warnings: list[str] = []
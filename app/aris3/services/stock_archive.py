@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from uuid import UUID
+
+from sqlalchemy import DateTime, delete, exists, func, insert, literal, select, union_all
+from sqlalchemy.orm import aliased
+
+from app.aris3.core.config import settings
+from app.aris3.db.models import PreloadLine, StockItem, StockItemArchive
+from app.aris3.services.change_versions import STOCK_RESOURCE, mark_changed
+from app.aris3.services.stock_changes import TOMBSTONE_ARCHIVED, record_tombstones
+
+
+STOCK_ITEM_COLUMNS = tuple(column.key for column in StockItem.__table__.columns)
+
+
+@lru_cache(maxsize=None)
+def stock_items_with_archive():
+    # StockItem aliased over hot rows UNION ALL archived rows. Rows loaded through it are read-only:
+    # an archived row has no stock_items row to flush changes into. Cached so every caller shares
+    # one alias and filters, ordering and aggregates built separately still compose.
+    hot = select(*[StockItem.__table__.c[name] for name in STOCK_ITEM_COLUMNS])
+    archived = select(*[StockItemArchive.__table__.c[name] for name in STOCK_ITEM_COLUMNS])
+    return aliased(StockItem, union_all(hot, archived).subquery("stock_items_all"))
+
+
+@dataclass
+class StockArchiveResult:
+    moved_rows: int = 0
+    moved_units: int = 0
+    batches: int = 0
+
+
+class StockArchiveService:
+    def __init__(self, db, *, batch_size: int | None = None):
+        self.db = db
+        self.batch_size = batch_size or settings.STOCK_ARCHIVE_BATCH_SIZE
+
+    def archive_sold(
+        self,
+        *,
+        tenant_id: str | UUID | None = None,
+        older_than_days: int | None = None,
+        now: datetime | None = None,
+    ) -> StockArchiveResult:
+        # Moves SOLD units whose last change is older than the cutoff, one locked batch per transaction.
+        # Stock counters and search tokens are left alone on purpose: counters keep counting archived
+        # units for view=history/all, and tokens stay keyed by the unchanged row id.
+        now = now or datetime.utcnow()
+        days = settings.STOCK_ARCHIVE_SOLD_AFTER_DAYS if older_than_days is None else older_than_days
+        clauses = [
+            StockItem.status == "SOLD",
+            func.coalesce(StockItem.updated_at, StockItem.created_at) < now - timedelta(days=days),
+            # preload_lines.saved_stock_item_id is a foreign key into stock_items.
+            ~exists().where(PreloadLine.saved_stock_item_id == StockItem.id),
+        ]
+        if tenant_id is not None:
+            clauses.append(StockItem.tenant_id == UUID(str(tenant_id)))
+        result = StockArchiveResult()
+        while True:
+            batch = self.db.execute(
+                select(StockItem.id, StockItem.quantity, StockItem.tenant_id, StockItem.store_id)
+                .where(*clauses)
+                .order_by(StockItem.id)
+                .limit(self.batch_size)
+                .with_for_update()
+            ).all()
+            if not batch:
+                break
+            ids = [row.id for row in batch]
+            self.db.execute(
+                insert(StockItemArchive).from_select(
+                    [*STOCK_ITEM_COLUMNS, "archived_at"],
+                    select(
+                        *[StockItem.__table__.c[name] for name in STOCK_ITEM_COLUMNS],
+                        literal(now, DateTime()),
+                    ).where(StockItem.id.in_(ids)),
+                )
+            )
+            self.db.execute(delete(StockItem).where(StockItem.id.in_(ids)).execution_options(synchronize_session=False))
+            record_tombstones(self.db, [row._mapping for row in batch], reason=TOMBSTONE_ARCHIVED)
+            for tenant_key, store_key in {(row.tenant_id, row.store_id) for row in batch}:
+                mark_changed(self.db, tenant_id=tenant_key, resource=STOCK_RESOURCE, store_id=store_key)
+            self.db.commit()
+            result.batches += 1
+            result.moved_rows += len(batch)
+            result.moved_units += sum(row.quantity or 1 for row in batch)
+        return result
+
+    def restore_sold(
+        self,
+        *,
+        tenant_id: str | UUID,
+        store_id: str | UUID,
+        location_code: str | None,
+        pool: str | None,
+        epc: str | None = None,
+        sku: str | None = None,
+        units: int = 1,
+    ) -> int:
+        # Returns and refunds lock SOLD rows in stock_items; when the hot tier cannot cover the request,
+        # the oldest matching archived rows are moved back first. Runs inside the caller's transaction.
+        def _clauses(model):
+            clauses = [
+                model.tenant_id == UUID(str(tenant_id)),
+                model.store_id == UUID(str(store_id)),
+                model.status == "SOLD",
+                model.location_code == location_code,
+                model.pool == pool,
+            ]
+            if epc is not None:
+                clauses.append(model.epc == epc)
+            else:
+                clauses.append(model.sku == sku)
+            return clauses
+
+        hot_units = int(
+            self.db.execute(select(func.coalesce(func.sum(StockItem.quantity), 0)).where(*_clauses(StockItem))).scalar_one()
+            or 0
+        )
+        if hot_units >= units:
+            return 0
+        if epc is not None and self.db.execute(
+            select(StockItem.id).where(StockItem.tenant_id == UUID(str(tenant_id)), StockItem.epc == epc)
+        ).first():
+            # The EPC was re-used by a live unit, so the archived sale cannot come back under it.
+            return 0
+        ids = list(
+            self.db.execute(
+                select(StockItemArchive.id)
+                .where(*_clauses(StockItemArchive))
+                .order_by(StockItemArchive.created_at, StockItemArchive.id)
+                .limit(units - hot_units)
+            )
+            .scalars()
+            .all()
+        )
+        if not ids:
+            return 0
+        self.db.execute(
+            insert(StockItem).from_select(
+                list(STOCK_ITEM_COLUMNS),
+                select(*[StockItemArchive.__table__.c[name] for name in STOCK_ITEM_COLUMNS]).where(
+                    StockItemArchive.id.in_(ids)
+                ),
+            )
+        )
+        self.db.execute(delete(StockItemArchive).where(StockItemArchive.id.in_(ids)))
+        mark_changed(self.db, tenant_id=tenant_id, resource=STOCK_RESOURCE, store_id=store_id)
+        return len(ids)
+
+    def archived_counts(self, tenant_id: str | UUID) -> tuple[int, int]:
+        rows, units = self.db.execute(
+            select(func.count(), func.coalesce(func.sum(StockItemArchive.quantity), 0)).where(
+                StockItemArchive.tenant_id == UUID(str(tenant_id))
+            )
+        ).one()
+        return int(rows or 0), int(units or 0)
+
+    def delete_for_store(self, store_id: str | UUID) -> None:
+        self.db.execute(delete(StockItemArchive).where(StockItemArchive.store_id == UUID(str(store_id))))
+
+    def delete_for_tenant(self, tenant_id: str | UUID) -> None:
+        self.db.execute(delete(StockItemArchive).where(StockItemArchive.tenant_id == UUID(str(tenant_id))))
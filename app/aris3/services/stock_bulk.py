@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import uuid
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator
+
+from sqlalchemy import insert
+
+from app.aris3.db.models import StockItem
+from app.aris3.services.change_versions import STOCK_RESOURCE, mark_changed
+from app.aris3.services.live_events import note_stock_transition
+from app.aris3.services.stock_counters import StockCounterKey, StockCounterService
+from app.aris3.services.stock_search import SEARCH_FIELDS, build_search_text, insert_item_tokens, uses_token_index
+
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _batched(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    iterator = iter(rows)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class StockBulkInsertService:
+    def __init__(self, db, *, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+
+    def insert_rows(self, rows: Iterable[dict]) -> int:
+        inserted = 0
+        deltas: dict[StockCounterKey, int] = defaultdict(int)
+        row_deltas: dict[StockCounterKey, int] = defaultdict(int)
+        units_by_group: dict[tuple, int] = defaultdict(int)
+        # executemany inserts bypass the flush hooks, so search text/tokens, counters, change versions, live
+        # events and the delta-sync updated_at are maintained here.
+        index_tokens = uses_token_index(self.db)
+        now = datetime.utcnow()
+        for batch in _batched(rows, self.batch_size):
+            for row in batch:
+                row.setdefault("id", uuid.uuid4())
+                row["updated_at"] = row.get("updated_at") or row.get("created_at") or now
+                row["search_text"] = build_search_text(row.get(field) for field in SEARCH_FIELDS)
+                key = StockCounterKey.from_values(row)
+                deltas[key] += row.get("quantity") or 1
+                row_deltas[key] += 1
+                units_by_group[(row.get("tenant_id"), row.get("store_id"), row.get("status"))] += row.get("quantity") or 1
+            self.db.execute(insert(StockItem), batch)
+            if index_tokens:
+                insert_item_tokens(
+                    self.db.connection(),
+                    ((row["tenant_id"], row["id"], row["search_text"]) for row in batch),
+                )
+            inserted += len(batch)
+        # One version bump and one live-event transition per (tenant, store, status), not per unit.
+        for (tenant_id, store_id, status), units in units_by_group.items():
+            mark_changed(self.db, tenant_id=tenant_id, resource=STOCK_RESOURCE, store_id=store_id)
+            note_stock_transition(self.db, tenant_id, store_id, None, status, units)
+        StockCounterService(self.db).apply(deltas, row_deltas)
+        return inserted
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, update
+
+from app.aris3.core.config import settings
+from app.aris3.core.error_catalog import AppError, ErrorCatalog
+from app.aris3.db.models import StockBulkActionRun, StockItem, StockSearchToken
+from app.aris3.services.change_versions import STOCK_RESOURCE, mark_changed
+from app.aris3.services.live_events import note_stock_transition
+from app.aris3.services.stock_changes import TOMBSTONE_DELETED, record_tombstones
+from app.aris3.services.stock_counters import COUNTER_KEY_FIELDS, StockCounterKey, StockCounterService
+from app.aris3.services.stock_search import uses_token_index
+
+
+BULK_ACTIONS = ("WRITE_OFF", "REPRICE", "MARKDOWN_BY_AGE")
+BULK_RUN_RUNNING = "RUNNING"
+BULK_RUN_COMPLETED = "COMPLETED"
+BULK_RUN_FAILED = "FAILED"
+BULK_AUDIT_SAMPLE_SIZE = 20
+_CHUNK_COLUMNS = tuple(
+    getattr(StockItem, name)
+    for name in dict.fromkeys(("id", "quantity", "sale_price", "list_price", "markdown_percent", *COUNTER_KEY_FIELDS))
+)
+_SAMPLE_FIELDS = (
+    "id",
+    "sku",
+    "epc",
+    "status",
+    "location_code",
+    "pool",
+    "store_id",
+    "sale_price",
+    "list_price",
+    "markdown_percent",
+    "quantity",
+)
+_CENT = Decimal("0.01")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StockBulkActionResult:
+    # Units, like processed: a LOT row counts for its quantity. matched_rows counts stock rows.
+    matched: int = 0
+    matched_rows: int = 0
+    processed: int = 0
+    chunks: int = 0
+    before_sample: list[dict] = field(default_factory=list)
+    after_sample: list[dict] = field(default_factory=list)
+
+
+def _sample_value(value):
+    if isinstance(value, (UUID, Decimal, datetime)):
+        return str(value)
+    return value
+
+
+def _base_price(row: dict):
+    return row["list_price"] if row["list_price"] is not None else row["sale_price"]
+
+
+def _markdown_factor(percent: Decimal) -> Decimal:
+    return (Decimal("100") - percent) / Decimal("100")
+
+
+def _sample(values: dict) -> dict:
+    return {name: _sample_value(values.get(name)) for name in _SAMPLE_FIELDS}
+
+
+class StockBulkActionService:
+    def __init__(self, db, *, chunk_size: int | None = None):
+        self.db = db
+        self.chunk_size = chunk_size or settings.STOCK_BULK_ACTION_CHUNK_SIZE
+
+    def start(
+        self,
+        *,
+        tenant_id: str,
+        user_id: str | None,
+        transaction_id: str | None,
+        action: str,
+        request_hash: str,
+        trace_id: str | None,
+    ) -> StockBulkActionRun:
+        # The run is committed before the first chunk, so a failure part way through leaves a record of what was
+        # applied. A failed run retried with the same transaction and payload resumes after its last chunk.
+        if action not in BULK_ACTIONS:
+            raise AppError(ErrorCatalog.VALIDATION_ERROR, details={"message": "unsupported action", "action": action})
+        run = self.db.execute(
+            select(StockBulkActionRun)
+            .where(
+                StockBulkActionRun.tenant_id == UUID(str(tenant_id)),
+                StockBulkActionRun.transaction_id == transaction_id,
+                StockBulkActionRun.request_hash == request_hash,
+                StockBulkActionRun.status == BULK_RUN_FAILED,
+            )
+            .order_by(StockBulkActionRun.created_at.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+        if run is None:
+            run = StockBulkActionRun(
+                tenant_id=UUID(str(tenant_id)),
+                created_by_user_id=UUID(str(user_id)) if user_id else None,
+                transaction_id=transaction_id,
+                action=action,
+                request_hash=request_hash,
+                matched=0,
+                matched_rows=0,
+                processed=0,
+                chunks=0,
+                trace_id=trace_id,
+            )
+            self.db.add(run)
+        run.status = BULK_RUN_RUNNING
+        run.failure_reason = None
+        run.updated_at = datetime.utcnow()
+        self.db.commit()
+        return run
+
+    def execute(
+        self,
+        run: StockBulkActionRun,
+        selection,
+        *,
+        price: Decimal | None = None,
+        markdown_percent: Decimal | None = None,
+        now: datetime | None = None,
+    ) -> StockBulkActionResult:
+        try:
+            return self.run(run, selection, price=price, markdown_percent=markdown_percent, now=now)
+        except Exception as exc:
+            logger.exception("stock bulk action failed", extra={"run_id": str(run.id), "tenant_id": str(run.tenant_id)})
+            self.db.rollback()
+            self.fail(run, str(exc) or exc.__class__.__name__)
+            self.db.commit()
+            raise
+
+    def run(
+        self,
+        run: StockBulkActionRun,
+        selection,
+        *,
+        price: Decimal | None = None,
+        markdown_percent: Decimal | None = None,
+        now: datetime | None = None,
+    ) -> StockBulkActionResult:
+        # Walks the selection in id order, one locked chunk per transaction, so row locks are held
+        # for at most chunk_size rows at a time. The run's cursor and counts commit with each chunk.
+        now = now or datetime.utcnow()
+        action = run.action
+        result = StockBulkActionResult(
+            matched=run.matched, matched_rows=run.matched_rows, processed=run.processed, chunks=run.chunks
+        )
+        last_id = run.last_item_id
+        while True:
+            query = selection.with_only_columns(*_CHUNK_COLUMNS).order_by(StockItem.id).limit(self.chunk_size)
+            if last_id is not None:
+                query = query.where(StockItem.id > last_id)
+            rows = [dict(row._mapping) for row in self.db.execute(query.with_for_update()).all()]
+            if not rows:
+                break
+            last_id = rows[-1]["id"]
+            ids = [row["id"] for row in rows]
+            if action == "WRITE_OFF":
+                affected = rows
+                self._write_off(rows, ids)
+            elif action == "REPRICE":
+                affected = rows
+                # A manual reprice sets a new list price, so markdown policies restart from it.
+                self._update(ids, sale_price=price, list_price=None, markdown_percent=None, updated_at=now)
+            else:
+                # Same pricing as StockMarkdownService: the markdown applies to the list price, so repeated
+                # markdowns replace each other instead of stacking.
+                base_price = func.coalesce(StockItem.list_price, StockItem.sale_price)
+                affected = [row for row in rows if _base_price(row) is not None]
+                self._update(
+                    [row["id"] for row in affected],
+                    list_price=base_price,
+                    sale_price=func.round(base_price * _markdown_factor(markdown_percent), 2),
+                    markdown_percent=markdown_percent,
+                    updated_at=now,
+                )
+            # Set-based statements bypass the flush hooks that bump list versions.
+            for row in affected:
+                mark_changed(self.db, tenant_id=row["tenant_id"], resource=STOCK_RESOURCE, store_id=row["store_id"])
+            result.chunks += 1
+            result.matched += sum(row["quantity"] or 1 for row in rows)
+            result.matched_rows += len(rows)
+            result.processed += sum(row["quantity"] or 1 for row in affected)
+            self._record_progress(run, result, last_id)
+            self.db.commit()
+            self._collect_samples(result, affected, action, price=price, markdown_percent=markdown_percent)
+        run.status = BULK_RUN_COMPLETED
+        run.completed_at = datetime.utcnow()
+        run.updated_at = run.completed_at
+        self.db.commit()
+        return result
+
+    @staticmethod
+    def _record_progress(run: StockBulkActionRun, result: StockBulkActionResult, last_id) -> None:
+        run.last_item_id = last_id
+        run.matched = result.matched
+        run.matched_rows = result.matched_rows
+        run.processed = result.processed
+        run.chunks = result.chunks
+        run.updated_at = datetime.utcnow()
+
+    def fail(self, run: StockBulkActionRun, reason: str) -> None:
+        run.status = BULK_RUN_FAILED
+        run.failure_reason = reason[:255]
+        run.updated_at = datetime.utcnow()
+
+    def _write_off(self, rows: list[dict], ids: list) -> None:
+        # Set-based DELETE bypasses the flush hooks, so counters, search tokens, tombstones and live events are kept in sync here.
+        deltas: dict[StockCounterKey, int] = defaultdict(int)
+        row_deltas: dict[StockCounterKey, int] = defaultdict(int)
+        for row in rows:
+            key = StockCounterKey.from_values(row)
+            deltas[key] -= row["quantity"] or 1
+            row_deltas[key] -= 1
+        if uses_token_index(self.db):
+            self.db.execute(delete(StockSearchToken).where(StockSearchToken.stock_item_id.in_(ids)))
+        self.db.execute(
+            delete(StockItem).where(StockItem.id.in_(ids)).execution_options(synchronize_session=False)
+        )
+        StockCounterService(self.db).apply(deltas, row_deltas)
+        record_tombstones(self.db, rows, reason=TOMBSTONE_DELETED)
+        for row in rows:
+            note_stock_transition(self.db, row["tenant_id"], row["store_id"], row["status"], None, row["quantity"])
+
+    def _update(self, ids: list, **values) -> None:
+        if not ids:
+            return
+        self.db.execute(
+            update(StockItem).where(StockItem.id.in_(ids)).values(**values).execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _collect_samples(
+        result: StockBulkActionResult,
+        rows: list[dict],
+        action: str,
+        *,
+        price: Decimal | None,
+        markdown_percent: Decimal | None,
+    ) -> None:
+        room = BULK_AUDIT_SAMPLE_SIZE - len(result.before_sample)
+        for row in rows[: max(room, 0)]:
+            result.before_sample.append(_sample(row))
+            if action == "WRITE_OFF":
+                continue
+            after = dict(row)
+            if action == "REPRICE":
+                after["sale_price"] = price
+            elif action == "MARKDOWN_BY_AGE":
+                base_price = Decimal(str(_base_price(row)))
+                after["list_price"] = base_price
+                after["sale_price"] = (base_price * _markdown_factor(markdown_percent)).quantize(_CENT)
+                after["markdown_percent"] = markdown_percent
+            result.after_sample.append(_sample(after))
@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import and_, delete, event, insert, inspect, literal, or_, select
+from sqlalchemy.orm import Session, object_session, with_expression
+from sqlalchemy.orm.base import NO_VALUE
+
+from app.aris3.core.config import settings
+from app.aris3.db.models import StockItem, StockItemTombstone
+from app.aris3.services.stock_rules import operational_mode_expression
+
+
+TOMBSTONE_DELETED = "DELETED"
+TOMBSTONE_ARCHIVED = "ARCHIVED"
+TOMBSTONE_MOVED = "MOVED"
+_CURSOR_ID_MAX = UUID(int=(1 << 128) - 1)
+
+
+@dataclass(frozen=True)
+class StockChangeCursor:
+    changed_at: datetime
+    id: UUID
+
+
+def encode_change_cursor(cursor: StockChangeCursor) -> str:
+    raw = json.dumps({"t": cursor.changed_at.isoformat(), "k": str(cursor.id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_change_cursor(token: str) -> StockChangeCursor:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        return StockChangeCursor(changed_at=datetime.fromisoformat(str(data["t"])), id=UUID(str(data["k"])))
+    except (ValueError, TypeError, KeyError, UnicodeError) as exc:
+        raise ValueError("malformed cursor") from exc
+
+
+@dataclass
+class StockChangePage:
+    rows: list[StockItem]
+    tombstones: list[StockItemTombstone]
+    next_cursor: StockChangeCursor
+    has_more: bool
+
+
+def _after(changed_at_column, id_column, cursor: StockChangeCursor):
+    return or_(changed_at_column > cursor.changed_at, and_(changed_at_column == cursor.changed_at, id_column > cursor.id))
+
+
+def _committed_value(obj, field: str):
+    original = inspect(obj).committed_state.get(field, NO_VALUE)
+    return getattr(obj, field) if original is NO_VALUE else original
+
+
+def _stamp_insert(mapper, connection, target: StockItem) -> None:
+    if target.updated_at is None:
+        target.updated_at = target.created_at or datetime.utcnow()
+
+
+def _stamp_update(mapper, connection, target: StockItem) -> None:
+    # Delta sync keys on updated_at, so every ORM update moves it even when the caller did not.
+    session = object_session(target)
+    if session is not None and not session.is_modified(target):
+        return
+    if not inspect(target).attrs.updated_at.history.has_changes():
+        target.updated_at = datetime.utcnow()
+
+
+def _track_tombstones(session, flush_context, instances) -> None:
+    now = datetime.utcnow()
+    for obj in session.deleted:
+        if isinstance(obj, StockItem):
+            session.add(
+                StockItemTombstone(
+                    tenant_id=obj.tenant_id,
+                    store_id=_committed_value(obj, "store_id"),
+                    stock_item_id=obj.id,
+                    reason=TOMBSTONE_DELETED,
+                    deleted_at=now,
+                )
+            )
+    for obj in session.dirty:
+        if not isinstance(obj, StockItem) or not session.is_modified(obj):
+            continue
+        previous_store_id = _committed_value(obj, "store_id")
+        if previous_store_id is not None and str(previous_store_id) != str(obj.store_id):
+            session.add(
+                StockItemTombstone(
+                    tenant_id=obj.tenant_id,
+                    store_id=previous_store_id,
+                    stock_item_id=obj.id,
+                    reason=TOMBSTONE_MOVED,
+                    deleted_at=now,
+                )
+            )
+
+
+event.listen(StockItem, "before_insert", _stamp_insert)
+event.listen(StockItem, "before_update", _stamp_update)
+event.listen(Session, "before_flush", _track_tombstones)
+
+
+def record_tombstones(db, rows: Iterable[dict], *, reason: str, now: datetime | None = None) -> None:
+    # For set-based deletes that bypass the flush hooks; rows need tenant_id, store_id and id.
+    now = now or datetime.utcnow()
+    values = [
+        {"tenant_id": row["tenant_id"], "store_id": row["store_id"], "stock_item_id": row["id"], "reason": reason, "deleted_at": now}
+        for row in rows
+    ]
+    if values:
+        db.execute(insert(StockItemTombstone), values)
+
+
+def record_tombstones_for(db, *clauses, reason: str, now: datetime | None = None) -> None:
+    # Server-side INSERT ... SELECT ahead of wiping every unit matching clauses.
+    now = now or datetime.utcnow()
+    db.execute(
+        insert(StockItemTombstone).from_select(
+            ["tenant_id", "store_id", "stock_item_id", "reason", "deleted_at"],
+            select(StockItem.tenant_id, StockItem.store_id, StockItem.id, literal(reason), literal(now)).where(*clauses),
+        )
+    )
+
+
+class StockChangeService:
+    def __init__(self, db):
+        self.db = db
+
+    def changes(
+        self,
+        *,
+        tenant_id: str | UUID,
+        store_id: str | UUID | None = None,
+        cursor: StockChangeCursor | None = None,
+        limit: int = 500,
+        now: datetime | None = None,
+    ) -> StockChangePage:
+        # Upserts and tombstones merged in (changed_at, id) order. Changes younger than the settle window
+        # are held back so a transaction still committing with an earlier updated_at is not skipped over.
+        now = now or datetime.utcnow()
+        horizon = now - timedelta(seconds=settings.STOCK_CHANGES_SETTLE_SECONDS)
+        tenant_uuid = UUID(str(tenant_id))
+        store_uuid = UUID(str(store_id)) if store_id else None
+
+        row_query = select(StockItem).where(StockItem.tenant_id == tenant_uuid, StockItem.updated_at <= horizon)
+        tombstone_query = select(StockItemTombstone).where(
+            StockItemTombstone.tenant_id == tenant_uuid,
+            StockItemTombstone.deleted_at <= horizon,
+        )
+        if store_uuid is not None:
+            row_query = row_query.where(StockItem.store_id == store_uuid)
+            tombstone_query = tombstone_query.where(StockItemTombstone.store_id == store_uuid)
+        else:
+            # A tenant-wide mirror still holds a moved unit; its new store_id arrives as an upsert.
+            tombstone_query = tombstone_query.where(StockItemTombstone.reason != TOMBSTONE_MOVED)
+        if cursor is not None:
+            row_query = row_query.where(_after(StockItem.updated_at, StockItem.id, cursor))
+            tombstone_query = tombstone_query.where(
+                _after(StockItemTombstone.deleted_at, StockItemTombstone.stock_item_id, cursor)
+            )
+        rows = self.db.execute(
+            row_query.options(with_expression(StockItem.operational_mode, operational_mode_expression()))
+            .order_by(StockItem.updated_at, StockItem.id)
+            .limit(limit + 1)
+        ).scalars().all()
+        tombstones = self.db.execute(
+            tombstone_query.order_by(StockItemTombstone.deleted_at, StockItemTombstone.stock_item_id).limit(limit + 1)
+        ).scalars().all()
+
+        merged = sorted(
+            [(row.updated_at, row.id, row) for row in rows]
+            + [(tombstone.deleted_at, tombstone.stock_item_id, tombstone) for tombstone in tombstones],
+            key=lambda change: (change[0], change[1]),
+        )
+        has_more = len(merged) > limit
+        page = merged[:limit]
+        if has_more:
+            next_cursor = StockChangeCursor(changed_at=page[-1][0], id=page[-1][1])
+        else:
+            # Caught up: resume from the horizon so the next poll only scans newer changes.
+            next_cursor = StockChangeCursor(changed_at=horizon, id=_CURSOR_ID_MAX)
+            if cursor is not None and cursor.changed_at > horizon:
+                next_cursor = cursor
+        return StockChangePage(
+            rows=[change[2] for change in page if isinstance(change[2], StockItem)],
+            tombstones=[change[2] for change in page if isinstance(change[2], StockItemTombstone)],
+            next_cursor=next_cursor,
+            has_more=has_more,
+        )
+
+    def cursor_expired(self, cursor: StockChangeCursor, *, now: datetime | None = None) -> bool:
+        now = now or datetime.utcnow()
+        return cursor.changed_at < now - timedelta(days=settings.STOCK_TOMBSTONE_RETENTION_DAYS)
+
+    def prune_tombstones(self, *, older_than_days: int | None = None, now: datetime | None = None) -> int:
+        now = now or datetime.utcnow()
+        days = settings.STOCK_TOMBSTONE_RETENTION_DAYS if older_than_days is None else older_than_days
+        result = self.db.execute(delete(StockItemTombstone).where(StockItemTombstone.deleted_at < now - timedelta(days=days)))
+        self.db.commit()
+        return int(result.rowcount or 0)
+
+    def delete_for_tenant(self, tenant_id: str | UUID) -> None:
+        self.db.execute(delete(StockItemTombstone).where(StockItemTombstone.tenant_id == UUID(str(tenant_id))))
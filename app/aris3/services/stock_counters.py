@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Mapping
+from uuid import UUID
+
+from sqlalchemy import case, delete, event, func, inspect, insert, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.base import NO_VALUE
+
+from app.aris3.db.models import StockCounter, StockItem
+from app.aris3.services.stock_archive import stock_items_with_archive
+from app.aris3.services.stock_movements import record_movements
+
+
+COUNTER_KEY_FIELDS = (
+    "tenant_id",
+    "store_id",
+    "sku",
+    "var1_value",
+    "var2_value",
+    "location_code",
+    "pool",
+    "status",
+    "location_is_vendible",
+    "epc",
+)
+_SESSION_DELTAS_KEY = "stock_counter_deltas"
+_SESSION_ROW_DELTAS_KEY = "stock_counter_row_deltas"
+
+
+def _as_uuid(value) -> UUID | None:
+    if value is None:
+        return None
+    if isinstance(value, UUID):
+        return value
+    return UUID(str(value))
+
+
+@dataclass(frozen=True)
+class StockCounterKey:
+    tenant_id: UUID
+    store_id: UUID | None
+    sku: str | None
+    var1_value: str | None
+    var2_value: str | None
+    location_code: str | None
+    pool: str | None
+    status: str | None
+    location_is_vendible: bool
+    has_epc: bool
+
+    @classmethod
+    def from_values(cls, values: Mapping) -> "StockCounterKey":
+        vendible = values.get("location_is_vendible")
+        return cls(
+            tenant_id=_as_uuid(values.get("tenant_id")),
+            store_id=_as_uuid(values.get("store_id")),
+            sku=values.get("sku"),
+            var1_value=values.get("var1_value"),
+            var2_value=values.get("var2_value"),
+            location_code=values.get("location_code"),
+            pool=values.get("pool"),
+            status=values.get("status"),
+            location_is_vendible=True if vendible is None else bool(vendible),
+            has_epc=bool(values["has_epc"]) if "has_epc" in values else bool((values.get("epc") or "").strip()),
+        )
+
+    @classmethod
+    def for_item(cls, item: StockItem) -> "StockCounterKey":
+        return cls.from_values({field: getattr(item, field) for field in COUNTER_KEY_FIELDS})
+
+    def digest(self) -> str:
+        raw = json.dumps(
+            [
+                str(self.store_id) if self.store_id else None,
+                self.sku,
+                self.var1_value,
+                self.var2_value,
+                self.location_code,
+                self.pool,
+                self.status,
+                self.location_is_vendible,
+                self.has_epc,
+            ],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class StockCounterDrift:
+    tenant_id: str
+    store_id: str | None
+    sku: str | None
+    location_code: str | None
+    pool: str | None
+    status: str | None
+    counter_qty: int
+    actual_qty: int
+    counter_rows: int
+    actual_rows: int
+
+
+def _dialect_insert(connection):
+    dialect_name = connection.dialect.name
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+
+        return dialect_insert
+    if dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+
+        return dialect_insert
+    return None
+
+
+def _counter_row(key: StockCounterKey, qty: int, row_count: int, now: datetime) -> dict:
+    return {
+        "id": uuid.uuid4(),
+        "tenant_id": key.tenant_id,
+        "store_id": key.store_id,
+        "counter_key": key.digest(),
+        "sku": key.sku,
+        "var1_value": key.var1_value,
+        "var2_value": key.var2_value,
+        "location_code": key.location_code,
+        "pool": key.pool,
+        "status": key.status,
+        "location_is_vendible": key.location_is_vendible,
+        "has_epc": key.has_epc,
+        "qty": qty,
+        "row_count": row_count,
+        "updated_at": now,
+    }
+
+
+def apply_counter_deltas(
+    connection, deltas: Mapping[StockCounterKey, int], row_deltas: Mapping[StockCounterKey, int]
+) -> None:
+    # deltas are units (a LOT row counts for its quantity); row_deltas are stock rows.
+    now = datetime.utcnow()
+    rows = [
+        _counter_row(key, deltas.get(key, 0), row_deltas.get(key, 0), now)
+        for key in dict.fromkeys([*deltas, *row_deltas])
+        if deltas.get(key, 0) or row_deltas.get(key, 0)
+    ]
+    if not rows:
+        return
+    dialect_insert = _dialect_insert(connection)
+    if dialect_insert is not None:
+        table = StockCounter.__table__
+        stmt = dialect_insert(table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.tenant_id, table.c.counter_key],
+            set_={
+                "qty": table.c.qty + stmt.excluded.qty,
+                "row_count": table.c.row_count + stmt.excluded.row_count,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        connection.execute(stmt)
+        return
+    for row in rows:
+        updated = connection.execute(
+            update(StockCounter)
+            .where(StockCounter.tenant_id == row["tenant_id"], StockCounter.counter_key == row["counter_key"])
+            .values(qty=StockCounter.qty + row["qty"], row_count=StockCounter.row_count + row["row_count"], updated_at=now)
+        )
+        if not updated.rowcount:
+            connection.execute(insert(StockCounter).values(**row))
+
+
+def _committed_value(state, item: StockItem, field: str):
+    original = state.committed_state.get(field, NO_VALUE)
+    return getattr(item, field) if original is NO_VALUE else original
+
+
+def _committed_key(item: StockItem) -> StockCounterKey:
+    state = inspect(item)
+    return StockCounterKey.from_values({field: _committed_value(state, item, field) for field in COUNTER_KEY_FIELDS})
+
+
+def _units(value) -> int:
+    return 1 if value is None else int(value)
+
+
+def _track_stock_item_changes(session, flush_context, instances) -> None:
+    deltas: dict[StockCounterKey, int] = defaultdict(int)
+    row_deltas: dict[StockCounterKey, int] = defaultdict(int)
+    for obj in session.dirty:
+        if not isinstance(obj, StockItem) or not session.is_modified(obj):
+            continue
+        before = _committed_key(obj)
+        after = StockCounterKey.for_item(obj)
+        before_units = _units(_committed_value(inspect(obj), obj, "quantity"))
+        after_units = _units(obj.quantity)
+        if before != after or before_units != after_units:
+            deltas[before] -= before_units
+            deltas[after] += after_units
+        if before != after:
+            row_deltas[before] -= 1
+            row_deltas[after] += 1
+    for obj in session.deleted:
+        if isinstance(obj, StockItem):
+            key = _committed_key(obj)
+            deltas[key] -= _units(_committed_value(inspect(obj), obj, "quantity"))
+            row_deltas[key] -= 1
+    session.info[_SESSION_DELTAS_KEY] = deltas
+    session.info[_SESSION_ROW_DELTAS_KEY] = row_deltas
+
+
+def _apply_stock_item_changes(session, flush_context) -> None:
+    deltas = session.info.pop(_SESSION_DELTAS_KEY, None) or defaultdict(int)
+    row_deltas = session.info.pop(_SESSION_ROW_DELTAS_KEY, None) or defaultdict(int)
+    for obj in session.new:
+        if isinstance(obj, StockItem):
+            key = StockCounterKey.for_item(obj)
+            deltas[key] += _units(obj.quantity)
+            row_deltas[key] += 1
+    if deltas or row_deltas:
+        apply_counter_deltas(session.connection(), deltas, row_deltas)
+        record_movements(session, deltas)
+
+
+def _force_active_history(target, value, oldvalue, initiator):
+    return value
+
+
+for _field in (*COUNTER_KEY_FIELDS, "quantity"):
+    event.listen(getattr(StockItem, _field), "set", _force_active_history, active_history=True, retval=True)
+event.listen(Session, "before_flush", _track_stock_item_changes)
+event.listen(Session, "after_flush", _apply_stock_item_changes)
+
+
+class StockCounterService:
+    def __init__(self, db):
+        self.db = db
+
+    def apply(self, deltas: Mapping[StockCounterKey, int], row_deltas: Mapping[StockCounterKey, int]) -> None:
+        # Set-based writes; rebuild() bypasses this so a recount is not ledgered as movement.
+        apply_counter_deltas(self.db.connection(), deltas, row_deltas)
+        record_movements(self.db, deltas)
+
+    def sku_available_qty(
+        self,
+        *,
+        tenant_id: str | UUID,
+        store_id: str | UUID,
+        sku: str,
+        location_code: str | None = None,
+        pool: str | None = None,
+    ) -> int:
+        query = select(func.coalesce(func.sum(StockCounter.qty), 0)).where(
+            StockCounter.tenant_id == _as_uuid(tenant_id),
+            StockCounter.store_id == _as_uuid(store_id),
+            StockCounter.sku == sku,
+            StockCounter.has_epc.is_(False),
+            StockCounter.status != "SOLD",
+        )
+        if location_code:
+            query = query.where(StockCounter.location_code == location_code)
+        if pool:
+            query = query.where(StockCounter.pool == pool)
+        return int(self.db.execute(query).scalar_one() or 0)
+
+    def sku_available_qty_by_store(
+        self,
+        *,
+        tenant_id: str | UUID,
+        skus: Iterable[str],
+    ) -> dict[tuple[str | None, str], int]:
+        skus = {sku for sku in skus if sku}
+        if not skus:
+            return {}
+        rows = self.db.execute(
+            select(StockCounter.store_id, StockCounter.sku, func.sum(StockCounter.qty))
+            .where(
+                StockCounter.tenant_id == _as_uuid(tenant_id),
+                StockCounter.sku.in_(skus),
+                StockCounter.has_epc.is_(False),
+                StockCounter.status != "SOLD",
+            )
+            .group_by(StockCounter.store_id, StockCounter.sku)
+        ).all()
+        return {
+            (str(store_id) if store_id else None, sku): int(qty or 0)
+            for store_id, sku, qty in rows
+        }
+
+    def grouped_totals_query(self, clauses: Iterable):
+        vendible = StockCounter.location_is_vendible.is_(True)
+        return (
+            select(
+                StockCounter.store_id,
+                func.sum(StockCounter.row_count),
+                func.coalesce(func.sum(case((vendible & (StockCounter.status == "RFID"), StockCounter.qty), else_=0)), 0),
+                func.coalesce(func.sum(case((vendible & (StockCounter.status == "PENDING"), StockCounter.qty), else_=0)), 0),
+            )
+            .where(*clauses)
+            .group_by(StockCounter.store_id)
+            .having(func.sum(StockCounter.row_count) > 0)
+        )
+
+    def _actual_counts(self, tenant_id: UUID) -> dict[StockCounterKey, tuple[int, int]]:
+        # Archived SOLD units stay counted, so the truth is the hot table plus the archive.
+        items = stock_items_with_archive()
+        fields = [field for field in COUNTER_KEY_FIELDS if field != "epc"]
+        has_epc = case((func.coalesce(func.trim(items.epc), "") != "", 1), else_=0)
+        rows = self.db.execute(
+            select(*[getattr(items, field) for field in fields], has_epc, func.sum(items.quantity), func.count())
+            .where(items.tenant_id == tenant_id)
+            .group_by(*[getattr(items, field) for field in fields], has_epc)
+        ).all()
+        counts: dict[StockCounterKey, tuple[int, int]] = defaultdict(lambda: (0, 0))
+        for row in rows:
+            values = dict(zip(fields, row[:-3]))
+            values["has_epc"] = row[-3]
+            key = StockCounterKey.from_values(values)
+            units, row_count = counts[key]
+            counts[key] = (units + int(row[-2]), row_count + int(row[-1]))
+        return dict(counts)
+
+    def _stored_counts(self, tenant_id: UUID) -> dict[StockCounterKey, tuple[int, int]]:
+        counters = self.db.execute(select(StockCounter).where(StockCounter.tenant_id == tenant_id)).scalars().all()
+        counts: dict[StockCounterKey, tuple[int, int]] = {}
+        for counter in counters:
+            key = StockCounterKey(
+                tenant_id=counter.tenant_id,
+                store_id=counter.store_id,
+                sku=counter.sku,
+                var1_value=counter.var1_value,
+                var2_value=counter.var2_value,
+                location_code=counter.location_code,
+                pool=counter.pool,
+                status=counter.status,
+                location_is_vendible=bool(counter.location_is_vendible),
+                has_epc=bool(counter.has_epc),
+            )
+            counts[key] = (int(counter.qty or 0), int(counter.row_count or 0))
+        return counts
+
+    def verify(self, tenant_id: str | UUID) -> list[StockCounterDrift]:
+        tenant_uuid = _as_uuid(tenant_id)
+        actual = self._actual_counts(tenant_uuid)
+        stored = self._stored_counts(tenant_uuid)
+        drift = []
+        for key in sorted(set(actual) | set(stored), key=lambda item: item.digest()):
+            actual_qty, actual_rows = actual.get(key, (0, 0))
+            counter_qty, counter_rows = stored.get(key, (0, 0))
+            if (actual_qty, actual_rows) == (counter_qty, counter_rows):
+                continue
+            drift.append(
+                StockCounterDrift(
+                    tenant_id=str(tenant_uuid),
+                    store_id=str(key.store_id) if key.store_id else None,
+                    sku=key.sku,
+                    location_code=key.location_code,
+                    pool=key.pool,
+                    status=key.status,
+                    counter_qty=counter_qty,
+                    actual_qty=actual_qty,
+                    counter_rows=counter_rows,
+                    actual_rows=actual_rows,
+                )
+            )
+        return drift
+
+    def rebuild(self, tenant_id: str | UUID) -> int:
+        tenant_uuid = _as_uuid(tenant_id)
+        actual = self._actual_counts(tenant_uuid)
+        self.db.execute(delete(StockCounter).where(StockCounter.tenant_id == tenant_uuid))
+        apply_counter_deltas(
+            self.db.connection(),
+            {key: units for key, (units, _rows) in actual.items()},
+            {key: row_count for key, (_units, row_count) in actual.items()},
+        )
+        return len(actual)
+
+    def delete_for_store(self, store_id: str | UUID) -> None:
+        self.db.execute(delete(StockCounter).where(StockCounter.store_id == _as_uuid(store_id)))
+
+    def delete_for_tenant(self, tenant_id: str | UUID) -> None:
+        self.db.execute(delete(StockCounter).where(StockCounter.tenant_id == _as_uuid(tenant_id)))
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator
+from uuid import UUID
+
+from app.aris3.core.config import settings
+from app.aris3.core.error_catalog import AppError, ErrorCatalog
+from app.aris3.db.models import StockImportJob
+
+
+IMPORT_JOB_RUNNING = "RUNNING"
+IMPORT_JOB_COMPLETED = "COMPLETED"
+IMPORT_JOB_COMPLETED_WITH_ERRORS = "COMPLETED_WITH_ERRORS"
+IMPORT_JOB_FAILED = "FAILED"
+RESUMABLE_IMPORT_JOB_STATUSES = {IMPORT_JOB_RUNNING, IMPORT_JOB_FAILED}
+IMPORT_SOURCE_FORMATS = ("ndjson", "csv")
+
+
+@dataclass
+class ImportRecord:
+    line: int
+    values: dict | None
+    error: str | None = None
+
+
+@dataclass
+class ImportChunkResult:
+    last_line: int
+    inserted: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+
+def _line_too_long(line: int, max_line_bytes: int) -> AppError:
+    return AppError(
+        ErrorCatalog.VALIDATION_ERROR,
+        details={"message": f"line exceeds {max_line_bytes} bytes", "line": line, "max_line_bytes": max_line_bytes},
+    )
+
+
+async def iter_body_lines(chunks: AsyncIterator[bytes], *, max_line_bytes: int) -> AsyncIterator[str]:
+    # Decode the request body incrementally; only one partial line, of at most max_line_bytes, is ever buffered.
+    buffer = b""
+    first = True
+    line = 0
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += chunk
+        *complete, buffer = buffer.split(b"\n")
+        for raw in complete:
+            line += 1
+            if len(raw) > max_line_bytes:
+                raise _line_too_long(line, max_line_bytes)
+            if first:
+                raw = raw.removeprefix(b"\xef\xbb\xbf")
+                first = False
+            yield raw.decode("utf-8", errors="replace").rstrip("\r")
+        if len(buffer) > max_line_bytes:
+            raise _line_too_long(line + 1, max_line_bytes)
+    if buffer:
+        if first:
+            buffer = buffer.removeprefix(b"\xef\xbb\xbf")
+        yield buffer.decode("utf-8", errors="replace").rstrip("\r")
+
+
+class ImportRecordDecoder:
+    def __init__(self, source_format: str):
+        self.source_format = source_format
+        self.header: list[str] | None = None
+        self.line = 0
+
+    def decode(self, text: str) -> ImportRecord | None:
+        if not text.strip():
+            return None
+        if self.source_format == "csv":
+            row = next(csv.reader([text]))
+            if self.header is None:
+                self.header = [name.strip() for name in row]
+                return None
+            self.line += 1
+            if len(row) != len(self.header):
+                return ImportRecord(line=self.line, values=None, error="column count does not match header")
+            return ImportRecord(
+                line=self.line,
+                values={name: (value if value.strip() else None) for name, value in zip(self.header, row)},
+            )
+        self.line += 1
+        try:
+            values = json.loads(text)
+        except ValueError:
+            return ImportRecord(line=self.line, values=None, error="line is not valid JSON")
+        if not isinstance(values, dict):
+            return ImportRecord(line=self.line, values=None, error="line must be a JSON object")
+        return ImportRecord(line=self.line, values=values)
+
+
+class StockImportJobService:
+    def __init__(self, db):
+        self.db = db
+
+    def create(
+        self,
+        *,
+        tenant_id: str,
+        user_id: str | None,
+        transaction_id: str,
+        source_format: str,
+        trace_id: str | None,
+    ) -> StockImportJob:
+        job = StockImportJob(
+            tenant_id=tenant_id,
+            created_by_user_id=user_id,
+            transaction_id=transaction_id,
+            source_format=source_format,
+            status=IMPORT_JOB_RUNNING,
+            processed_lines=0,
+            inserted_count=0,
+            error_count=0,
+            errors=[],
+            trace_id=trace_id,
+        )
+        self.db.add(job)
+        self.db.commit()
+        return job
+
+    def get(self, *, tenant_id: str, job_id: str) -> StockImportJob:
+        try:
+            job = self.db.get(StockImportJob, UUID(str(job_id)))
+        except ValueError:
+            job = None
+        if not job or str(job.tenant_id) != str(tenant_id):
+            raise AppError(ErrorCatalog.RESOURCE_NOT_FOUND, details={"message": "import job not found", "job_id": job_id})
+        return job
+
+    def resume(self, *, tenant_id: str, job_id: str, source_format: str) -> StockImportJob:
+        job = self.get(tenant_id=tenant_id, job_id=job_id)
+        if job.status not in RESUMABLE_IMPORT_JOB_STATUSES:
+            raise AppError(
+                ErrorCatalog.BUSINESS_CONFLICT,
+                details={"message": "import job is already finished", "job_id": job_id, "status": job.status},
+            )
+        if job.source_format != source_format:
+            raise AppError(
+                ErrorCatalog.VALIDATION_ERROR,
+                details={"message": "format does not match import job", "field": "format"},
+            )
+        job.status = IMPORT_JOB_RUNNING
+        job.failure_reason = None
+        return job
+
+    def record_chunk(self, job: StockImportJob, result: ImportChunkResult) -> None:
+        job.processed_lines = result.last_line
+        job.inserted_count = (job.inserted_count or 0) + result.inserted
+        job.error_count = (job.error_count or 0) + len(result.errors)
+        if result.errors:
+            kept = list(job.errors or [])
+            room = settings.STOCK_IMPORT_MAX_ERROR_DETAILS - len(kept)
+            if room > 0:
+                job.errors = kept + result.errors[:room]
+        job.updated_at = datetime.utcnow()
+
+    def finish(self, job: StockImportJob) -> None:
+        job.status = IMPORT_JOB_COMPLETED_WITH_ERRORS if job.error_count else IMPORT_JOB_COMPLETED
+        job.completed_at = datetime.utcnow()
+        job.updated_at = job.completed_at
+
+    def fail_after_error(self, job: StockImportJob, exc: Exception) -> None:
+        # Drops the half-written chunk and leaves the job FAILED so the caller can resume it.
+        self.db.rollback()
+        if job.status == IMPORT_JOB_FAILED:
+            return
+        details = exc.details if isinstance(exc, AppError) else None
+        if isinstance(details, dict) and details.get("message"):
+            reason = str(details["message"])
+        else:
+            reason = f"import failed: {type(exc).__name__}"
+        self.fail(job, reason)
+        self.db.commit()
+
+    def fail(self, job: StockImportJob, reason: str) -> None:
+        job.status = IMPORT_JOB_FAILED
+        job.failure_reason = reason[:255]
+        job.updated_at = datetime.utcnow()
+
+
+def error_entry(record: ImportRecord, message: str, **extra) -> dict:
+    return {"line": record.line, "message": message, **{key: value for key, value in extra.items() if value}}
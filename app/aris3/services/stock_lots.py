@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+from app.aris3.db.models import StockItem
+
+
+# A SKU lot is a stock_items row without EPC whose quantity is greater than one.
+# Columns copied when a lot is split; identity and derived columns are regenerated.
+_SPLIT_EXCLUDED_COLUMNS = {"id", "item_uid", "quantity", "search_text"}
+_SPLIT_COLUMNS = tuple(
+    column.key for column in StockItem.__table__.columns if column.key not in _SPLIT_EXCLUDED_COLUMNS
+)
+
+
+def stock_units(rows: Iterable[StockItem]) -> int:
+    return sum(row.quantity or 1 for row in rows)
+
+
+def split_stock_lot(db, row: StockItem, qty: int) -> StockItem:
+    if qty < 1 or qty >= (row.quantity or 1):
+        raise ValueError("split qty must be between 1 and the lot quantity - 1")
+    part = StockItem(**{key: getattr(row, key) for key in _SPLIT_COLUMNS}, quantity=qty)
+    row.quantity = row.quantity - qty
+    db.add(part)
+    # Persist the split right away so callers can update, snapshot or delete the part like any loaded row.
+    db.flush()
+    return part
+
+
+def take_stock_units(db, rows: Iterable[StockItem], qty: int) -> list[StockItem]:
+    # rows must already be locked and ordered oldest first. Returns rows holding exactly qty units,
+    # splitting the last lot; when short, rows come back untouched and callers compare stock_units().
+    rows = list(rows)
+    if stock_units(rows) < qty:
+        return rows
+    taken: list[StockItem] = []
+    remaining = qty
+    for row in rows:
+        if remaining <= 0:
+            break
+        units = row.quantity or 1
+        if units <= remaining:
+            taken.append(row)
+            remaining -= units
+            continue
+        taken.append(split_stock_lot(db, row, remaining))
+        remaining = 0
+    return taken
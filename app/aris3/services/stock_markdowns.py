@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID
+
+from sqlalchemy import delete, func, or_, select, update
+
+from app.aris3.core.config import settings
+from app.aris3.core.error_catalog import AppError, ErrorCatalog
+from app.aris3.db.models import StockItem, StockMarkdownPolicy, StockMarkdownRun
+from app.aris3.services.change_versions import STOCK_RESOURCE, mark_changed
+
+
+MARKDOWN_RUN_QUEUED = "QUEUED"
+MARKDOWN_RUN_RUNNING = "RUNNING"
+MARKDOWN_RUN_COMPLETED = "COMPLETED"
+MARKDOWN_RUN_FAILED = "FAILED"
+_CENT = Decimal("0.01")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class MarkdownBucket:
+    min_age_days: int
+    percent: Decimal
+
+    @property
+    def factor(self) -> Decimal:
+        return (Decimal("100") - self.percent) / Decimal("100")
+
+
+@dataclass(frozen=True)
+class MarkdownBucketWindow:
+    bucket: MarkdownBucket
+    created_before: datetime
+    created_after: datetime | None
+
+
+@dataclass
+class MarkdownBucketPreview:
+    min_age_days: int
+    percent: Decimal
+    rows: int = 0
+    units: int = 0
+    current_value: Decimal = Decimal("0.00")
+    new_value: Decimal = Decimal("0.00")
+
+
+def parse_buckets(raw: list[dict]) -> list[MarkdownBucket]:
+    return sorted(
+        (MarkdownBucket(min_age_days=int(item["min_age_days"]), percent=Decimal(str(item["percent"]))) for item in raw),
+        key=lambda bucket: bucket.min_age_days,
+    )
+
+
+def bucket_windows(buckets: list[MarkdownBucket], now: datetime) -> list[MarkdownBucketWindow]:
+    # Each bucket owns the ages between its own threshold and the next older bucket's threshold,
+    # so every unit falls into exactly one bucket.
+    windows = []
+    for index, bucket in enumerate(buckets):
+        older = buckets[index + 1] if index + 1 < len(buckets) else None
+        windows.append(
+            MarkdownBucketWindow(
+                bucket=bucket,
+                created_before=now - timedelta(days=bucket.min_age_days),
+                created_after=now - timedelta(days=older.min_age_days) if older else None,
+            )
+        )
+    return windows
+
+
+class StockMarkdownService:
+    def __init__(self, db, *, chunk_size: int | None = None):
+        self.db = db
+        self.chunk_size = chunk_size or settings.STOCK_MARKDOWN_CHUNK_SIZE
+
+    def get_policy(self, *, tenant_id: str, policy_id: str) -> StockMarkdownPolicy:
+        try:
+            policy = self.db.get(StockMarkdownPolicy, UUID(str(policy_id)))
+        except ValueError:
+            policy = None
+        if not policy or str(policy.tenant_id) != str(tenant_id):
+            raise AppError(
+                ErrorCatalog.RESOURCE_NOT_FOUND,
+                details={"message": "markdown policy not found", "policy_id": policy_id},
+            )
+        return policy
+
+    def get_run(self, *, tenant_id: str, run_id: str) -> StockMarkdownRun:
+        try:
+            run = self.db.get(StockMarkdownRun, UUID(str(run_id)))
+        except ValueError:
+            run = None
+        if not run or str(run.tenant_id) != str(tenant_id):
+            raise AppError(ErrorCatalog.RESOURCE_NOT_FOUND, details={"message": "markdown run not found", "run_id": run_id})
+        return run
+
+    def active_policies(self, tenant_id: str) -> list[StockMarkdownPolicy]:
+        return (
+            self.db.execute(
+                select(StockMarkdownPolicy)
+                .where(StockMarkdownPolicy.tenant_id == UUID(str(tenant_id)), StockMarkdownPolicy.is_active.is_(True))
+                .order_by(StockMarkdownPolicy.name)
+            )
+            .scalars()
+            .all()
+        )
+
+    def _window_clauses(self, policy: StockMarkdownPolicy, window: MarkdownBucketWindow) -> list:
+        base_price = func.coalesce(StockItem.list_price, StockItem.sale_price)
+        clauses = [
+            StockItem.tenant_id == policy.tenant_id,
+            StockItem.status != "SOLD",
+            StockItem.location_is_vendible.is_(True),
+            base_price.is_not(None),
+            StockItem.created_at <= window.created_before,
+            # Units already at this bucket's markdown are skipped, which makes re-runs no-ops.
+            or_(StockItem.markdown_percent.is_(None), StockItem.markdown_percent != window.bucket.percent),
+        ]
+        if window.created_after is not None:
+            clauses.append(StockItem.created_at > window.created_after)
+        if policy.store_id is not None:
+            clauses.append(StockItem.store_id == policy.store_id)
+        if policy.pool:
+            clauses.append(StockItem.pool == policy.pool)
+        return clauses
+
+    def preview(self, policy: StockMarkdownPolicy, *, now: datetime | None = None) -> list[MarkdownBucketPreview]:
+        now = now or datetime.utcnow()
+        base_price = func.coalesce(StockItem.list_price, StockItem.sale_price)
+        previews = []
+        for window in bucket_windows(parse_buckets(policy.buckets), now):
+            rows, units, current_value, base_value = self.db.execute(
+                select(
+                    func.count(),
+                    func.coalesce(func.sum(StockItem.quantity), 0),
+                    func.coalesce(func.sum(func.coalesce(StockItem.sale_price, 0) * StockItem.quantity), 0),
+                    func.coalesce(func.sum(base_price * StockItem.quantity), 0),
+                ).where(*self._window_clauses(policy, window))
+            ).one()
+            previews.append(
+                MarkdownBucketPreview(
+                    min_age_days=window.bucket.min_age_days,
+                    percent=window.bucket.percent,
+                    rows=int(rows or 0),
+                    units=int(units or 0),
+                    current_value=Decimal(str(current_value or 0)).quantize(_CENT),
+                    new_value=(Decimal(str(base_value or 0)) * window.bucket.factor).quantize(_CENT),
+                )
+            )
+        return previews
+
+    def apply(self, policy: StockMarkdownPolicy, run: StockMarkdownRun, *, now: datetime | None = None) -> StockMarkdownRun:
+        # Each chunk is selected, updated and committed on its own so row locks never outlive one chunk.
+        now = now or datetime.utcnow()
+        run.status = MARKDOWN_RUN_RUNNING
+        run.started_at = now
+        self.db.commit()
+        bucket_counts = []
+        for window in bucket_windows(parse_buckets(policy.buckets), now):
+            bucket_rows = 0
+            base_price = func.coalesce(StockItem.list_price, StockItem.sale_price)
+            while True:
+                chunk = self.db.execute(
+                    select(StockItem.id, StockItem.quantity, StockItem.store_id)
+                    .where(*self._window_clauses(policy, window))
+                    .order_by(StockItem.id)
+                    .limit(self.chunk_size)
+                    .with_for_update()
+                ).all()
+                if not chunk:
+                    break
+                self.db.execute(
+                    update(StockItem)
+                    .where(StockItem.id.in_([row.id for row in chunk]))
+                    .values(
+                        list_price=base_price,
+                        sale_price=func.round(base_price * window.bucket.factor, 2),
+                        markdown_percent=window.bucket.percent,
+                        updated_at=now,
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+                for store_id in {row.store_id for row in chunk}:
+                    mark_changed(self.db, tenant_id=policy.tenant_id, resource=STOCK_RESOURCE, store_id=store_id)
+                bucket_rows += len(chunk)
+                run.updated_count += len(chunk)
+                run.updated_units += sum(row.quantity or 1 for row in chunk)
+                self.db.commit()
+            bucket_counts.append(
+                {"min_age_days": window.bucket.min_age_days, "percent": str(window.bucket.percent), "rows": bucket_rows}
+            )
+        run.bucket_counts = bucket_counts
+        run.status = MARKDOWN_RUN_COMPLETED
+        run.completed_at = datetime.utcnow()
+        self.db.commit()
+        return run
+
+    def queue_run(self, policy: StockMarkdownPolicy, *, user_id: str | None, trace_id: str | None) -> StockMarkdownRun:
+        run = StockMarkdownRun(
+            tenant_id=policy.tenant_id,
+            policy_id=policy.id,
+            created_by_user_id=UUID(str(user_id)) if user_id else None,
+            status=MARKDOWN_RUN_QUEUED,
+            updated_count=0,
+            updated_units=0,
+            trace_id=trace_id,
+        )
+        self.db.add(run)
+        self.db.commit()
+        return run
+
+    def claim_queued(self, tenant_id: str) -> StockMarkdownRun | None:
+        # Runs requested through the API wait as QUEUED rows for the scheduled CLI. The compare-and-set on
+        # status means two overlapping schedulers never execute the same run.
+        while True:
+            run_id = self.db.execute(
+                select(StockMarkdownRun.id)
+                .where(StockMarkdownRun.tenant_id == UUID(str(tenant_id)), StockMarkdownRun.status == MARKDOWN_RUN_QUEUED)
+                .order_by(StockMarkdownRun.created_at)
+                .limit(1)
+            ).scalar_one_or_none()
+            if run_id is None:
+                self.db.rollback()
+                return None
+            claimed = self.db.execute(
+                update(StockMarkdownRun)
+                .where(StockMarkdownRun.id == run_id, StockMarkdownRun.status == MARKDOWN_RUN_QUEUED)
+                .values(status=MARKDOWN_RUN_RUNNING, started_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            self.db.commit()
+            if claimed.rowcount:
+                return self.db.get(StockMarkdownRun, run_id)
+
+    def execute(self, run: StockMarkdownRun) -> StockMarkdownRun:
+        policy = self.db.get(StockMarkdownPolicy, run.policy_id)
+        try:
+            return self.apply(policy, run)
+        except Exception as exc:
+            logger.exception("stock markdown run failed", extra={"run_id": str(run.id), "tenant_id": str(run.tenant_id)})
+            self.db.rollback()
+            self.fail(run, str(exc) or exc.__class__.__name__)
+            self.db.commit()
+            return run
+
+    def fail(self, run: StockMarkdownRun, reason: str) -> None:
+        run.status = MARKDOWN_RUN_FAILED
+        run.failure_reason = reason[:255]
+        run.completed_at = datetime.utcnow()
+
+    def delete_for_store(self, store_id: str | UUID) -> None:
+        policy_ids = select(StockMarkdownPolicy.id).where(StockMarkdownPolicy.store_id == UUID(str(store_id)))
+        self.db.execute(delete(StockMarkdownRun).where(StockMarkdownRun.policy_id.in_(policy_ids)))
+        self.db.execute(delete(StockMarkdownPolicy).where(StockMarkdownPolicy.store_id == UUID(str(store_id))))
+
+    def delete_for_tenant(self, tenant_id: str | UUID) -> None:
+        self.db.execute(delete(StockMarkdownRun).where(StockMarkdownRun.tenant_id == UUID(str(tenant_id))))
+        self.db.execute(delete(StockMarkdownPolicy).where(StockMarkdownPolicy.tenant_id == UUID(str(tenant_id))))
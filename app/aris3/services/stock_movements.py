@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Mapping
+from uuid import UUID
+
+from sqlalchemy import delete, event, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.aris3.core.config import settings
+from app.aris3.db.models import StockMovement, StockSnapshot, StockSnapshotLine
+
+
+MOVEMENT_ADJUSTMENT = "ADJUSTMENT"
+MOVEMENT_IMPORT = "IMPORT"
+MOVEMENT_SALE = "SALE"
+MOVEMENT_RETURN = "RETURN"
+MOVEMENT_TRANSFER = "TRANSFER"
+MOVEMENT_STOCK_ACTION = "STOCK_ACTION"
+_SESSION_CONTEXT_KEY = "stock_movement_context"
+_SESSION_PENDING_KEY = "stock_movement_pending_ids"
+
+OnHandKey = tuple[str | None, str | None]
+
+
+def _as_uuid(value) -> UUID | None:
+    if value is None:
+        return None
+    if isinstance(value, UUID):
+        return value
+    return UUID(str(value))
+
+
+@dataclass(frozen=True)
+class StockMovementContext:
+    reason: str
+    reference_type: str | None = None
+    reference_id: str | None = None
+
+
+@dataclass
+class StockOnHand:
+    at: datetime
+    snapshot_taken_at: datetime | None
+    units: dict[OnHandKey, int]
+
+
+def set_movement_context(session, reason: str, *, reference_type: str | None = None, reference_id=None) -> None:
+    # Labels the ledger rows for every later stock change made through this session.
+    session.info[_SESSION_CONTEXT_KEY] = StockMovementContext(
+        reason=reason,
+        reference_type=reference_type,
+        reference_id=str(reference_id) if reference_id is not None else None,
+    )
+
+
+def record_movements(session, deltas: Mapping) -> None:
+    # Called with the stock counter deltas of every flush and set-based write; only units entering or
+    # leaving on-hand (anything but SOLD) are ledgered, netted per store and SKU.
+    net: dict[tuple[UUID, UUID | None, str | None], int] = defaultdict(int)
+    for key, delta in deltas.items():
+        if delta and key.status != "SOLD":
+            net[(key.tenant_id, key.store_id, key.sku)] += delta
+    context = session.info.get(_SESSION_CONTEXT_KEY) or StockMovementContext(reason=MOVEMENT_ADJUSTMENT)
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "tenant_id": tenant_id,
+            "store_id": store_id,
+            "sku": sku,
+            "qty_delta": delta,
+            "reason": context.reason,
+            "reference_type": context.reference_type,
+            "reference_id": context.reference_id,
+            "occurred_at": now,
+        }
+        for (tenant_id, store_id, sku), delta in net.items()
+        if delta and tenant_id is not None
+    ]
+    if rows:
+        session.connection().execute(insert(StockMovement), rows)
+        session.info.setdefault(_SESSION_PENDING_KEY, []).extend(row["id"] for row in rows)
+
+
+def _stamp_movements_at_commit(session) -> None:
+    # occurred_at is rewritten to the commit time: a transaction that flushed before a snapshot but commits
+    # after it then lands after the snapshot's taken_at instead of being skipped by every later query.
+    session.flush()
+    pending = session.info.pop(_SESSION_PENDING_KEY, None)
+    if pending:
+        session.connection().execute(
+            update(StockMovement).where(StockMovement.id.in_(pending)).values(occurred_at=datetime.utcnow())
+        )
+
+
+def _forget_pending_movements(session, previous_transaction) -> None:
+    if previous_transaction.parent is None:
+        session.info.pop(_SESSION_PENDING_KEY, None)
+
+
+event.listen(Session, "before_commit", _stamp_movements_at_commit)
+event.listen(Session, "after_soft_rollback", _forget_pending_movements)
+
+
+class StockMovementService:
+    def __init__(self, db):
+        self.db = db
+
+    def on_hand_at(
+        self,
+        *,
+        tenant_id: str | UUID,
+        at: datetime,
+        store_id: str | UUID | None = None,
+        sku: str | None = None,
+    ) -> StockOnHand:
+        # Latest snapshot at or before `at`, plus the ledger between the two; without a snapshot the
+        # ledger is replayed from its start.
+        tenant_uuid = _as_uuid(tenant_id)
+        store_uuid = _as_uuid(store_id)
+        snapshot = self.db.execute(
+            select(StockSnapshot)
+            .where(StockSnapshot.tenant_id == tenant_uuid, StockSnapshot.taken_at <= at)
+            .order_by(StockSnapshot.taken_at.desc())
+            .limit(1)
+        ).scalar_one_or_none()
+
+        units: dict[OnHandKey, int] = defaultdict(int)
+        if snapshot is not None:
+            line_query = select(StockSnapshotLine.store_id, StockSnapshotLine.sku, StockSnapshotLine.on_hand).where(
+                StockSnapshotLine.snapshot_id == snapshot.id
+            )
+            if store_uuid is not None:
+                line_query = line_query.where(StockSnapshotLine.store_id == store_uuid)
+            if sku:
+                line_query = line_query.where(StockSnapshotLine.sku == sku)
+            for line_store_id, line_sku, on_hand in self.db.execute(line_query).all():
+                units[(str(line_store_id) if line_store_id else None, line_sku)] += int(on_hand)
+
+        movement_query = (
+            select(StockMovement.store_id, StockMovement.sku, func.sum(StockMovement.qty_delta))
+            .where(StockMovement.tenant_id == tenant_uuid, StockMovement.occurred_at <= at)
+            .group_by(StockMovement.store_id, StockMovement.sku)
+        )
+        if snapshot is not None:
+            movement_query = movement_query.where(StockMovement.occurred_at > snapshot.taken_at)
+        if store_uuid is not None:
+            movement_query = movement_query.where(StockMovement.store_id == store_uuid)
+        if sku:
+            movement_query = movement_query.where(StockMovement.sku == sku)
+        for movement_store_id, movement_sku, delta in self.db.execute(movement_query).all():
+            units[(str(movement_store_id) if movement_store_id else None, movement_sku)] += int(delta or 0)
+
+        return StockOnHand(
+            at=at,
+            snapshot_taken_at=snapshot.taken_at if snapshot is not None else None,
+            units={key: value for key, value in units.items() if value},
+        )
+
+    def take_snapshot(self, *, tenant_id: str | UUID, now: datetime | None = None) -> StockSnapshot:
+        # Snapshots are folded from the ledger itself, up to the same settle window delta sync uses. Movements are
+        # stamped at commit, so the window only has to cover the gap between that stamp and the commit itself.
+        now = now or datetime.utcnow()
+        taken_at = now - timedelta(seconds=settings.STOCK_CHANGES_SETTLE_SECONDS)
+        on_hand = self.on_hand_at(tenant_id=tenant_id, at=taken_at)
+        snapshot = StockSnapshot(tenant_id=_as_uuid(tenant_id), taken_at=taken_at)
+        self.db.add(snapshot)
+        self.db.flush()
+        lines = [
+            {
+                "id": uuid.uuid4(),
+                "snapshot_id": snapshot.id,
+                "tenant_id": snapshot.tenant_id,
+                "store_id": _as_uuid(store_id),
+                "sku": sku,
+                "on_hand": units,
+            }
+            for (store_id, sku), units in on_hand.units.items()
+        ]
+        if lines:
+            self.db.execute(insert(StockSnapshotLine), lines)
+        return snapshot
+
+    def delete_for_store(self, store_id: str | UUID) -> None:
+        store_uuid = _as_uuid(store_id)
+        self.db.execute(delete(StockMovement).where(StockMovement.store_id == store_uuid))
+        self.db.execute(delete(StockSnapshotLine).where(StockSnapshotLine.store_id == store_uuid))
+
+    def delete_for_tenant(self, tenant_id: str | UUID) -> None:
+        tenant_uuid = _as_uuid(tenant_id)
+        self.db.execute(delete(StockMovement).where(StockMovement.tenant_id == tenant_uuid))
+        self.db.execute(delete(StockSnapshotLine).where(StockSnapshotLine.tenant_id == tenant_uuid))
+        self.db.execute(delete(StockSnapshot).where(StockSnapshot.tenant_id == tenant_uuid))
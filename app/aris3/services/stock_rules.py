@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Literal
 
+from sqlalchemy import case, func
+
 from app.aris3.db.models import StockItem
 
 
@@ -23,6 +25,33 @@ def is_historical_status(status: str | None) -> bool:
     return (status or "").upper() == "SOLD"
 
 
+def operational_mode_expression(entity=StockItem):
+    # compute_operational_state as a CASE, so listings read each row's state with the row itself.
+    return case(
+        (func.upper(func.coalesce(entity.status, "")) == "SOLD", "NONE"),
+        (func.coalesce(func.trim(entity.epc), "") != "", "EPC"),
+        else_="SKU",
+    )
+
+
+def operational_state_for_mode(mode: OperationalMode) -> StockOperationalState:
+    available = mode != "NONE"
+    return StockOperationalState(
+        available_for_sale=available,
+        available_for_transfer=available,
+        sale_mode=mode,
+        transfer_mode=mode,
+        is_historical=not available,
+    )
+
+
+def row_operational_state(item: StockItem) -> StockOperationalState:
+    # Prefers the state selected through operational_mode_expression; rows loaded without it are computed here.
+    if item.operational_mode is not None:
+        return operational_state_for_mode(item.operational_mode)
+    return compute_operational_state(item)
+
+
 def compute_operational_state(item: StockItem) -> StockOperationalState:
     status = (item.status or "").upper()
     epc = (item.epc or "").strip() or None
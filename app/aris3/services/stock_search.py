@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable
+from uuid import UUID
+
+from sqlalchemy import and_, delete, event, insert, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from app.aris3.db.models import StockItem, StockItemArchive, StockSearchToken
+
+
+SEARCH_FIELDS = ("sku", "description", "var1_value", "var2_value", "epc", "location_code", "pool")
+_TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+_TOKEN_MAX_LENGTH = 100
+
+
+def build_search_text(values) -> str | None:
+    parts = [str(value).strip().lower() for value in values if value is not None and str(value).strip()]
+    return " ".join(parts) or None
+
+
+def search_text_for_item(item: StockItem) -> str | None:
+    return build_search_text(getattr(item, field) for field in SEARCH_FIELDS)
+
+
+def search_tokens(text: str | None) -> set[str]:
+    return {token[:_TOKEN_MAX_LENGTH] for token in _TOKEN_PATTERN.findall((text or "").lower())}
+
+
+def uses_token_index(db) -> bool:
+    # PostgreSQL serves q straight from the pg_trgm index on search_text;
+    # other dialects fall back to the normalized-token side table.
+    return db.get_bind().dialect.name != "postgresql"
+
+
+def query_tokens(q: str) -> list[str]:
+    return sorted(search_tokens(q))
+
+
+def token_prefix_pattern(token: str) -> str:
+    # Tokens are [0-9a-z]+, so they need no escaping inside the pattern.
+    return f"(^|[^0-9a-z]){token}"
+
+
+def search_clause(db, tenant_id: str | UUID, q: str, *, entity=StockItem):
+    # One rule on every dialect: each alphanumeric token of q must be the prefix of a token of the item,
+    # so "den jack" matches "Denim Jacket" but "enim" does not. A q without tokens is a plain substring match.
+    tokens = query_tokens(q)
+    if not tokens:
+        return entity.search_text.ilike(f"%{q.strip().lower()}%")
+    if not uses_token_index(db):
+        # search_text is stored lowercased; pg_trgm serves the regex from the same trigram index.
+        return and_(*[entity.search_text.regexp_match(token_prefix_pattern(token)) for token in tokens])
+    tenant_uuid = UUID(str(tenant_id))
+    return and_(
+        *[
+            entity.id.in_(
+                select(StockSearchToken.stock_item_id).where(
+                    StockSearchToken.tenant_id == tenant_uuid,
+                    StockSearchToken.token.like(f"{token}%"),
+                )
+            )
+            for token in tokens
+        ]
+    )
+
+
+def token_rows(*, tenant_id, stock_item_id, text: str | None) -> list[dict]:
+    return [
+        {"tenant_id": tenant_id, "stock_item_id": stock_item_id, "token": token}
+        for token in sorted(search_tokens(text))
+    ]
+
+
+def insert_item_tokens(connection, items: Iterable[tuple[UUID, UUID, str | None]]) -> None:
+    rows = []
+    for tenant_id, item_id, text in items:
+        rows.extend(token_rows(tenant_id=tenant_id, stock_item_id=item_id, text=text))
+    if rows:
+        connection.execute(insert(StockSearchToken), rows)
+
+
+def _refresh_search_text(mapper, connection, target: StockItem) -> None:
+    target.search_text = search_text_for_item(target)
+
+
+def _sync_search_tokens(session, flush_context) -> None:
+    indexed = []
+    stale_ids = []
+    for obj in session.new:
+        if isinstance(obj, StockItem):
+            indexed.append((obj.tenant_id, obj.id, obj.search_text))
+    for obj in session.dirty:
+        if isinstance(obj, StockItem) and inspect(obj).attrs.search_text.history.has_changes():
+            indexed.append((obj.tenant_id, obj.id, obj.search_text))
+            stale_ids.append(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, StockItem):
+            stale_ids.append(obj.id)
+    if not (indexed or stale_ids) or not uses_token_index(session):
+        return
+    connection = session.connection()
+    if stale_ids:
+        connection.execute(delete(StockSearchToken).where(StockSearchToken.stock_item_id.in_(stale_ids)))
+    insert_item_tokens(connection, indexed)
+
+
+event.listen(StockItem, "before_insert", _refresh_search_text)
+event.listen(StockItem, "before_update", _refresh_search_text)
+event.listen(Session, "after_flush", _sync_search_tokens)
+
+
+class StockSearchIndexService:
+    def __init__(self, db):
+        self.db = db
+
+    def delete_for_store(self, store_id: str | UUID) -> None:
+        store_uuid = UUID(str(store_id))
+        self.db.execute(
+            delete(StockSearchToken).where(
+                or_(
+                    StockSearchToken.stock_item_id.in_(select(StockItem.id).where(StockItem.store_id == store_uuid)),
+                    StockSearchToken.stock_item_id.in_(
+                        select(StockItemArchive.id).where(StockItemArchive.store_id == store_uuid)
+                    ),
+                )
+            )
+        )
+
+    def delete_for_tenant(self, tenant_id: str | UUID) -> None:
+        self.db.execute(delete(StockSearchToken).where(StockSearchToken.tenant_id == UUID(str(tenant_id))))
@@ -36,6 +36,13 @@ from app.aris3.db.models import (
     VariantFieldSettings,
 )
 from app.aris3.services.audit import AuditEventPayload, AuditService
+from app.aris3.services.change_versions import ChangeVersionService
+from app.aris3.services.stock_archive import StockArchiveService
+from app.aris3.services.stock_changes import TOMBSTONE_DELETED, StockChangeService, record_tombstones_for
+from app.aris3.services.stock_counters import StockCounterService
+from app.aris3.services.stock_markdowns import StockMarkdownService
+from app.aris3.services.stock_movements import StockMovementService
+from app.aris3.services.stock_search import StockSearchIndexService
 
 logger = logging.getLogger(__name__)
 
@@ -363,6 +370,13 @@ class TenantPurgeService:
 
     def _delete_tenant_in_order(self, *, tenant_id: str, preserve_audit_events: bool) -> dict[str, int]:
         deleted_counts: dict[str, int] = {}
+        StockCounterService(self.db).delete_for_tenant(tenant_id)
+        StockMovementService(self.db).delete_for_tenant(tenant_id)
+        StockSearchIndexService(self.db).delete_for_tenant(tenant_id)
+        StockArchiveService(self.db).delete_for_tenant(tenant_id)
+        StockMarkdownService(self.db).delete_for_tenant(tenant_id)
+        ChangeVersionService(self.db).delete_for_tenant(tenant_id)
+        StockChangeService(self.db).delete_for_tenant(tenant_id)
         for name, model in TENANT_PURGE_ORDER[:-1]:
             result = self.db.execute(delete(model).where(model.tenant_id == tenant_id))
             deleted_counts[name] = int(result.rowcount or 0)
@@ -448,7 +462,14 @@ class TenantPurgeService:
         deleted_counts["cash_sessions"] = int(self.db.execute(delete(PosCashSession).where(PosCashSession.store_id == store_id)).rowcount or 0)
         deleted_counts["exports"] = int(self.db.execute(delete(ExportRecord).where(ExportRecord.store_id == store_id)).rowcount or 0)
         deleted_counts["store_role_policies"] = int(self.db.execute(delete(StoreRolePolicy).where(StoreRolePolicy.store_id == store_id)).rowcount or 0)
+        ChangeVersionService(self.db).mark_store_content(store_id)
+        StockMarkdownService(self.db).delete_for_store(store_id)
+        StockSearchIndexService(self.db).delete_for_store(store_id)
+        record_tombstones_for(self.db, StockItem.store_id == store_id, reason=TOMBSTONE_DELETED)
         deleted_counts["stock_items"] = int(self.db.execute(delete(StockItem).where(StockItem.store_id == store_id)).rowcount or 0)
+        StockArchiveService(self.db).delete_for_store(store_id)
+        StockCounterService(self.db).delete_for_store(store_id)
+        StockMovementService(self.db).delete_for_store(store_id)
 
         user_ids = list(self.db.execute(select(User.id).where(User.store_id == store_id)).scalars().all())
         if user_ids:
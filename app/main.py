@@ -9,6 +9,7 @@ from app.aris3.middleware.tenant import TenantContextMiddleware
 from app.aris3.core.errors import setup_exception_handlers
 from app.aris3.db.schema_guard import verify_schema_alignment
 from app.aris3.openapi import harden_openapi_schema
+from app.aris3.services.stock_ai_preload import close_inventory_http_clients
 
 
 def create_app() -> FastAPI:
@@ -26,6 +27,10 @@ def create_app() -> FastAPI:
     def _verify_schema_alignment_on_startup() -> None:
         verify_schema_alignment()
 
+    @app.on_event("shutdown")
+    async def _close_ai_http_clients_on_shutdown() -> None:
+        await close_inventory_http_clients()
+
     return app
 
 
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import argparse
+import json
+
+from app.aris3.core.config import settings
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.aris3.services.stock_ai_cache import StockAiExtractionCacheService
+
+
+# Intended for a scheduler (cron or a platform job) running e.g. nightly:
+#   python -m app.ops.stock_ai_cache prune
+# Deletes cached AI extractions past AI_EXTRACTION_CACHE_TTL_DAYS or from an older prompt version.
+
+
+def run_prune(output_format: str, *, older_than_days: int | None = None, database_url: str | None = None) -> int:
+    engine = create_engine(database_url or settings.DATABASE_URL, future=True)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    with SessionLocal() as db:
+        pruned = StockAiExtractionCacheService(db).prune(older_than_days=older_than_days)
+    if output_format == "json":
+        print(json.dumps({"mode": "prune", "pruned_entries": pruned}, indent=2))
+    else:
+        print(f"Stock AI Cache Prune Report\npruned_entries={pruned}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ARIS3 AI preload extraction cache retention")
+    parser.add_argument("mode", choices=["prune"])
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=None,
+        help="Delete entries older than this many days (default AI_EXTRACTION_CACHE_TTL_DAYS)",
+    )
+    parser.add_argument("--format", choices=["json", "text"], default="text")
+    args = parser.parse_args(argv)
+    return run_prune(args.format, older_than_days=args.older_than_days)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import socket
+import time
+
+from app.aris3.core.config import settings
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.aris3.services.stock_ai_jobs import StockAiJobService
+
+
+# Runs large AI preload extractions outside the web process; start one or more per host:
+#   python -m app.ops.stock_ai_worker run
+# `drain` processes whatever is due and exits, e.g. for a scheduled job. Deployment: the `stock-ai-worker`
+# component in .do/app.yaml and the "Workers y tareas programadas" section of the README.
+
+logger = logging.getLogger(__name__)
+
+
+def run_worker(
+    mode: str,
+    output_format: str,
+    *,
+    max_jobs: int | None = None,
+    worker_id: str | None = None,
+    database_url: str | None = None,
+) -> int:
+    engine = create_engine(database_url or settings.DATABASE_URL, future=True)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    results: dict[str, int] = {}
+    processed = 0
+    errors = 0
+    backoff = 0.0
+    while max_jobs is None or processed < max_jobs:
+        # A fresh session per job, so a dropped connection or a poisoned transaction cannot wedge the loop.
+        try:
+            with SessionLocal() as db:
+                job = StockAiJobService(db).run_next(worker_id=worker_id)
+                status = job.status if job is not None else None
+        except Exception:
+            errors += 1
+            logger.exception("stock.ai_worker.loop_failed worker_id=%s errors=%s", worker_id, errors)
+            if mode == "drain":
+                break
+            backoff = min(max(backoff * 2, settings.AI_JOBS_POLL_SECONDS), settings.AI_WORKER_MAX_BACKOFF_SECONDS)
+            time.sleep(backoff)
+            continue
+        backoff = 0.0
+        if status is None:
+            if mode == "drain":
+                break
+            time.sleep(settings.AI_JOBS_POLL_SECONDS)
+            continue
+        processed += 1
+        results[status] = results.get(status, 0) + 1
+    if output_format == "json":
+        print(
+            json.dumps(
+                {"mode": mode, "worker_id": worker_id, "processed": processed, "errors": errors, "statuses": results},
+                indent=2,
+            )
+        )
+    else:
+        statuses = " ".join(f"{status.lower()}={count}" for status, count in sorted(results.items()))
+        print(f"Stock AI Worker Report\nworker_id={worker_id} processed={processed} errors={errors} {statuses}".rstrip())
+    return 1 if errors else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ARIS3 worker for queued AI preload extractions")
+    parser.add_argument("mode", choices=["run", "drain"])
+    parser.add_argument("--max-jobs", type=int, default=None, help="Exit after this many jobs")
+    parser.add_argument("--worker-id", default=None, help="Lease owner name (default: host:pid)")
+    parser.add_argument("--format", choices=["json", "text"], default="text")
+    args = parser.parse_args(argv)
+    return run_worker(args.mode, args.format, max_jobs=args.max_jobs, worker_id=args.worker_id)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import json
+
+from app.aris3.core.config import settings
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.aris3.services.stock_archive import StockArchiveService
+from app.ops.integrity_checks import resolve_tenants
+
+
+# Intended for a scheduler (cron or a platform job) running e.g. nightly:
+#   python -m app.ops.stock_archive archive --tenant all
+
+
+def _format_text(mode: str, results: dict[str, dict]) -> str:
+    lines = [f"Stock Archive {mode.title()} Report"]
+    for tenant_id, result in results.items():
+        if mode == "archive":
+            lines.append(
+                f"tenant={tenant_id} moved_rows={result['moved_rows']} moved_units={result['moved_units']} "
+                f"batches={result['batches']}"
+            )
+        else:
+            lines.append(f"tenant={tenant_id} archived_rows={result['archived_rows']} archived_units={result['archived_units']}")
+    return "\n".join(lines)
+
+
+def run_archive(
+    tenant: str,
+    mode: str,
+    output_format: str,
+    *,
+    older_than_days: int | None = None,
+    database_url: str | None = None,
+) -> int:
+    engine = create_engine(database_url or settings.DATABASE_URL, future=True)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    results: dict[str, dict] = {}
+    with SessionLocal() as db:
+        service = StockArchiveService(db)
+        for tenant_id in resolve_tenants(db, tenant):
+            if mode == "archive":
+                results[tenant_id] = vars(service.archive_sold(tenant_id=tenant_id, older_than_days=older_than_days))
+                continue
+            archived_rows, archived_units = service.archived_counts(tenant_id)
+            results[tenant_id] = {"archived_rows": archived_rows, "archived_units": archived_units}
+    if output_format == "json":
+        print(json.dumps({"mode": mode, "tenants": results}, indent=2))
+    else:
+        print(_format_text(mode, results))
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ARIS3 archive tier for SOLD stock units")
+    parser.add_argument("mode", choices=["archive", "status"])
+    parser.add_argument("--tenant", required=True, help="Tenant ID or 'all'")
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=None,
+        help="Archive SOLD units unchanged for this many days (default STOCK_ARCHIVE_SOLD_AFTER_DAYS)",
+    )
+    parser.add_argument("--format", choices=["json", "text"], default="text")
+    args = parser.parse_args(argv)
+    return run_archive(args.tenant, args.mode, args.format, older_than_days=args.older_than_days)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
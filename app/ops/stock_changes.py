@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import argparse
+import json
+
+from app.aris3.core.config import settings
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.aris3.services.stock_changes import StockChangeService
+
+
+# Intended for a scheduler (cron or a platform job) running e.g. nightly:
+#   python -m app.ops.stock_changes prune
+# Delta-sync cursors older than the retention window are refused, so clients fall back to a full reload.
+
+
+def run_prune(output_format: str, *, older_than_days: int | None = None, database_url: str | None = None) -> int:
+    engine = create_engine(database_url or settings.DATABASE_URL, future=True)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    with SessionLocal() as db:
+        pruned = StockChangeService(db).prune_tombstones(older_than_days=older_than_days)
+    if output_format == "json":
+        print(json.dumps({"mode": "prune", "pruned_tombstones": pruned}, indent=2))
+    else:
+        print(f"Stock Changes Prune Report\npruned_tombstones={pruned}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ARIS3 stock delta-sync tombstone retention")
+    parser.add_argument("mode", choices=["prune"])
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=None,
+        help="Delete tombstones older than this many days (default STOCK_TOMBSTONE_RETENTION_DAYS)",
+    )
+    parser.add_argument("--format", choices=["json", "text"], default="text")
+    args = parser.parse_args(argv)
+    return run_prune(args.format, older_than_days=args.older_than_days)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
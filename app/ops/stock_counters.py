@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import asdict
+
+from app.aris3.core.config import settings
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.aris3.services.stock_counters import StockCounterDrift, StockCounterService
+from app.ops.integrity_checks import resolve_tenants
+
+
+def _format_text(mode: str, results: dict[str, dict]) -> str:
+    lines = [f"Stock Counters {mode.title()} Report"]
+    for tenant_id, result in results.items():
+        if mode == "rebuild":
+            lines.append(f"tenant={tenant_id} counters={result['counters']}")
+            continue
+        lines.append(f"tenant={tenant_id} drift={len(result['drift'])}")
+        for drift in result["drift"]:
+            lines.append(
+                f"  store={drift['store_id'] or '-'} sku={drift['sku'] or '-'} location={drift['location_code'] or '-'} "
+                f"pool={drift['pool'] or '-'} status={drift['status'] or '-'} "
+                f"counter={drift['counter_qty']} actual={drift['actual_qty']} "
+                f"counter_rows={drift['counter_rows']} actual_rows={drift['actual_rows']}"
+            )
+    return "\n".join(lines)
+
+
+def _serialize_drift(drift: list[StockCounterDrift]) -> list[dict]:
+    return [asdict(item) for item in drift]
+
+
+def run_counters(tenant: str, mode: str, output_format: str, *, database_url: str | None = None) -> int:
+    engine = create_engine(database_url or settings.DATABASE_URL, future=True)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    results: dict[str, dict] = {}
+    with SessionLocal() as db:
+        service = StockCounterService(db)
+        for tenant_id in resolve_tenants(db, tenant):
+            if mode == "rebuild":
+                results[tenant_id] = {"counters": service.rebuild(tenant_id)}
+                db.commit()
+            else:
+                results[tenant_id] = {"drift": _serialize_drift(service.verify(tenant_id))}
+    if output_format == "json":
+        print(json.dumps({"mode": mode, "tenants": results}, indent=2, default=str))
+    else:
+        print(_format_text(mode, results))
+    if mode == "verify" and any(result["drift"] for result in results.values()):
+        return 1
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ARIS3 stock counters rebuild/verify")
+    parser.add_argument("mode", choices=["rebuild", "verify"])
+    parser.add_argument("--tenant", required=True, help="Tenant ID or 'all'")
+    parser.add_argument("--format", choices=["json", "text"], default="text")
+    args = parser.parse_args(argv)
+    return run_counters(args.tenant, args.mode, args.format)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import json
+
+from app.aris3.core.config import settings
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.aris3.db.models import StockMarkdownPolicy
+from app.aris3.services.stock_markdowns import StockMarkdownService
+from app.ops.integrity_checks import resolve_tenants
+
+
+# Intended for a scheduler (cron or a platform job) running e.g. nightly:
+#   python -m app.ops.stock_markdowns apply --tenant all
+# Runs requested through POST /aris3/stock/markdown-policies/{id}/runs are only queued; a frequent job executes them:
+#   python -m app.ops.stock_markdowns run-queued --tenant all
+
+
+def _format_text(mode: str, results: dict[str, list[dict]]) -> str:
+    lines = [f"Stock Markdowns {mode.title()} Report"]
+    for tenant_id, policies in results.items():
+        lines.append(f"tenant={tenant_id} policies={len(policies)}")
+        for policy in policies:
+            if mode != "preview":
+                lines.append(
+                    f"  policy={policy['name']} status={policy['status']} rows={policy['updated_count']} "
+                    f"units={policy['updated_units']}"
+                )
+                continue
+            for bucket in policy["buckets"]:
+                lines.append(
+                    f"  policy={policy['name']} min_age_days={bucket['min_age_days']} percent={bucket['percent']} "
+                    f"rows={bucket['rows']} units={bucket['units']}"
+                )
+    return "\n".join(lines)
+
+
+def _run_result(name: str, run) -> dict:
+    return {
+        "name": name,
+        "run_id": str(run.id),
+        "status": run.status,
+        "updated_count": run.updated_count,
+        "updated_units": run.updated_units,
+        "failure_reason": run.failure_reason,
+    }
+
+
+def run_markdowns(tenant: str, mode: str, output_format: str, *, database_url: str | None = None) -> int:
+    engine = create_engine(database_url or settings.DATABASE_URL, future=True)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    results: dict[str, list[dict]] = {}
+    failed = False
+    with SessionLocal() as db:
+        service = StockMarkdownService(db)
+        for tenant_id in resolve_tenants(db, tenant):
+            results[tenant_id] = []
+            if mode == "run-queued":
+                while (run := service.claim_queued(tenant_id)) is not None:
+                    run = service.execute(run)
+                    failed = failed or run.status != "COMPLETED"
+                    results[tenant_id].append(_run_result(db.get(StockMarkdownPolicy, run.policy_id).name, run))
+                continue
+            for policy in service.active_policies(tenant_id):
+                if mode == "preview":
+                    results[tenant_id].append(
+                        {"name": policy.name, "buckets": [vars(bucket) for bucket in service.preview(policy)]}
+                    )
+                    continue
+                run = service.execute(service.queue_run(policy, user_id=None, trace_id=None))
+                failed = failed or run.status != "COMPLETED"
+                results[tenant_id].append(_run_result(policy.name, run))
+    if output_format == "json":
+        print(json.dumps({"mode": mode, "tenants": results}, indent=2, default=str))
+    else:
+        print(_format_text(mode, results))
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ARIS3 scheduled markdown-by-age policies")
+    parser.add_argument("mode", choices=["apply", "preview", "run-queued"])
+    parser.add_argument("--tenant", required=True, help="Tenant ID or 'all'")
+    parser.add_argument("--format", choices=["json", "text"], default="text")
+    args = parser.parse_args(argv)
+    return run_markdowns(args.tenant, args.mode, args.format)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import argparse
+import json
+
+from app.aris3.core.config import settings
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.aris3.services.stock_movements import StockMovementService
+from app.ops.integrity_checks import resolve_tenants
+
+
+# Intended for a scheduler (cron or a platform job) running e.g. nightly or at each month end:
+#   python -m app.ops.stock_snapshots snapshot --tenant all
+# Point-in-time on-hand queries start from the latest snapshot, so regular snapshots keep them short.
+
+
+def _format_text(results: dict[str, dict]) -> str:
+    lines = ["Stock Snapshot Report"]
+    for tenant_id, result in results.items():
+        lines.append(f"tenant={tenant_id} snapshot_id={result['snapshot_id']} taken_at={result['taken_at']}")
+    return "\n".join(lines)
+
+
+def run_snapshot(tenant: str, output_format: str, *, database_url: str | None = None) -> int:
+    engine = create_engine(database_url or settings.DATABASE_URL, future=True)
+    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    results: dict[str, dict] = {}
+    with SessionLocal() as db:
+        service = StockMovementService(db)
+        for tenant_id in resolve_tenants(db, tenant):
+            snapshot = service.take_snapshot(tenant_id=tenant_id)
+            results[tenant_id] = {"snapshot_id": str(snapshot.id), "taken_at": snapshot.taken_at.isoformat()}
+            db.commit()
+    if output_format == "json":
+        print(json.dumps({"mode": "snapshot", "tenants": results}, indent=2))
+    else:
+        print(_format_text(results))
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="ARIS3 stock on-hand snapshots for point-in-time queries")
+    parser.add_argument("mode", choices=["snapshot"])
+    parser.add_argument("--tenant", required=True, help="Tenant ID or 'all'")
+    parser.add_argument("--format", choices=["json", "text"], default="text")
+    args = parser.parse_args(argv)
+    return run_snapshot(args.tenant, args.format)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,141 @@
+"""s13 materialized stock counters
+
+Revision ID: 0038_s13_stock_counters
+Revises: 0037_s12_reports_cost_snapshot
+Create Date: 2026-10-17
+"""
+
+from collections import defaultdict
+from datetime import datetime
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+revision = "0038_s13_stock_counters"
+down_revision = "0037_s12_reports_cost_snapshot"
+branch_labels = None
+depends_on = None
+
+
+class GUID(sa.TypeDecorator):
+    impl = sa.CHAR
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import UUID
+
+            return dialect.type_descriptor(UUID(as_uuid=True))
+        return dialect.type_descriptor(sa.CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+_KEY_COLUMNS = ("store_id", "sku", "var1_value", "var2_value", "location_code", "pool", "status", "location_is_vendible")
+
+
+def _counter_key(values: dict, has_epc: bool) -> str:
+    # Must stay in sync with StockCounterKey.digest in app/aris3/services/stock_counters.py.
+    raw = json.dumps(
+        [
+            str(values["store_id"]) if values["store_id"] else None,
+            values["sku"],
+            values["var1_value"],
+            values["var2_value"],
+            values["location_code"],
+            values["pool"],
+            values["status"],
+            bool(values["location_is_vendible"]),
+            has_epc,
+        ],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _backfill_counters(bind, counters_table) -> None:
+    stock_items = sa.table(
+        "stock_items",
+        sa.column("tenant_id", GUID()),
+        sa.column("store_id", GUID()),
+        sa.column("sku", sa.String()),
+        sa.column("var1_value", sa.String()),
+        sa.column("var2_value", sa.String()),
+        sa.column("location_code", sa.String()),
+        sa.column("pool", sa.String()),
+        sa.column("status", sa.String()),
+        sa.column("location_is_vendible", sa.Boolean()),
+        sa.column("epc", sa.String()),
+    )
+    has_epc = sa.case((sa.func.coalesce(sa.func.trim(stock_items.c.epc), "") != "", 1), else_=0)
+    group_columns = [stock_items.c.tenant_id, *[stock_items.c[name] for name in _KEY_COLUMNS], has_epc]
+    rows = bind.execute(sa.select(*group_columns, sa.func.count()).group_by(*group_columns)).all()
+    totals: dict[tuple, dict] = defaultdict(dict)
+    now = datetime.utcnow()
+    for row in rows:
+        values = dict(zip(_KEY_COLUMNS, row[1:-2]))
+        key = (row[0], _counter_key(values, bool(row[-2])))
+        entry = totals[key]
+        if not entry:
+            entry.update(
+                {
+                    "id": uuid.uuid4(),
+                    "tenant_id": row[0],
+                    "counter_key": key[1],
+                    **values,
+                    "location_is_vendible": bool(values["location_is_vendible"]),
+                    "has_epc": bool(row[-2]),
+                    "qty": 0,
+                    "updated_at": now,
+                }
+            )
+        entry["qty"] += int(row[-1])
+    if totals:
+        op.bulk_insert(counters_table, list(totals.values()))
+
+
+def upgrade() -> None:
+    counters_table = op.create_table(
+        "stock_counters",
+        sa.Column("id", GUID(), nullable=False),
+        sa.Column("tenant_id", GUID(), nullable=False),
+        sa.Column("store_id", GUID(), nullable=True),
+        sa.Column("counter_key", sa.String(length=64), nullable=False),
+        sa.Column("sku", sa.String(length=100), nullable=True),
+        sa.Column("var1_value", sa.String(length=100), nullable=True),
+        sa.Column("var2_value", sa.String(length=100), nullable=True),
+        sa.Column("location_code", sa.String(length=100), nullable=True),
+        sa.Column("pool", sa.String(length=100), nullable=True),
+        sa.Column("status", sa.String(length=50), nullable=True),
+        sa.Column("location_is_vendible", sa.Boolean(), nullable=False),
+        sa.Column("has_epc", sa.Boolean(), nullable=False),
+        sa.Column("qty", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"]),
+        sa.ForeignKeyConstraint(["store_id"], ["stores.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("tenant_id", "counter_key", name="uq_stock_counters_tenant_key"),
+    )
+    op.create_index("ix_stock_counters_tenant_store_sku", "stock_counters", ["tenant_id", "store_id", "sku"])
+    _backfill_counters(op.get_bind(), counters_table)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_counters_tenant_store_sku", table_name="stock_counters")
+    op.drop_table("stock_counters")
@@ -0,0 +1,130 @@
+"""s13 stock search index
+
+Revision ID: 0039_s13_stock_search_index
+Revises: 0038_s13_stock_counters
+Create Date: 2026-10-17
+"""
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+revision = "0039_s13_stock_search_index"
+down_revision = "0038_s13_stock_counters"
+branch_labels = None
+depends_on = None
+
+
+class GUID(sa.TypeDecorator):
+    impl = sa.CHAR
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import UUID
+
+            return dialect.type_descriptor(UUID(as_uuid=True))
+        return dialect.type_descriptor(sa.CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+_SEARCH_FIELDS = ("sku", "description", "var1_value", "var2_value", "epc", "location_code", "pool")
+_TOKEN_PATTERN = re.compile(r"[0-9a-z]+")
+_BATCH_SIZE = 1000
+
+
+def _search_text(row) -> str | None:
+    # Must stay in sync with build_search_text in app/aris3/services/stock_search.py.
+    parts = [str(value).strip().lower() for value in row if value is not None and str(value).strip()]
+    return " ".join(parts) or None
+
+
+def _backfill(bind, tokens_table, *, with_tokens: bool) -> None:
+    stock_items = sa.table(
+        "stock_items",
+        sa.column("id", GUID()),
+        sa.column("tenant_id", GUID()),
+        sa.column("search_text", sa.Text()),
+        *[sa.column(name, sa.String()) for name in _SEARCH_FIELDS],
+    )
+    last_id = None
+    while True:
+        query = sa.select(stock_items.c.id, stock_items.c.tenant_id, *[stock_items.c[name] for name in _SEARCH_FIELDS])
+        if last_id is not None:
+            query = query.where(stock_items.c.id > last_id)
+        batch = bind.execute(query.order_by(stock_items.c.id).limit(_BATCH_SIZE)).all()
+        if not batch:
+            return
+        updates = []
+        token_rows = []
+        for row in batch:
+            text = _search_text(row[2:])
+            updates.append({"item_id": row[0], "text": text})
+            if with_tokens:
+                for token in sorted(set(_TOKEN_PATTERN.findall(text or ""))):
+                    token_rows.append(
+                        {"id": uuid.uuid4(), "tenant_id": row[1], "stock_item_id": row[0], "token": token[:100]}
+                    )
+        bind.execute(
+            stock_items.update()
+            .where(stock_items.c.id == sa.bindparam("item_id"))
+            .values(search_text=sa.bindparam("text")),
+            updates,
+        )
+        if token_rows:
+            op.bulk_insert(tokens_table, token_rows)
+        last_id = batch[-1][0]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    is_postgresql = bind.dialect.name == "postgresql"
+    op.add_column("stock_items", sa.Column("search_text", sa.Text(), nullable=True))
+    tokens_table = op.create_table(
+        "stock_item_search_tokens",
+        sa.Column("id", GUID(), nullable=False),
+        sa.Column("tenant_id", GUID(), nullable=False),
+        sa.Column("stock_item_id", GUID(), nullable=False),
+        sa.Column("token", sa.String(length=100), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stock_item_search_tokens_stock_item_id", "stock_item_search_tokens", ["stock_item_id"])
+    op.create_index("ix_stock_item_search_tokens_tenant_token", "stock_item_search_tokens", ["tenant_id", "token"])
+    # PostgreSQL answers ILIKE '%term%' from a trigram index; the token table stays empty there.
+    _backfill(bind, tokens_table, with_tokens=not is_postgresql)
+    if is_postgresql:
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_stock_items_search_text_trgm",
+            "stock_items",
+            ["search_text"],
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index("ix_stock_items_search_text_trgm", table_name="stock_items")
+    op.drop_index("ix_stock_item_search_tokens_tenant_token", table_name="stock_item_search_tokens")
+    op.drop_index("ix_stock_item_search_tokens_stock_item_id", table_name="stock_item_search_tokens")
+    op.drop_table("stock_item_search_tokens")
+    with op.batch_alter_table("stock_items") as batch_op:
+        batch_op.drop_column("search_text")
@@ -0,0 +1,72 @@
+"""s13 streaming stock import jobs
+
+Revision ID: 0040_s13_stock_import_jobs
+Revises: 0039_s13_stock_search_index
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+revision = "0040_s13_stock_import_jobs"
+down_revision = "0039_s13_stock_search_index"
+branch_labels = None
+depends_on = None
+
+
+class GUID(sa.TypeDecorator):
+    impl = sa.CHAR
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import UUID
+
+            return dialect.type_descriptor(UUID(as_uuid=True))
+        return dialect.type_descriptor(sa.CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_import_jobs",
+        sa.Column("id", GUID(), nullable=False),
+        sa.Column("tenant_id", GUID(), nullable=False),
+        sa.Column("created_by_user_id", GUID(), nullable=True),
+        sa.Column("transaction_id", sa.String(length=255), nullable=True),
+        sa.Column("source_format", sa.String(length=10), nullable=False),
+        sa.Column("status", sa.String(length=30), nullable=False),
+        sa.Column("processed_lines", sa.Integer(), nullable=False),
+        sa.Column("inserted_count", sa.Integer(), nullable=False),
+        sa.Column("error_count", sa.Integer(), nullable=False),
+        sa.Column("errors", sa.JSON(), nullable=True),
+        sa.Column("failure_reason", sa.String(length=255), nullable=True),
+        sa.Column("trace_id", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stock_import_jobs_tenant_id", "stock_import_jobs", ["tenant_id"])
+    op.create_index("ix_stock_import_jobs_tenant_status", "stock_import_jobs", ["tenant_id", "status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_import_jobs_tenant_status", table_name="stock_import_jobs")
+    op.drop_index("ix_stock_import_jobs_tenant_id", table_name="stock_import_jobs")
+    op.drop_table("stock_import_jobs")
@@ -0,0 +1,40 @@
+"""s13 quantity-based SKU lots on stock items
+
+Revision ID: 0041_s13_stock_item_lots
+Revises: 0040_s13_stock_import_jobs
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0041_s13_stock_item_lots"
+down_revision = "0040_s13_stock_import_jobs"
+branch_labels = None
+depends_on = None
+
+
+def _has_column(inspector, table_name: str, column_name: str) -> bool:
+    return any(column.get("name") == column_name for column in inspector.get_columns(table_name))
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if not _has_column(inspector, "stock_items", "quantity"):
+        # Existing rows are single units; only SKU lots imported afterwards carry quantity > 1.
+        with op.batch_alter_table("stock_items") as batch_op:
+            batch_op.add_column(sa.Column("quantity", sa.Integer(), nullable=False, server_default="1"))
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if _has_column(inspector, "stock_items", "quantity"):
+        # Lots cannot be represented without the column, so downgrading is refused while any lot remains.
+        remaining = bind.execute(sa.text("SELECT COUNT(*) FROM stock_items WHERE quantity > 1")).scalar_one()
+        if remaining:
+            raise RuntimeError("stock_items still holds SKU lots with quantity > 1; split them before downgrading")
+        with op.batch_alter_table("stock_items") as batch_op:
+            batch_op.drop_column("quantity")
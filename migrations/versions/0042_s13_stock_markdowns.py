@@ -0,0 +1,108 @@
+"""s13 markdown-by-age policies and runs
+
+Revision ID: 0042_s13_stock_markdowns
+Revises: 0041_s13_stock_item_lots
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+revision = "0042_s13_stock_markdowns"
+down_revision = "0041_s13_stock_item_lots"
+branch_labels = None
+depends_on = None
+
+
+class GUID(sa.TypeDecorator):
+    impl = sa.CHAR
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import UUID
+
+            return dialect.type_descriptor(UUID(as_uuid=True))
+        return dialect.type_descriptor(sa.CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+def _has_column(inspector, table_name: str, column_name: str) -> bool:
+    return any(column.get("name") == column_name for column in inspector.get_columns(table_name))
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    with op.batch_alter_table("stock_items") as batch_op:
+        if not _has_column(inspector, "stock_items", "list_price"):
+            batch_op.add_column(sa.Column("list_price", sa.Numeric(12, 2), nullable=True))
+        if not _has_column(inspector, "stock_items", "markdown_percent"):
+            batch_op.add_column(sa.Column("markdown_percent", sa.Numeric(5, 2), nullable=True))
+
+    op.create_table(
+        "stock_markdown_policies",
+        sa.Column("id", GUID(), nullable=False),
+        sa.Column("tenant_id", GUID(), nullable=False),
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("store_id", GUID(), nullable=True),
+        sa.Column("pool", sa.String(length=100), nullable=True),
+        sa.Column("buckets", sa.JSON(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"]),
+        sa.ForeignKeyConstraint(["store_id"], ["stores.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("tenant_id", "name", name="uq_stock_markdown_policies_tenant_name"),
+    )
+    op.create_index("ix_stock_markdown_policies_tenant_id", "stock_markdown_policies", ["tenant_id"])
+
+    op.create_table(
+        "stock_markdown_runs",
+        sa.Column("id", GUID(), nullable=False),
+        sa.Column("tenant_id", GUID(), nullable=False),
+        sa.Column("policy_id", GUID(), nullable=False),
+        sa.Column("created_by_user_id", GUID(), nullable=True),
+        sa.Column("status", sa.String(length=30), nullable=False),
+        sa.Column("updated_count", sa.Integer(), nullable=False),
+        sa.Column("updated_units", sa.Integer(), nullable=False),
+        sa.Column("bucket_counts", sa.JSON(), nullable=True),
+        sa.Column("failure_reason", sa.String(length=255), nullable=True),
+        sa.Column("trace_id", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["policy_id"], ["stock_markdown_policies.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stock_markdown_runs_tenant_id", "stock_markdown_runs", ["tenant_id"])
+    op.create_index("ix_stock_markdown_runs_policy_id", "stock_markdown_runs", ["policy_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_markdown_runs_policy_id", table_name="stock_markdown_runs")
+    op.drop_index("ix_stock_markdown_runs_tenant_id", table_name="stock_markdown_runs")
+    op.drop_table("stock_markdown_runs")
+    op.drop_index("ix_stock_markdown_policies_tenant_id", table_name="stock_markdown_policies")
+    op.drop_table("stock_markdown_policies")
+    inspector = sa.inspect(op.get_bind())
+    with op.batch_alter_table("stock_items") as batch_op:
+        if _has_column(inspector, "stock_items", "markdown_percent"):
+            batch_op.drop_column("markdown_percent")
+        if _has_column(inspector, "stock_items", "list_price"):
+            batch_op.drop_column("list_price")
@@ -0,0 +1,124 @@
+"""s13 archive tier for SOLD stock units
+
+Revision ID: 0043_s13_stock_items_archive
+Revises: 0042_s13_stock_markdowns
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+revision = "0043_s13_stock_items_archive"
+down_revision = "0042_s13_stock_markdowns"
+branch_labels = None
+depends_on = None
+
+
+class GUID(sa.TypeDecorator):
+    impl = sa.CHAR
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import UUID
+
+            return dialect.type_descriptor(UUID(as_uuid=True))
+        return dialect.type_descriptor(sa.CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_items_archive",
+        sa.Column("id", GUID(), nullable=False),
+        sa.Column("item_uid", GUID(), nullable=False),
+        sa.Column("tenant_id", GUID(), nullable=False),
+        sa.Column("store_id", GUID(), nullable=True),
+        sa.Column("catalog_product_id", GUID(), nullable=True),
+        sa.Column("sku", sa.String(length=100), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("var1_value", sa.String(length=100), nullable=True),
+        sa.Column("var2_value", sa.String(length=100), nullable=True),
+        sa.Column("epc", sa.String(length=255), nullable=True),
+        sa.Column("location_code", sa.String(length=100), nullable=True),
+        sa.Column("pool", sa.String(length=100), nullable=True),
+        sa.Column("status", sa.String(length=50), nullable=True),
+        sa.Column("item_status", sa.String(length=50), nullable=False),
+        sa.Column("epc_status", sa.String(length=50), nullable=False),
+        sa.Column("observation", sa.Text(), nullable=True),
+        sa.Column("print_status", sa.String(length=50), nullable=False),
+        sa.Column("issue_state", sa.String(length=50), nullable=True),
+        sa.Column("location_is_vendible", sa.Boolean(), nullable=False),
+        sa.Column("image_asset_id", GUID(), nullable=True),
+        sa.Column("image_url", sa.String(length=500), nullable=True),
+        sa.Column("image_thumb_url", sa.String(length=500), nullable=True),
+        sa.Column("image_source", sa.String(length=100), nullable=True),
+        sa.Column("image_updated_at", sa.DateTime(), nullable=True),
+        sa.Column("cost_price", sa.Numeric(12, 2), nullable=True),
+        sa.Column("suggested_price", sa.Numeric(12, 2), nullable=True),
+        sa.Column("sale_price", sa.Numeric(12, 2), nullable=True),
+        sa.Column("list_price", sa.Numeric(12, 2), nullable=True),
+        sa.Column("markdown_percent", sa.Numeric(5, 2), nullable=True),
+        sa.Column("quantity", sa.Integer(), nullable=False),
+        sa.Column("search_text", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"]),
+        sa.ForeignKeyConstraint(["store_id"], ["stores.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stock_items_archive_tenant_id", "stock_items_archive", ["tenant_id"])
+    op.create_index(
+        "ix_stock_items_archive_tenant_store_created",
+        "stock_items_archive",
+        ["tenant_id", "store_id", "created_at"],
+    )
+    op.create_index("ix_stock_items_archive_tenant_sku", "stock_items_archive", ["tenant_id", "sku"])
+    op.create_index("ix_stock_items_archive_tenant_epc", "stock_items_archive", ["tenant_id", "epc"])
+    if op.get_bind().dialect.name == "postgresql":
+        # Same trigram index as stock_items so view=history searches stay indexed.
+        op.create_index(
+            "ix_stock_items_archive_search_text_trgm",
+            "stock_items_archive",
+            ["search_text"],
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    # Archived units would be lost with the table, so they go back to stock_items first.
+    columns = ", ".join(
+        [
+            "id", "item_uid", "tenant_id", "store_id", "catalog_product_id", "sku", "description", "var1_value",
+            "var2_value", "epc", "location_code", "pool", "status", "item_status", "epc_status", "observation",
+            "print_status", "issue_state", "location_is_vendible", "image_asset_id", "image_url", "image_thumb_url",
+            "image_source", "image_updated_at", "cost_price", "suggested_price", "sale_price", "list_price",
+            "markdown_percent", "quantity", "search_text", "created_at", "updated_at",
+        ]
+    )
+    bind.execute(sa.text(f"INSERT INTO stock_items ({columns}) SELECT {columns} FROM stock_items_archive"))
+    if bind.dialect.name == "postgresql":
+        op.drop_index("ix_stock_items_archive_search_text_trgm", table_name="stock_items_archive")
+    op.drop_index("ix_stock_items_archive_tenant_epc", table_name="stock_items_archive")
+    op.drop_index("ix_stock_items_archive_tenant_sku", table_name="stock_items_archive")
+    op.drop_index("ix_stock_items_archive_tenant_store_created", table_name="stock_items_archive")
+    op.drop_index("ix_stock_items_archive_tenant_id", table_name="stock_items_archive")
+    op.drop_table("stock_items_archive")
@@ -0,0 +1,44 @@
+"""s13 composite indexes for stock hot filters
+
+Revision ID: 0044_s13_stock_items_hot_indexes
+Revises: 0043_s13_stock_items_archive
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0044_s13_stock_items_hot_indexes"
+down_revision = "0043_s13_stock_items_archive"
+branch_labels = None
+depends_on = None
+
+
+_INDEXES = (
+    (
+        "ix_stock_items_tenant_store_sku_status",
+        ["tenant_id", "store_id", "sku", "status", "location_code", "pool", "location_is_vendible", "created_at"],
+        {"postgresql_include": ["epc", "quantity"]},
+    ),
+    ("ix_stock_items_tenant_store_created", ["tenant_id", "store_id", "created_at"], {}),
+    ("ix_stock_items_tenant_created", ["tenant_id", "created_at"], {}),
+)
+
+
+def _index_names(inspector, table_name: str) -> set[str]:
+    return {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    existing = _index_names(sa.inspect(op.get_bind()), "stock_items")
+    for name, columns, kwargs in _INDEXES:
+        if name not in existing:
+            op.create_index(name, "stock_items", columns, **kwargs)
+
+
+def downgrade() -> None:
+    existing = _index_names(sa.inspect(op.get_bind()), "stock_items")
+    for name, _columns, _kwargs in reversed(_INDEXES):
+        if name in existing:
+            op.drop_index(name, table_name="stock_items")
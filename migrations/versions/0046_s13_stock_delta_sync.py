@@ -0,0 +1,99 @@
+"""s13 stock delta sync: updated_at indexes and tombstones
+
+Revision ID: 0046_s13_stock_delta_sync
+Revises: 0045_s13_change_versions
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+revision = "0046_s13_stock_delta_sync"
+down_revision = "0045_s13_change_versions"
+branch_labels = None
+depends_on = None
+
+
+class GUID(sa.TypeDecorator):
+    impl = sa.CHAR
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import UUID
+
+            return dialect.type_descriptor(UUID(as_uuid=True))
+        return dialect.type_descriptor(sa.CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+_STOCK_ITEM_INDEXES = (
+    ("ix_stock_items_tenant_store_updated", ["tenant_id", "store_id", "updated_at", "id"]),
+    ("ix_stock_items_tenant_updated", ["tenant_id", "updated_at", "id"]),
+)
+
+
+def _index_names(inspector, table_name: str) -> set[str]:
+    return {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def upgrade() -> None:
+    # Rows never updated carry a NULL updated_at; delta sync orders on it, so seed it from created_at.
+    stock_items = sa.table(
+        "stock_items",
+        sa.column("updated_at", sa.DateTime()),
+        sa.column("created_at", sa.DateTime()),
+    )
+    op.execute(stock_items.update().where(stock_items.c.updated_at.is_(None)).values(updated_at=stock_items.c.created_at))
+
+    existing = _index_names(sa.inspect(op.get_bind()), "stock_items")
+    for name, columns in _STOCK_ITEM_INDEXES:
+        if name not in existing:
+            op.create_index(name, "stock_items", columns)
+
+    op.create_table(
+        "stock_item_tombstones",
+        sa.Column("id", GUID(), nullable=False),
+        sa.Column("tenant_id", GUID(), nullable=False),
+        sa.Column("store_id", GUID(), nullable=True),
+        sa.Column("stock_item_id", GUID(), nullable=False),
+        sa.Column("reason", sa.String(length=20), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_stock_item_tombstones_tenant_store_deleted",
+        "stock_item_tombstones",
+        ["tenant_id", "store_id", "deleted_at", "stock_item_id"],
+    )
+    op.create_index(
+        "ix_stock_item_tombstones_tenant_deleted",
+        "stock_item_tombstones",
+        ["tenant_id", "deleted_at", "stock_item_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_item_tombstones_tenant_deleted", table_name="stock_item_tombstones")
+    op.drop_index("ix_stock_item_tombstones_tenant_store_deleted", table_name="stock_item_tombstones")
+    op.drop_table("stock_item_tombstones")
+    existing = _index_names(sa.inspect(op.get_bind()), "stock_items")
+    for name, _columns in reversed(_STOCK_ITEM_INDEXES):
+        if name in existing:
+            op.drop_index(name, table_name="stock_items")
@@ -0,0 +1,158 @@
+"""s13 stock movement ledger and on-hand snapshots
+
+Revision ID: 0047_s13_stock_movements
+Revises: 0046_s13_stock_delta_sync
+Create Date: 2026-10-17
+"""
+
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+revision = "0047_s13_stock_movements"
+down_revision = "0046_s13_stock_delta_sync"
+branch_labels = None
+depends_on = None
+
+
+class GUID(sa.TypeDecorator):
+    impl = sa.CHAR
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import UUID
+
+            return dialect.type_descriptor(UUID(as_uuid=True))
+        return dialect.type_descriptor(sa.CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+def _seed_opening_snapshots() -> None:
+    # The ledger starts now: every tenant gets an opening snapshot of its current on-hand units,
+    # so point-in-time queries have a base to add movements to.
+    bind = op.get_bind()
+    tenants = sa.table("tenants", sa.column("id", GUID()))
+    stock_items = sa.table(
+        "stock_items",
+        sa.column("tenant_id", GUID()),
+        sa.column("store_id", GUID()),
+        sa.column("sku", sa.String()),
+        sa.column("status", sa.String()),
+        sa.column("quantity", sa.Integer()),
+    )
+    snapshots = sa.table(
+        "stock_snapshots",
+        sa.column("id", GUID()),
+        sa.column("tenant_id", GUID()),
+        sa.column("taken_at", sa.DateTime()),
+    )
+    snapshot_lines = sa.table(
+        "stock_snapshot_lines",
+        sa.column("id", GUID()),
+        sa.column("snapshot_id", GUID()),
+        sa.column("tenant_id", GUID()),
+        sa.column("store_id", GUID()),
+        sa.column("sku", sa.String()),
+        sa.column("on_hand", sa.Integer()),
+    )
+    now = datetime.utcnow()
+    snapshot_ids = {}
+    for (tenant_id,) in bind.execute(sa.select(tenants.c.id)).all():
+        snapshot_ids[str(tenant_id)] = uuid.uuid4()
+        bind.execute(snapshots.insert().values(id=snapshot_ids[str(tenant_id)], tenant_id=tenant_id, taken_at=now))
+    on_hand = sa.func.sum(sa.func.coalesce(stock_items.c.quantity, 1))
+    rows = bind.execute(
+        sa.select(stock_items.c.tenant_id, stock_items.c.store_id, stock_items.c.sku, on_hand)
+        .where(stock_items.c.status != "SOLD")
+        .group_by(stock_items.c.tenant_id, stock_items.c.store_id, stock_items.c.sku)
+    ).all()
+    lines = [
+        {
+            "id": uuid.uuid4(),
+            "snapshot_id": snapshot_ids[str(tenant_id)],
+            "tenant_id": tenant_id,
+            "store_id": store_id,
+            "sku": sku,
+            "on_hand": int(units or 0),
+        }
+        for tenant_id, store_id, sku, units in rows
+        if units and str(tenant_id) in snapshot_ids
+    ]
+    if lines:
+        bind.execute(snapshot_lines.insert(), lines)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_movements",
+        sa.Column("id", GUID(), nullable=False),
+        sa.Column("tenant_id", GUID(), nullable=False),
+        sa.Column("store_id", GUID(), nullable=True),
+        sa.Column("sku", sa.String(length=100), nullable=True),
+        sa.Column("qty_delta", sa.Integer(), nullable=False),
+        sa.Column("reason", sa.String(length=40), nullable=False),
+        sa.Column("reference_type", sa.String(length=40), nullable=True),
+        sa.Column("reference_id", sa.String(length=100), nullable=True),
+        sa.Column("occurred_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stock_movements_tenant_occurred", "stock_movements", ["tenant_id", "occurred_at"])
+    op.create_index(
+        "ix_stock_movements_tenant_store_sku_occurred",
+        "stock_movements",
+        ["tenant_id", "store_id", "sku", "occurred_at"],
+    )
+    op.create_table(
+        "stock_snapshots",
+        sa.Column("id", GUID(), nullable=False),
+        sa.Column("tenant_id", GUID(), nullable=False),
+        sa.Column("taken_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["tenant_id"], ["tenants.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stock_snapshots_tenant_taken", "stock_snapshots", ["tenant_id", "taken_at"])
+    op.create_table(
+        "stock_snapshot_lines",
+        sa.Column("id", GUID(), nullable=False),
+        sa.Column("snapshot_id", GUID(), nullable=False),
+        sa.Column("tenant_id", GUID(), nullable=False),
+        sa.Column("store_id", GUID(), nullable=True),
+        sa.Column("sku", sa.String(length=100), nullable=True),
+        sa.Column("on_hand", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["snapshot_id"], ["stock_snapshots.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_stock_snapshot_lines_snapshot_store_sku",
+        "stock_snapshot_lines",
+        ["snapshot_id", "store_id", "sku"],
+    )
+    _seed_opening_snapshots()
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_snapshot_lines_snapshot_store_sku", table_name="stock_snapshot_lines")
+    op.drop_table("stock_snapshot_lines")
+    op.drop_index("ix_stock_snapshots_tenant_taken", table_name="stock_snapshots")
+    op.drop_table("stock_snapshots")
+    op.drop_index("ix_stock_movements_tenant_store_sku_occurred", table_name="stock_movements")
+    op.drop_index("ix_stock_movements_tenant_occurred", table_name="stock_movements")
+    op.drop_table("stock_movements")
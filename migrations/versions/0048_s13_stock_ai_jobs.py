@@ -0,0 +1,73 @@
+"""s13 durable queue for AI preload jobs
+
+Revision ID: 0048_s13_stock_ai_jobs
+Revises: 0047_s13_stock_movements
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+revision = "0048_s13_stock_ai_jobs"
+down_revision = "0047_s13_stock_movements"
+branch_labels = None
+depends_on = None
+
+
+class GUID(sa.TypeDecorator):
+    impl = sa.CHAR
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import UUID
+
+            return dialect.type_descriptor(UUID(as_uuid=True))
+        return dialect.type_descriptor(sa.CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_ai_jobs",
+        sa.Column("id", GUID(), primary_key=True),
+        sa.Column("tenant_id", GUID(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("extraction_id", GUID(), sa.ForeignKey("stock_ai_extractions.id"), nullable=False),
+        sa.Column("kind", sa.String(length=40), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("available_at", sa.DateTime(), nullable=False),
+        sa.Column("lease_owner", sa.String(length=100), nullable=True),
+        sa.Column("lease_expires_at", sa.DateTime(), nullable=True),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_stock_ai_jobs_extraction_id", "stock_ai_jobs", ["extraction_id"])
+    op.create_index("ix_stock_ai_jobs_status_available", "stock_ai_jobs", ["status", "available_at"])
+    op.create_index("ix_stock_ai_jobs_tenant_status", "stock_ai_jobs", ["tenant_id", "status"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_ai_jobs_tenant_status", table_name="stock_ai_jobs")
+    op.drop_index("ix_stock_ai_jobs_status_available", table_name="stock_ai_jobs")
+    op.drop_index("ix_stock_ai_jobs_extraction_id", table_name="stock_ai_jobs")
+    op.drop_table("stock_ai_jobs")
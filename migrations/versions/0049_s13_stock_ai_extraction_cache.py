@@ -0,0 +1,70 @@
+"""s13 content-hash cache for AI preload extractions
+
+Revision ID: 0049_s13_stock_ai_extraction_cache
+Revises: 0048_s13_stock_ai_jobs
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+revision = "0049_s13_stock_ai_extraction_cache"
+down_revision = "0048_s13_stock_ai_jobs"
+branch_labels = None
+depends_on = None
+
+
+class GUID(sa.TypeDecorator):
+    impl = sa.CHAR
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import UUID
+
+            return dialect.type_descriptor(UUID(as_uuid=True))
+        return dialect.type_descriptor(sa.CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_ai_extraction_cache",
+        sa.Column("id", GUID(), primary_key=True),
+        sa.Column("tenant_id", GUID(), sa.ForeignKey("tenants.id"), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("prompt_version", sa.String(length=64), nullable=False),
+        sa.Column("model", sa.String(length=100), nullable=False),
+        sa.Column("result", sa.JSON(), nullable=False),
+        sa.Column("hit_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("last_hit_at", sa.DateTime(), nullable=True),
+        sa.UniqueConstraint(
+            "tenant_id", "content_hash", "prompt_version", "model", name="uq_stock_ai_extraction_cache_key"
+        ),
+    )
+    with op.batch_alter_table("stock_ai_extraction_files") as batch_op:
+        batch_op.add_column(sa.Column("file_hash", sa.String(length=128), nullable=True))
+        batch_op.create_index("ix_stock_ai_extraction_files_file_hash", ["file_hash"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("stock_ai_extraction_files") as batch_op:
+        batch_op.drop_index("ix_stock_ai_extraction_files_file_hash")
+        batch_op.drop_column("file_hash")
+    op.drop_table("stock_ai_extraction_cache")
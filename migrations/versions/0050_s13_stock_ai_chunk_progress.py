@@ -0,0 +1,27 @@
+"""s13 chunk progress on AI preload extractions
+
+Revision ID: 0050_s13_stock_ai_chunk_progress
+Revises: 0049_s13_stock_ai_extraction_cache
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0050_s13_stock_ai_chunk_progress"
+down_revision = "0049_s13_stock_ai_extraction_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("stock_ai_extractions") as batch_op:
+        batch_op.add_column(sa.Column("chunks_total", sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column("chunks_completed", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("stock_ai_extractions") as batch_op:
+        batch_op.drop_column("chunks_completed")
+        batch_op.drop_column("chunks_total")
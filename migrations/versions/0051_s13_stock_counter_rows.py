@@ -0,0 +1,119 @@
+"""s13 stock row counts on stock counters
+
+Revision ID: 0051_s13_stock_counter_rows
+Revises: 0050_s13_stock_ai_chunk_progress
+Create Date: 2026-10-17
+"""
+
+from collections import defaultdict
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+revision = "0051_s13_stock_counter_rows"
+down_revision = "0050_s13_stock_ai_chunk_progress"
+branch_labels = None
+depends_on = None
+
+
+class GUID(sa.TypeDecorator):
+    impl = sa.CHAR
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import UUID
+
+            return dialect.type_descriptor(UUID(as_uuid=True))
+        return dialect.type_descriptor(sa.CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+_KEY_COLUMNS = ("store_id", "sku", "var1_value", "var2_value", "location_code", "pool", "status", "location_is_vendible")
+
+
+def _counter_key(values: dict, has_epc: bool) -> str:
+    # Must stay in sync with StockCounterKey.digest in app/aris3/services/stock_counters.py.
+    raw = json.dumps(
+        [
+            str(values["store_id"]) if values["store_id"] else None,
+            values["sku"],
+            values["var1_value"],
+            values["var2_value"],
+            values["location_code"],
+            values["pool"],
+            values["status"],
+            bool(values["location_is_vendible"]),
+            has_epc,
+        ],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _items_table(name: str):
+    return sa.table(
+        name,
+        sa.column("tenant_id", GUID()),
+        sa.column("store_id", GUID()),
+        sa.column("sku", sa.String()),
+        sa.column("var1_value", sa.String()),
+        sa.column("var2_value", sa.String()),
+        sa.column("location_code", sa.String()),
+        sa.column("pool", sa.String()),
+        sa.column("status", sa.String()),
+        sa.column("location_is_vendible", sa.Boolean()),
+        sa.column("epc", sa.String()),
+    )
+
+
+def _backfill_row_counts(bind) -> None:
+    # Archived SOLD rows stay counted, like their units.
+    totals: dict[tuple, int] = defaultdict(int)
+    for table_name in ("stock_items", "stock_items_archive"):
+        items = _items_table(table_name)
+        has_epc = sa.case((sa.func.coalesce(sa.func.trim(items.c.epc), "") != "", 1), else_=0)
+        group_columns = [items.c.tenant_id, *[items.c[name] for name in _KEY_COLUMNS], has_epc]
+        for row in bind.execute(sa.select(*group_columns, sa.func.count()).group_by(*group_columns)).all():
+            values = dict(zip(_KEY_COLUMNS, row[1:-2]))
+            totals[(row[0], _counter_key(values, bool(row[-2])))] += int(row[-1])
+    counters = sa.table(
+        "stock_counters",
+        sa.column("tenant_id", GUID()),
+        sa.column("counter_key", sa.String()),
+        sa.column("row_count", sa.Integer()),
+    )
+    for (tenant_id, counter_key), row_count in totals.items():
+        bind.execute(
+            counters.update()
+            .where(counters.c.tenant_id == tenant_id, counters.c.counter_key == counter_key)
+            .values(row_count=row_count)
+        )
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("stock_counters") as batch_op:
+        batch_op.add_column(sa.Column("row_count", sa.Integer(), nullable=False, server_default="0"))
+    _backfill_row_counts(op.get_bind())
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("stock_counters") as batch_op:
+        batch_op.drop_column("row_count")
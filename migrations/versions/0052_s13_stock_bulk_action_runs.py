@@ -0,0 +1,73 @@
+"""s13 status records for chunked bulk stock actions
+
+Revision ID: 0052_s13_stock_bulk_action_runs
+Revises: 0051_s13_stock_counter_rows
+Create Date: 2026-10-17
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import uuid
+
+
+revision = "0052_s13_stock_bulk_action_runs"
+down_revision = "0051_s13_stock_counter_rows"
+branch_labels = None
+depends_on = None
+
+
+class GUID(sa.TypeDecorator):
+    impl = sa.CHAR
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import UUID
+
+            return dialect.type_descriptor(UUID(as_uuid=True))
+        return dialect.type_descriptor(sa.CHAR(36))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, uuid.UUID):
+            return value
+        return uuid.UUID(str(value))
+
+
+
+def upgrade() -> None:
+    op.create_table(
+        "stock_bulk_action_runs",
+        sa.Column("id", GUID(), nullable=False),
+        sa.Column("tenant_id", GUID(), nullable=False),
+        sa.Column("created_by_user_id", GUID(), nullable=True),
+        sa.Column("transaction_id", sa.String(length=255), nullable=True),
+        sa.Column("action", sa.String(length=30), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("status", sa.String(length=30), nullable=False),
+        sa.Column("last_item_id", GUID(), nullable=True),
+        sa.Column("matched", sa.Integer(), nullable=False),
+        sa.Column("matched_rows", sa.Integer(), nullable=False),
+        sa.Column("processed", sa.Integer(), nullable=False),
+        sa.Column("chunks", sa.Integer(), nullable=False),
+        sa.Column("failure_reason", sa.String(length=255), nullable=True),
+        sa.Column("trace_id", sa.String(length=255), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("completed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_stock_bulk_action_runs_tenant_txn", "stock_bulk_action_runs", ["tenant_id", "transaction_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_stock_bulk_action_runs_tenant_txn", table_name="stock_bulk_action_runs")
+    op.drop_table("stock_bulk_action_runs")
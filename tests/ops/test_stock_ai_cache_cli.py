@@ -0,0 +1,38 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from app.aris3.db.models import StockAiExtractionCache, Tenant
+from app.aris3.services.stock_ai_preload import inventory_prompt_version
+from app.ops.stock_ai_cache import run_prune
+
+
+def test_stock_ai_cache_prune_drops_expired_and_superseded_entries(db_session, capsys):
+    tenant = Tenant(id=uuid.uuid4(), name="Tenant AI cache prune")
+    db_session.add(tenant)
+    db_session.commit()
+    now = datetime.utcnow()
+    entries = {
+        "fresh": (inventory_prompt_version(), now),
+        "expired": (inventory_prompt_version(), now - timedelta(days=45)),
+        "superseded": ("old-prompt", now),
+    }
+    for content_hash, (prompt_version, created_at) in entries.items():
+        db_session.add(
+            StockAiExtractionCache(
+                tenant_id=tenant.id,
+                content_hash=content_hash,
+                prompt_version=prompt_version,
+                model="gpt-test",
+                result={"lines": []},
+                hit_count=0,
+                created_at=created_at,
+            )
+        )
+    db_session.commit()
+
+    assert run_prune("json", older_than_days=30, database_url=str(db_session.get_bind().url)) == 0
+    assert json.loads(capsys.readouterr().out)["pruned_entries"] == 2
+    db_session.expire_all()
+    remaining = db_session.query(StockAiExtractionCache).filter_by(tenant_id=tenant.id).all()
+    assert [entry.content_hash for entry in remaining] == ["fresh"]
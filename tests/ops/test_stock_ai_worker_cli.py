@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from app.aris3.core.config import settings
+from app.ops import stock_ai_worker
+from app.ops.stock_ai_worker import run_worker
+
+
+def test_stock_ai_worker_survives_loop_errors_with_backoff(db_session, monkeypatch):
+    outcomes = iter([RuntimeError("connection reset"), RuntimeError("connection reset"), None])
+    sleeps: list[float] = []
+
+    def _run_next(self, *, worker_id):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def _sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 3:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(stock_ai_worker.StockAiJobService, "run_next", _run_next)
+    monkeypatch.setattr(stock_ai_worker.time, "sleep", _sleep)
+    monkeypatch.setattr(settings, "AI_JOBS_POLL_SECONDS", 2.0)
+    monkeypatch.setattr(settings, "AI_WORKER_MAX_BACKOFF_SECONDS", 3.0)
+
+    with pytest.raises(KeyboardInterrupt):
+        run_worker("run", "json", worker_id="w-run", database_url=str(db_session.get_bind().url))
+
+    # Two failures back off (capped), then an empty poll waits the normal interval.
+    assert sleeps == [2.0, 3.0, 2.0]
+
+
+def test_stock_ai_worker_drain_stops_on_error(db_session, monkeypatch, capsys):
+    def _run_next(self, *, worker_id):
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(stock_ai_worker.StockAiJobService, "run_next", _run_next)
+
+    assert run_worker("drain", "json", worker_id="w-drain", database_url=str(db_session.get_bind().url)) == 1
+    payload = json.loads(capsys.readouterr().out)
+    assert (payload["processed"], payload["errors"]) == (0, 1)
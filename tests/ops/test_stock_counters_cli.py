@@ -0,0 +1,30 @@
+import json
+import uuid
+
+from app.aris3.db.models import StockItem, Store, Tenant
+from app.ops.stock_counters import run_counters
+
+
+def test_stock_counters_verify_then_rebuild(db_session, capsys):
+    tenant = Tenant(id=uuid.uuid4(), name="Tenant Counters CLI")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name="Store Counters CLI")
+    db_session.add_all([tenant, store])
+    db_session.commit()
+    db_session.add(
+        StockItem(id=uuid.uuid4(), tenant_id=tenant.id, store_id=store.id, sku="SKU-CLI", status="PENDING")
+    )
+    db_session.commit()
+    database_url = str(db_session.get_bind().url)
+
+    assert run_counters(str(tenant.id), "verify", "json", database_url=database_url) == 0
+    capsys.readouterr()
+
+    db_session.execute(StockItem.__table__.delete().where(StockItem.__table__.c.tenant_id == str(tenant.id)))
+    db_session.commit()
+    assert run_counters(str(tenant.id), "verify", "json", database_url=database_url) == 1
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["tenants"][str(tenant.id)]["drift"][0]["sku"] == "SKU-CLI"
+
+    assert run_counters(str(tenant.id), "rebuild", "json", database_url=database_url) == 0
+    capsys.readouterr()
+    assert run_counters(str(tenant.id), "verify", "text", database_url=database_url) == 0
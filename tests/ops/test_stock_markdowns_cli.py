@@ -0,0 +1,50 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.aris3.db.models import StockItem, StockMarkdownPolicy, Store, Tenant
+from app.ops.stock_markdowns import run_markdowns
+
+
+def test_stock_markdowns_preview_then_apply(db_session, capsys):
+    tenant = Tenant(id=uuid.uuid4(), name="Tenant Markdowns CLI")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name="Store Markdowns CLI")
+    db_session.add_all([tenant, store])
+    db_session.commit()
+    item_id = uuid.uuid4()
+    db_session.add_all(
+        [
+            StockItem(
+                id=item_id,
+                tenant_id=tenant.id,
+                store_id=store.id,
+                sku="SKU-MD-CLI",
+                status="PENDING",
+                location_is_vendible=True,
+                sale_price=Decimal("50.00"),
+                created_at=datetime.utcnow() - timedelta(days=40),
+            ),
+            StockMarkdownPolicy(
+                tenant_id=tenant.id,
+                name="Nightly",
+                buckets=[{"min_age_days": 30, "percent": "20"}],
+                is_active=True,
+            ),
+        ]
+    )
+    db_session.commit()
+    database_url = str(db_session.get_bind().url)
+
+    assert run_markdowns(str(tenant.id), "preview", "json", database_url=database_url) == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["tenants"][str(tenant.id)][0]["buckets"][0]["rows"] == 1
+
+    assert run_markdowns(str(tenant.id), "apply", "json", database_url=database_url) == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert payload["tenants"][str(tenant.id)][0]["updated_count"] == 1
+    db_session.expire_all()
+    assert db_session.get(StockItem, item_id).sale_price == Decimal("40.00")
+
+    assert run_markdowns(str(tenant.id), "apply", "text", database_url=database_url) == 0
+    assert "rows=0" in capsys.readouterr().out
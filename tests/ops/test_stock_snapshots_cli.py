@@ -0,0 +1,40 @@
+import json
+import uuid
+
+import pytest
+from sqlalchemy import select
+
+from app.aris3.db.models import StockSnapshot, Tenant
+from app.ops.stock_snapshots import main, run_snapshot
+
+
+def test_stock_snapshots_single_tenant_then_all(db_session, capsys):
+    tenant_a = Tenant(id=uuid.uuid4(), name="Tenant Snapshots CLI A")
+    tenant_b = Tenant(id=uuid.uuid4(), name="Tenant Snapshots CLI B")
+    db_session.add_all([tenant_a, tenant_b])
+    db_session.commit()
+    database_url = str(db_session.get_bind().url)
+
+    assert run_snapshot(str(tenant_a.id), "json", database_url=database_url) == 0
+    payload = json.loads(capsys.readouterr().out)
+    assert list(payload["tenants"]) == [str(tenant_a.id)]
+    db_session.expire_all()
+    snapshot_ids = db_session.execute(
+        select(StockSnapshot.id).where(StockSnapshot.tenant_id == tenant_a.id)
+    ).scalars().all()
+    assert [str(snapshot_id) for snapshot_id in snapshot_ids] == [payload["tenants"][str(tenant_a.id)]["snapshot_id"]]
+    assert db_session.execute(select(StockSnapshot).where(StockSnapshot.tenant_id == tenant_b.id)).first() is None
+
+    assert run_snapshot("all", "text", database_url=database_url) == 0
+    out = capsys.readouterr().out
+    assert f"tenant={tenant_a.id}" in out
+    assert f"tenant={tenant_b.id}" in out
+    db_session.expire_all()
+    assert db_session.execute(select(StockSnapshot).where(StockSnapshot.tenant_id == tenant_b.id)).first() is not None
+
+
+def test_stock_snapshots_cli_requires_tenant(capsys):
+    with pytest.raises(SystemExit) as exc:
+        main(["snapshot"])
+    assert exc.value.code == 2
+    assert "--tenant" in capsys.readouterr().err
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.aris3.core.forensics import compile_sql_with_literals
+
+
+def explain_plan(db, statement) -> list[str]:
+    """Return one line per plan node for ``statement`` on the session's dialect."""
+    sql = compile_sql_with_literals(db, statement)
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "sqlite":
+        return [row[-1] for row in db.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()]
+    if dialect_name == "postgresql":
+        # Tiny test tables always favour a sequential scan; disabling it makes the planner
+        # fall back to a Seq Scan only when no index can serve the predicate.
+        db.execute(text("SET LOCAL enable_seqscan = off"))
+        raw = db.execute(text(f"EXPLAIN (FORMAT JSON) {sql}")).scalar_one()
+        plan = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+        lines = []
+        pending = [plan]
+        while pending:
+            node = pending.pop()
+            lines.append(" ".join(filter(None, [node.get("Node Type"), node.get("Relation Name"), node.get("Index Name")])))
+            pending.extend(node.get("Plans", []))
+        db.rollback()
+        return lines
+    pytest.skip(f"no EXPLAIN support for dialect {dialect_name}")
+
+
+def full_scans(plan: list[str], table: str) -> list[str]:
+    """Plan lines that read every row of ``table`` instead of seeking an index."""
+    scans = []
+    for line in plan:
+        words = line.split()
+        if line.startswith("SCAN ") and len(words) > 1 and words[1] == table and "USING" not in line:
+            scans.append(line)
+        elif line.startswith("Seq Scan") and len(words) > 2 and words[2] == table:
+            scans.append(line)
+    return scans
@@ -0,0 +1,135 @@
+import uuid
+from datetime import datetime
+
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import ChangeVersion, PosSale, SkuImage, StockItem, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str, role: str = "ADMIN"):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"user-{suffix}",
+        email=f"user-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role=role,
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, store, user
+
+
+def _stock_item(tenant_id, store_id, *, sku: str) -> StockItem:
+    return StockItem(
+        id=uuid.uuid4(),
+        tenant_id=tenant_id,
+        store_id=store_id,
+        sku=sku,
+        description="Etag item",
+        var1_value="Blue",
+        var2_value="M",
+        epc=None,
+        location_code="LOC-1",
+        pool="P1",
+        status="PENDING",
+        location_is_vendible=True,
+        created_at=datetime.utcnow(),
+    )
+
+
+def test_stock_list_answers_not_modified_until_stock_changes(client, db_session):
+    run_seed(db_session)
+    tenant, store, admin = _create_tenant_user(db_session, suffix="etag-stock")
+    db_session.add(_stock_item(tenant.id, store.id, sku="SKU-ETAG-1"))
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {_login(client, admin.username, 'Pass1234!')}"}
+
+    first = client.get("/aris3/stock", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"stock-')
+
+    cached = client.get("/aris3/stock", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert cached.content == b""
+
+    other_query = client.get("/aris3/stock", params={"sku": "SKU-ETAG-1"}, headers={**headers, "If-None-Match": etag})
+    assert other_query.status_code == 200
+    assert other_query.headers["ETag"] != etag
+
+    db_session.add(_stock_item(tenant.id, store.id, sku="SKU-ETAG-2"))
+    db_session.commit()
+
+    changed = client.get("/aris3/stock", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json()["totals"]["total_rows"] == 2
+
+
+def test_stock_list_version_ignores_other_stores(client, db_session):
+    run_seed(db_session)
+    tenant, store, admin = _create_tenant_user(db_session, suffix="etag-stores")
+    other_store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name="Store etag-other")
+    db_session.add(other_store)
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {_login(client, admin.username, 'Pass1234!')}"}
+
+    etag = client.get("/aris3/stock", headers=headers).headers["ETag"]
+    db_session.add(_stock_item(tenant.id, other_store.id, sku="SKU-ETAG-OTHER"))
+    db_session.commit()
+    assert client.get("/aris3/stock", headers={**headers, "If-None-Match": etag}).status_code == 304
+
+    tenant_etag = client.get("/aris3/stock", params={"scope": "tenant"}, headers=headers).headers["ETag"]
+    db_session.add(_stock_item(tenant.id, other_store.id, sku="SKU-ETAG-OTHER-2"))
+    db_session.commit()
+    assert client.get("/aris3/stock", params={"scope": "tenant"}, headers={**headers, "If-None-Match": tenant_etag}).status_code == 200
+    # Tenant-wide versions are summed on read; no single row is bumped by every commit.
+    assert not db_session.query(ChangeVersion).filter(ChangeVersion.tenant_id == tenant.id, ChangeVersion.scope_key == "*").count()
+
+
+def test_sales_and_catalog_lists_emit_etags(client, db_session):
+    run_seed(db_session)
+    tenant, store, admin = _create_tenant_user(db_session, suffix="etag-sales")
+    headers = {"Authorization": f"Bearer {_login(client, admin.username, 'Pass1234!')}"}
+
+    sales_etag = client.get("/aris3/pos/sales", headers=headers).headers["ETag"]
+    assert client.get("/aris3/pos/sales", headers={**headers, "If-None-Match": sales_etag}).status_code == 304
+    db_session.add(PosSale(id=uuid.uuid4(), tenant_id=tenant.id, store_id=store.id, status="DRAFT"))
+    db_session.commit()
+    assert client.get("/aris3/pos/sales", headers={**headers, "If-None-Match": sales_etag}).status_code == 200
+
+    images_url = "/aris3/catalog/sku/SKU-ETAG-IMG/images"
+    images_etag = client.get(images_url, headers=headers).headers["ETag"]
+    assert client.get(images_url, headers={**headers, "If-None-Match": images_etag}).status_code == 304
+    db_session.add(
+        SkuImage(
+            id=uuid.uuid4(),
+            tenant_id=tenant.id,
+            sku="SKU-ETAG-IMG",
+            asset_id=uuid.uuid4(),
+            is_primary=True,
+            sort_order=1,
+            created_at=datetime.utcnow(),
+        )
+    )
+    db_session.commit()
+    refreshed = client.get(images_url, headers={**headers, "If-None-Match": images_etag})
+    assert refreshed.status_code == 200
+    assert len(refreshed.json()) == 1
@@ -0,0 +1,174 @@
+import asyncio
+import uuid
+
+from app.aris3.db.models import StockItem
+from app.aris3.services.live_events import (
+    SALE_CHECKOUT_EVENT,
+    STOCK_STATUS_EVENT,
+    LiveEvent,
+    LiveEventBroker,
+    live_events,
+)
+from app.aris3.routers.live_events import _event_stream
+from tests.pos_sales_helpers import (
+    create_stock_item,
+    create_tenant_user,
+    login,
+    open_cash_session,
+    sale_line,
+    sale_payload,
+    seed_defaults,
+)
+
+
+def _drain(loop, subscription) -> list[LiveEvent]:
+    received = []
+    while (live_event := loop.run_until_complete(subscription.next(timeout=0.05))) is not None:
+        received.append(live_event)
+    return received
+
+
+def test_stock_transitions_are_published_per_store_after_commit(db_session):
+    seed_defaults(db_session)
+    tenant, store, other_store, _user = create_tenant_user(db_session, suffix="live-stock")
+    loop = asyncio.new_event_loop()
+    store_feed = live_events.subscribe(tenant_id=str(tenant.id), store_id=str(store.id), loop=loop)
+    other_feed = live_events.subscribe(tenant_id=str(tenant.id), store_id=str(other_store.id), loop=loop)
+    tenant_feed = live_events.subscribe(tenant_id=str(tenant.id), loop=loop)
+    try:
+        item = StockItem(
+            id=uuid.uuid4(),
+            tenant_id=tenant.id,
+            store_id=store.id,
+            sku="SKU-LIVE-1",
+            location_code="LOC-1",
+            pool="P1",
+            status="PENDING",
+            location_is_vendible=True,
+            quantity=3,
+        )
+        db_session.add(item)
+        db_session.commit()
+        created = _drain(loop, store_feed)
+        assert [live_event.type for live_event in created] == [STOCK_STATUS_EVENT]
+        assert created[0].data == {"transitions": [{"from": None, "to": "PENDING", "units": 3}]}
+
+        item.status = "RFID"
+        db_session.flush()
+        db_session.rollback()
+        assert _drain(loop, store_feed) == []
+
+        item.status = "RFID"
+        db_session.commit()
+        assert _drain(loop, store_feed)[0].data["transitions"] == [{"from": "PENDING", "to": "RFID", "units": 3}]
+        assert len(_drain(loop, tenant_feed)) == 2
+        assert _drain(loop, other_feed) == []
+    finally:
+        for subscription in (store_feed, other_feed, tenant_feed):
+            live_events.unsubscribe(subscription)
+        loop.close()
+
+
+def test_checkout_publishes_sale_and_stock_events(client, db_session):
+    seed_defaults(db_session)
+    tenant, store, _other_store, user = create_tenant_user(db_session, suffix="live-checkout")
+    token = login(client, user.username, "Pass1234!")
+    create_stock_item(
+        db_session,
+        tenant_id=str(tenant.id),
+        sku="SKU-LIVE-2",
+        epc="EPC-LIVE-2",
+        location_code="LOC-1",
+        pool="P1",
+        status="RFID",
+    )
+    open_cash_session(db_session, tenant_id=str(tenant.id), store_id=str(store.id), cashier_user_id=str(user.id))
+    created = client.post(
+        "/aris3/pos/sales",
+        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": "live-sale-create"},
+        json=sale_payload(
+            str(store.id),
+            [sale_line(line_type="EPC", qty=1, unit_price=8.0, sku="SKU-LIVE-2", epc="EPC-LIVE-2")],
+            transaction_id="live-sale-create",
+        ),
+    )
+    assert created.status_code == 201
+    sale_id = created.json()["header"]["id"]
+
+    loop = asyncio.new_event_loop()
+    feed = live_events.subscribe(tenant_id=str(tenant.id), store_id=str(store.id), loop=loop)
+    try:
+        response = client.post(
+            f"/aris3/pos/sales/{sale_id}/actions",
+            headers={"Authorization": f"Bearer {token}", "Idempotency-Key": "live-sale-checkout"},
+            json={"transaction_id": "live-sale-checkout", "action": "CHECKOUT", "payments": [{"method": "CASH", "amount": 8.0}]},
+        )
+        assert response.status_code == 200
+        received = {live_event.type: live_event for live_event in _drain(loop, feed)}
+    finally:
+        live_events.unsubscribe(feed)
+        loop.close()
+
+    assert received[SALE_CHECKOUT_EVENT].data["sale_id"] == sale_id
+    assert received[SALE_CHECKOUT_EVENT].data["status"] == "PAID"
+    assert {"from": "RFID", "to": "SOLD", "units": 1} in received[STOCK_STATUS_EVENT].data["transitions"]
+
+
+def test_live_events_endpoint_enforces_store_scope(client, db_session):
+    seed_defaults(db_session)
+    _tenant, _store, other_store, user = create_tenant_user(db_session, suffix="live-scope", role="USER")
+    token = login(client, user.username, "Pass1234!")
+
+    response = client.get(
+        "/aris3/live/events",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"store_id": str(other_store.id)},
+    )
+    assert response.status_code == 403
+
+
+def test_event_stream_formats_server_sent_events():
+    class _Request:
+        def __init__(self):
+            self.polls = 0
+
+        async def is_disconnected(self):
+            self.polls += 1
+            return self.polls > 1
+
+    async def _collect():
+        broker_tenant_id = str(uuid.uuid4())
+        chunks = []
+        stream = _event_stream(_Request(), tenant_id=broker_tenant_id, store_id=None)
+        chunks.append(await stream.__anext__())
+        live_events.publish(
+            [LiveEvent(type=SALE_CHECKOUT_EVENT, tenant_id=broker_tenant_id, store_id=None, data={"sale_id": "s-1"})]
+        )
+        async for chunk in stream:
+            chunks.append(chunk)
+        return chunks
+
+    chunks = asyncio.run(_collect())
+    assert chunks[0].startswith("retry: ")
+    assert chunks[1].startswith(f"id: 1\nevent: {SALE_CHECKOUT_EVENT}\ndata: ")
+    assert '"sale_id":"s-1"' in chunks[1]
+    assert not live_events._subscriptions
+
+
+def test_broker_uses_pluggable_backend():
+    published = []
+
+    class _RecordingBackend:
+        def start(self, deliver):
+            self.deliver = deliver
+
+        def publish(self, live_event):
+            published.append(live_event)
+
+        def close(self):
+            return None
+
+    broker = LiveEventBroker(backend=_RecordingBackend())
+    live_event = LiveEvent(type=STOCK_STATUS_EVENT, tenant_id=str(uuid.uuid4()), store_id=None, data={})
+    broker.publish([live_event])
+    assert published == [live_event]
@@ -12,7 +12,12 @@ def test_openapi_reports_exports_contract_is_explicit():
     create_example = create_export_schema["example"]
 
     source_type_schema = schemas["ExportSourceType"]
-    assert source_type_schema["enum"] == ["reports_overview", "reports_daily", "reports_calendar"]
+    assert source_type_schema["enum"] == [
+        "reports_overview",
+        "reports_daily",
+        "reports_calendar",
+        "reports_inventory_valuation",
+    ]
 
     format_schema = schemas["ExportFormat"]
     assert "csv" in format_schema["enum"]
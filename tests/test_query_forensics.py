@@ -0,0 +1,121 @@
+import uuid
+
+from app.aris3.core.config import settings
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockItem, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+from app.aris3.routers import stock as stock_router
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str, role: str = "ADMIN"):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"admin-{suffix}",
+        email=f"admin-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role=role,
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    item = StockItem(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        sku=f"SKU-{suffix}",
+        status="PENDING",
+        location_code="LOC-1",
+        pool="P1",
+        location_is_vendible=True,
+    )
+    db_session.add_all([tenant, store, user, item])
+    db_session.commit()
+    return tenant, user
+
+
+def _capture_forensics(monkeypatch) -> tuple[list[str], list[object]]:
+    messages: list[str] = []
+    compiled: list[object] = []
+    original_compile = stock_router.compile_sql_with_literals
+
+    def _capture_log(message, *args, **kwargs):
+        messages.append(message % args)
+
+    def _capture_compile(db, statement):
+        compiled.append(statement)
+        return original_compile(db, statement)
+
+    monkeypatch.setattr(stock_router.logger, "info", _capture_log)
+    monkeypatch.setattr(stock_router, "compile_sql_with_literals", _capture_compile)
+    return messages, compiled
+
+
+def test_stock_forensics_skipped_without_header_or_sampling(client, db_session, monkeypatch):
+    run_seed(db_session)
+    _tenant, user = _create_tenant_user(db_session, suffix="forensics-off")
+    monkeypatch.setattr(settings, "FORENSICS_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(settings, "FORENSICS_TENANT_IDS", "")
+    messages, compiled = _capture_forensics(monkeypatch)
+
+    response = client.get("/aris3/stock", headers={"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"})
+
+    assert response.status_code == 200
+    assert not [message for message in messages if "stock_query_forensics" in message]
+    assert compiled == []
+
+
+def test_stock_forensics_enabled_by_tenant_and_sampling(client, db_session, monkeypatch):
+    run_seed(db_session)
+    tenant, user = _create_tenant_user(db_session, suffix="forensics-tenant")
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+    messages, compiled = _capture_forensics(monkeypatch)
+
+    monkeypatch.setattr(settings, "FORENSICS_TENANT_IDS", f"{uuid.uuid4()}, {tenant.id}")
+    assert client.get("/aris3/stock", headers=headers).status_code == 200
+    monkeypatch.setattr(settings, "FORENSICS_TENANT_IDS", "")
+    monkeypatch.setattr(settings, "FORENSICS_SAMPLE_RATE", 1.0)
+    assert client.get("/aris3/stock", headers=headers).status_code == 200
+    monkeypatch.setattr(settings, "FORENSICS_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(settings, "FORENSICS_HEADER_ENABLED", False)
+    assert client.get("/aris3/stock", headers={**headers, "X-ARIS3-Forensics": "1"}).status_code == 200
+
+    forensic_logs = [message for message in messages if "stock_query_forensics" in message]
+    assert len(forensic_logs) == 2
+    assert "forensic_reason=tenant" in forensic_logs[0]
+    assert "forensic_reason=sampled" in forensic_logs[1]
+    assert all("base_sql=SELECT" in message for message in forensic_logs)
+    assert len(compiled) == 4
+
+
+def test_stock_forensics_header_is_opt_in_and_admin_only(client, db_session, monkeypatch):
+    run_seed(db_session)
+    _tenant, admin = _create_tenant_user(db_session, suffix="forensics-header")
+    _other_tenant, manager = _create_tenant_user(db_session, suffix="forensics-manager", role="MANAGER")
+    monkeypatch.setattr(settings, "FORENSICS_SAMPLE_RATE", 0.0)
+    monkeypatch.setattr(settings, "FORENSICS_TENANT_IDS", "")
+    messages, _compiled = _capture_forensics(monkeypatch)
+
+    def _traced(user) -> bool:
+        headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}", "X-ARIS3-Forensics": "1"}
+        before = len(messages)
+        assert client.get("/aris3/stock", headers=headers).status_code == 200
+        return any("forensic_reason=header" in message for message in messages[before:])
+
+    assert settings.FORENSICS_HEADER_ENABLED is False
+    assert not _traced(admin)
+    monkeypatch.setattr(settings, "FORENSICS_HEADER_ENABLED", True)
+    assert _traced(admin)
+    assert not _traced(manager)
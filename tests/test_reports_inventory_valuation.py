@@ -0,0 +1,106 @@
+import csv
+import io
+from datetime import datetime, timedelta
+
+from tests.pos_sales_helpers import create_stock_item, create_tenant_user, login, seed_defaults
+
+
+def _stock(db_session, tenant, store, *, sku: str, status: str, age_days: int, quantity: int = 1, cost=None, price=None):
+    item = create_stock_item(
+        db_session,
+        tenant_id=str(tenant.id),
+        store_id=str(store.id),
+        sku=sku,
+        epc=None,
+        location_code="LOC-1",
+        pool="P1",
+        status=status,
+        cost_price=cost,
+        sale_price=price,
+    )
+    item.quantity = quantity
+    item.created_at = datetime.utcnow() - timedelta(days=age_days)
+    db_session.commit()
+    return item
+
+
+def _seed_valuation_stock(db_session, tenant, store, other_store):
+    _stock(db_session, tenant, store, sku="SKU-VAL-1", status="PENDING", age_days=5, quantity=3, cost=4.0, price=10.0)
+    _stock(db_session, tenant, store, sku="SKU-VAL-1", status="RFID", age_days=10, cost=4.0, price=10.0)
+    _stock(db_session, tenant, store, sku="SKU-VAL-1", status="PENDING", age_days=75, quantity=2, cost=3.5, price=9.0)
+    _stock(db_session, tenant, store, sku="SKU-VAL-2", status="PENDING", age_days=400, price=20.0)
+    _stock(db_session, tenant, store, sku="SKU-VAL-2", status="SOLD", age_days=5, cost=1.0, price=20.0)
+    _stock(db_session, tenant, other_store, sku="SKU-VAL-1", status="PENDING", age_days=5, cost=4.0, price=10.0)
+
+
+def test_inventory_valuation_groups_by_sku_location_and_age(client, db_session):
+    seed_defaults(db_session)
+    tenant, store, other_store, user = create_tenant_user(db_session, suffix="inventory-valuation")
+    token = login(client, user.username, "Pass1234!")
+    _seed_valuation_stock(db_session, tenant, store, other_store)
+
+    response = client.get(
+        "/aris3/reports/inventory-valuation",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"store_id": str(store.id)},
+    )
+    assert response.status_code == 200, response.text
+    payload = response.json()
+    assert [
+        (row["sku"], row["age_bucket"], row["units"], row["cost_value"], row["retail_value"], row["missing_cost_units"])
+        for row in payload["rows"]
+    ] == [
+        ("SKU-VAL-1", "0_30", 4, "16.00", "40.00", 0),
+        ("SKU-VAL-1", "61_90", 2, "7.00", "18.00", 0),
+        ("SKU-VAL-2", "181_plus", 1, "0.00", "20.00", 1),
+    ]
+    totals = payload["totals"]
+    assert (totals["units"], totals["cost_value"], totals["retail_value"], totals["missing_cost_units"]) == (
+        7,
+        "23.00",
+        "78.00",
+        1,
+    )
+    assert {bucket["age_bucket"]: bucket["units"] for bucket in totals["age_buckets"]} == {
+        "0_30": 4,
+        "31_60": 0,
+        "61_90": 2,
+        "91_180": 0,
+        "181_plus": 1,
+    }
+
+    filtered = client.get(
+        "/aris3/reports/inventory-valuation",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"store_id": str(store.id), "sku": "SKU-VAL-2"},
+    )
+    assert [row["sku"] for row in filtered.json()["rows"]] == ["SKU-VAL-2"]
+
+
+def test_inventory_valuation_export_matches_report(client, db_session):
+    seed_defaults(db_session)
+    tenant, store, other_store, user = create_tenant_user(db_session, suffix="inventory-valuation-export")
+    token = login(client, user.username, "Pass1234!")
+    _seed_valuation_stock(db_session, tenant, store, other_store)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    report = client.get("/aris3/reports/inventory-valuation", headers=headers, params={"store_id": str(store.id)}).json()
+    created = client.post(
+        "/aris3/exports",
+        headers={**headers, "Idempotency-Key": "inventory-valuation-export"},
+        json={
+            "source_type": "reports_inventory_valuation",
+            "format": "csv",
+            "filters": {"store_id": str(store.id)},
+            "transaction_id": "txn-inventory-valuation-export",
+        },
+    )
+    assert created.status_code == 201, created.text
+    assert created.json()["row_count"] == len(report["rows"])
+
+    download = client.get(f"/aris3/exports/{created.json()['export_id']}/download", headers=headers)
+    assert download.status_code == 200
+    exported = list(csv.DictReader(io.StringIO(download.content.decode("utf-8"))))
+    assert [(row["sku"], row["age_bucket"], row["units"], row["cost_value"]) for row in exported] == [
+        (row["sku"], row["age_bucket"], str(row["units"]), row["cost_value"]) for row in report["rows"]
+    ]
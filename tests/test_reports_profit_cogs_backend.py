@@ -1,8 +1,9 @@
 from datetime import date
 from decimal import Decimal
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from app.aris3.db.models import PosSale
+from app.aris3.db.models import PosSale, PosSaleLine, StockItem
+from app.aris3.services.reports import sale_line_costs_and_diagnostics
 from tests.pos_sales_helpers import (
     create_paid_sale,
     create_stock_item,
@@ -181,3 +182,65 @@ def test_reports_missing_cost_and_line_level_return_reversal(client, db_session)
     assert Decimal(totals["cogs_reversed_from_returns"]) == Decimal("101.84")
     assert Decimal(totals["net_cogs"]) == Decimal("101.84")
     assert Decimal(totals["net_profit"]) == Decimal("377.16")
+
+
+def test_reports_sku_cost_fallback_weights_lots_and_keeps_ambiguous_rows_missing(client, db_session):
+    seed_defaults(db_session)
+    tenant, store, _other, _user = create_tenant_user(db_session, suffix="reports-lot-cogs")
+    stock = {
+        "LOTS": ((50, 2.00), (10, 8.00)),
+        "ROUND": ((2, 1.00), (4, 2.00)),
+        "MIXED": ((50, 2.00), (1, 53.00)),
+    }
+    for var2, rows in stock.items():
+        for quantity, cost in rows:
+            db_session.add(
+                StockItem(
+                    id=uuid4(),
+                    tenant_id=tenant.id,
+                    store_id=store.id,
+                    sku="SKU-LOT-COGS",
+                    var1_value="V1",
+                    var2_value=var2,
+                    location_code="LOC-1",
+                    pool="P1",
+                    status="PENDING",
+                    location_is_vendible=True,
+                    cost_price=cost,
+                    quantity=quantity,
+                )
+            )
+    sales = {}
+    for var2, qty in (("LOTS", 2), ("ROUND", 3), ("MIXED", 2)):
+        sale = PosSale(id=uuid4(), tenant_id=tenant.id, store_id=store.id, status="PAID")
+        db_session.add(sale)
+        db_session.flush()
+        db_session.add(
+            PosSaleLine(
+                id=uuid4(),
+                sale_id=sale.id,
+                tenant_id=tenant.id,
+                line_type="SKU",
+                qty=qty,
+                unit_price=10.0,
+                line_total=10.0 * qty,
+                sku="SKU-LOT-COGS",
+                var1_value="V1",
+                var2_value=var2,
+            )
+        )
+        sales[var2] = str(sale.id)
+    db_session.commit()
+
+    cogs_by_sale, _revenue, diagnostics = sale_line_costs_and_diagnostics(
+        db_session, tenant_id=str(tenant.id), store_id=str(store.id), sale_ids=list(sales.values())
+    )
+
+    # Lots only: (50 * 2.00 + 10 * 8.00) / 60 units = 3.00 per unit; a per-row average would say 5.00.
+    assert cogs_by_sale[sales["LOTS"]] == Decimal("6.00")
+    # 10.00 / 6 units is quantized to 1.67 before it is multiplied by the sold quantity.
+    assert cogs_by_sale[sales["ROUND"]] == Decimal("5.01")
+    # A lot next to a single unit is still an ambiguous match.
+    assert cogs_by_sale[sales["MIXED"]] == Decimal("0.00")
+    assert diagnostics["missing_cost_lines"] == 1
+    assert diagnostics["cost_source_summary"] == {"fallback_sku_variant": 2, "missing": 1}
@@ -0,0 +1,111 @@
+import io
+import uuid
+
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockAiExtractionCache, StockAiExtractionFile, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+from app.aris3.services import stock_ai_preload
+from app.aris3.services.stock_ai_jobs import StockAiJobService
+from app.aris3.services.stock_ai_preload import FakeInventoryClient
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post("/aris3/auth/login", json={"username_or_email": username, "password": password})
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, suffix: str):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"user-{suffix}",
+        email=f"user-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role="ADMIN",
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, store, user
+
+
+def _invoice_result():
+    return {
+        "document_summary": {"document_type": "invoice", "document_number": "INV-77"},
+        "lines": [{"sku": "SKU-CACHE-1", "description": "Blusa", "quantity": 3, "original_cost": "4.00", "source_currency": "USD"}],
+        "warnings": [],
+    }
+
+
+def _analyze_pdf(client, token, store, filename: str):
+    return client.post(
+        "/aris3/stock/ai/preload/analyze",
+        headers={"Authorization": f"Bearer {token}"},
+        data={"store_id": str(store.id), "source_currency": "USD"},
+        files={"files": (filename, io.BytesIO(b"%PDF-1.4 same invoice"), "application/pdf")},
+    )
+
+
+def test_resent_document_reuses_cached_extraction_until_prompt_version_changes(client, db_session, monkeypatch):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, "ai-cache")
+    token = _login(client, user.username, "Pass1234!")
+    fake = FakeInventoryClient(result=_invoice_result())
+    monkeypatch.setattr(stock_ai_preload, "build_inventory_client", lambda: fake)
+
+    first = _analyze_pdf(client, token, store, "invoice.pdf")
+    assert first.status_code == 200, first.text
+    resent = _analyze_pdf(client, token, store, "invoice (1).pdf")
+    assert resent.status_code == 200, resent.text
+    assert len(fake.calls) == 1
+    assert [line["sku"] for line in resent.json()["lines"]] == ["SKU-CACHE-1"]
+    assert resent.json()["document_summary"]["document_number"] == "INV-77"
+    assert any("reutilizado" in warning["message"] for warning in resent.json()["warnings"])
+
+    hashes = {
+        row.file_hash
+        for row in db_session.query(StockAiExtractionFile).filter(
+            StockAiExtractionFile.extraction_id.in_([uuid.UUID(first.json()["extraction_id"]), uuid.UUID(resent.json()["extraction_id"])])
+        )
+    }
+    assert len(hashes) == 1 and None not in hashes
+    entry = db_session.query(StockAiExtractionCache).filter(StockAiExtractionCache.tenant_id == tenant.id).one()
+    assert entry.hit_count == 1
+
+    monkeypatch.setattr(stock_ai_preload, "INVENTORY_PROMPT_VERSION", "next")
+    _analyze_pdf(client, token, store, "invoice.pdf")
+    assert len(fake.calls) == 2
+
+    # The cache is per tenant: the same bytes uploaded elsewhere are extracted again.
+    _other_tenant, other_store, other_user = _create_tenant_user(db_session, "ai-cache-other")
+    _analyze_pdf(client, _login(client, other_user.username, "Pass1234!"), other_store, "invoice.pdf")
+    assert len(fake.calls) == 3
+
+
+def test_large_input_cached_by_worker_is_answered_synchronously(client, db_session, monkeypatch):
+    run_seed(db_session)
+    _tenant, store, user = _create_tenant_user(db_session, "ai-cache-large")
+    token = _login(client, user.username, "Pass1234!")
+    monkeypatch.setattr(stock_ai_preload.settings, "AI_INVENTORY_CLIENT", "fake")
+    fake = stock_ai_preload.build_inventory_client()
+    assert isinstance(fake, FakeInventoryClient)
+    monkeypatch.setattr(stock_ai_preload, "build_inventory_client", lambda: fake)
+    long_text = ("texto inventario sin patrones shein " * 300) + " SKU: LARGE-1 SKU: LARGE-2"
+    data = {"store_id": str(store.id), "free_text": long_text, "source_currency": "USD"}
+
+    queued = client.post("/aris3/stock/ai/preload/analyze", headers={"Authorization": f"Bearer {token}"}, data=data)
+    assert queued.json()["status"] == "PROCESSING"
+    assert StockAiJobService(db_session).run_next(worker_id="worker-1").status == "COMPLETED"
+    calls_after_worker = len(fake.calls)
+
+    resent = client.post("/aris3/stock/ai/preload/analyze", headers={"Authorization": f"Bearer {token}"}, data=data)
+    assert resent.status_code == 200, resent.text
+    assert resent.json()["status"] == "DRAFT"
+    assert [line["sku"] for line in resent.json()["lines"]] == ["LARGE-1", "LARGE-2"]
+    assert len(fake.calls) == calls_after_worker
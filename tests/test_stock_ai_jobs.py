@@ -0,0 +1,228 @@
+import re
+import uuid
+from datetime import datetime, timedelta
+
+from app.aris3.core.error_catalog import AppError, ErrorCatalog
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockAiExtraction, StockAiJob, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+from app.aris3.services import stock_ai_jobs
+from app.aris3.services.stock_ai_jobs import JOB_LARGE_EXTRACTION, StockAiJobService
+from app.aris3.services.stock_ai_preload import OpenAIInventoryClient
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post("/aris3/auth/login", json={"username_or_email": username, "password": password})
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, suffix: str):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"user-{suffix}",
+        email=f"user-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role="ADMIN",
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, store, user
+
+
+def _queue_job(db_session, tenant, store):
+    extraction = StockAiExtraction(
+        tenant_id=tenant.id,
+        store_id=store.id,
+        source_currency="USD",
+        pricing_mode="manual",
+        rounding_step="1.00",
+        status="PROCESSING",
+        normalized_result={"lines": []},
+        warnings=[],
+    )
+    db_session.add(extraction)
+    db_session.flush()
+    job = StockAiJobService(db_session).enqueue(
+        tenant_id=tenant.id,
+        extraction_id=extraction.id,
+        kind=JOB_LARGE_EXTRACTION,
+        payload={
+            "prompt": "inventario",
+            "store_id": str(store.id),
+            "source_currency": "USD",
+            "pricing_mode": "manual",
+            "rounding_step": "1.00",
+            "attachments": [],
+        },
+    )
+    db_session.commit()
+    return extraction, job
+
+
+def test_large_analyze_is_queued_and_completed_by_worker(client, db_session, monkeypatch):
+    run_seed(db_session)
+    _tenant, store, user = _create_tenant_user(db_session, "ai-jobs-worker")
+    token = _login(client, user.username, "Pass1234!")
+
+    calls = []
+
+    async def _mock_extract(self, *, prompt, attachments, **kwargs):
+        assert attachments == []
+        calls.append(prompt)
+        sku = f"SKU-JOB-{len(calls)}"
+        return {
+            "document_summary": {"document_type": "other"},
+            "lines": [{"sku": sku, "description": "Producto", "quantity": 2, "source_currency": "USD"}],
+            "warnings": [],
+        }
+
+    monkeypatch.setattr(OpenAIInventoryClient, "extract_async", _mock_extract)
+    long_text = ("texto inventario sin patrones shein " * 300) + " SKU: A1 SKU: A2"
+    analyze = client.post(
+        "/aris3/stock/ai/preload/analyze",
+        headers={"Authorization": f"Bearer {token}"},
+        data={"store_id": str(store.id), "free_text": long_text, "source_currency": "USD"},
+    )
+    assert analyze.status_code == 200
+    assert analyze.json()["status"] == "PROCESSING"
+    extraction_id = analyze.json()["extraction_id"]
+
+    job = db_session.query(StockAiJob).filter(StockAiJob.extraction_id == uuid.UUID(extraction_id)).one()
+    assert job.status == "QUEUED"
+
+    processed = StockAiJobService(db_session).run_next(worker_id="worker-1")
+    assert processed.id == job.id
+    assert processed.status == "COMPLETED"
+    assert processed.attempts == 1
+
+    detail = client.get(f"/aris3/stock/ai/preload/{extraction_id}", headers={"Authorization": f"Bearer {token}"})
+    assert detail.json()["status"] == "COMPLETED"
+    assert len(calls) > 1
+    skus = sorted(line["sku"] for line in detail.json()["lines"])
+    assert skus == sorted(f"SKU-JOB-{index}" for index in range(1, len(calls) + 1))
+
+
+def test_retryable_failures_back_off_then_fail_the_extraction(client, db_session, monkeypatch):
+    run_seed(db_session)
+    tenant, store, _user = _create_tenant_user(db_session, "ai-jobs-retry")
+    monkeypatch.setattr(stock_ai_jobs.settings, "AI_JOBS_MAX_ATTEMPTS", 2)
+    extraction, job = _queue_job(db_session, tenant, store)
+
+    async def _timeout(self, **kwargs):
+        raise AppError(ErrorCatalog.AI_SERVICE_TIMEOUT, details={"message": "timed out", "retryable": True})
+
+    monkeypatch.setattr(OpenAIInventoryClient, "extract_async", _timeout)
+    service = StockAiJobService(db_session)
+
+    service.run_next(worker_id="worker-1")
+    db_session.refresh(job)
+    assert (job.status, job.attempts, job.lease_owner) == ("QUEUED", 1, None)
+    assert job.available_at > datetime.utcnow()
+    assert job.last_error.startswith(ErrorCatalog.AI_SERVICE_TIMEOUT.code)
+    assert service.claim(worker_id="worker-1") is None
+
+    claimed = service.claim(worker_id="worker-1", now=job.available_at + timedelta(seconds=1))
+    service.run(claimed, worker_id="worker-1")
+    db_session.refresh(job)
+    db_session.refresh(extraction)
+    assert (job.status, job.attempts) == ("FAILED", 2)
+    assert extraction.status == "FAILED"
+    assert extraction.raw_ai_result["code"] == ErrorCatalog.AI_SERVICE_TIMEOUT.code
+
+
+def test_claim_respects_tenant_concurrency_and_expired_leases(client, db_session, monkeypatch):
+    run_seed(db_session)
+    monkeypatch.setattr(stock_ai_jobs.settings, "AI_JOBS_TENANT_CONCURRENCY", 1)
+    busy_tenant, busy_store, _user = _create_tenant_user(db_session, "ai-jobs-busy")
+    other_tenant, other_store, _other_user = _create_tenant_user(db_session, "ai-jobs-other")
+    _queue_job(db_session, busy_tenant, busy_store)
+    _queue_job(db_session, busy_tenant, busy_store)
+    _queue_job(db_session, other_tenant, other_store)
+    service = StockAiJobService(db_session)
+
+    first = service.claim(worker_id="worker-1")
+    second = service.claim(worker_id="worker-2")
+    assert {first.tenant_id, second.tenant_id} == {busy_tenant.id, other_tenant.id}
+    assert service.claim(worker_id="worker-3") is None
+
+    # worker-1 died: once its lease expires the job is handed to someone else and worker-1 can no longer finish it.
+    reclaimed = service.claim(worker_id="worker-3", now=first.lease_expires_at + timedelta(seconds=1))
+    assert reclaimed.id == first.id
+    assert (reclaimed.lease_owner, reclaimed.attempts) == ("worker-3", 2)
+    assert service._finish(first, worker_id="worker-1", status="COMPLETED") is False
+
+
+def test_chunked_job_shows_progress_and_retries_only_failed_chunks(client, db_session, monkeypatch):
+    run_seed(db_session)
+    _tenant, store, user = _create_tenant_user(db_session, "ai-jobs-chunks")
+    token = _login(client, user.username, "Pass1234!")
+    calls: list[str] = []
+    failing = {"PARTE-3"}
+
+    async def _mock_extract(self, *, prompt, **kwargs):
+        part = re.search(r"PARTE-\d", prompt).group(0)
+        calls.append(part)
+        if part in failing:
+            raise AppError(ErrorCatalog.AI_SERVICE_UNAVAILABLE, details={"message": "OpenAI service unavailable", "retryable": True})
+        return {"document_summary": {"document_type": "other"}, "lines": [{"sku": f"SKU-{part}", "quantity": 1}], "warnings": []}
+
+    monkeypatch.setattr(OpenAIInventoryClient, "extract_async", _mock_extract)
+    long_text = "\n\n".join(f"PARTE-{idx} " + ("renglon de inventario " * 130) for idx in range(1, 4))
+    analyze = client.post(
+        "/aris3/stock/ai/preload/analyze",
+        headers={"Authorization": f"Bearer {token}"},
+        data={"store_id": str(store.id), "free_text": long_text, "source_currency": "USD"},
+    )
+    assert analyze.json()["status"] == "PROCESSING"
+    assert analyze.json()["chunks_total"] == 3
+    extraction_id = analyze.json()["extraction_id"]
+    service = StockAiJobService(db_session)
+
+    job = service.run_next(worker_id="worker-1")
+    db_session.refresh(job)
+    assert job.status == "QUEUED"
+    detail = client.get(f"/aris3/stock/ai/preload/{extraction_id}", headers={"Authorization": f"Bearer {token}"}).json()
+    assert (detail["status"], detail["chunks_total"], detail["chunks_completed"]) == ("PROCESSING", 3, 2)
+    assert sorted(line["sku"] for line in detail["lines"]) == ["SKU-PARTE-1", "SKU-PARTE-2"]
+
+    failing.clear()
+    claimed = service.claim(worker_id="worker-1", now=job.available_at + timedelta(seconds=1))
+    service.run(claimed, worker_id="worker-1")
+    assert sorted(calls) == ["PARTE-1", "PARTE-2", "PARTE-3", "PARTE-3"]
+    detail = client.get(f"/aris3/stock/ai/preload/{extraction_id}", headers={"Authorization": f"Bearer {token}"}).json()
+    assert (detail["status"], detail["chunks_completed"]) == ("COMPLETED", 3)
+    assert [line["sku"] for line in detail["lines"]] == ["SKU-PARTE-1", "SKU-PARTE-2", "SKU-PARTE-3"]
+
+
+def test_progress_renews_the_lease_and_finished_jobs_drop_their_payload(client, db_session, monkeypatch):
+    run_seed(db_session)
+    tenant, store, _user = _create_tenant_user(db_session, "ai-jobs-lease")
+    _extraction, job = _queue_job(db_session, tenant, store)
+    service = StockAiJobService(db_session)
+
+    claimed = service.claim(worker_id="worker-1")
+    lease = (claimed.lease_owner, claimed.attempts)
+    # A long run is about to outlive the lease taken at claim time; progress must push it out.
+    claimed.lease_expires_at = datetime.utcnow() + timedelta(seconds=1)
+    db_session.commit()
+    service.record_progress(claimed, lease, lines=[], chunks_completed=1)
+    db_session.refresh(claimed)
+    assert claimed.lease_expires_at > datetime.utcnow() + timedelta(seconds=60)
+    assert service.claim(worker_id="worker-2", now=datetime.utcnow() + timedelta(seconds=30)) is None
+
+    async def _mock_extract(self, **kwargs):
+        return {"document_summary": {}, "lines": [{"sku": "SKU-LEASE", "quantity": 1}], "warnings": []}
+
+    monkeypatch.setattr(OpenAIInventoryClient, "extract_async", _mock_extract)
+    service.run(claimed, worker_id="worker-1")
+    db_session.refresh(claimed)
+    assert (claimed.status, claimed.payload) == ("COMPLETED", {})
+    assert service.renew_lease(claimed, lease) is False
@@ -1,13 +1,17 @@
+import asyncio
 import io
+import json
 import uuid
 
 import httpx
 
 from app.aris3.core.config import settings
+from app.aris3.core.error_catalog import AppError, ErrorCatalog
 from app.aris3.core.security import get_password_hash
 from app.aris3.db.models import CatalogProduct, CatalogProductCostHistory, PreloadLine, StockAiExtraction, StockItem, Store, Tenant, User
 from app.aris3.db.seed import run_seed
-from app.aris3.routers import stock as stock_router
+from app.aris3.services import stock_ai_preload
+from app.aris3.services.stock_ai_jobs import StockAiJobService
 from app.aris3.services.stock_ai_preload import OpenAIInventoryClient
 
 
@@ -37,12 +41,20 @@ def _create_tenant_user(db_session, suffix: str):
     return tenant, store, user
 
 
+async def _empty_spreadsheet_extract(self, **kwargs):
+    return {"document_summary": {"document_type": "spreadsheet"}, "lines": [], "warnings": []}
+
+
+def _stub_openai(monkeypatch, handler):
+    monkeypatch.setattr(stock_ai_preload, "_configured_http_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+
 def test_ai_preload_analyze_text_and_confirm_creates_preload_session(client, db_session, monkeypatch):
     run_seed(db_session)
     _tenant, store, user = _create_tenant_user(db_session, "ai-preload")
     token = _login(client, user.username, "Pass1234!")
 
-    def _mock_extract(self, *, prompt, attachments, **kwargs):
+    async def _mock_extract(self, *, prompt, attachments, **kwargs):
         assert "camisa" in prompt.lower()
         return {
             "document_summary": {"document_type": "invoice", "detected_currency": "USD", "overall_confidence": 0.9},
@@ -65,7 +77,7 @@ def test_ai_preload_analyze_text_and_confirm_creates_preload_session(client, db_
             "warnings": [],
         }
 
-    monkeypatch.setattr(OpenAIInventoryClient, "extract", _mock_extract)
+    monkeypatch.setattr(OpenAIInventoryClient, "extract_async", _mock_extract)
 
     analyze = client.post(
         "/aris3/stock/ai/preload/analyze",
@@ -526,8 +538,8 @@ def test_ai_preload_spreadsheet_epc_and_sale_warning(client, db_session, monkeyp
 
     monkeypatch.setattr(
         OpenAIInventoryClient,
-        "extract",
-        lambda self, **kwargs: {"document_summary": {"document_type": "spreadsheet"}, "lines": [], "warnings": []},
+        "extract_async",
+        _empty_spreadsheet_extract,
     )
 
     csv_content = "SKU,EPC,Descripcion,Venta,Costo,Moneda\nSKU-1,ABC,Prod A,120,10,USD\n"
@@ -594,10 +606,10 @@ def test_ai_preload_analyze_openai_timeout_returns_controlled_json(client, db_se
     token = _login(client, user.username, "Pass1234!")
     monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
 
-    def _mock_timeout(*args, **kwargs):
-        raise httpx.ReadTimeout("timed out")
+    def _mock_timeout(request):
+        raise httpx.ReadTimeout("timed out", request=request)
 
-    monkeypatch.setattr(httpx, "post", _mock_timeout)
+    _stub_openai(monkeypatch, _mock_timeout)
     analyze = client.post(
         "/aris3/stock/ai/preload/analyze",
         headers={"Authorization": f"Bearer {token}"},
@@ -635,12 +647,10 @@ def test_ai_preload_analyze_invalid_api_key_returns_controlled_json(client, db_s
     token = _login(client, user.username, "Pass1234!")
     monkeypatch.setattr(settings, "OPENAI_API_KEY", "bad-key")
 
-    def _mock_http_error(*args, **kwargs):
-        request = httpx.Request("POST", "https://api.openai.com/v1/responses")
-        response = httpx.Response(401, request=request, text='{"error":{"message":"invalid_api_key"}}')
-        raise httpx.HTTPStatusError("unauthorized", request=request, response=response)
+    def _mock_http_error(request):
+        return httpx.Response(401, text='{"error":{"message":"invalid_api_key"}}')
 
-    monkeypatch.setattr(httpx, "post", _mock_http_error)
+    _stub_openai(monkeypatch, _mock_http_error)
     analyze = client.post(
         "/aris3/stock/ai/preload/analyze",
         headers={"Authorization": f"Bearer {token}"},
@@ -656,15 +666,13 @@ def test_ai_preload_text_only_openai_request_uses_valid_responses_payload(monkey
     monkeypatch.setattr(settings, "OPENAI_INVENTORY_MODEL", "gpt-4.1-mini")
     captured: dict = {}
 
-    def _mock_post(url, *, headers=None, json=None, timeout=None):
-        captured["url"] = url
-        captured["headers"] = headers
-        captured["json"] = json
-        request = httpx.Request("POST", url)
-        return httpx.Response(200, request=request, json={"output_text": '{"document_summary":{},"pricing_context":{},"lines":[],"warnings":[]}'})
+    def _mock_post(request):
+        captured["url"] = str(request.url)
+        captured["headers"] = request.headers
+        captured["json"] = json.loads(request.content)
+        return httpx.Response(200, json={"output_text": '{"document_summary":{},"pricing_context":{},"lines":[],"warnings":[]}'})
 
-    monkeypatch.setattr(httpx, "post", _mock_post)
-    client = OpenAIInventoryClient()
+    client = OpenAIInventoryClient(http_client=httpx.AsyncClient(transport=httpx.MockTransport(_mock_post)))
     client.extract(
         prompt="12 camisas negras talla M costo USD 10.00 cada una",
         attachments=[],
@@ -692,12 +700,15 @@ def test_ai_preload_analyze_rate_limit_returns_controlled_json(client, db_sessio
     token = _login(client, user.username, "Pass1234!")
     monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
 
-    def _mock_http_error(*args, **kwargs):
-        request = httpx.Request("POST", "https://api.openai.com/v1/responses")
-        response = httpx.Response(429, request=request, text='{"error":{"message":"rate_limit"}}')
-        raise httpx.HTTPStatusError("rate limit", request=request, response=response)
+    monkeypatch.setattr(settings, "OPENAI_INVENTORY_MAX_RETRIES", 2)
+    monkeypatch.setattr(settings, "OPENAI_INVENTORY_RETRY_BACKOFF_SECONDS", 0)
+    attempts: list[str] = []
+
+    def _mock_http_error(request):
+        attempts.append(request.url.path)
+        return httpx.Response(429, text='{"error":{"message":"rate_limit"}}')
 
-    monkeypatch.setattr(httpx, "post", _mock_http_error)
+    _stub_openai(monkeypatch, _mock_http_error)
     analyze = client.post(
         "/aris3/stock/ai/preload/analyze",
         headers={"Authorization": f"Bearer {token}"},
@@ -706,6 +717,7 @@ def test_ai_preload_analyze_rate_limit_returns_controlled_json(client, db_sessio
     assert analyze.status_code == 429
     payload = analyze.json()
     assert payload["code"] == "AI_RATE_LIMITED"
+    assert attempts == ["/v1/responses"] * 3
 
 
 def test_ai_preload_analyze_malformed_output_returns_controlled_json(client, db_session, monkeypatch):
@@ -714,11 +726,10 @@ def test_ai_preload_analyze_malformed_output_returns_controlled_json(client, db_
     token = _login(client, user.username, "Pass1234!")
     monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
 
-    def _mock_post(*args, **kwargs):
-        request = httpx.Request("POST", "https://api.openai.com/v1/responses")
-        return httpx.Response(200, request=request, json={"output_text": "{not json"})
+    def _mock_post(request):
+        return httpx.Response(200, json={"output_text": "{not json"})
 
-    monkeypatch.setattr(httpx, "post", _mock_post)
+    _stub_openai(monkeypatch, _mock_post)
     analyze = client.post(
         "/aris3/stock/ai/preload/analyze",
         headers={"Authorization": f"Bearer {token}"},
@@ -735,11 +746,9 @@ def test_ai_preload_analyze_openai_400_returns_ai_request_invalid(client, db_ses
     token = _login(client, user.username, "Pass1234!")
     monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
 
-    def _mock_http_error(*args, **kwargs):
-        request = httpx.Request("POST", "https://api.openai.com/v1/responses")
-        response = httpx.Response(
+    def _mock_http_error(request):
+        return httpx.Response(
             400,
-            request=request,
             json={
                 "error": {
                     "message": "Invalid schema for response_format",
@@ -749,9 +758,8 @@ def test_ai_preload_analyze_openai_400_returns_ai_request_invalid(client, db_ses
                 }
             },
         )
-        raise httpx.HTTPStatusError("bad request", request=request, response=response)
 
-    monkeypatch.setattr(httpx, "post", _mock_http_error)
+    _stub_openai(monkeypatch, _mock_http_error)
     analyze = client.post(
         "/aris3/stock/ai/preload/analyze",
         headers={"Authorization": f"Bearer {token}"},
@@ -771,7 +779,7 @@ def test_ai_preload_analyze_text_only_response_excludes_epc_and_sale_fields(clie
     _tenant, store, user = _create_tenant_user(db_session, "ai-preload-text-only")
     token = _login(client, user.username, "Pass1234!")
 
-    def _mock_extract(self, *, prompt, attachments, **kwargs):
+    async def _mock_extract(self, *, prompt, attachments, **kwargs):
         assert attachments == []
         return {
             "document_summary": {"document_type": "other", "detected_currency": "USD", "overall_confidence": 0.9},
@@ -793,7 +801,7 @@ def test_ai_preload_analyze_text_only_response_excludes_epc_and_sale_fields(clie
             "warnings": [],
         }
 
-    monkeypatch.setattr(OpenAIInventoryClient, "extract", _mock_extract)
+    monkeypatch.setattr(OpenAIInventoryClient, "extract_async", _mock_extract)
     analyze = client.post(
         "/aris3/stock/ai/preload/analyze",
         headers={"Authorization": f"Bearer {token}"},
@@ -825,11 +833,11 @@ def test_ai_preload_analyze_without_files_field_behaves_as_text_only(client, db_
     _tenant, store, user = _create_tenant_user(db_session, "ai-preload-empty-files")
     token = _login(client, user.username, "Pass1234!")
 
-    def _mock_extract(self, *, attachments, **kwargs):
+    async def _mock_extract(self, *, attachments, **kwargs):
         assert attachments == []
         return {"document_summary": {}, "lines": [], "warnings": []}
 
-    monkeypatch.setattr(OpenAIInventoryClient, "extract", _mock_extract)
+    monkeypatch.setattr(OpenAIInventoryClient, "extract_async", _mock_extract)
     analyze = client.post(
         "/aris3/stock/ai/preload/analyze",
         headers={"Authorization": f"Bearer {token}"},
@@ -846,8 +854,8 @@ def test_ai_preload_excel_like_template_maps_canonical_fields(client, db_session
 
     monkeypatch.setattr(
         OpenAIInventoryClient,
-        "extract",
-        lambda self, **kwargs: {"document_summary": {"document_type": "spreadsheet"}, "lines": [], "warnings": []},
+        "extract_async",
+        _empty_spreadsheet_extract,
     )
 
     csv_content = (
@@ -885,7 +893,7 @@ def test_ai_preload_symbol_currency_and_shein_price_behavior(client, db_session,
     _tenant, store, user = _create_tenant_user(db_session, "ai-preload-shein")
     token = _login(client, user.username, "Pass1234!")
 
-    def _mock_extract(self, **kwargs):
+    async def _mock_extract(self, **kwargs):
         return {
             "document_summary": {"document_type": "other"},
             "lines": [
@@ -905,7 +913,7 @@ def test_ai_preload_symbol_currency_and_shein_price_behavior(client, db_session,
             "warnings": [{"severity": "warning", "message": "Confirmar moneda antes de calcular Costo(Q)."}],
         }
 
-    monkeypatch.setattr(OpenAIInventoryClient, "extract", _mock_extract)
+    monkeypatch.setattr(OpenAIInventoryClient, "extract_async", _mock_extract)
     analyze = client.post(
         "/aris3/stock/ai/preload/analyze",
         headers={"Authorization": f"Bearer {token}"},
@@ -925,7 +933,7 @@ def test_ai_preload_shein_order_text_sets_reference_price_defaults_and_document_
     _tenant, store, user = _create_tenant_user(db_session, "ai-preload-shein-order-detail")
     token = _login(client, user.username, "Pass1234!")
 
-    def _mock_extract(self, **kwargs):
+    async def _mock_extract(self, **kwargs):
         return {
             "document_summary": {
                 "document_type": "other",
@@ -957,7 +965,7 @@ def test_ai_preload_shein_order_text_sets_reference_price_defaults_and_document_
             "warnings": [],
         }
 
-    monkeypatch.setattr(OpenAIInventoryClient, "extract", _mock_extract)
+    monkeypatch.setattr(OpenAIInventoryClient, "extract_async", _mock_extract)
 
     analyze = client.post(
         "/aris3/stock/ai/preload/analyze",
@@ -1003,8 +1011,8 @@ def test_ai_preload_sellable_rules_only_explicit_phrases_force_false(client, db_
 
     monkeypatch.setattr(
         OpenAIInventoryClient,
-        "extract",
-        lambda self, **kwargs: {"document_summary": {"document_type": "spreadsheet"}, "lines": [], "warnings": []},
+        "extract_async",
+        _empty_spreadsheet_extract,
     )
     csv_content = "SKU,Descripcion,Cantidad,Precio Costo (Q),Ubicación\nSKU-1,Producto normal en transito,1,10.00,EN TRANSITO\nSKU-2,Producto dañado,1,10.00,BOD-A1\n"
     files = {"files": ("sellable.csv", io.BytesIO(csv_content.encode("utf-8")), "text/csv")}
@@ -1027,10 +1035,10 @@ def test_ai_preload_long_shein_text_uses_deterministic_parser_without_openai(cli
     _tenant, store, user = _create_tenant_user(db_session, "ai-preload-long-shein-parser")
     token = _login(client, user.username, "Pass1234!")
 
-    def _should_not_call(*args, **kwargs):
+    async def _should_not_call(*args, **kwargs):
         raise AssertionError("OpenAI extract should not be called for deterministic SHEIN parse")
 
-    monkeypatch.setattr(OpenAIInventoryClient, "extract", _should_not_call)
+    monkeypatch.setattr(OpenAIInventoryClient, "extract_async", _should_not_call)
     long_text = (
         "Núm. de pedido\nGSH16U13F000644\nFecha\n21 Feb 2026\nProductos Cantidad SKU Importe Estado Acción\n"
         "SHEIN SXY Vestido vaquero largo...\nAzul lavado medio / XS\n1 SKU: sz2401176811723523\n$33.15\n$86.91\nEnviado\n"
@@ -1063,10 +1071,6 @@ def test_ai_preload_long_non_shein_returns_processing_and_get_shows_processing(c
     _tenant, store, user = _create_tenant_user(db_session, "ai-preload-long-processing")
     token = _login(client, user.username, "Pass1234!")
 
-    def _no_background(*args, **kwargs):
-        return None
-
-    monkeypatch.setattr(stock_router, "_run_large_ai_preload_extraction", _no_background)
     long_non_shein = ("texto inventario sin patrones shein " * 300) + " SKU: A1 SKU: A2 SKU: A3 SKU: A4 SKU: A5"
     analyze = client.post(
         "/aris3/stock/ai/preload/analyze",
@@ -1111,3 +1115,166 @@ def test_ai_preload_get_after_background_completion_returns_lines(client, db_ses
     payload = get_resp.json()
     assert payload["status"] == "COMPLETED"
     assert payload["total_lines"] == 1
+
+
+def test_openai_client_retries_dropped_pooled_connection(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "OPENAI_INVENTORY_RETRY_BACKOFF_SECONDS", 0)
+    calls: list[int] = []
+
+    def _handler(request):
+        calls.append(1)
+        if len(calls) == 1:
+            raise httpx.RemoteProtocolError("Server disconnected without sending a response.", request=request)
+        return httpx.Response(200, json={"output_text": '{"document_summary":{},"lines":[{"sku":"SKU-RETRY"}],"warnings":[]}'})
+
+    client = OpenAIInventoryClient(http_client=httpx.AsyncClient(transport=httpx.MockTransport(_handler)))
+    result = client.extract(prompt="2 camisas", attachments=[], trace_id=None, tenant_id="t", store_id="s", document_type=None)
+    assert result["lines"] == [{"sku": "SKU-RETRY"}]
+    assert len(calls) == 2
+
+
+def test_openai_client_bounds_concurrent_requests(monkeypatch):
+    monkeypatch.setattr(settings, "OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(settings, "OPENAI_INVENTORY_MAX_CONCURRENCY", 2)
+    in_flight = {"now": 0, "max": 0}
+
+    async def _handler(request):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return httpx.Response(200, json={"output_text": '{"document_summary":{},"lines":[],"warnings":[]}'})
+
+    async def _run():
+        stub = httpx.AsyncClient(transport=httpx.MockTransport(_handler))
+        client = OpenAIInventoryClient(http_client=stub)
+        await asyncio.gather(
+            *[
+                client.extract_async(prompt=f"p{idx}", attachments=[], trace_id=None, tenant_id="t", store_id="s", document_type=None)
+                for idx in range(6)
+            ]
+        )
+        await stub.aclose()
+
+    asyncio.run(_run())
+    assert in_flight["max"] == 2
+
+
+def test_ai_preload_large_sheet_is_extracted_in_parallel_row_chunks(client, db_session, monkeypatch):
+    run_seed(db_session)
+    _tenant, store, user = _create_tenant_user(db_session, "ai-preload-chunks")
+    token = _login(client, user.username, "Pass1234!")
+    monkeypatch.setattr(settings, "AI_PRELOAD_CHUNK_ROWS", 2)
+    monkeypatch.setattr(settings, "AI_PRELOAD_CHUNK_CONCURRENCY", 3)
+    # One attempt, so the worker keeps the partial result instead of retrying the failed chunk.
+    monkeypatch.setattr(settings, "AI_JOBS_MAX_ATTEMPTS", 1)
+    in_flight = {"now": 0, "max": 0}
+    prompts: list[str] = []
+
+    async def _mock_extract(self, *, prompt, **kwargs):
+        prompts.append(prompt)
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        if "SKU-C5" in prompt:
+            raise AppError(ErrorCatalog.AI_SERVICE_UNAVAILABLE, details={"message": "OpenAI service unavailable", "retryable": True})
+        return {
+            "document_summary": {"document_type": "spreadsheet"},
+            "lines": [{"sku": "SKU-AI-SHARED", "description": "Mismo articulo en cada parte", "quantity": 1}],
+            "warnings": [],
+        }
+
+    monkeypatch.setattr(OpenAIInventoryClient, "extract_async", _mock_extract)
+    csv_content = "SKU,Descripcion,Cantidad\n" + "".join(f"SKU-C{idx},Producto {idx},1\n" for idx in range(1, 6))
+    analyze = client.post(
+        "/aris3/stock/ai/preload/analyze",
+        headers={"Authorization": f"Bearer {token}"},
+        data={"store_id": str(store.id), "source_currency": "GTQ"},
+        files={"files": ("big.csv", io.BytesIO(csv_content.encode("utf-8")), "text/csv")},
+    )
+    assert analyze.status_code == 200, analyze.text
+    # Several chunks never share one request's time budget: the sheet is queued for the worker.
+    assert (analyze.json()["status"], analyze.json()["chunks_total"]) == ("PROCESSING", 3)
+    assert prompts == []
+    StockAiJobService(db_session).run_next(worker_id="worker-1")
+    payload = client.get(
+        f"/aris3/stock/ai/preload/{analyze.json()['extraction_id']}", headers={"Authorization": f"Bearer {token}"}
+    ).json()
+    assert payload["status"] == "COMPLETED"
+    assert len(prompts) == 3
+    assert in_flight["max"] > 1
+    assert (payload["chunks_total"], payload["chunks_completed"]) == (3, 2)
+    skus = [line["sku"] for line in payload["lines"]]
+    # The same item listed in two parts of the document is two lines, not a re-read to drop.
+    assert skus.count("SKU-AI-SHARED") == 2
+    assert [sku for sku in skus if sku.startswith("SKU-C")] == [f"SKU-C{idx}" for idx in range(1, 6)]
+    assert any("1 de 3 partes" in warning["message"] for warning in payload["warnings"])
+
+
+def test_merge_chunk_results_keeps_identical_lines_from_different_chunks():
+    service = stock_ai_preload.StockAiPreloadService(openai_client=stock_ai_preload.FakeInventoryClient())
+    line = {"sku": "SKU-REPEAT", "description": "Blusa", "quantity": 1, "original_cost": "4.00"}
+    merged = service.merge_chunk_results(
+        [
+            {"document_summary": {"document_type": "invoice"}, "lines": [dict(line)], "warnings": [{"severity": "info", "message": "x"}]},
+            None,
+            {"document_summary": {"document_number": "INV-2"}, "lines": [dict(line)], "warnings": [{"severity": "info", "message": "x"}]},
+        ]
+    )
+
+    assert [entry["sku"] for entry in merged["lines"]] == ["SKU-REPEAT", "SKU-REPEAT"]
+    assert merged["document_summary"] == {"document_type": "invoice", "document_number": "INV-2"}
+    assert merged["warnings"] == [{"severity": "info", "message": "x"}]
+
+
+def test_spreadsheet_scan_streams_workbook_rows_read_only(monkeypatch, caplog):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    first = workbook.active
+    first.title = "Pedido"
+    first.append(["SKU", "Descripcion", "Cantidad", "Precio (USD)", "EPC"])
+    for idx in range(1, 6):
+        first.append([f"SKU-S{idx}", f"Prod {idx}", 2, 3.5])
+    workbook.create_sheet("Vacia")
+    second = workbook.create_sheet("Extra")
+    second.append(["SKU", "Cantidad"])
+    second.append(["SKU-X1", 1])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+
+    load_kwargs: list[dict] = []
+    real_load_workbook = stock_ai_preload.load_workbook
+
+    def _spy_load_workbook(*args, **kwargs):
+        load_kwargs.append(kwargs)
+        return real_load_workbook(*args, **kwargs)
+
+    monkeypatch.setattr(stock_ai_preload, "load_workbook", _spy_load_workbook)
+    monkeypatch.setattr(settings, "AI_PRELOAD_SHEET_PROGRESS_ROWS", 2)
+    monkeypatch.setattr(settings, "AI_PRELOAD_CHUNK_ROWS", 2)
+    # Alembic's fileConfig disables loggers created before the migrations ran.
+    monkeypatch.setattr(stock_ai_preload.logger, "disabled", False)
+    service = stock_ai_preload.StockAiPreloadService(openai_client=stock_ai_preload.FakeInventoryClient())
+    source = stock_ai_preload.UploadedSource(
+        filename="pedido.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        content=buffer.getvalue(),
+    )
+    with caplog.at_level("INFO", logger=stock_ai_preload.__name__):
+        scan = service.scan_spreadsheet(source)
+
+    assert load_kwargs[0]["read_only"] is True
+    assert scan.row_count == 6
+    # Raw rows are serialized per chunk batch as they are read; only the mapped lines stay as dicts.
+    assert len(scan.row_batches) == 3
+    assert "'_sheet_name': 'Pedido'" in scan.row_batches[2] and "'_row_number': '6'" in scan.row_batches[2]
+    assert "'_sheet_name': 'Extra'" in scan.row_batches[2] and "SKU-S4" not in scan.row_batches[2]
+    assert [line["sku"] for line in scan.lines] == [f"SKU-S{idx}" for idx in range(1, 6)] + ["SKU-X1"]
+    assert scan.lines[0]["quantity"] == 2 and scan.lines[0]["original_cost"] == "3.50"
+    assert "missing cost" in scan.row_warnings
+    assert [w["message"] for w in scan.warnings] == ["EPC values were detected but ignored. EPC must be assigned later."]
+    progress = [r.getMessage() for r in caplog.records if "sheet_progress" in r.getMessage()]
+    assert [message.rsplit("=", 1)[1] for message in progress] == ["2", "4", "6"]
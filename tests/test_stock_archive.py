@@ -0,0 +1,126 @@
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockItem, StockItemArchive, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+from app.aris3.services.stock_archive import StockArchiveService
+from app.aris3.services.stock_counters import StockCounterService
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"admin-{suffix}",
+        email=f"admin-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role="ADMIN",
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, store, user
+
+
+def _seed_items(db_session, tenant, store):
+    now = datetime.utcnow()
+    specs = [
+        ("SKU-ARCH-OLD", "SOLD", 120),
+        ("SKU-ARCH-OLD", "SOLD", 100),
+        ("SKU-ARCH-NEW", "SOLD", 5),
+        ("SKU-ARCH-LIVE", "RFID", 200),
+    ]
+    for index, (sku, status, age) in enumerate(specs):
+        db_session.add(
+            StockItem(
+                id=uuid.uuid4(),
+                tenant_id=tenant.id,
+                store_id=store.id,
+                sku=sku,
+                description="Archive Jacket",
+                epc=f"{index + 1:024X}",
+                status=status,
+                location_code="LOC-1",
+                pool="P1",
+                location_is_vendible=True,
+                sale_price=Decimal("25.00"),
+                created_at=now - timedelta(days=age),
+                updated_at=now - timedelta(days=age),
+            )
+        )
+    db_session.commit()
+
+
+def test_archive_moves_old_sold_units_and_history_views_union_them(client, db_session):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="stock-archive")
+    _seed_items(db_session, tenant, store)
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+
+    result = StockArchiveService(db_session, batch_size=1).archive_sold(tenant_id=str(tenant.id), older_than_days=90)
+    assert (result.moved_rows, result.batches) == (2, 2)
+    assert db_session.query(StockItem).filter(StockItem.tenant_id == tenant.id).count() == 2
+    assert db_session.query(StockItemArchive).filter(StockItemArchive.tenant_id == tenant.id).count() == 2
+    assert StockCounterService(db_session).verify(str(tenant.id)) == []
+
+    operational = client.get("/aris3/stock", headers=headers, params={"view": "operational"})
+    assert operational.status_code == 200, operational.text
+    assert [row["sku"] for row in operational.json()["rows"]] == ["SKU-ARCH-LIVE"]
+
+    history = client.get("/aris3/stock", headers=headers, params={"view": "history", "sort_by": "created_at", "sort_dir": "asc"})
+    assert history.status_code == 200, history.text
+    assert [row["sku"] for row in history.json()["rows"]] == ["SKU-ARCH-OLD", "SKU-ARCH-OLD", "SKU-ARCH-NEW"]
+    assert history.json()["totals"]["total_rows"] == 3
+
+    searched = client.get("/aris3/stock", headers=headers, params={"view": "all", "q": "arch-old", "epc": f"{1:024X}"})
+    assert searched.status_code == 200, searched.text
+    assert [row["epc"] for row in searched.json()["rows"]] == [f"{1:024X}"]
+    assert searched.json()["totals"]["total_rows"] == 1
+
+    first_page = client.get("/aris3/stock", headers=headers, params={"view": "all", "page_size": 3})
+    second_page = client.get(
+        "/aris3/stock",
+        headers=headers,
+        params={"view": "all", "page_size": 3, "cursor": first_page.json()["meta"]["next_cursor"]},
+    )
+    seen = [row["id"] for row in first_page.json()["rows"] + second_page.json()["rows"]]
+    assert len(seen) == len(set(seen)) == 4
+    assert second_page.json()["meta"]["next_cursor"] is None
+
+
+def test_restore_sold_brings_archived_units_back_for_returns(client, db_session):
+    run_seed(db_session)
+    tenant, store, _user = _create_tenant_user(db_session, suffix="stock-archive-restore")
+    _seed_items(db_session, tenant, store)
+    service = StockArchiveService(db_session)
+    service.archive_sold(tenant_id=str(tenant.id), older_than_days=90)
+
+    restored = service.restore_sold(
+        tenant_id=tenant.id,
+        store_id=store.id,
+        location_code="LOC-1",
+        pool="P1",
+        sku="SKU-ARCH-OLD",
+        units=1,
+    )
+    db_session.commit()
+    assert restored == 1
+    assert db_session.query(StockItem).filter(StockItem.sku == "SKU-ARCH-OLD").count() == 1
+    assert service.archived_counts(tenant.id) == (1, 1)
+    assert StockCounterService(db_session).verify(str(tenant.id)) == []
@@ -0,0 +1,297 @@
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.aris3.core.config import settings
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import (
+    AuditEvent,
+    StockBulkActionRun,
+    StockItem,
+    StockMarkdownPolicy,
+    StockSearchToken,
+    Store,
+    Tenant,
+    User,
+)
+from app.aris3.db.seed import run_seed
+from app.aris3.services.stock_bulk_actions import StockBulkActionService
+from app.aris3.services.stock_counters import StockCounterService
+from app.aris3.services.stock_markdowns import StockMarkdownService
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"admin-{suffix}",
+        email=f"admin-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role="ADMIN",
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, store, user
+
+
+def _seed_items(db_session, tenant, store):
+    now = datetime.utcnow()
+    items = []
+    for index in range(5):
+        items.append(
+            StockItem(
+                id=uuid.uuid4(),
+                tenant_id=tenant.id,
+                store_id=store.id,
+                sku="SKU-BULK-A" if index < 3 else "SKU-BULK-B",
+                description="Bulk Jacket",
+                epc=f"{index:024X}",
+                status="RFID",
+                location_code="LOC-1",
+                pool="P1",
+                location_is_vendible=True,
+                sale_price=Decimal("100.00"),
+                created_at=now - timedelta(days=90 if index == 0 else 1),
+            )
+        )
+    db_session.add_all(items)
+    db_session.commit()
+    return [(item.id, item.epc) for item in items]
+
+
+def _bulk(client, headers, key: str, **body):
+    return client.post(
+        "/aris3/stock/actions/bulk",
+        headers={**headers, "Idempotency-Key": key},
+        json={"transaction_id": f"txn-{key}", **body},
+    )
+
+
+def test_bulk_stock_actions_apply_set_based_updates_in_chunks(client, db_session, monkeypatch):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="bulk-actions")
+    items = _seed_items(db_session, tenant, store)
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+    monkeypatch.setattr(settings, "STOCK_BULK_ACTION_CHUNK_SIZE", 2)
+
+    repriced = _bulk(
+        client,
+        headers,
+        "bulk-reprice",
+        action="REPRICE",
+        selector={"sku": "SKU-BULK-A"},
+        payload={"price": "80.00"},
+    )
+    assert repriced.status_code == 200, repriced.text
+    assert repriced.json()["matched"] == 3
+    assert repriced.json()["processed"] == 3
+    assert repriced.json()["chunks"] == 2
+
+    marked_down = _bulk(
+        client,
+        headers,
+        "bulk-markdown",
+        action="MARKDOWN_BY_AGE",
+        selector={"sku": "SKU-BULK-A"},
+        payload={"percent": "25", "min_age_days": 30},
+    )
+    assert marked_down.status_code == 200, marked_down.text
+    assert marked_down.json()["processed"] == 1
+
+    db_session.expire_all()
+    prices = [db_session.get(StockItem, item_id).sale_price for item_id, _epc in items]
+    assert prices == [Decimal("60.00"), Decimal("80.00"), Decimal("80.00"), Decimal("100.00"), Decimal("100.00")]
+
+    written_off = _bulk(
+        client,
+        headers,
+        "bulk-write-off",
+        action="WRITE_OFF",
+        selector={"epcs": [items[3][1], items[4][1]]},
+        payload={"reason": "DAMAGED"},
+    )
+    assert written_off.status_code == 200, written_off.text
+    assert written_off.json()["processed"] == 2
+    db_session.expire_all()
+    remaining = db_session.query(StockItem).filter(StockItem.tenant_id == tenant.id).all()
+    assert {item.sku for item in remaining} == {"SKU-BULK-A"}
+    assert StockCounterService(db_session).verify(tenant.id) == []
+
+    removed_ids = [items[3][0], items[4][0]]
+    assert db_session.query(StockSearchToken).filter(StockSearchToken.stock_item_id.in_(removed_ids)).count() == 0
+
+    audit = (
+        db_session.query(AuditEvent)
+        .filter(AuditEvent.tenant_id == tenant.id, AuditEvent.action == "stock.bulk_reprice")
+        .one()
+    )
+    assert audit.event_metadata["matched"] == 3
+    assert len(audit.before_payload["sample"]) == 3
+    assert {entry["sale_price"] for entry in audit.after_payload["sample"]} == {"80.00"}
+
+
+def test_bulk_stock_actions_require_a_selector(client, db_session):
+    run_seed(db_session)
+    _tenant, _store, user = _create_tenant_user(db_session, suffix="bulk-empty")
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+
+    response = _bulk(client, headers, "bulk-empty", action="REPRICE", selector={}, payload={"price": "10.00"})
+
+    assert response.status_code == 422
+    assert response.json()["details"]["field"] == "selector"
+
+
+def test_bulk_stock_actions_count_lot_units_as_matched(client, db_session):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="bulk-actions-lots")
+    for quantity in (10, 1):
+        db_session.add(
+            StockItem(
+                id=uuid.uuid4(),
+                tenant_id=tenant.id,
+                store_id=store.id,
+                sku="SKU-BULK-LOT",
+                description="Lot Tee",
+                status="PENDING",
+                location_code="LOC-1",
+                pool="P1",
+                location_is_vendible=True,
+                sale_price=Decimal("20.00"),
+                quantity=quantity,
+            )
+        )
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+
+    repriced = _bulk(
+        client,
+        headers,
+        "bulk-reprice-lots",
+        action="REPRICE",
+        selector={"sku": "SKU-BULK-LOT"},
+        payload={"price": "15.00"},
+    )
+    assert repriced.status_code == 200, repriced.text
+    body = repriced.json()
+    assert (body["matched"], body["matched_rows"], body["processed"]) == (11, 2, 11)
+
+
+def test_bulk_markdowns_apply_to_the_list_price_and_do_not_stack(client, db_session):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="bulk-markdown-base")
+    item_id, _epc = _seed_items(db_session, tenant, store)[0]
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+
+    for key, percent in (("bulk-markdown-20", "20"), ("bulk-markdown-30", "30")):
+        response = _bulk(
+            client,
+            headers,
+            key,
+            action="MARKDOWN_BY_AGE",
+            selector={"epcs": [_epc]},
+            payload={"percent": percent},
+        )
+        assert response.status_code == 200, response.text
+    db_session.expire_all()
+    item = db_session.get(StockItem, item_id)
+    assert (item.list_price, item.sale_price, item.markdown_percent) == (
+        Decimal("100.00"),
+        Decimal("70.00"),
+        Decimal("30.00"),
+    )
+
+    policy = StockMarkdownPolicy(
+        tenant_id=tenant.id,
+        name="Clearance",
+        buckets=[{"min_age_days": 30, "percent": "50"}],
+        is_active=True,
+    )
+    db_session.add(policy)
+    db_session.commit()
+    service = StockMarkdownService(db_session)
+    service.apply(policy, service.queue_run(policy, user_id=None, trace_id=None))
+    db_session.expire_all()
+    assert db_session.get(StockItem, item_id).sale_price == Decimal("50.00")
+
+
+def test_failed_bulk_action_is_audited_and_resumes_after_its_last_chunk(client, db_session, monkeypatch):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="bulk-resume")
+    _seed_items(db_session, tenant, store)
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+    monkeypatch.setattr(settings, "STOCK_BULK_ACTION_CHUNK_SIZE", 2)
+    body = {
+        "transaction_id": "txn-bulk-resume",
+        "action": "REPRICE",
+        "selector": {"sku": "SKU-BULK-A"},
+        "payload": {"price": "80.00"},
+    }
+    update_calls = []
+    original_update = StockBulkActionService._update
+
+    def _failing_update(self, ids, **values):
+        update_calls.append(ids)
+        if len(update_calls) == 2:
+            raise RuntimeError("database went away")
+        return original_update(self, ids, **values)
+
+    monkeypatch.setattr(StockBulkActionService, "_update", _failing_update)
+    with pytest.raises(RuntimeError):
+        client.post("/aris3/stock/actions/bulk", headers={**headers, "Idempotency-Key": "bulk-resume-1"}, json=body)
+
+    db_session.expire_all()
+    run = db_session.query(StockBulkActionRun).filter(StockBulkActionRun.tenant_id == tenant.id).one()
+    assert (run.status, run.processed, run.chunks) == ("FAILED", 2, 1)
+    assert run.failure_reason == "database went away"
+    audit = (
+        db_session.query(AuditEvent)
+        .filter(AuditEvent.tenant_id == tenant.id, AuditEvent.action == "stock.bulk_reprice")
+        .one()
+    )
+    assert audit.result == "failure"
+    assert audit.event_metadata["processed"] == 2
+    prices = db_session.query(StockItem.sale_price).filter(StockItem.sku == "SKU-BULK-A").all()
+    assert sorted(price for (price,) in prices) == [Decimal("80.00"), Decimal("80.00"), Decimal("100.00")]
+
+    replayed = client.post("/aris3/stock/actions/bulk", headers={**headers, "Idempotency-Key": "bulk-resume-1"}, json=body)
+    assert replayed.status_code == 500
+    assert len(update_calls) == 2
+
+    resumed = client.post("/aris3/stock/actions/bulk", headers={**headers, "Idempotency-Key": "bulk-resume-2"}, json=body)
+    assert resumed.status_code == 200, resumed.text
+    assert resumed.json()["run_id"] == str(run.id)
+    assert (resumed.json()["processed"], resumed.json()["chunks"]) == (3, 2)
+    assert len(update_calls) == 3
+    db_session.expire_all()
+    prices = db_session.query(StockItem.sale_price).filter(StockItem.sku == "SKU-BULK-A").all()
+    assert {price for (price,) in prices} == {Decimal("80.00")}
+    assert db_session.get(StockBulkActionRun, run.id).status == "COMPLETED"
+
+
+def test_bulk_stock_actions_reject_actions_they_do_not_implement(client, db_session):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="bulk-reprint")
+    _seed_items(db_session, tenant, store)
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+
+    response = _bulk(client, headers, "bulk-reprint", action="REPRINT_LABEL", selector={"sku": "SKU-BULK-A"})
+
+    assert response.status_code == 422
+    assert db_session.query(StockBulkActionRun).filter(StockBulkActionRun.tenant_id == tenant.id).count() == 0
@@ -0,0 +1,157 @@
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockItem, StockItemTombstone, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+from app.aris3.services import stock_changes
+from app.aris3.services.stock_changes import StockChangeService
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str, role: str = "ADMIN"):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"user-{suffix}",
+        email=f"user-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role=role,
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, store, user
+
+
+def _stock_item(tenant_id, store_id, *, sku: str) -> StockItem:
+    return StockItem(
+        id=uuid.uuid4(),
+        tenant_id=tenant_id,
+        store_id=store_id,
+        sku=sku,
+        description="Delta item",
+        location_code="LOC-1",
+        pool="P1",
+        status="PENDING",
+        location_is_vendible=True,
+        sale_price=Decimal("10.00"),
+        created_at=datetime.utcnow() - timedelta(minutes=5),
+    )
+
+
+def test_stock_changes_returns_upserts_and_tombstones_after_cursor(client, db_session, monkeypatch):
+    monkeypatch.setattr(stock_changes.settings, "STOCK_CHANGES_SETTLE_SECONDS", 0)
+    run_seed(db_session)
+    tenant, store, admin = _create_tenant_user(db_session, suffix="delta-sync")
+    kept = _stock_item(tenant.id, store.id, sku="SKU-DELTA-1")
+    removed = _stock_item(tenant.id, store.id, sku="SKU-DELTA-2")
+    db_session.add_all([kept, removed])
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {_login(client, admin.username, 'Pass1234!')}"}
+
+    initial = client.get("/aris3/stock/changes", headers=headers)
+    assert initial.status_code == 200
+    payload = initial.json()
+    assert {row["sku"] for row in payload["rows"]} == {"SKU-DELTA-1", "SKU-DELTA-2"}
+    assert payload["tombstones"] == []
+    assert payload["has_more"] is False
+    cursor = payload["next_cursor"]
+
+    idle = client.get("/aris3/stock/changes", params={"cursor": cursor}, headers=headers).json()
+    assert idle["rows"] == [] and idle["tombstones"] == []
+
+    kept.sale_price = Decimal("8.00")
+    db_session.delete(removed)
+    db_session.commit()
+
+    delta = client.get("/aris3/stock/changes", params={"cursor": cursor}, headers=headers).json()
+    assert [row["id"] for row in delta["rows"]] == [str(kept.id)]
+    assert delta["rows"][0]["sale_price"] == "8.00"
+    assert [(row["id"], row["reason"]) for row in delta["tombstones"]] == [(str(removed.id), "DELETED")]
+
+
+def test_stock_changes_pages_in_order_and_tombstones_moves(client, db_session, monkeypatch):
+    monkeypatch.setattr(stock_changes.settings, "STOCK_CHANGES_SETTLE_SECONDS", 0)
+    run_seed(db_session)
+    tenant, store, admin = _create_tenant_user(db_session, suffix="delta-pages")
+    other_store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name="Store delta-other")
+    items = [_stock_item(tenant.id, store.id, sku=f"SKU-PAGE-{index}") for index in range(3)]
+    db_session.add_all([other_store, *items])
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {_login(client, admin.username, 'Pass1234!')}"}
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/aris3/stock/changes", params=params, headers=headers).json()
+        seen.extend(row["id"] for row in page["rows"])
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            break
+    assert sorted(seen) == sorted(str(item.id) for item in items)
+    assert len(seen) == 3
+
+    items[0].store_id = other_store.id
+    db_session.commit()
+
+    moved = client.get("/aris3/stock/changes", params={"cursor": cursor}, headers=headers).json()
+    assert moved["rows"] == []
+    assert [(row["id"], row["reason"], row["store_id"]) for row in moved["tombstones"]] == [
+        (str(items[0].id), "MOVED", str(store.id))
+    ]
+    tenant_wide = client.get(
+        "/aris3/stock/changes",
+        params={"cursor": cursor, "scope": "tenant"},
+        headers=headers,
+    ).json()
+    assert [row["store_id"] for row in tenant_wide["rows"]] == [str(other_store.id)]
+    assert tenant_wide["tombstones"] == []
+
+
+def test_stock_changes_rejects_cursors_past_retention(client, db_session):
+    run_seed(db_session)
+    _tenant, _store, admin = _create_tenant_user(db_session, suffix="delta-expired")
+    headers = {"Authorization": f"Bearer {_login(client, admin.username, 'Pass1234!')}"}
+
+    stale = (datetime.utcnow() - timedelta(days=400)).isoformat()
+    response = client.get("/aris3/stock/changes", params={"changed_since": stale}, headers=headers)
+    assert response.status_code == 409
+    assert response.json()["details"]["field"] == "cursor"
+
+    malformed = client.get("/aris3/stock/changes", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert malformed.status_code == 422
+
+
+def test_prune_tombstones_keeps_recent_rows(db_session):
+    tenant = Tenant(id=uuid.uuid4(), name="Tenant delta-prune")
+    db_session.add(tenant)
+    db_session.commit()
+    now = datetime.utcnow()
+    db_session.add_all(
+        [
+            StockItemTombstone(
+                tenant_id=tenant.id, stock_item_id=uuid.uuid4(), reason="DELETED", deleted_at=now - timedelta(days=45)
+            ),
+            StockItemTombstone(tenant_id=tenant.id, stock_item_id=uuid.uuid4(), reason="DELETED", deleted_at=now),
+        ]
+    )
+    db_session.commit()
+
+    assert StockChangeService(db_session).prune_tombstones(older_than_days=30) == 1
+    assert db_session.query(StockItemTombstone).filter_by(tenant_id=tenant.id).count() == 1
@@ -0,0 +1,174 @@
+import uuid
+from datetime import datetime
+
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockCounter, StockItem, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+from app.aris3.services import stock_bulk
+from app.aris3.services.stock_bulk import StockBulkInsertService
+from app.aris3.services.stock_counters import StockCounterService
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"admin-{suffix}",
+        email=f"admin-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role="ADMIN",
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, store, user
+
+
+def _sku_line(store_id: str, qty: int):
+    return {
+        "sku": "SKU-CNT",
+        "description": "Counter Jacket",
+        "var1_value": "Blue",
+        "var2_value": "L",
+        "epc": None,
+        "location_code": "LOC-1",
+        "pool": "P1",
+        "status": "PENDING",
+        "store_id": store_id,
+        "location_is_vendible": True,
+        "image_asset_id": None,
+        "image_url": None,
+        "image_thumb_url": None,
+        "image_source": None,
+        "image_updated_at": None,
+        "qty": qty,
+    }
+
+
+def _counter_qty(db_session, tenant_id, **filters) -> int:
+    db_session.expire_all()
+    query = db_session.query(StockCounter).filter(StockCounter.tenant_id == tenant_id)
+    for field, value in filters.items():
+        query = query.filter(getattr(StockCounter, field) == value)
+    return sum(counter.qty for counter in query.all())
+
+
+def test_stock_counters_follow_import_migrate_and_write_off(client, db_session):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="counters-flow")
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+
+    imported = client.post(
+        "/aris3/stock/import-sku",
+        headers={**headers, "Idempotency-Key": "counters-import"},
+        json={"transaction_id": "txn-counters-import", "lines": [_sku_line(str(store.id), 3)]},
+    )
+    assert imported.status_code == 201
+    assert _counter_qty(db_session, tenant.id, status="PENDING", has_epc=False) == 3
+
+    migrated = client.post(
+        "/aris3/stock/migrate-sku-to-epc",
+        headers={**headers, "Idempotency-Key": "counters-migrate"},
+        json={
+            "transaction_id": "txn-counters-migrate",
+            "epc": "A" * 24,
+            "data": {**_sku_line(str(store.id), 1), "qty": None},
+        },
+    )
+    assert migrated.status_code == 200, migrated.text
+    assert _counter_qty(db_session, tenant.id, status="PENDING", has_epc=False) == 2
+    assert _counter_qty(db_session, tenant.id, status="RFID", has_epc=True) == 1
+
+    written_off = client.post(
+        "/aris3/stock/actions",
+        headers={**headers, "Idempotency-Key": "counters-write-off"},
+        json={
+            "transaction_id": "txn-counters-write-off",
+            "action": "WRITE_OFF",
+            "payload": {"reason": "DAMAGED", "qty": 1, "data": _sku_line(str(store.id), 1)},
+        },
+    )
+    assert written_off.status_code == 200, written_off.text
+    assert _counter_qty(db_session, tenant.id, status="PENDING", has_epc=False) == 1
+
+    assert StockCounterService(db_session).verify(tenant.id) == []
+
+    listed = client.get("/aris3/stock", headers=headers)
+    assert listed.status_code == 200
+    payload = listed.json()
+    assert payload["totals"]["total_rows"] == 2
+    assert payload["totals"]["total_pending"] == 1
+    assert payload["totals"]["total_rfid"] == 1
+    pending_row = next(row for row in payload["rows"] if row["status"] == "PENDING")
+    assert pending_row["available_qty"] == 1
+
+
+def test_stock_counters_verify_detects_drift_and_rebuild_repairs(client, db_session):
+    run_seed(db_session)
+    tenant, store, _user = _create_tenant_user(db_session, suffix="counters-drift")
+    item = StockItem(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        sku="SKU-DRIFT",
+        status="PENDING",
+        location_code="LOC-1",
+        pool="P1",
+        location_is_vendible=True,
+        created_at=datetime.utcnow(),
+    )
+    db_session.add(item)
+    db_session.commit()
+
+    service = StockCounterService(db_session)
+    assert service.verify(tenant.id) == []
+
+    db_session.execute(StockItem.__table__.delete().where(StockItem.__table__.c.id == str(item.id)))
+    db_session.commit()
+    drift = service.verify(tenant.id)
+    assert len(drift) == 1
+    assert drift[0].counter_qty == 1
+    assert drift[0].actual_qty == 0
+
+    service.rebuild(tenant.id)
+    db_session.commit()
+    assert service.verify(tenant.id) == []
+
+
+def test_bulk_insert_bumps_versions_and_live_events_once_per_group(db_session, monkeypatch):
+    tenant = Tenant(id=uuid.uuid4(), name="Tenant counters-groups")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name="Store counters-groups")
+    db_session.add_all([tenant, store])
+    db_session.commit()
+    marks = []
+    transitions = []
+    monkeypatch.setattr(stock_bulk, "mark_changed", lambda _db, **kwargs: marks.append(kwargs))
+    monkeypatch.setattr(stock_bulk, "note_stock_transition", lambda _db, *args: transitions.append(args))
+    rows = [
+        {"tenant_id": tenant.id, "store_id": store.id, "sku": "SKU-GRP", "status": status, "quantity": quantity}
+        for status, quantity in [("PENDING", 1)] * 4 + [("PENDING", 3), ("RFID", 1)]
+    ]
+
+    assert StockBulkInsertService(db_session, batch_size=2).insert_rows(rows) == 6
+    db_session.commit()
+
+    assert len(marks) == 2
+    assert sorted(transitions, key=lambda args: args[3]) == [
+        (tenant.id, store.id, None, "PENDING", 7),
+        (tenant.id, store.id, None, "RFID", 1),
+    ]
+    assert _counter_qty(db_session, tenant.id, status="PENDING") == 7
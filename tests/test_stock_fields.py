@@ -0,0 +1,136 @@
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockItem, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+from app.aris3.routers.stock import _STOCK_ROW_COLUMNS
+from app.aris3.schemas.stock import StockRow
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str, role: str = "ADMIN"):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"user-{suffix}",
+        email=f"user-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role=role,
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, store, user
+
+
+def _seed_stock(db_session, tenant_id, store_id):
+    db_session.add_all(
+        [
+            StockItem(
+                id=uuid.uuid4(),
+                tenant_id=tenant_id,
+                store_id=store_id,
+                sku="SKU-FIELDS-1",
+                description="Fields item",
+                var1_value="Blue",
+                var2_value="M",
+                epc="A" * 24,
+                location_code="LOC-1",
+                pool="P1",
+                status="RFID",
+                location_is_vendible=True,
+                sale_price=Decimal("12.5"),
+                created_at=datetime(2024, 1, 2, 10, 0, 0),
+            ),
+            StockItem(
+                id=uuid.uuid4(),
+                tenant_id=tenant_id,
+                store_id=store_id,
+                sku="SKU-FIELDS-2",
+                description="Fields item",
+                var1_value="Red",
+                var2_value="L",
+                epc=None,
+                location_code="LOC-1",
+                pool="P1",
+                status="PENDING",
+                location_is_vendible=True,
+                created_at=datetime(2024, 1, 1, 10, 0, 0),
+            ),
+        ]
+    )
+    db_session.commit()
+
+
+def test_every_stock_row_field_is_selectable():
+    assert set(_STOCK_ROW_COLUMNS) == set(StockRow.model_fields)
+
+
+def test_stock_fields_projection_matches_full_rows(client, db_session):
+    run_seed(db_session)
+    tenant, store, admin = _create_tenant_user(db_session, suffix="fields-projection")
+    _seed_stock(db_session, tenant.id, store.id)
+    headers = {"Authorization": f"Bearer {_login(client, admin.username, 'Pass1234!')}"}
+
+    full = client.get("/aris3/stock", headers=headers)
+    assert full.status_code == 200
+
+    fields = "epc,sku,sale_price,sale_mode,available_qty,store_name"
+    projected = client.get("/aris3/stock", params={"fields": fields}, headers=headers)
+    assert projected.status_code == 200
+    payload = projected.json()
+    assert payload["meta"] == full.json()["meta"]
+    assert payload["totals"] == full.json()["totals"]
+    assert payload["rows"] == [{name: row[name] for name in fields.split(",")} for row in full.json()["rows"]]
+    assert payload["rows"][0]["sale_price"] == "12.50"
+    assert projected.headers["ETag"] != full.headers["ETag"]
+
+    invalid = client.get("/aris3/stock", params={"fields": "sku,unknown_field"}, headers=headers)
+    assert invalid.status_code == 422
+    assert invalid.json()["details"]["field"] == "fields"
+
+
+def test_stock_columnar_encoding(client, db_session):
+    run_seed(db_session)
+    tenant, store, admin = _create_tenant_user(db_session, suffix="fields-columnar")
+    _seed_stock(db_session, tenant.id, store.id)
+    headers = {"Authorization": f"Bearer {_login(client, admin.username, 'Pass1234!')}"}
+
+    full = client.get("/aris3/stock", headers=headers).json()
+
+    columnar = client.get("/aris3/stock", params={"encoding": "columnar"}, headers=headers)
+    assert columnar.status_code == 200
+    payload = columnar.json()
+    assert payload["columns"] == list(StockRow.model_fields)
+    assert [dict(zip(payload["columns"], values)) for values in payload["rows"]] == full["rows"]
+
+    narrow = client.get(
+        "/aris3/stock",
+        params={"encoding": "columnar", "fields": "id,status"},
+        headers={**headers, "If-None-Match": columnar.headers["ETag"]},
+    )
+    assert narrow.status_code == 200
+    assert narrow.json()["columns"] == ["id", "status"]
+    assert narrow.json()["rows"] == [[row["id"], row["status"]] for row in full["rows"]]
+
+    cached = client.get(
+        "/aris3/stock",
+        params={"encoding": "columnar", "fields": "id,status"},
+        headers={**headers, "If-None-Match": narrow.headers["ETag"]},
+    )
+    assert cached.status_code == 304
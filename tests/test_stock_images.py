@@ -2,9 +2,14 @@ import uuid
 from datetime import datetime
 from types import SimpleNamespace
 
+from sqlalchemy import event
+
+from app.aris3.core.config import settings
 from app.aris3.core.security import get_password_hash
 from app.aris3.db.models import SkuImage, StockItem, Store, Tenant, User
 from app.aris3.db.seed import run_seed
+from app.aris3.services import sku_image_cache
+from app.aris3.services.sku_image_cache import PrimarySkuImageCache
 
 
 def _login(client, username: str, password: str) -> str:
@@ -125,6 +130,132 @@ def test_stock_query_populates_catalog_image_urls(client, db_session):
     assert row["image_source"] == "catalog"
 
 
+def test_stock_listing_caches_primary_catalog_image_until_upsert(client, db_session):
+    run_seed(db_session)
+    tenant, store, admin = _create_tenant_user(db_session, suffix="stock-images-cache")
+    sku = "SKU-IMG-CACHE"
+    asset_id = uuid.uuid4()
+    db_session.add(
+        StockItem(
+            id=uuid.uuid4(),
+            tenant_id=tenant.id,
+            store_id=store.id,
+            sku=sku,
+            description="SKU with late image",
+            status="PENDING",
+            location_is_vendible=True,
+            image_asset_id=asset_id,
+            created_at=datetime.utcnow(),
+        )
+    )
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {_login(client, admin.username, 'Pass1234!')}"}
+
+    first = client.get("/aris3/stock", params={"scope": "self"}, headers=headers)
+    assert first.status_code == 200
+    assert first.json()["rows"][0]["image_source"] is None
+
+    statements = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        cached = client.get("/aris3/stock", params={"scope": "self"}, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+    assert cached.status_code == 200
+    assert not [statement for statement in statements if "sku_images" in statement]
+
+    upserted = client.post(
+        f"/aris3/catalog/sku/{sku}/images",
+        json={"asset_id": str(asset_id), "mode": "replace"},
+        headers={**headers, "Idempotency-Key": "sku-image-cache-1"},
+    )
+    assert upserted.status_code == 201, upserted.text
+
+    refreshed = client.get("/aris3/stock", params={"scope": "self"}, headers=headers)
+    row = refreshed.json()["rows"][0]
+    assert row["image_source"] == "catalog"
+    assert row["image_url"]
+
+
+def test_stock_listing_drops_cached_image_when_another_worker_changes_it(client, db_session, monkeypatch):
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(sku_image_cache, "time", SimpleNamespace(monotonic=lambda: clock["now"]))
+    run_seed(db_session)
+    tenant, store, admin = _create_tenant_user(db_session, suffix="stock-images-version")
+    sku = "SKU-IMG-VERSION"
+    asset_id = uuid.uuid4()
+    db_session.add(
+        StockItem(
+            id=uuid.uuid4(),
+            tenant_id=tenant.id,
+            store_id=store.id,
+            sku=sku,
+            description="SKU with image written elsewhere",
+            status="PENDING",
+            location_is_vendible=True,
+            image_asset_id=asset_id,
+            created_at=datetime.utcnow(),
+        )
+    )
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {_login(client, admin.username, 'Pass1234!')}"}
+
+    first = client.get("/aris3/stock", params={"scope": "self"}, headers=headers)
+    assert first.json()["rows"][0]["image_source"] is None
+    etag = first.headers["ETag"]
+
+    # Written outside this worker's image endpoints, so its cache is never invalidated locally.
+    db_session.add(
+        SkuImage(
+            id=uuid.uuid4(),
+            tenant_id=tenant.id,
+            sku=sku,
+            asset_id=asset_id,
+            is_primary=True,
+            sort_order=1,
+            created_at=datetime.utcnow(),
+        )
+    )
+    db_session.commit()
+    clock["now"] += settings.SKU_IMAGE_CACHE_VERSION_CHECK_SECONDS
+
+    refreshed = client.get("/aris3/stock", params={"scope": "self"}, headers={**headers, "If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.json()["rows"][0]["image_source"] == "catalog"
+
+
+def test_primary_image_cache_reads_the_catalog_version_once_per_window(db_session, monkeypatch):
+    tenant, _store, _admin = _create_tenant_user(db_session, suffix="stock-images-window")
+    clock = {"now": 1000.0}
+    monkeypatch.setattr(sku_image_cache, "time", SimpleNamespace(monotonic=lambda: clock["now"]))
+    cache = PrimarySkuImageCache()
+    statements = []
+
+    def _capture(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    def _version_reads():
+        return len([statement for statement in statements if "change_versions" in statement])
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        cache.get_many(db_session, tenant_id=tenant.id, skus=["SKU-WINDOW"])
+        cache.get_many(db_session, tenant_id=tenant.id, skus=["SKU-WINDOW", "SKU-OTHER"])
+        assert _version_reads() == 1
+
+        clock["now"] += settings.SKU_IMAGE_CACHE_VERSION_CHECK_SECONDS
+        cache.get_many(db_session, tenant_id=tenant.id, skus=["SKU-WINDOW"])
+        assert _version_reads() == 2
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+
 def test_asset_content_endpoint_serves_authorized_bytes(client, db_session, monkeypatch):
     run_seed(db_session)
     tenant, _store, admin = _create_tenant_user(db_session, suffix="asset-content")
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+
+from app.aris3.core.config import settings
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockImportJob, StockItem, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+from app.aris3.routers import stock as stock_router
+from app.aris3.services.stock_counters import StockCounterService
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"admin-{suffix}",
+        email=f"admin-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role="ADMIN",
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, user
+
+
+def _epc(index: int) -> str:
+    return f"{index:024X}"
+
+
+def _line(index: int, store, **overrides) -> dict:
+    line = {
+        "sku": "SKU-STREAM",
+        "description": "Streamed Tee",
+        "var1_value": "Black",
+        "var2_value": "M",
+        "epc": _epc(index),
+        "location_code": "LOC-1",
+        "pool": "P1",
+        "status": "RFID",
+        "store_id": str(store),
+        "location_is_vendible": True,
+    }
+    line.update(overrides)
+    return line
+
+
+def _ndjson(lines) -> bytes:
+    return "\n".join(json.dumps(line) for line in lines).encode("utf-8")
+
+
+def test_import_epc_stream_ndjson_chunks_and_reports_line_errors(client, db_session, monkeypatch):
+    run_seed(db_session)
+    tenant, user = _create_tenant_user(db_session, suffix="epc-stream")
+    db_session.add(
+        StockItem(id=uuid.uuid4(), tenant_id=tenant.id, store_id=user.store_id, epc=_epc(99), status="RFID")
+    )
+    db_session.commit()
+    monkeypatch.setattr(settings, "STOCK_IMPORT_STREAM_CHUNK_SIZE", 2)
+    token = _login(client, user.username, "Pass1234!")
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"}
+    body = _ndjson(
+        [
+            _line(1, user.store_id),
+            _line(2, user.store_id, epc="not-an-epc"),
+            _line(3, user.store_id),
+            _line(4, user.store_id, epc=_epc(3)),
+            _line(5, user.store_id, epc=_epc(99)),
+            _line(6, user.store_id, store_id=str(uuid.uuid4())),
+            _line(7, user.store_id),
+        ]
+    ) + b"\n{broken\n"
+
+    response = client.post(
+        "/aris3/stock/import-epc/stream",
+        params={"transaction_id": "txn-stream-1"},
+        headers=headers,
+        content=body,
+    )
+
+    assert response.status_code == 200
+    job = response.json()
+    assert job["status"] == "COMPLETED_WITH_ERRORS"
+    assert job["processed_lines"] == 8
+    assert job["inserted"] == 3
+    assert job["error_count"] == 5
+
+    status_response = client.get(f"/aris3/stock/import-jobs/{job['job_id']}", headers=headers)
+    assert status_response.status_code == 200
+    assert status_response.json()["status"] == "COMPLETED_WITH_ERRORS"
+
+    errors_response = client.get(f"/aris3/stock/import-jobs/{job['job_id']}/errors", headers=headers)
+    assert errors_response.status_code == 200
+    errors = errors_response.json()
+    assert errors["truncated"] is False
+    assert [(entry["line"], entry["message"]) for entry in errors["errors"]] == [
+        (2, "epc must be 24 hex uppercase characters"),
+        (4, "duplicate epc in request"),
+        (5, "epc already exists"),
+        (6, "store_id is outside tenant scope"),
+        (8, "line is not valid JSON"),
+    ]
+
+    epcs = {
+        row.epc
+        for row in db_session.query(StockItem).filter(StockItem.tenant_id == tenant.id, StockItem.epc.isnot(None)).all()
+    }
+    assert epcs == {_epc(1), _epc(3), _epc(7), _epc(99)}
+    assert StockCounterService(db_session).verify(tenant.id) == []
+
+
+def test_import_epc_stream_csv_and_resume_skips_committed_lines(client, db_session):
+    run_seed(db_session)
+    tenant, user = _create_tenant_user(db_session, suffix="epc-stream-csv")
+    token = _login(client, user.username, "Pass1234!")
+    headers = {"Authorization": f"Bearer {token}", "Content-Type": "text/csv"}
+    columns = ["sku", "description", "epc", "location_code", "pool", "status", "store_id", "location_is_vendible"]
+    rows = [
+        ",".join(["SKU-CSV", f"Tee {index}", _epc(100 + index), "LOC-1", "P1", "RFID", str(user.store_id), "true"])
+        for index in range(1, 5)
+    ]
+
+    first = client.post(
+        "/aris3/stock/import-epc/stream",
+        params={"transaction_id": "txn-stream-csv", "format": "csv"},
+        headers=headers,
+        content="\ufeff" + "\r\n".join([",".join(columns), *rows[:2]]),
+    )
+    assert first.status_code == 200
+    assert first.json()["inserted"] == 2
+
+    job = db_session.get(StockImportJob, uuid.UUID(first.json()["job_id"]))
+    job.status = "FAILED"
+    db_session.commit()
+
+    resumed = client.post(
+        "/aris3/stock/import-epc/stream",
+        params={"job_id": first.json()["job_id"], "format": "csv"},
+        headers=headers,
+        content="\n".join([",".join(columns), *rows]),
+    )
+    assert resumed.status_code == 200
+    payload = resumed.json()
+    assert payload["status"] == "COMPLETED"
+    assert payload["processed_lines"] == 4
+    assert payload["inserted"] == 4
+    assert payload["error_count"] == 0
+    assert db_session.query(StockItem).filter(StockItem.tenant_id == tenant.id).count() == 4
+
+    finished = client.post(
+        "/aris3/stock/import-epc/stream",
+        params={"job_id": first.json()["job_id"], "format": "csv"},
+        headers=headers,
+        content="\n".join([",".join(columns), *rows]),
+    )
+    assert finished.status_code == 409
+
+    missing = client.get(f"/aris3/stock/import-jobs/{uuid.uuid4()}", headers=headers)
+    assert missing.status_code == 404
+
+
+def test_import_epc_stream_commits_chunks_off_the_event_loop(client, db_session, monkeypatch):
+    run_seed(db_session)
+    _tenant, user = _create_tenant_user(db_session, suffix="epc-stream-thread")
+    monkeypatch.setattr(settings, "STOCK_IMPORT_STREAM_CHUNK_SIZE", 2)
+    original_commit = stock_router._commit_epc_stream_chunk
+    on_event_loop: list[bool] = []
+
+    def _spy_commit(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            on_event_loop.append(True)
+        except RuntimeError:
+            on_event_loop.append(False)
+        return original_commit(*args, **kwargs)
+
+    monkeypatch.setattr(stock_router, "_commit_epc_stream_chunk", _spy_commit)
+    token = _login(client, user.username, "Pass1234!")
+    response = client.post(
+        "/aris3/stock/import-epc/stream",
+        params={"transaction_id": "txn-epc-stream-thread"},
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"},
+        content=_ndjson([_line(index, user.store_id) for index in range(1, 6)]),
+    )
+
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 5
+    assert on_event_loop == [False, False, False]
+
+
+def _stream_job(db_session, transaction_id: str) -> StockImportJob:
+    db_session.expire_all()
+    return db_session.query(StockImportJob).filter(StockImportJob.transaction_id == transaction_id).one()
+
+
+def test_import_epc_stream_fails_the_job_on_an_oversized_line(client, db_session, monkeypatch):
+    run_seed(db_session)
+    _tenant, user = _create_tenant_user(db_session, suffix="epc-stream-long")
+    monkeypatch.setattr(settings, "STOCK_IMPORT_STREAM_CHUNK_SIZE", 2)
+    monkeypatch.setattr(settings, "STOCK_IMPORT_MAX_LINE_BYTES", 400)
+    token = _login(client, user.username, "Pass1234!")
+    body = _ndjson([_line(1, user.store_id), _line(2, user.store_id), _line(3, user.store_id, description="x" * 1000)])
+
+    response = client.post(
+        "/aris3/stock/import-epc/stream",
+        params={"transaction_id": "txn-epc-stream-long"},
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"},
+        content=body,
+    )
+
+    assert response.status_code == 422
+    job = _stream_job(db_session, "txn-epc-stream-long")
+    assert (job.status, job.failure_reason) == ("FAILED", "line exceeds 400 bytes")
+    assert (job.processed_lines, job.inserted_count) == (2, 2)
+
+
+def test_import_epc_stream_fails_the_job_when_a_chunk_raises(client, db_session, monkeypatch):
+    run_seed(db_session)
+    tenant, user = _create_tenant_user(db_session, suffix="epc-stream-crash")
+    monkeypatch.setattr(settings, "STOCK_IMPORT_STREAM_CHUNK_SIZE", 2)
+    original_chunk = stock_router._import_epc_stream_chunk
+    calls = []
+
+    def _crash_second_chunk(*args, **kwargs):
+        calls.append(1)
+        result = original_chunk(*args, **kwargs)
+        if len(calls) == 2:
+            raise RuntimeError("storage went away")
+        return result
+
+    monkeypatch.setattr(stock_router, "_import_epc_stream_chunk", _crash_second_chunk)
+    token = _login(client, user.username, "Pass1234!")
+    with pytest.raises(RuntimeError):
+        client.post(
+            "/aris3/stock/import-epc/stream",
+            params={"transaction_id": "txn-epc-stream-crash"},
+            headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"},
+            content=_ndjson([_line(index, user.store_id) for index in range(1, 6)]),
+        )
+
+    job = _stream_job(db_session, "txn-epc-stream-crash")
+    assert (job.status, job.failure_reason) == ("FAILED", "import failed: RuntimeError")
+    assert (job.processed_lines, job.inserted_count) == (2, 2)
+    assert db_session.query(StockItem).filter(StockItem.tenant_id == tenant.id).count() == 2
@@ -0,0 +1,131 @@
+import uuid
+
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockItem, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+from app.aris3.services.stock_counters import StockCounterService
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"admin-{suffix}",
+        email=f"admin-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role="ADMIN",
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, store, user
+
+
+def _sku_line(store_id: str, qty: int):
+    return {
+        "sku": "SKU-LOT",
+        "description": "Lot Jacket",
+        "var1_value": "Blue",
+        "var2_value": "L",
+        "epc": None,
+        "location_code": "LOC-1",
+        "pool": "P1",
+        "status": "PENDING",
+        "store_id": store_id,
+        "location_is_vendible": True,
+        "image_asset_id": None,
+        "image_url": None,
+        "image_thumb_url": None,
+        "image_source": None,
+        "image_updated_at": None,
+        "qty": qty,
+    }
+
+
+def _rows(db_session, tenant_id):
+    db_session.expire_all()
+    return db_session.query(StockItem).filter(StockItem.tenant_id == tenant_id).all()
+
+
+def test_sku_lot_import_split_on_migrate_and_write_off(client, db_session):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="lots-flow")
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+
+    imported = client.post(
+        "/aris3/stock/import-sku",
+        headers={**headers, "Idempotency-Key": "lots-import"},
+        json={"transaction_id": "txn-lots-import", "storage_mode": "LOT", "lines": [_sku_line(str(store.id), 5)]},
+    )
+    assert imported.status_code == 201, imported.text
+    assert imported.json()["processed"] == 5
+    rows = _rows(db_session, tenant.id)
+    assert [row.quantity for row in rows] == [5]
+
+    listed = client.get("/aris3/stock", headers=headers)
+    assert listed.status_code == 200
+    payload = listed.json()
+    assert payload["totals"]["total_rows"] == 1
+    assert payload["totals"]["total_pending"] == 5
+    assert payload["totals"]["total_units"] == 5
+    assert payload["rows"][0]["quantity"] == 5
+    assert payload["rows"][0]["available_qty"] == 5
+
+    migrated = client.post(
+        "/aris3/stock/migrate-sku-to-epc",
+        headers={**headers, "Idempotency-Key": "lots-migrate"},
+        json={
+            "transaction_id": "txn-lots-migrate",
+            "epc": "B" * 24,
+            "data": {**_sku_line(str(store.id), 1), "qty": None},
+        },
+    )
+    assert migrated.status_code == 200, migrated.text
+    rows = _rows(db_session, tenant.id)
+    assert sorted((row.status, row.quantity) for row in rows) == [("PENDING", 4), ("RFID", 1)]
+    assert len({row.item_uid for row in rows}) == 2
+    # Counter-served and row-scanning (text search) totals agree: rows for paging, units for stock.
+    for params in ({}, {"q": "Lot Jacket"}):
+        totals = client.get("/aris3/stock", headers=headers, params=params).json()["totals"]
+        assert (totals["total_rows"], totals["total_pending"], totals["total_rfid"]) == (2, 4, 1)
+
+    written_off = client.post(
+        "/aris3/stock/actions",
+        headers={**headers, "Idempotency-Key": "lots-write-off"},
+        json={
+            "transaction_id": "txn-lots-write-off",
+            "action": "WRITE_OFF",
+            "payload": {"reason": "DAMAGED", "qty": 2, "data": _sku_line(str(store.id), 2)},
+        },
+    )
+    assert written_off.status_code == 200, written_off.text
+    rows = _rows(db_session, tenant.id)
+    assert sorted((row.status, row.quantity) for row in rows) == [("PENDING", 2), ("RFID", 1)]
+
+    over_written_off = client.post(
+        "/aris3/stock/actions",
+        headers={**headers, "Idempotency-Key": "lots-write-off-over"},
+        json={
+            "transaction_id": "txn-lots-write-off-over",
+            "action": "WRITE_OFF",
+            "payload": {"reason": "DAMAGED", "qty": 3, "data": _sku_line(str(store.id), 3)},
+        },
+    )
+    assert over_written_off.status_code == 422
+    assert sorted(row.quantity for row in _rows(db_session, tenant.id)) == [1, 2]
+
+    assert StockCounterService(db_session).verify(tenant.id) == []
@@ -0,0 +1,136 @@
+import json
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.aris3.core.config import settings
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockItem, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+from app.ops.stock_markdowns import run_markdowns
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"admin-{suffix}",
+        email=f"admin-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role="ADMIN",
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, store, user
+
+
+def _seed_aged_items(db_session, tenant, store):
+    now = datetime.utcnow()
+    ids = {}
+    for age in (10, 45, 90):
+        item = StockItem(
+            id=uuid.uuid4(),
+            tenant_id=tenant.id,
+            store_id=store.id,
+            sku=f"SKU-AGE-{age}",
+            description="Aged Jacket",
+            epc=f"{age:024X}",
+            status="RFID",
+            location_code="LOC-1",
+            pool="P1",
+            location_is_vendible=True,
+            sale_price=Decimal("100.00"),
+            created_at=now - timedelta(days=age),
+        )
+        db_session.add(item)
+        ids[age] = item.id
+    db_session.commit()
+    return ids
+
+
+def test_markdown_policy_preview_and_idempotent_runs(client, db_session, monkeypatch, capsys):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="markdowns")
+    item_ids = _seed_aged_items(db_session, tenant, store)
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+    monkeypatch.setattr(settings, "STOCK_MARKDOWN_CHUNK_SIZE", 1)
+    database_url = str(db_session.get_bind().url)
+
+    created = client.post(
+        "/aris3/stock/markdown-policies",
+        headers=headers,
+        json={
+            "name": "Seasonal",
+            "buckets": [{"min_age_days": 60, "percent": "25"}, {"min_age_days": 30, "percent": "10"}],
+        },
+    )
+    assert created.status_code == 200, created.text
+    policy_id = created.json()["policy_id"]
+    assert [bucket["min_age_days"] for bucket in created.json()["buckets"]] == [30, 60]
+
+    preview = client.post(f"/aris3/stock/markdown-policies/{policy_id}/preview", headers=headers)
+    assert preview.status_code == 200, preview.text
+    buckets = {bucket["min_age_days"]: bucket for bucket in preview.json()["buckets"]}
+    assert buckets[30]["rows"] == 1 and buckets[60]["rows"] == 1
+    assert Decimal(buckets[30]["new_value"]) == Decimal("90.00")
+    assert Decimal(buckets[60]["new_value"]) == Decimal("75.00")
+    assert preview.json()["total_units"] == 2
+
+    queued = client.post(f"/aris3/stock/markdown-policies/{policy_id}/runs", headers=headers)
+    assert queued.status_code == 202, queued.text
+    assert queued.json()["status"] == "QUEUED"
+    # The API only records the run; the scheduled CLI executes queued runs.
+    assert client.get(f"/aris3/stock/markdown-runs/{queued.json()['run_id']}", headers=headers).json()["status"] == "QUEUED"
+    assert run_markdowns(str(tenant.id), "run-queued", "json", database_url=database_url) == 0
+    assert [run["run_id"] for run in json.loads(capsys.readouterr().out)["tenants"][str(tenant.id)]] == [
+        queued.json()["run_id"]
+    ]
+    run = client.get(f"/aris3/stock/markdown-runs/{queued.json()['run_id']}", headers=headers)
+    assert run.status_code == 200, run.text
+    assert run.json()["status"] == "COMPLETED"
+    assert run.json()["updated_count"] == 2
+
+    db_session.expire_all()
+    prices = {age: db_session.get(StockItem, item_id) for age, item_id in item_ids.items()}
+    assert prices[10].sale_price == Decimal("100.00") and prices[10].list_price is None
+    assert prices[45].sale_price == Decimal("90.00") and prices[45].list_price == Decimal("100.00")
+    assert prices[90].sale_price == Decimal("75.00") and prices[90].list_price == Decimal("100.00")
+    assert prices[90].markdown_percent == Decimal("25.00")
+
+    rerun = client.post(f"/aris3/stock/markdown-policies/{policy_id}/runs", headers=headers)
+    assert rerun.status_code == 202
+    assert run_markdowns(str(tenant.id), "run-queued", "json", database_url=database_url) == 0
+    assert run_markdowns(str(tenant.id), "run-queued", "text", database_url=database_url) == 0
+    assert "policies=0" in capsys.readouterr().out
+    rerun_status = client.get(f"/aris3/stock/markdown-runs/{rerun.json()['run_id']}", headers=headers)
+    assert rerun_status.json()["status"] == "COMPLETED"
+    assert rerun_status.json()["updated_count"] == 0
+
+
+def test_markdown_policy_rejects_duplicate_bucket_ages(client, db_session):
+    run_seed(db_session)
+    _tenant, _store, user = _create_tenant_user(db_session, suffix="markdowns-dup")
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+
+    response = client.post(
+        "/aris3/stock/markdown-policies",
+        headers=headers,
+        json={"name": "Dup", "buckets": [{"min_age_days": 30, "percent": "10"}, {"min_age_days": 30, "percent": "20"}]},
+    )
+    assert response.status_code == 422
+    assert response.json()["code"] == "VALIDATION_ERROR"
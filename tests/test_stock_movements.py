@@ -0,0 +1,203 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockItem, StockMovement, StockSnapshot, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+from app.aris3.services import stock_movements
+from app.aris3.services.stock_movements import MOVEMENT_IMPORT, MOVEMENT_SALE, MOVEMENT_STOCK_ACTION, StockMovementService
+from tests.pos_sales_helpers import (
+    create_stock_item,
+    create_tenant_user,
+    login,
+    open_cash_session,
+    sale_line,
+    sale_payload,
+    seed_defaults,
+)
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"admin-{suffix}",
+        email=f"admin-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role="ADMIN",
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, store, user
+
+
+def _sku_line(store_id: str, qty: int):
+    return {
+        "sku": "SKU-MOV",
+        "description": "Ledger Jacket",
+        "var1_value": "Blue",
+        "var2_value": "L",
+        "epc": None,
+        "location_code": "LOC-1",
+        "pool": "P1",
+        "status": "PENDING",
+        "store_id": store_id,
+        "location_is_vendible": True,
+        "image_asset_id": None,
+        "image_url": None,
+        "image_thumb_url": None,
+        "image_source": None,
+        "image_updated_at": None,
+        "qty": qty,
+    }
+
+
+def _movements(db_session, tenant_id):
+    db_session.expire_all()
+    return (
+        db_session.query(StockMovement)
+        .filter(StockMovement.tenant_id == tenant_id)
+        .order_by(StockMovement.occurred_at)
+        .all()
+    )
+
+
+def test_on_hand_at_rolls_ledger_forward_from_snapshots(client, db_session, monkeypatch):
+    monkeypatch.setattr(stock_movements.settings, "STOCK_CHANGES_SETTLE_SECONDS", 0)
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="movements-flow")
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+
+    imported = client.post(
+        "/aris3/stock/import-sku",
+        headers={**headers, "Idempotency-Key": "movements-import"},
+        json={"transaction_id": "txn-movements-import", "lines": [_sku_line(str(store.id), 3)]},
+    )
+    assert imported.status_code == 201
+    after_import = datetime.utcnow()
+
+    written_off = client.post(
+        "/aris3/stock/actions",
+        headers={**headers, "Idempotency-Key": "movements-write-off"},
+        json={
+            "transaction_id": "txn-movements-write-off",
+            "action": "WRITE_OFF",
+            "payload": {"reason": "DAMAGED", "qty": 1, "data": _sku_line(str(store.id), 1)},
+        },
+    )
+    assert written_off.status_code == 200, written_off.text
+
+    movements = _movements(db_session, tenant.id)
+    assert [(row.reason, row.qty_delta, row.reference_id) for row in movements] == [
+        (MOVEMENT_IMPORT, 3, "txn-movements-import"),
+        (MOVEMENT_STOCK_ACTION, -1, "txn-movements-write-off"),
+    ]
+
+    past = client.get("/aris3/stock/on-hand", headers=headers, params={"at": after_import.isoformat()})
+    assert past.status_code == 200
+    assert past.json()["snapshot_taken_at"] is None
+    assert past.json()["rows"] == [{"store_id": str(store.id), "sku": "SKU-MOV", "on_hand": 3}]
+
+    service = StockMovementService(db_session)
+    snapshot = service.take_snapshot(tenant_id=tenant.id)
+    db_session.commit()
+    assert service.on_hand_at(tenant_id=tenant.id, at=after_import).snapshot_taken_at is None
+
+    current = client.get("/aris3/stock/on-hand", headers=headers)
+    assert current.status_code == 200
+    assert current.json()["total_units"] == 2
+    assert current.json()["snapshot_taken_at"] is not None
+
+    # Once a snapshot exists the ledger before it is no longer replayed.
+    db_session.query(StockMovement).filter(StockMovement.occurred_at <= snapshot.taken_at).delete()
+    db_session.commit()
+    assert service.on_hand_at(tenant_id=tenant.id, at=datetime.utcnow()).units == {(str(store.id), "SKU-MOV"): 2}
+    assert db_session.query(StockSnapshot).filter(StockSnapshot.tenant_id == tenant.id).count() == 1
+
+
+def test_movements_are_stamped_at_commit_so_late_transactions_are_not_lost(db_session, monkeypatch):
+    monkeypatch.setattr(stock_movements.settings, "STOCK_CHANGES_SETTLE_SECONDS", 0)
+    tenant, store, _user = _create_tenant_user(db_session, suffix="movements-late")
+    started = datetime(2030, 1, 1, 12, 0, 0)
+    clock = {"now": started}
+
+    class _Clock(datetime):
+        @classmethod
+        def utcnow(cls):
+            return clock["now"]
+
+    monkeypatch.setattr(stock_movements, "datetime", _Clock)
+    line = _sku_line(str(store.id), 4)
+    line.pop("qty")
+    db_session.add(StockItem(id=uuid.uuid4(), tenant_id=tenant.id, quantity=4, **line))
+    db_session.flush()
+    assert [row.occurred_at for row in _movements(db_session, tenant.id)] == [started]
+
+    # The transaction commits an hour after it flushed; a snapshot taken in between could not see it.
+    clock["now"] = started + timedelta(hours=1)
+    db_session.commit()
+    assert [row.occurred_at for row in _movements(db_session, tenant.id)] == [started + timedelta(hours=1)]
+
+    service = StockMovementService(db_session)
+    snapshot = service.take_snapshot(tenant_id=tenant.id, now=started + timedelta(minutes=30))
+    db_session.commit()
+    assert snapshot.taken_at == started + timedelta(minutes=30)
+    later = service.on_hand_at(tenant_id=tenant.id, at=started + timedelta(hours=2))
+    assert later.snapshot_taken_at == snapshot.taken_at
+    assert later.units == {(str(store.id), "SKU-MOV"): 4}
+
+
+def test_checkout_writes_sale_movement(client, db_session):
+    seed_defaults(db_session)
+    tenant, store, _other_store, user = create_tenant_user(db_session, suffix="movements-sale")
+    token = login(client, user.username, "Pass1234!")
+    create_stock_item(
+        db_session,
+        tenant_id=str(tenant.id),
+        sku="SKU-MOV-SALE",
+        epc="EPC-MOV-SALE",
+        location_code="LOC-1",
+        pool="P1",
+        status="RFID",
+    )
+    open_cash_session(db_session, tenant_id=str(tenant.id), store_id=str(store.id), cashier_user_id=str(user.id))
+    created = client.post(
+        "/aris3/pos/sales",
+        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": "movements-sale-create"},
+        json=sale_payload(
+            str(store.id),
+            [sale_line(line_type="EPC", qty=1, unit_price=8.0, sku="SKU-MOV-SALE", epc="EPC-MOV-SALE")],
+            transaction_id="movements-sale-create",
+        ),
+    )
+    assert created.status_code == 201
+    sale_id = created.json()["header"]["id"]
+
+    response = client.post(
+        f"/aris3/pos/sales/{sale_id}/actions",
+        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": "movements-sale-checkout"},
+        json={"transaction_id": "movements-sale-checkout", "action": "CHECKOUT", "payments": [{"method": "CASH", "amount": 8.0}]},
+    )
+    assert response.status_code == 200
+
+    sale_movements = [row for row in _movements(db_session, tenant.id) if row.reason == MOVEMENT_SALE]
+    assert [(row.sku, row.qty_delta, row.reference_type, row.reference_id) for row in sale_movements] == [
+        ("SKU-MOV-SALE", -1, "pos_sale", sale_id)
+    ]
+    on_hand = StockMovementService(db_session).on_hand_at(tenant_id=tenant.id, at=datetime.utcnow())
+    assert on_hand.units.get((str(store.id), "SKU-MOV-SALE"), 0) == 0
@@ -5,6 +5,7 @@ import pytest
 from app.aris3.core.security import get_password_hash
 from app.aris3.db.models import StockItem, Store, Tenant, User
 from app.aris3.db.seed import run_seed
+from app.aris3.services.stock_rules import compute_operational_state
 from tests.pos_sales_helpers import sale_line, sale_payload
 
 
@@ -442,3 +443,33 @@ def test_unsold_operational_row_marked_saleable_can_be_sold(client, db_session):
         ),
     )
     assert create_sale.status_code == 201
+
+
+def test_listing_state_from_sql_matches_python_rules(client, db_session):
+    run_seed(db_session)
+    tenant, store_a, _, user = _bootstrap(db_session, "sql-operational-state")
+    rows = [
+        _add_stock(db_session, tenant_id=tenant.id, store_id=store_a.id, sku="SKU-SQL-1", status="RFID", epc="E" * 24),
+        _add_stock(db_session, tenant_id=tenant.id, store_id=store_a.id, sku="SKU-SQL-2", status="PENDING", epc=None),
+        _add_stock(db_session, tenant_id=tenant.id, store_id=store_a.id, sku="SKU-SQL-3", status="RFID", epc="  "),
+        _add_stock(db_session, tenant_id=tenant.id, store_id=store_a.id, sku="SKU-SQL-4", status="sold", epc="F" * 24),
+    ]
+    expected = {str(row.id): compute_operational_state(row) for row in rows}
+
+    token = _login(client, user.username)
+    for view in ("operational", "all"):
+        response = client.get(
+            "/aris3/stock",
+            headers={"Authorization": f"Bearer {token}"},
+            params={"store_id": str(store_a.id), "view": view},
+        )
+        assert response.status_code == 200
+        listed = response.json()["rows"]
+        assert len(listed) == 4
+        for row in listed:
+            state = expected[row["id"]]
+            assert row["sale_mode"] == state.sale_mode
+            assert row["transfer_mode"] == state.transfer_mode
+            assert row["available_for_sale"] is state.available_for_sale
+            assert row["available_for_transfer"] is state.available_for_transfer
+            assert row["is_historical"] is state.is_historical
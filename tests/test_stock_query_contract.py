@@ -103,6 +103,7 @@ def test_stock_query_contract(client, db_session):
         "transfer_mode",
         "is_historical",
         "available_qty",
+        "quantity",
         "display_pool",
         "display_location_code",
         "cost_price",
@@ -0,0 +1,145 @@
+import uuid
+from datetime import datetime, timedelta
+
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockItem, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"admin-{suffix}",
+        email=f"admin-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role="ADMIN",
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, store, user
+
+
+def _seed_rows(db_session, tenant, store, count: int):
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    rows = []
+    for index in range(count):
+        rows.append(
+            StockItem(
+                id=uuid.uuid4(),
+                tenant_id=tenant.id,
+                store_id=store.id,
+                sku=None if index % 4 == 0 else f"SKU-{index % 3}",
+                status="PENDING",
+                location_code="LOC-1",
+                pool="P1",
+                location_is_vendible=True,
+                # Pairs share created_at so the id tie-break is exercised.
+                created_at=base + timedelta(minutes=index // 2),
+            )
+        )
+    db_session.add_all(rows)
+    db_session.commit()
+    return rows
+
+
+def _walk_with_cursor(client, headers, params):
+    collected = []
+    cursor = None
+    pages = 0
+    while True:
+        request_params = dict(params)
+        if cursor:
+            request_params["cursor"] = cursor
+        response = client.get("/aris3/stock", params=request_params, headers=headers)
+        assert response.status_code == 200, response.text
+        payload = response.json()
+        collected.extend(row["id"] for row in payload["rows"])
+        cursor = payload["meta"]["next_cursor"]
+        pages += 1
+        if not cursor:
+            return collected, pages
+        assert pages < 50
+
+
+def test_stock_query_cursor_pages_match_offset_pages_for_every_sort(client, db_session):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="cursor")
+    _seed_rows(db_session, tenant, store, 11)
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+
+    for sort_by in ("created_at", "sku", "id"):
+        for sort_dir in ("asc", "desc"):
+            params = {"page_size": 3, "sort_by": sort_by, "sort_dir": sort_dir}
+            full = client.get(
+                "/aris3/stock",
+                params={"page_size": 50, "sort_by": sort_by, "sort_dir": sort_dir},
+                headers=headers,
+            ).json()
+            expected = [row["id"] for row in full["rows"]]
+            assert full["meta"]["next_cursor"] is None
+
+            walked, pages = _walk_with_cursor(client, headers, params)
+            assert walked == expected
+            assert pages == 4
+
+
+def test_stock_query_page_numbers_cover_every_row_once(client, db_session):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="page-walk")
+    seeded = _seed_rows(db_session, tenant, store, 9)
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+
+    walked = []
+    for page in (1, 2, 3):
+        response = client.get(
+            "/aris3/stock",
+            params={"page": page, "page_size": 3, "sort_by": "created_at", "sort_dir": "asc"},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.text
+        page_ids = [row["id"] for row in response.json()["rows"]]
+        assert len(page_ids) == 3
+        walked.extend(page_ids)
+
+    assert len(walked) == len(set(walked)) == 9
+    assert set(walked) == {str(row.id) for row in seeded}
+
+
+def test_stock_query_cursor_rejects_malformed_or_mismatched_cursor(client, db_session):
+    run_seed(db_session)
+    tenant, store, user = _create_tenant_user(db_session, suffix="cursor-invalid")
+    _seed_rows(db_session, tenant, store, 4)
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+
+    first = client.get("/aris3/stock", params={"page_size": 2, "sort_by": "sku"}, headers=headers)
+    assert first.status_code == 200
+    next_cursor = first.json()["meta"]["next_cursor"]
+    assert next_cursor
+
+    malformed = client.get("/aris3/stock", params={"cursor": "not-a-cursor"}, headers=headers)
+    assert malformed.status_code == 422
+    assert malformed.json()["code"] == "VALIDATION_ERROR"
+
+    mismatched = client.get(
+        "/aris3/stock",
+        params={"page_size": 2, "sort_by": "created_at", "cursor": next_cursor},
+        headers=headers,
+    )
+    assert mismatched.status_code == 422
+    assert mismatched.json()["details"]["field"] == "cursor"
@@ -446,6 +446,7 @@ def test_stock_query_store_scope_strict_rows_and_totals_with_operational_view(cl
         forensic_messages.append(message % args)
 
     monkeypatch.setattr(stock_router.logger, "info", _capture_log)
+    monkeypatch.setattr(stock_router.settings, "FORENSICS_HEADER_ENABLED", True)
 
     token = _login(client, user.username, "Pass1234!")
     response = client.get(
@@ -459,7 +460,7 @@ def test_stock_query_store_scope_strict_rows_and_totals_with_operational_view(cl
             "sort_by": "created_at",
             "sort_dir": "desc",
         },
-        headers={"Authorization": f"Bearer {token}"},
+        headers={"Authorization": f"Bearer {token}", "X-ARIS3-Forensics": "1"},
     )
 
     assert response.status_code == 200
@@ -482,5 +483,6 @@ def test_stock_query_store_scope_strict_rows_and_totals_with_operational_view(cl
     assert "token_store_id=" in forensic_log
     assert "base_sql=" in forensic_log
     assert "paged_sql=" in forensic_log
+    assert "forensic_reason=header" in forensic_log
     assert str(requested_store.id) in forensic_log
     assert "SKU-SMOKE-A" not in {row["sku"] for row in rows}
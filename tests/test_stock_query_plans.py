@@ -0,0 +1,104 @@
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from app.aris3.db.models import StockItem
+from app.aris3.repos.stock import StockQueryFilters, StockRepository
+from app.aris3.services.stock_archive import stock_items_with_archive
+from app.aris3.services.stock_rules import sale_epc_filters, sale_sku_filters, transfer_sku_filters
+from tests.query_plan_utils import explain_plan, full_scans
+
+
+TENANT_ID = str(uuid.uuid4())
+STORE_ID = str(uuid.uuid4())
+
+
+def _list_stock(db, **filters):
+    repo = StockRepository(db)
+    query_filters = StockQueryFilters(tenant_id=TENANT_ID, **filters)
+    return repo._paged_query(
+        repo._apply_filters(query_filters),
+        page=1,
+        page_size=51,
+        sort_by="created_at",
+        sort_dir="desc",
+        entity=repo.entity_for(query_filters),
+    )
+
+
+def _report_costs(db):
+    stock_items = stock_items_with_archive()
+    return select(stock_items.sku, stock_items.cost_price).where(
+        stock_items.tenant_id == TENANT_ID,
+        stock_items.store_id == STORE_ID,
+        stock_items.sku.in_(["SKU-1", "SKU-2"]),
+    )
+
+
+# Every hot stock access path; a plan that stops using an index for any of them fails the suite.
+HOT_QUERIES = {
+    "checkout_sku_pick": lambda db: select(StockItem)
+    .where(*sale_sku_filters(tenant_id=TENANT_ID, store_id=STORE_ID, sku="SKU-1"))
+    .order_by(StockItem.created_at)
+    .limit(2),
+    "checkout_sku_available": lambda db: select(func.coalesce(func.sum(StockItem.quantity), 0)).where(
+        *sale_sku_filters(tenant_id=TENANT_ID, store_id=STORE_ID, sku="SKU-1")
+    ),
+    "checkout_epc": lambda db: select(StockItem).where(
+        *sale_epc_filters(tenant_id=TENANT_ID, store_id=STORE_ID, epc="E280000000000000000000A1")
+    ),
+    "transfer_sku_validation": lambda db: select(StockItem)
+    .where(
+        *transfer_sku_filters(
+            tenant_id=TENANT_ID, origin_store_id=STORE_ID, sku="SKU-1", location_code="LOC-1", pool="P1"
+        )
+    )
+    .order_by(StockItem.created_at.asc())
+    .limit(3),
+    "return_sold_sku": lambda db: select(StockItem)
+    .where(
+        StockItem.tenant_id == TENANT_ID,
+        StockItem.store_id == STORE_ID,
+        StockItem.sku == "SKU-1",
+        StockItem.status == "SOLD",
+        StockItem.location_code == "LOC-1",
+        StockItem.pool == "P1",
+    )
+    .order_by(StockItem.created_at)
+    .limit(1),
+    "list_stock_store": lambda db: _list_stock(db, scope_store_id=STORE_ID),
+    "list_stock_tenant": lambda db: _list_stock(db, scope="tenant"),
+    "list_stock_sku": lambda db: _list_stock(db, scope_store_id=STORE_ID, sku="SKU-1"),
+    "list_stock_history": lambda db: _list_stock(db, scope_store_id=STORE_ID, view="history"),
+    "report_cost_lookup": _report_costs,
+}
+
+
+# Single-column indexes that only narrow to a whole tenant (or every tenant); a hot query seeking
+# through one of these reads as many rows as a full scan once a tenant has real volume.
+TENANT_WIDE_INDEXES = {
+    "ix_stock_items_tenant_id",
+    "ix_stock_items_store_id",
+    "ix_stock_items_sku",
+    "ix_stock_items_status",
+    "ix_stock_items_location_code",
+    "ix_stock_items_pool",
+    "ix_stock_items_created_at",
+    "ix_stock_items_archive_tenant_id",
+}
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_stock_queries_use_indexes(db_session, name):
+    plan = explain_plan(db_session, HOT_QUERIES[name](db_session))
+    assert plan
+    for table in ("stock_items", "stock_items_archive"):
+        assert full_scans(plan, table) == [], f"{name} regressed to a full scan of {table}: {plan}"
+    words = {word for line in plan for word in line.split()}
+    assert not words & TENANT_WIDE_INDEXES, f"{name} fell back to a tenant-wide index: {plan}"
+
+
+def test_full_scan_detection_flags_unindexed_filters(db_session):
+    plan = explain_plan(db_session, select(StockItem).where(StockItem.observation == "damaged"))
+    assert full_scans(plan, "stock_items")
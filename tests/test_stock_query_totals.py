@@ -1,5 +1,7 @@
 import uuid
 
+from sqlalchemy import event
+
 from app.aris3.core.security import get_password_hash
 from app.aris3.db.models import StockItem, Store, Tenant, User
 from app.aris3.db.seed import run_seed
@@ -58,3 +60,51 @@ def test_stock_query_totals(client, db_session):
     assert totals["total_rfid"] == 2
     assert totals["total_pending"] == 1
     assert totals["total_units"] == totals["total_rfid"] + totals["total_pending"]
+
+
+def test_stock_query_tenant_totals_and_store_breakdown_share_one_scan(client, db_session):
+    run_seed(db_session)
+    tenant, user = _create_tenant_user(db_session, suffix="totals-single-pass")
+    other_store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name="Store totals-single-pass B")
+    db_session.add(other_store)
+    db_session.commit()
+    db_session.add_all(
+        [
+            StockItem(id=uuid.uuid4(), tenant_id=tenant.id, store_id=user.store_id, status="RFID", location_is_vendible=True),
+            StockItem(id=uuid.uuid4(), tenant_id=tenant.id, store_id=user.store_id, status="PENDING", location_is_vendible=True),
+            StockItem(id=uuid.uuid4(), tenant_id=tenant.id, store_id=other_store.id, status="PENDING", location_is_vendible=True),
+            StockItem(id=uuid.uuid4(), tenant_id=tenant.id, store_id=other_store.id, status="PENDING", location_is_vendible=False),
+            StockItem(id=uuid.uuid4(), tenant_id=tenant.id, store_id=None, status="RFID", location_is_vendible=True),
+        ]
+    )
+    db_session.commit()
+    token = _login(client, user.username, "Pass1234!")
+
+    from app.aris3.db.session import engine
+
+    stock_statements: list[str] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM stock_items" in statement:
+            stock_statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        response = client.get(
+            "/aris3/stock",
+            params={"scope": "tenant", "page_size": 2},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    assert response.status_code == 200
+    totals = response.json()["totals"]
+    assert totals["total_rows"] == 5
+    assert totals["total_rfid"] == 2
+    assert totals["total_pending"] == 2
+    assert totals["total_units"] == 4
+    by_store = {entry["store_id"]: entry["total_rows"] for entry in totals["totals_by_store"]}
+    assert by_store == {str(user.store_id): 2, str(other_store.id): 2, None: 1}
+    # Only the page fetch touches stock_items; totals come from stock_counters.
+    assert len(stock_statements) == 1
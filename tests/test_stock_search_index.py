@@ -0,0 +1,139 @@
+import re
+import uuid
+from types import SimpleNamespace
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.aris3.core.security import get_password_hash
+from app.aris3.db.models import StockItem, StockSearchToken, Store, Tenant, User
+from app.aris3.db.seed import run_seed
+from app.aris3.services.stock_search import query_tokens, search_clause, token_prefix_pattern
+
+
+def _login(client, username: str, password: str) -> str:
+    response = client.post(
+        "/aris3/auth/login",
+        json={"username_or_email": username, "password": password},
+    )
+    assert response.status_code == 200
+    return response.json()["access_token"]
+
+
+def _create_tenant_user(db_session, *, suffix: str):
+    tenant = Tenant(id=uuid.uuid4(), name=f"Tenant {suffix}")
+    store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name=f"Store {suffix}")
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=store.id,
+        username=f"admin-{suffix}",
+        email=f"admin-{suffix}@example.com",
+        hashed_password=get_password_hash("Pass1234!"),
+        role="ADMIN",
+        status="active",
+        must_change_password=False,
+        is_active=True,
+    )
+    db_session.add_all([tenant, store, user])
+    db_session.commit()
+    return tenant, user
+
+
+def _search_skus(client, headers, q: str) -> list[str]:
+    response = client.get("/aris3/stock", params={"q": q}, headers=headers)
+    assert response.status_code == 200
+    return sorted(row["sku"] for row in response.json()["rows"])
+
+
+def test_stock_search_index_tracks_writes_and_matches_token_prefixes(client, db_session):
+    run_seed(db_session)
+    tenant, user = _create_tenant_user(db_session, suffix="search-index")
+    jacket = StockItem(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=user.store_id,
+        sku="SKU-JKT-01",
+        description="Denim Jacket",
+        var1_value="Navy",
+        var2_value="L",
+        epc="A1B2C3D4E5F60718293A4B5C",
+        location_code="LOC-A",
+        pool="P1",
+        status="RFID",
+        location_is_vendible=True,
+    )
+    shirt = StockItem(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=user.store_id,
+        sku="SKU-SHT-02",
+        description="Linen Shirt",
+        var1_value="White",
+        var2_value="M",
+        location_code="LOC-B",
+        pool="P1",
+        status="PENDING",
+        location_is_vendible=True,
+    )
+    db_session.add_all([jacket, shirt])
+    db_session.commit()
+
+    assert jacket.search_text == "sku-jkt-01 denim jacket navy l a1b2c3d4e5f60718293a4b5c loc-a p1"
+    tokens = set(
+        db_session.execute(select(StockSearchToken.token).where(StockSearchToken.stock_item_id == jacket.id)).scalars()
+    )
+    assert {"sku", "jkt", "01", "denim", "jacket", "navy", "a1b2c3d4e5f60718293a4b5c", "loc", "p1"} <= tokens
+
+    token = _login(client, user.username, "Pass1234!")
+    headers = {"Authorization": f"Bearer {token}"}
+    assert _search_skus(client, headers, "den") == ["SKU-JKT-01"]
+    assert _search_skus(client, headers, "a1b2c3") == ["SKU-JKT-01"]
+    assert _search_skus(client, headers, "sku p1") == ["SKU-JKT-01", "SKU-SHT-02"]
+    assert _search_skus(client, headers, "linen white") == ["SKU-SHT-02"]
+    assert _search_skus(client, headers, "linen navy") == []
+
+    shirt.description = "Oxford Shirt"
+    db_session.commit()
+    assert _search_skus(client, headers, "linen") == []
+    assert _search_skus(client, headers, "OXF") == ["SKU-SHT-02"]
+
+    db_session.delete(jacket)
+    db_session.commit()
+    assert db_session.execute(select(StockSearchToken).where(StockSearchToken.stock_item_id == jacket.id)).first() is None
+    assert _search_skus(client, headers, "denim") == []
+
+
+def test_stock_search_applies_the_token_prefix_rule_on_every_dialect(client, db_session):
+    run_seed(db_session)
+    tenant, user = _create_tenant_user(db_session, suffix="search-rule")
+    item = StockItem(
+        id=uuid.uuid4(),
+        tenant_id=tenant.id,
+        store_id=user.store_id,
+        sku="SKU-RULE-01",
+        description="Denim Jacket",
+        var1_value="Navy",
+        var2_value="L",
+        location_code="LOC-A",
+        pool="P1",
+        status="PENDING",
+        location_is_vendible=True,
+    )
+    db_session.add(item)
+    db_session.commit()
+    headers = {"Authorization": f"Bearer {_login(client, user.username, 'Pass1234!')}"}
+    postgres_db = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+
+    for q, expected in [("den JACK", True), ("enim", False), ("rule-01", True), ("jacket wool", False), ("-", True)]:
+        assert _search_skus(client, headers, q) == (["SKU-RULE-01"] if expected else [])
+        tokens = query_tokens(q)
+        if tokens:
+            # The PostgreSQL clause is a regex per token; applying the same patterns here gives the same answer.
+            compiled = str(
+                search_clause(postgres_db, tenant.id, q).compile(
+                    dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+                )
+            )
+            assert compiled.count("stock_items.search_text ~") == len(tokens)
+            assert all(re.search(token_prefix_pattern(token), item.search_text) for token in tokens) is expected
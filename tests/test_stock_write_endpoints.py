@@ -3,6 +3,7 @@ from datetime import datetime, timezone
 from decimal import Decimal
 
 import pytest
+from sqlalchemy import event
 from sqlalchemy.exc import ProgrammingError
 
 from app.aris3.core.error_catalog import AppError, ErrorCatalog
@@ -10,6 +11,7 @@ from app.aris3.core.security import get_password_hash
 from app.aris3.db.models import StockItem, Store, Tenant, User
 from app.aris3.routers import stock as stock_router
 from app.aris3.db.seed import run_seed
+from app.aris3.services.stock_counters import StockCounterService
 
 
 def _login(client, username: str, password: str) -> str:
@@ -194,6 +196,66 @@ def test_import_sku_success(client, db_session):
     assert total_rfid + total_pending == len(rows)
 
 
+def test_import_sku_bulk_inserts_units_and_validates_each_store_once(client, db_session):
+    run_seed(db_session)
+    tenant, user = _create_tenant_user(db_session, suffix="import-sku-bulk")
+    other_store = Store(id=uuid.uuid4(), tenant_id=tenant.id, name="Store import-sku-bulk B")
+    db_session.add(other_store)
+    db_session.commit()
+    token = _login(client, user.username, "Pass1234!")
+    payload = {
+        "transaction_id": "txn-sku-bulk",
+        "lines": [
+            _stock_line(None, status="PENDING", qty=1200, store_id=str(user.store_id)),
+            _stock_line(None, status="PENDING", qty=3, store_id=str(user.store_id)),
+            _stock_line(None, status="PENDING", qty=5, store_id=str(other_store.id)),
+        ],
+    }
+
+    from app.aris3.db.session import engine
+
+    store_lookups: list[str] = []
+
+    def _capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and "FROM stores" in statement:
+            store_lookups.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _capture)
+    try:
+        response = client.post(
+            "/aris3/stock/import-sku",
+            headers={"Authorization": f"Bearer {token}", "Idempotency-Key": "sku-bulk"},
+            json=payload,
+        )
+    finally:
+        event.remove(engine, "before_cursor_execute", _capture)
+
+    assert response.status_code == 201
+    assert response.json()["processed"] == 1208
+    assert len(store_lookups) == 2
+
+    rows = db_session.query(StockItem).filter(StockItem.tenant_id == tenant.id).all()
+    assert len(rows) == 1208
+    assert len({row.item_uid for row in rows}) == 1208
+    assert {row.status for row in rows} == {"PENDING"}
+    assert {row.item_status for row in rows} == {"PENDING"}
+    assert all(row.created_at is not None for row in rows)
+    assert rows[0].search_text == "sku-1 blue jacket blue l loc-1 p1"
+
+    listing = client.get(
+        "/aris3/stock",
+        params={"scope": "tenant", "q": "jacket", "page_size": 1},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert listing.status_code == 200
+    totals = listing.json()["totals"]
+    assert totals["total_rows"] == 1208
+    assert totals["total_pending"] == 1208
+    by_store = {entry["store_id"]: entry["total_rows"] for entry in totals["totals_by_store"]}
+    assert by_store == {str(user.store_id): 1203, str(other_store.id): 5}
+    assert StockCounterService(db_session).verify(tenant.id) == []
+
+
 def test_import_sku_accepts_lines_without_epc_field(client, db_session):
     run_seed(db_session)
     tenant, user = _create_tenant_user(db_session, suffix="import-sku-no-epc")